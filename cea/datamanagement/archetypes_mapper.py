@@ -19,6 +19,7 @@ import cea.config
 import cea.inputlocator
 from cea import InvalidOccupancyNameException
 from cea.datamanagement.schedule_helper import calc_mixed_schedule
+from cea.utilities import database_cache
 from cea.utilities.dbf import dbf_to_dataframe, dataframe_to_dbf
 
 
@@ -75,7 +76,8 @@ def archetypes_mapper(locator,
 
     # get occupant densities from archetypes schedules
     occupant_densities = {}
-    occ_densities = pd.read_excel(locator.get_database_use_types_properties(), 'INTERNAL_LOADS').set_index('code')
+    occ_densities = database_cache.read_excel(locator.get_database_use_types_properties(),
+                                              'INTERNAL_LOADS').set_index('code')
     for use in list_uses:
         if occ_densities.loc[use, 'Occ_m2p'] > 0.0:
             occupant_densities[use] = 1 / occ_densities.loc[use, 'Occ_m2p']
@@ -104,7 +106,7 @@ def archetypes_mapper(locator,
 
 
 def indoor_comfort_mapper(list_uses, locator, occupant_densities, building_typology_df):
-    comfort_DB = pd.read_excel(locator.get_database_use_types_properties(), 'INDOOR_COMFORT')
+    comfort_DB = database_cache.read_excel(locator.get_database_use_types_properties(), 'INDOOR_COMFORT')
     # define comfort
     prop_comfort_df = building_typology_df.merge(comfort_DB, left_on='1ST_USE', right_on='code')
     # write to shapefile
@@ -125,7 +127,7 @@ def indoor_comfort_mapper(list_uses, locator, occupant_densities, building_typol
 
 
 def internal_loads_mapper(list_uses, locator, occupant_densities, building_typology_df):
-    internal_DB = pd.read_excel(locator.get_database_use_types_properties(), 'INTERNAL_LOADS')
+    internal_DB = database_cache.read_excel(locator.get_database_use_types_properties(), 'INTERNAL_LOADS')
     # define comfort
     prop_internal_df = building_typology_df.merge(internal_DB, left_on='1ST_USE', right_on='code')
     # write to shapefile
@@ -152,7 +154,7 @@ def internal_loads_mapper(list_uses, locator, occupant_densities, building_typol
 
 
 def supply_mapper(locator, building_typology_df):
-    supply_DB = pd.read_excel(locator.get_database_construction_standards(), 'SUPPLY_ASSEMBLIES')
+    supply_DB = database_cache.read_excel(locator.get_database_construction_standards(), 'SUPPLY_ASSEMBLIES')
     prop_supply_df = building_typology_df.merge(supply_DB, left_on='STANDARD', right_on='STANDARD')
     fields = ['Name',
               'type_cs',
@@ -162,7 +164,7 @@ def supply_mapper(locator, building_typology_df):
     dataframe_to_dbf(prop_supply_df[fields], locator.get_building_supply())
 
 def aircon_mapper(locator, typology_df):
-    air_conditioning_DB = pd.read_excel(locator.get_database_construction_standards(), 'HVAC_ASSEMBLIES')
+    air_conditioning_DB = database_cache.read_excel(locator.get_database_construction_standards(), 'HVAC_ASSEMBLIES')
     # define HVAC systems types
     prop_HVAC_df = typology_df.merge(air_conditioning_DB, left_on='STANDARD', right_on='STANDARD')
     # write to shapefile
@@ -180,7 +182,7 @@ def aircon_mapper(locator, typology_df):
 
 
 def architecture_mapper(locator, typology_df):
-    architecture_DB = pd.read_excel(locator.get_database_construction_standards(), 'ENVELOPE_ASSEMBLIES')
+    architecture_DB = database_cache.read_excel(locator.get_database_construction_standards(), 'ENVELOPE_ASSEMBLIES')
     prop_architecture_df = typology_df.merge(architecture_DB, left_on='STANDARD', right_on='STANDARD')
     fields = ['Name',
               'Hs_ag',
@@ -10,8 +10,9 @@ from collections import namedtuple
 from cea.constants import HOURS_IN_YEAR
 from cea.demand import constants
 from cea.demand.sensible_loads import calc_hr, calc_hc
-from cea.utilities.dbf import dbf_to_dataframe
 from cea.technologies import blinds
+from cea.utilities import database_cache
+from cea.utilities.dbf import dbf_to_dataframe
 from typing import List
 
 __author__ = "Gabriel Happle"
@@ -30,6 +31,10 @@ H_IS = constants.H_IS
 B_F = constants.B_F
 LAMBDA_AT = constants.LAMBDA_AT
 
+# the columns of the radiation results used to calculate the solar gains
+RADIATION_COLUMNS = ['walls_east_kW', 'walls_west_kW', 'walls_north_kW', 'walls_south_kW', 'roofs_top_kW',
+                     'windows_east_kW', 'windows_west_kW', 'windows_north_kW', 'windows_south_kW']
+
 
 class BuildingProperties(object):
     """
@@ -106,6 +111,9 @@ class BuildingProperties(object):
         self._solar = solar
         self._prop_RC_model = prop_rc_model
 
+        # the rows of each property, as plain dicts, for a quick lookup by building name (see `__getitem__`)
+        self._records = {}
+
     def calc_bounding_box_geom(self, geometry_shapefile):
         import shapefile
         sf = shapefile.Reader(geometry_shapefile)
@@ -141,43 +149,52 @@ class BuildingProperties(object):
 
     def get_prop_supply_systems(self, name_building):
         """get geometry of a building by name"""
-        return self._prop_supply_systems.loc[name_building].to_dict()
+        return self._get_record('_prop_supply_systems', name_building)
 
     def get_prop_geometry(self, name_building):
         """get geometry of a building by name"""
-        return self._prop_geometry.loc[name_building].to_dict()
+        return self._get_record('_prop_geometry', name_building)
 
     def get_prop_envelope(self, name_building):
         """get the architecture and thermal properties of a building by name"""
-        return self._prop_envelope.loc[name_building].to_dict()
+        return self._get_record('_prop_envelope', name_building)
 
     def get_prop_typology(self, name_building):
         """get the typology properties of a building by name"""
-        return self._prop_typology.loc[name_building].to_dict()
+        return self._get_record('_prop_typology', name_building)
 
     def get_prop_hvac(self, name_building):
         """get HVAC properties of a building by name"""
-        return self._prop_HVAC_result.loc[name_building].to_dict()
+        return self._get_record('_prop_HVAC_result', name_building)
 
     def get_prop_rc_model(self, name_building):
         """get RC-model properties of a building by name"""
-        return self._prop_RC_model.loc[name_building].to_dict()
+        return self._get_record('_prop_RC_model', name_building)
 
     def get_prop_comfort(self, name_building):
         """get comfort properties of a building by name"""
-        return self._prop_comfort.loc[name_building].to_dict()
+        return self._get_record('_prop_comfort', name_building)
 
     def get_prop_internal_loads(self, name_building):
         """get internal loads properties of a building by name"""
-        return self._prop_internal_loads.loc[name_building].to_dict()
+        return self._get_record('_prop_internal_loads', name_building)
 
     def get_prop_age(self, name_building):
         """get age properties of a building by name"""
-        return self._prop_age.loc[name_building].to_dict()
+        return self._get_record('_prop_age', name_building)
 
     def get_solar(self, name_building):
         """get solar properties of a building by name"""
-        return self._solar.loc[name_building]
+        return self._get_record('_solar', name_building)
+
+    def _get_record(self, prop, name_building):
+        """
+        Return the row of the building in the DataFrame ``self.<prop>`` as a dict. All the rows of the DataFrame are
+        converted at once the first time - this is much faster than indexing the DataFrame for each building.
+        """
+        if prop not in self._records:
+            self._records[prop] = getattr(self, prop).to_dict(orient='index')
+        return dict(self._records[prop][name_building])
 
     def calc_prop_rc_model(self, locator, typology, envelope, geometry, hvac_temperatures):
         """
@@ -252,15 +269,15 @@ class BuildingProperties(object):
 
         from cea.demand.control_heating_cooling_systems import has_heating_system, has_cooling_system
 
-        for building in self.building_names:
-            has_system_heating_flag = has_heating_system(hvac_temperatures.loc[building, 'class_hs'])
-            has_system_cooling_flag = has_cooling_system(hvac_temperatures.loc[building, 'class_cs'])
-            if (not has_system_heating_flag and not has_system_cooling_flag and
-                    np.max([df.loc[building, 'Hs_ag'], df.loc[building, 'Hs_bg']]) <= 0.0):
-                df.loc[building, 'Hs_ag'] = 0.0
-                df.loc[building, 'Hs_bg'] = 0.0
-                print('Building {building} has no heating and cooling system, Hs corrected to 0.'.format(
-                    building=building))
+        has_system_heating_flag = df['class_hs'].apply(has_heating_system)
+        has_system_cooling_flag = df['class_cs'].apply(has_cooling_system)
+        no_system = (df.index.isin(self.building_names) & ~has_system_heating_flag & ~has_system_cooling_flag &
+                     (np.maximum(df['Hs_ag'], df['Hs_bg']) <= 0.0))
+        df.loc[no_system, 'Hs_ag'] = 0.0
+        df.loc[no_system, 'Hs_bg'] = 0.0
+        for building in df.index[no_system]:
+            print('Building {building} has no heating and cooling system, Hs corrected to 0.'.format(
+                building=building))
 
         df = calc_useful_areas(df)
 
@@ -270,7 +287,7 @@ class BuildingProperties(object):
         else:
             df['Cm'] = df['Cm_Af'] * df['Af']
 
-        df['Am'] = df['Cm_Af'].apply(self.lookup_effective_mass_area_factor) * df['Af']  # Effective mass area in [m2]
+        df['Am'] = self.lookup_effective_mass_area_factor(df['Cm_Af']) * df['Af']  # Effective mass area in [m2]
 
         # Steady-state Thermal transmittance coefficients and Internal heat Capacity
         # Thermal transmission coefficient for windows and glazing in [W/K]
@@ -335,38 +352,31 @@ class BuildingProperties(object):
 
         """
 
-        # add result columns to envelope df
-        envelope['Awall_ag'] = np.nan
-        envelope['Awin_ag'] = np.nan
-        envelope['Aroof'] = np.nan
-
-        # call all building geometry files in a loop
-        for building_name in self.building_names:
-            geometry_data = pd.read_csv(locator.get_radiation_building(building_name))
-            envelope.loc[building_name, 'Awall_ag'] = geometry_data['walls_east_m2'][0] + \
-                                                  geometry_data['walls_west_m2'][0] + \
-                                                  geometry_data['walls_south_m2'][0] +\
-                                                  geometry_data['walls_north_m2'][0]
-            envelope.loc[building_name, 'Awin_ag'] = geometry_data['windows_east_m2'][0] + \
-                                                  geometry_data['windows_west_m2'][0] + \
-                                                  geometry_data['windows_south_m2'][0] +\
-                                                  geometry_data['windows_north_m2'][0]
-            envelope.loc[building_name, 'Aroof'] = geometry_data['roofs_top_m2'][0]
+        # the surface areas are the same in every row of the radiation results, only the first row is read
+        radiation_areas = pd.concat([pd.read_csv(locator.get_radiation_building(building_name), nrows=1)
+                                     for building_name in self.building_names], ignore_index=True)
+        radiation_areas.index = self.building_names
+
+        # add result columns to envelope df (NaN for the buildings that are not simulated)
+        envelope['Awall_ag'] = radiation_areas['walls_east_m2'] + \
+                               radiation_areas['walls_west_m2'] + \
+                               radiation_areas['walls_south_m2'] + \
+                               radiation_areas['walls_north_m2']
+        envelope['Awin_ag'] = radiation_areas['windows_east_m2'] + \
+                              radiation_areas['windows_west_m2'] + \
+                              radiation_areas['windows_south_m2'] + \
+                              radiation_areas['windows_north_m2']
+        envelope['Aroof'] = radiation_areas['roofs_top_m2']
 
         df = envelope.merge(geometry, left_index=True, right_index=True)
 
-        def calc_empty_envelope_ratio(void_deck_floors, height, floors, Awall, Awin):
-            if (Awall + Awin) > 0.0:
-                empty_envelope_ratio = 1 - ((void_deck_floors * (height / floors)) / (Awall + Awin))
-            else:
-                empty_envelope_ratio = 1
-            return empty_envelope_ratio
-
-        df['empty_envelope_ratio'] = df.apply(lambda x: calc_empty_envelope_ratio(x['void_deck'],
-                                                                                  x['height_ag'],
-                                                                                  x['floors_ag'],
-                                                                                  x['Awall_ag'],
-                                                                                  x['Awin_ag']), axis=1)
+        # share of the envelope that is not a void deck (1 for buildings without walls and windows)
+        envelope_area = df['Awall_ag'] + df['Awin_ag']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['empty_envelope_ratio'] = np.where(
+                envelope_area > 0.0,
+                1 - ((df['void_deck'] * (df['height_ag'] / df['floors_ag'])) / envelope_area),
+                1.0)
 
         # adjust envelope areas with Void_deck
         df['Awin_ag'] = df['Awin_ag'] * df['empty_envelope_ratio']
@@ -388,18 +398,13 @@ class BuildingProperties(object):
         This is used for the calculation of the effective mass area "Am" in `get_prop_RC_model`.
         Standard values can be found in the Annex G of ISO EN13790
 
-        :param: cm: The internal heat capacity per unit of area [J/m2].
+        :param: cm: The internal heat capacity per unit of area [J/m2] (a value or an array with a value per building).
 
         :return: Effective mass area factor (0, 2.5 or 3.2 depending on cm value).
 
         """
-
-        if cm == 0.0:
-            return 0.0
-        elif 0.0 < cm <= 165000.0:
-            return 2.5
-        else:
-            return 3.2
+        cm = np.asarray(cm)
+        return np.select([cm == 0.0, (0.0 < cm) & (cm <= 165000.0)], [0.0, 2.5], default=3.2)
 
     def __getitem__(self, building_name):
         """return a (read-only) BuildingPropertiesRow for the building"""
@@ -553,26 +558,26 @@ class BuildingPropertiesRow(object):
         Lsww_dis = 0.038 * Ll * Lw * nf_ag * H_F * fforma  # length hot water piping distribution circuit
         Lvww_dis = (Ll + 0.0625 * Ll * Lw) * fforma  # length piping heating system distribution circuit
 
-        building_systems = pd.Series({'Lcww_dis': Lcww_dis,
-                                      'Lsww_dis': Lsww_dis,
-                                      'Lv': Lv,
-                                      'Lvww_c': Lvww_c,
-                                      'Lvww_dis': Lvww_dis,
-                                      'Ths_sup_ahu_0': Ths_sup_ahu_0,
-                                      'Ths_re_ahu_0': Ths_re_ahu_0,
-                                      'Ths_sup_aru_0': Ths_sup_aru_0,
-                                      'Ths_re_aru_0': Ths_re_aru_0,
-                                      'Ths_sup_shu_0': Ths_sup_shu_0,
-                                      'Ths_re_shu_0': Ths_re_shu_0,
-                                      'Tcs_sup_ahu_0': Tcs_sup_ahu_0,
-                                      'Tcs_re_ahu_0': Tcs_re_ahu_0,
-                                      'Tcs_sup_aru_0': Tcs_sup_aru_0,
-                                      'Tcs_re_aru_0': Tcs_re_aru_0,
-                                      'Tcs_sup_scu_0': Tcs_sup_scu_0,
-                                      'Tcs_re_scu_0': Tcs_re_scu_0,
-                                      'Tww_sup_0': Tww_sup_0,
-                                      'Y': phi_pipes,
-                                      'fforma': fforma})
+        building_systems = {'Lcww_dis': Lcww_dis,
+                            'Lsww_dis': Lsww_dis,
+                            'Lv': Lv,
+                            'Lvww_c': Lvww_c,
+                            'Lvww_dis': Lvww_dis,
+                            'Ths_sup_ahu_0': Ths_sup_ahu_0,
+                            'Ths_re_ahu_0': Ths_re_ahu_0,
+                            'Ths_sup_aru_0': Ths_sup_aru_0,
+                            'Ths_re_aru_0': Ths_re_aru_0,
+                            'Ths_sup_shu_0': Ths_sup_shu_0,
+                            'Ths_re_shu_0': Ths_re_shu_0,
+                            'Tcs_sup_ahu_0': Tcs_sup_ahu_0,
+                            'Tcs_re_ahu_0': Tcs_re_ahu_0,
+                            'Tcs_sup_aru_0': Tcs_sup_aru_0,
+                            'Tcs_re_aru_0': Tcs_re_aru_0,
+                            'Tcs_sup_scu_0': Tcs_sup_scu_0,
+                            'Tcs_re_scu_0': Tcs_re_scu_0,
+                            'Tww_sup_0': Tww_sup_0,
+                            'Y': phi_pipes,
+                            'fforma': fforma}
         return building_systems
 
     def _calculate_pipe_transmittance_values(self):
@@ -630,7 +635,7 @@ class SolarProperties(object):
 
 
 def get_properties_supply_sytems(locator, properties_supply):
-    data_all_in_one_systems = pd.read_excel(locator.get_database_supply_assemblies(), sheet_name=None)
+    data_all_in_one_systems = database_cache.read_excel(locator.get_database_supply_assemblies(), sheet_name=None)
     supply_heating = data_all_in_one_systems['HEATING']
     supply_dhw = data_all_in_one_systems['HOT_WATER']
     supply_cooling = data_all_in_one_systems['COOLING']
@@ -723,12 +728,13 @@ def get_properties_technical_systems(locator, prop_HVAC):
 
     """
 
-    prop_emission_heating = pd.read_excel(locator.get_database_air_conditioning_systems(), 'HEATING')
-    prop_emission_cooling = pd.read_excel(locator.get_database_air_conditioning_systems(), 'COOLING')
-    prop_emission_dhw = pd.read_excel(locator.get_database_air_conditioning_systems(), 'HOT_WATER')
-    prop_emission_control_heating_and_cooling = pd.read_excel(locator.get_database_air_conditioning_systems(),
-                                                              'CONTROLLER')
-    prop_ventilation_system_and_control = pd.read_excel(locator.get_database_air_conditioning_systems(), 'VENTILATION')
+    air_conditioning_systems = database_cache.read_excel(locator.get_database_air_conditioning_systems(),
+                                                         ['HEATING', 'COOLING', 'HOT_WATER', 'CONTROLLER', 'VENTILATION'])
+    prop_emission_heating = air_conditioning_systems['HEATING']
+    prop_emission_cooling = air_conditioning_systems['COOLING']
+    prop_emission_dhw = air_conditioning_systems['HOT_WATER']
+    prop_emission_control_heating_and_cooling = air_conditioning_systems['CONTROLLER']
+    prop_ventilation_system_and_control = air_conditioning_systems['VENTILATION']
 
     df_emission_heating = prop_HVAC.merge(prop_emission_heating, left_on='type_hs', right_on='code')
     df_emission_cooling = prop_HVAC.merge(prop_emission_cooling, left_on='type_cs', right_on='code')
@@ -875,13 +881,14 @@ def get_envelope_properties(locator, prop_architecture):
                 'WARNING: Invalid floor type found in architecture inputs. The following buildings will not be modeled: {}.'.format(
                     list(df_floor.loc[df_floor['code'].isna()]['Name'])))
 
-    prop_roof = pd.read_excel(locator.get_database_envelope_systems(), 'ROOF')
-    prop_wall = pd.read_excel(locator.get_database_envelope_systems(), 'WALL')
-    prop_floor = pd.read_excel(locator.get_database_envelope_systems(), 'FLOOR')
-    prop_win = pd.read_excel(locator.get_database_envelope_systems(), 'WINDOW')
-    prop_shading = pd.read_excel(locator.get_database_envelope_systems(), 'SHADING')
-    prop_construction = pd.read_excel(locator.get_database_envelope_systems(), 'CONSTRUCTION')
-    prop_leakage = pd.read_excel(locator.get_database_envelope_systems(), 'TIGHTNESS')
+    envelope_systems = database_cache.read_excel(locator.get_database_envelope_systems(), sheet_name=None)
+    prop_roof = envelope_systems['ROOF']
+    prop_wall = envelope_systems['WALL']
+    prop_floor = envelope_systems['FLOOR']
+    prop_win = envelope_systems['WINDOW']
+    prop_shading = envelope_systems['SHADING']
+    prop_construction = envelope_systems['CONSTRUCTION']
+    prop_leakage = envelope_systems['TIGHTNESS']
 
     df_construction = prop_architecture.merge(prop_construction, left_on='type_cons', right_on='code', how='left')
     df_leakage = prop_architecture.merge(prop_leakage, left_on='type_leak', right_on='code', how='left')
@@ -927,10 +934,13 @@ def get_prop_solar(locator, building_names, prop_rc_model, prop_envelope, weathe
     # create result data frame
     list_Isol = []
 
+    # the heat transfer coefficients of the external surfaces only depend on the weather data
+    h_c, theta_ss = calc_external_surface_conditions(weather_data)
+
     # for every building
     for building_name in building_names:
         thermal_resistance_surface = dict(zip(['RSE_wall', 'RSE_roof', 'RSE_win'],
-            get_thermal_resistance_surface(prop_envelope.loc[building_name], weather_data)))
+            calc_thermal_resistance_surface(prop_envelope.loc[building_name], h_c, theta_ss)))
         I_sol = calc_Isol_daysim(building_name, locator, prop_envelope, prop_rc_model, thermal_resistance_surface)
         list_Isol.append(I_sol)
 
@@ -956,7 +966,7 @@ def calc_Isol_daysim(building_name, locator, prop_envelope, prop_rc_model, therm
     """
 
     # read daysim radiation
-    radiation_data = pd.read_csv(locator.get_radiation_building(building_name))
+    radiation_data = pd.read_csv(locator.get_radiation_building(building_name), usecols=RADIATION_COLUMNS)
 
     # sum wall
     # solar incident on all walls [W]
@@ -988,9 +998,8 @@ def calc_Isol_daysim(building_name, locator, prop_envelope, prop_rc_model, therm
                  radiation_data['windows_north_kW'] +
                  radiation_data['windows_south_kW']).values * 1000  # in W
 
-    Fsh_win = np.vectorize(blinds.calc_blinds_activation)(I_sol_win,
-                                                          prop_envelope.loc[building_name, 'G_win'],
-                                                          prop_envelope.loc[building_name, 'rf_sh'])
+    Fsh_win = blinds.calc_blinds_activation(I_sol_win, prop_envelope.loc[building_name, 'G_win'],
+                                            prop_envelope.loc[building_name, 'rf_sh'])
 
     I_sol_win = I_sol_win * \
                 Fsh_win * \
@@ -1007,12 +1016,28 @@ def get_thermal_resistance_surface(prop_envelope, weather_data):
     This function defines the surface resistance of external surfaces RSE according to ISO 6946 Eq. (A.1).
     '''
 
+    h_c, theta_ss = calc_external_surface_conditions(weather_data)
+    return calc_thermal_resistance_surface(prop_envelope, h_c, theta_ss)
+
+
+def calc_external_surface_conditions(weather_data):
+    '''
+    Return the convective heat transfer coefficient of the external surfaces and the temperature used for the
+    radiative heat transfer between the external surfaces and the sky for each hour.
+    '''
+    h_c = calc_hc(weather_data['windspd_ms'].values)
+    drybulb_C = weather_data['drybulb_C'].values
+    theta_ss = 0.5 * (weather_data['skytemp_C'].values +
+                      np.concatenate((drybulb_C[:1], drybulb_C[0:HOURS_IN_YEAR - 1])))
+    return h_c, theta_ss
+
+
+def calc_thermal_resistance_surface(prop_envelope, h_c, theta_ss):
+    '''
+    Same as `get_thermal_resistance_surface`, for the hourly values returned by `calc_external_surface_conditions`.
+    '''
+
     # define surface thermal resistances according to ISO 6946
-    h_c = np.vectorize(calc_hc)(weather_data['windspd_ms'].values)
-    theta_ss = 0.5 * (
-            weather_data['skytemp_C'].values +
-            np.array([weather_data['drybulb_C'].values[0]] +
-                     list(weather_data['drybulb_C'].values[0:HOURS_IN_YEAR - 1])))
     thermal_resistance_surface_wall = (h_c + calc_hr(prop_envelope.e_wall, theta_ss)) ** -1
     thermal_resistance_surface_win = (h_c + calc_hr(prop_envelope.e_win, theta_ss)) ** -1
     thermal_resistance_surface_roof = (h_c + calc_hr(prop_envelope.e_roof, theta_ss)) ** -1
@@ -348,6 +348,55 @@ def is_cooling_season(t, bpr):
         # no cooling season
         return False
 
+
+def get_heating_season_hours(bpr):
+    """
+    Vector form of :py:func:`is_heating_season` for all hours of the year
+
+    :param bpr: BuildingPropertiesRow
+    :type bpr: cea.demand.building_properties.BuildingPropertiesRow
+    :return: True for every hour of the year that is part of the heating season
+    :rtype: np.ndarray[bool]
+    """
+    return calc_season_hours(bpr.hvac['has-heating-season'], bpr.hvac['heat_starts'], bpr.hvac['heat_ends'])
+
+
+def get_cooling_season_hours(bpr):
+    """
+    Vector form of :py:func:`is_cooling_season` for all hours of the year
+
+    :param bpr: BuildingPropertiesRow
+    :type bpr: cea.demand.building_properties.BuildingPropertiesRow
+    :return: True for every hour of the year that is part of the cooling season
+    :rtype: np.ndarray[bool]
+    """
+    return calc_season_hours(bpr.hvac['has-cooling-season'], bpr.hvac['cool_starts'], bpr.hvac['cool_ends'])
+
+
+def calc_season_hours(has_season, season_starts, season_ends):
+    """
+    :param bool has_season: True if the building has this season at all
+    :param str season_starts: first day of the season in 'DD|MM' format
+    :param str season_ends: last day of the season in 'DD|MM' format
+    :return: True for every hour of the year that is part of the season
+    :rtype: np.ndarray[bool]
+    """
+    hours = np.arange(HOURS_IN_YEAR)
+    if not has_season:
+        return np.zeros(HOURS_IN_YEAR, dtype=bool)
+
+    season_start = convert_date_to_hour(season_starts)
+    season_end = convert_date_to_hour(season_ends) + 23  # end at the last hour of the day
+
+    if season_start < season_end:
+        # season in the middle of the year
+        return (season_start <= hours) & (hours <= season_end)
+    elif season_start > season_end:
+        # season over the year end
+        return (season_start <= hours) | (hours <= season_end)
+    else:
+        return np.zeros(HOURS_IN_YEAR, dtype=bool)
+
 # temperature controllers
 
 
@@ -4,6 +4,8 @@
 
 
 
+from numba import jit
+
 from cea.demand import control_heating_cooling_systems
 from cea.demand.constants import TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING, DELTA_T_NIGHT_FLUSHING
 
@@ -22,16 +24,23 @@ __status__ = "Production"
 #
 
 def is_mechanical_ventilation_active(bpr, tsd, t):
+    return _is_mechanical_ventilation_active(has_mechanical_ventilation(bpr), tsd['m_ve_required'][t],
+                                             is_night_flushing_active(bpr, tsd, t))
+
+
+@jit(nopython=True, cache=True)
+def _is_mechanical_ventilation_active(mechanical_ventilation_system, m_ve_required, night_flushing):
+    # numba compatible check, also used by cea.demand.rc_model_kernel
 
     # TODO: check for ventilation schedule
-    if has_mechanical_ventilation(bpr) \
-            and tsd['m_ve_required'][t] > 0:
+    if mechanical_ventilation_system \
+            and m_ve_required > 0:
 
         # mechanical ventilation is active if there is a ventilation demand
         return True
 
-    elif has_mechanical_ventilation(bpr) \
-            and is_night_flushing_active(bpr, tsd, t):
+    elif mechanical_ventilation_system \
+            and night_flushing:
 
         # mechanical ventilation for night flushing
         return True
@@ -41,9 +50,15 @@ def is_mechanical_ventilation_active(bpr, tsd, t):
 
 
 def is_window_ventilation_active(bpr, tsd, t):
+    return _is_window_ventilation_active(has_window_ventilation(bpr), is_mechanical_ventilation_active(bpr, tsd, t))
+
 
-    if has_window_ventilation(bpr) \
-            and not is_mechanical_ventilation_active(bpr, tsd, t):
+@jit(nopython=True, cache=True)
+def _is_window_ventilation_active(window_ventilation_system, mechanical_ventilation):
+    # numba compatible check, also used by cea.demand.rc_model_kernel
+
+    if window_ventilation_system \
+            and not mechanical_ventilation:
 
         # window ventilation in case of non-active mechanical ventilation
         return True
@@ -69,24 +84,37 @@ def is_mechanical_ventilation_heat_recovery_active(bpr, tsd, t):
     :rtype: bool
     """
 
-    if is_mechanical_ventilation_active(bpr, tsd, t)\
-            and has_mechanical_ventilation_heat_recovery(bpr)\
-            and control_heating_cooling_systems.is_heating_season(t, bpr):
-        if is_night_flushing_active(bpr, tsd, t) or is_economizer_active(bpr, tsd, t):
+    return _is_mechanical_ventilation_heat_recovery_active(
+        is_mechanical_ventilation_active(bpr, tsd, t), has_mechanical_ventilation_heat_recovery(bpr),
+        control_heating_cooling_systems.is_heating_season(t, bpr),
+        control_heating_cooling_systems.is_cooling_season(t, bpr), is_night_flushing_active(bpr, tsd, t),
+        is_economizer_active(bpr, tsd, t), tsd['T_int'][t-1], tsd['T_ext'][t])
+
+
+@jit(nopython=True, cache=True)
+def _is_mechanical_ventilation_heat_recovery_active(mechanical_ventilation, heat_recovery_system, heating_season,
+                                                    cooling_season, night_flushing, economizer, T_int_prev, T_ext):
+    # numba compatible check, also used by cea.demand.rc_model_kernel
+
+    if mechanical_ventilation\
+            and heat_recovery_system\
+            and heating_season:
+
+        if night_flushing or economizer:
             return False
         else:
             return True
 
-    elif is_mechanical_ventilation_active(bpr, tsd, t)\
-            and has_mechanical_ventilation_heat_recovery(bpr)\
-            and control_heating_cooling_systems.is_cooling_season(t, bpr)\
-            and tsd['T_int'][t-1] < tsd['T_ext'][t]:
+    elif mechanical_ventilation\
+            and heat_recovery_system\
+            and cooling_season\
+            and T_int_prev < T_ext:
 
         return True
 
-    elif is_mechanical_ventilation_active(bpr, tsd, t) \
-            and control_heating_cooling_systems.is_cooling_season(t, bpr) \
-            and tsd['T_int'][t-1] >= tsd['T_ext'][t]:
+    elif mechanical_ventilation \
+            and cooling_season \
+            and T_int_prev >= T_ext:
 
         # heat recovery is deactivated in the cooling case,
         # if outdoor air conditions are colder than indoor (free cooling)
@@ -98,15 +126,22 @@ def is_mechanical_ventilation_heat_recovery_active(bpr, tsd, t):
 
 
 def is_night_flushing_active(bpr, tsd, t):
+    return _is_night_flushing_active(has_night_flushing(bpr), t, tsd['T_int'][t-1], tsd['T_ext'][t], tsd['rh_ext'][t],
+                                     bpr.comfort['RH_max_pc'])
+
+
+@jit(nopython=True, cache=True)
+def _is_night_flushing_active(night_flushing_system, t, T_int_prev, T_ext, rh_ext, RH_max_pc):
+    # numba compatible check, also used by cea.demand.rc_model_kernel
 
     # night flushing is available for window ventilation (manual) and mechanical ventilation (automatic)
     # night flushing is active during the night if the outdoor conditions are favourable
 
-    if has_night_flushing(bpr) \
+    if night_flushing_system \
             and is_night_time(t) \
-            and tsd['T_int'][t-1] > TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING \
-            and tsd['T_int'][t-1] > tsd['T_ext'][t] + DELTA_T_NIGHT_FLUSHING \
-            and tsd['rh_ext'][t] < bpr.comfort['RH_max_pc']:
+            and T_int_prev > TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING \
+            and T_int_prev > T_ext + DELTA_T_NIGHT_FLUSHING \
+            and rh_ext < RH_max_pc:
 
         return True
 
@@ -136,8 +171,16 @@ def is_economizer_active(bpr, tsd, t):
     :rtype: bool
     """
 
-    if has_mechanical_ventilation_economizer(bpr) \
-            and tsd['T_int'][t-1] > bpr.comfort['Tcs_set_C'] >= tsd['T_ext'][t]:
+    return _is_economizer_active(has_mechanical_ventilation_economizer(bpr), tsd['T_int'][t-1],
+                                 bpr.comfort['Tcs_set_C'], tsd['T_ext'][t])
+
+
+@jit(nopython=True, cache=True)
+def _is_economizer_active(economizer_system, T_int_prev, Tcs_set_C, T_ext):
+    # numba compatible check, also used by cea.demand.rc_model_kernel
+
+    if economizer_system \
+            and T_int_prev > Tcs_set_C >= T_ext:
 
         return True
 
@@ -201,6 +244,7 @@ def has_mechanical_ventilation_economizer(bpr):
         raise ValueError(bpr.hvac['ECONOMIZER'])
 
 
+@jit(nopython=True, cache=True)
 def is_night_time(t):
     """
     Check if a certain hour of year is during night or not
@@ -211,6 +255,7 @@ def is_night_time(t):
     return not is_day_time(t)
 
 
+@jit(nopython=True, cache=True)
 def is_day_time(t):
     """
     Check if a certain hour of the year is during the daytime or not
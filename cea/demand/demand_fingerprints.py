@@ -0,0 +1,175 @@
+"""
+Fingerprints of the inputs of the demand calculation of each building. The fingerprints of the last run are stored in
+the demand manifest (``locator.get_demand_manifest()``) so a later run of the demand script can skip the buildings
+whose inputs did not change (see ``config.demand.incremental``).
+
+The fingerprint of a building covers:
+
+- the building properties (:py:class:`cea.demand.building_properties.BuildingPropertiesRow`)
+- the occupancy schedules of the building (``locator.get_schedule_model_file``)
+- the radiation results of the building (``locator.get_radiation_building``)
+- the weather file
+- the parameters of the demand script that change the results
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from cea.demand import demand_readers
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# increase this to invalidate all manifests written before a change to the demand model
+MANIFEST_VERSION = 2
+
+# the parameters of the demand script that change the results files
+DEMAND_PARAMETERS = ['use_dynamic_infiltration_calculation', 'resolution_output', 'loads_output', 'massflows_output',
+                     'temperatures_output', 'output_format']
+
+FILE_CHUNK_SIZE = 1024 * 1024
+
+
+def calc_fingerprints(building_names, bprs, locator, config):
+    """
+    Calculate the fingerprint of the inputs of each building.
+
+    :param building_names: the buildings to calculate the fingerprints of
+    :type building_names: list[str]
+    :param bprs: the building properties of each building
+    :type bprs: dict[str, cea.demand.building_properties.BuildingPropertiesRow]
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param config: the configuration, the parameters in ``DEMAND_PARAMETERS`` are part of the fingerprint
+    :type config: cea.config.Configuration
+    :return: the fingerprint (a hex digest) of each building
+    :rtype: dict[str, str]
+    """
+    common_inputs = hashlib.sha1()
+    update_hash(common_inputs, MANIFEST_VERSION)
+    update_hash(common_inputs, [getattr(config.demand, parameter) for parameter in DEMAND_PARAMETERS])
+    update_hash(common_inputs, config.debug)
+    update_hash(common_inputs, hash_file(locator.get_weather_file()))
+
+    fingerprints = {}
+    for building_name in building_names:
+        building_inputs = common_inputs.copy()
+        update_hash(building_inputs, building_name)
+        update_hash(building_inputs, bprs[building_name])
+        update_hash(building_inputs, hash_file(locator.get_schedule_model_file(building_name)))
+        update_hash(building_inputs, hash_file(locator.get_radiation_building(building_name)))
+        fingerprints[building_name] = building_inputs.hexdigest()
+    return fingerprints
+
+
+def get_changed_buildings(building_names, fingerprints, locator):
+    """
+    Return the buildings that need to be simulated: the buildings whose fingerprint differs from the one in the
+    demand manifest and the buildings with missing results.
+
+    :rtype: list[str]
+    """
+    manifest = read_manifest(locator)
+    total_demand_file = locator.get_total_demand('csv')
+    if not os.path.exists(total_demand_file):
+        return list(building_names)
+    buildings_in_totals = set(pd.read_csv(total_demand_file, usecols=['Name'])['Name'].astype(str))
+
+    def has_changed(building_name):
+        return (manifest.get(building_name) != fingerprints[building_name]
+                or building_name not in buildings_in_totals
+                or not os.path.exists(demand_readers.get_demand_results_file(locator, building_name)))
+
+    return [building_name for building_name in building_names if has_changed(building_name)]
+
+
+def read_manifest(locator):
+    """the fingerprints of the last run of the demand script (an empty dict if there is no valid manifest)"""
+    manifest_file = locator.get_demand_manifest()
+    if not os.path.exists(manifest_file):
+        return {}
+    try:
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+    except ValueError:
+        # e.g. the demand script was interrupted while writing the manifest
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest['buildings']
+
+
+def write_manifest(locator, fingerprints):
+    """
+    Store the fingerprints of the simulated buildings in the demand manifest. The entries of the buildings that were
+    not part of this run are kept.
+    """
+    manifest = read_manifest(locator)
+    manifest.update(fingerprints)
+    with open(locator.get_demand_manifest(), 'w') as f:
+        json.dump({'version': MANIFEST_VERSION, 'buildings': manifest}, f, indent=2, sort_keys=True)
+
+
+def delete_manifest(locator):
+    """
+    Remove the demand manifest of a previous run. A run that is not incremental changes the results without updating
+    the manifest, so a later incremental run must simulate all the buildings.
+    """
+    manifest_file = locator.get_demand_manifest()
+    if os.path.exists(manifest_file):
+        os.remove(manifest_file)
+
+
+def hash_file(path):
+    """hex digest of the contents of a file (an empty string if the file does not exist)"""
+    if not os.path.exists(path):
+        return ''
+    file_hash = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(FILE_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def update_hash(hasher, value):
+    """
+    Feed ``value`` to ``hasher``. Supports the (nested) values found in a BuildingPropertiesRow: scalars, strings,
+    numpy arrays, pandas Series, dicts, lists and the property classes of :py:mod:`cea.demand.building_properties`.
+    """
+    if isinstance(value, np.ndarray):
+        hasher.update(str(value.dtype).encode('utf-8'))
+        if value.dtype == object:
+            update_hash(hasher, value.tolist())
+        else:
+            hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (pd.Series, pd.DataFrame)):
+        update_hash(hasher, value.to_dict())
+    elif isinstance(value, dict):
+        hasher.update(b'{')
+        for key in sorted(value.keys(), key=str):
+            update_hash(hasher, key)
+            update_hash(hasher, value[key])
+        hasher.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b'[')
+        for item in value:
+            update_hash(hasher, item)
+        hasher.update(b']')
+    elif type(value).__module__.startswith('cea.'):
+        # the property classes of cea.demand.building_properties (some of them use __slots__)
+        attributes = getattr(value, '__slots__', None) or sorted(vars(value).keys())
+        hasher.update(type(value).__name__.encode('utf-8'))
+        update_hash(hasher, {attribute: getattr(value, attribute) for attribute in attributes})
+    else:
+        hasher.update(repr(value).encode('utf-8'))
+        hasher.update(b';')
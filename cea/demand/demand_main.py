@@ -6,13 +6,13 @@ Analytical energy demand model algorithm
 import os
 import time
 import warnings
-from itertools import repeat
 
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 from cea import MissingInputDataException
-from cea.demand import thermal_loads
+from cea.demand import thermal_loads, demand_fingerprints
 from cea.demand.building_properties import BuildingProperties
 from cea.utilities import epwreader
 from cea.utilities.date import get_date_range_hours_from_year
@@ -40,6 +40,9 @@ def demand_calculation(locator, config):
       - a csv file for every building with hourly demand data.
       - ``Total_demand.csv``, csv file of yearly demand data per building.
 
+    With ``config.demand.incremental``, only the buildings whose inputs changed since the last run are simulated (see
+    :py:mod:`cea.demand.demand_fingerprints`) and their rows in ``Total_demand.csv`` are updated.
+
 
     :param locator: An InputLocator to locate input files
     :type locator: cea.inputlocator.InputLocator
@@ -110,28 +113,43 @@ def demand_calculation(locator, config):
         print(
             'Warning! The following list of buildings have less than 100 m2 of gross floor area, CEA might fail: %s' % list_buildings_less_100m2)
 
+    # SKIP THE BUILDINGS WITH UNCHANGED INPUTS
+    bprs = {b: building_properties[b] for b in building_names}
+    if config.demand.incremental:
+        fingerprints = demand_fingerprints.calc_fingerprints(building_names, bprs, locator, config)
+        simulated_buildings = demand_fingerprints.get_changed_buildings(building_names, fingerprints, locator)
+        print('Skipping %i buildings with unchanged inputs' % (len(building_names) - len(simulated_buildings)))
+    else:
+        fingerprints = None
+        simulated_buildings = building_names
+        demand_fingerprints.delete_manifest(locator)
+
     # DEMAND CALCULATION
-    n = len(building_names)
     calc_thermal_loads = cea.utilities.parallel.vectorize(thermal_loads.calc_thermal_loads,
-                                                          config.get_number_of_processes(), on_complete=print_progress)
-
+                                                          config.get_number_of_processes(),
+                                                          on_complete=print_progress)
     calc_thermal_loads(
-        building_names,
-        [building_properties[b] for b in building_names],
-        repeat(weather_data, n),
-        repeat(date_range, n),
-        repeat(locator, n),
-        repeat(use_dynamic_infiltration, n),
-        repeat(resolution_output, n),
-        repeat(loads_output, n),
-        repeat(massflows_output, n),
-        repeat(temperatures_output, n),
-        repeat(config, n),
-        repeat(debug, n))
+        simulated_buildings,
+        [bprs[b] for b in simulated_buildings],
+        broadcast(weather_data),
+        broadcast(date_range),
+        broadcast(locator),
+        broadcast(use_dynamic_infiltration),
+        broadcast(resolution_output),
+        broadcast(loads_output),
+        broadcast(massflows_output),
+        broadcast(temperatures_output),
+        broadcast(config),
+        broadcast(debug))
 
     # WRITE TOTAL YEARLY VALUES
     writer_totals = demand_writers.YearlyDemandWriter(loads_output, massflows_output, temperatures_output)
-    writer_totals.write_to_csv(building_names, locator)
+    if len(simulated_buildings) < len(building_names):
+        writer_totals.update_csv(building_names, simulated_buildings, locator)
+    else:
+        writer_totals.write_to_csv(building_names, locator)
+    if fingerprints is not None:
+        demand_fingerprints.write_manifest(locator, fingerprints)
     time_elapsed = time.perf_counter() - t0
     print('done - time elapsed: %d.2 seconds' % time_elapsed)
 
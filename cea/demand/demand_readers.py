@@ -0,0 +1,51 @@
+"""
+Read the demand results of a building written by :py:mod:`cea.demand.demand_writers`, independent of the output format
+(csv or parquet) chosen in ``config.demand.output_format``.
+"""
+
+import os
+
+import pandas as pd
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+
+def get_demand_results_file(locator, building_name):
+    """
+    Path to the demand results of a building: scenario/outputs/data/demand/{building}.parquet if the demand was
+    written in the parquet format, else scenario/outputs/data/demand/{building}.csv
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param str building_name: name of the building
+    :rtype: str
+    """
+    parquet_file = locator.get_demand_results_file(building_name, 'parquet')
+    if os.path.exists(parquet_file):
+        return parquet_file
+    return locator.get_demand_results_file(building_name, 'csv')
+
+
+def read_demand_results(locator, building_name, columns=None):
+    """
+    Read the demand results of a building. The result is the same as ``pd.read_csv(locator.get_demand_results_file(
+    building_name), usecols=columns)``. With the parquet format, only the requested columns are read from disk.
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param str building_name: name of the building
+    :param columns: the columns to read (default: all columns)
+    :type columns: list[str]
+    :rtype: pd.DataFrame
+    """
+    path = get_demand_results_file(locator, building_name)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=list(columns) if columns is not None else None)
+    return pd.read_csv(path, usecols=columns)
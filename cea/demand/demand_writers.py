@@ -2,12 +2,17 @@
 A collection of classes that write out the demand results files. The default is `HourlyDemandWriter`. A `MonthlyDemandWriter` is provided
 that sums the values up monthly. See the `cea.analysis.sensitivity.sensitivity_demand` module for an example of using
 the `MonthlyDemandWriter`.
+
+The results of each building are written either to a csv file or to a (compressed, columnar) parquet file, see
+``config.demand.output_format``. Use :py:func:`cea.demand.demand_readers.read_demand_results` to read them back.
 """
 
 
 
 
 
+import os
+
 import numpy as np
 import pandas as pd
 
@@ -50,8 +55,22 @@ class DemandWriter(object):
         # save hourly data
         columns, hourly_data = self.calc_hourly_dataframe(building_name, date, tsd)
         self.write_to_csv(building_name, columns, hourly_data, locator)
+        remove_file(locator.get_demand_results_file(building_name, 'parquet'))
 
         # save total for the year
+        self.write_yearly_to_temporary_file(bpr, building_name, tsd, locator)
+
+    def results_to_parquet(self, tsd, bpr, locator, date, building_name):
+        # save hourly data
+        columns, hourly_data = self.calc_hourly_dataframe(building_name, date, tsd)
+        self.write_to_parquet(building_name, columns, hourly_data, locator)
+        remove_file(locator.get_demand_results_file(building_name, 'csv'))
+
+        # save total for the year
+        self.write_yearly_to_temporary_file(bpr, building_name, tsd, locator)
+
+    def write_yearly_to_temporary_file(self, bpr, building_name, tsd, locator):
+        """the yearly totals are collected by the `YearlyDemandWriter` after all buildings are simulated"""
         columns, data = self.calc_yearly_dataframe(bpr, building_name, tsd)
         # save to disc
         pd.DataFrame(data, index=[0]).to_csv(
@@ -109,6 +128,12 @@ class HourlyDemandWriter(DemandWriter):
         hourly_data.to_csv(locator.get_demand_results_file(building_name, 'csv'), columns=columns,
                            float_format=FLOAT_FORMAT, na_rep='nan')
 
+    def write_to_parquet(self, building_name, columns, hourly_data, locator):
+        # same columns as the csv file, the DATE is stored as text like in the csv file
+        hourly_data = hourly_data[columns]
+        hourly_data.insert(0, 'DATE', hourly_data.index.astype(str))
+        hourly_data.to_parquet(locator.get_demand_results_file(building_name, 'parquet'), index=False)
+
     def write_to_hdf5(self, building_name, columns, hourly_data, locator):
         # fixing columns with strings
         hourly_data.drop('Name', inplace=True, axis=1)
@@ -129,6 +154,11 @@ class MonthlyDemandWriter(DemandWriter):
         monthly_data_new.to_csv(locator.get_demand_results_file(building_name, 'csv'), index=False,
                                 float_format=FLOAT_FORMAT, na_rep='nan')
 
+    def write_to_parquet(self, building_name, columns, hourly_data, locator):
+        # get monthly totals and rename to MWhyr
+        monthly_data_new = self.calc_monthly_dataframe(building_name, hourly_data)
+        monthly_data_new.to_parquet(locator.get_demand_results_file(building_name, 'parquet'), index=False)
+
     def write_to_hdf5(self, building_name, columns, hourly_data, locator):
         # get monthly totals and rename to MWhyr
         monthly_data_new = self.calc_monthly_dataframe(building_name, hourly_data)
@@ -161,14 +191,29 @@ class YearlyDemandWriter(DemandWriter):
 
     def write_to_csv(self, list_buildings, locator):
         """read in the temporary results files and append them to the Totals.csv file."""
-        df = None
-        for name in list_buildings:
-            temporary_file = locator.get_temporary_file('%(name)sT.csv' % locals())
-            if df is None:
-                df = pd.read_csv(temporary_file)
-            else:
-                df = df.append(pd.read_csv(temporary_file), ignore_index=True)
-        df.to_csv(locator.get_total_demand('csv'), index=False, float_format='%.3f', na_rep='nan')
+        # the rows are streamed to the file one building at a time, in the columns of the first building
+        columns = None
+        with open(locator.get_total_demand('csv'), 'w', newline='') as total_demand_file:
+            for name in list_buildings:
+                temporary_file = locator.get_temporary_file('%(name)sT.csv' % locals())
+                columns = write_row(total_demand_file, pd.read_csv(temporary_file), columns)
+
+    def update_csv(self, list_buildings, simulated_buildings, locator):
+        """
+        Patch the rows of the ``simulated_buildings`` in the Totals.csv file of a previous run with the temporary
+        results files. The rows of the other buildings in ``list_buildings`` are kept as they are.
+        """
+        previous_totals = pd.read_csv(locator.get_total_demand('csv'))
+        previous_rows = dict((str(name), i) for i, name in enumerate(previous_totals['Name']))
+        simulated_buildings = set(simulated_buildings)
+        columns = None
+        with open(locator.get_total_demand('csv'), 'w', newline='') as total_demand_file:
+            for name in list_buildings:
+                if name in simulated_buildings:
+                    row = pd.read_csv(locator.get_temporary_file('%(name)sT.csv' % locals()))
+                else:
+                    row = previous_totals.iloc[[previous_rows[name]]]
+                columns = write_row(total_demand_file, row, columns)
 
         # """read saved data of monthly values and return as totals"""
         # monthly_data_buildings = [pd.read_csv(locator.get_demand_results_file(building_name, 'csv')) for building_name
@@ -192,3 +237,26 @@ class YearlyDemandWriter(DemandWriter):
                                   for building_name in
                                   list_buildings]
         return df, monthly_data_buildings
+
+
+def write_row(total_demand_file, row, columns):
+    """
+    Append the rows of a building to the open Totals.csv file. The header is written with the first building and the
+    rows of the other buildings are aligned to its ``columns`` (missing values are written as nan).
+
+    :return: the columns of the file
+    """
+    if columns is None:
+        columns = list(row.columns)
+        header = True
+    else:
+        row = row.reindex(columns=columns)
+        header = False
+    row.to_csv(total_demand_file, header=header, index=False, float_format='%.3f', na_rep='nan')
+    return columns
+
+
+def remove_file(path):
+    """remove the results of a previous run written in the other output format"""
+    if os.path.exists(path):
+        os.remove(path)
@@ -326,28 +326,18 @@ def calc_DH_ww_with_tank_losses(T_ext_C, T_int_C, Qww, Vww, Qww_dis_ls_r, Qww_di
     :type Qww_dis_ls_nr: ndarray
     :return:
     """
-    Qww_sys = np.zeros(HOURS_IN_YEAR)
-    Qww_st_ls = np.zeros(HOURS_IN_YEAR)
-    Tww_tank_C = np.zeros(HOURS_IN_YEAR)
-    Qd = np.zeros(HOURS_IN_YEAR)
     # calculate DHW tank size [in m3] based on the peak DHW demand in the building
     V_tank_m3 = Vww.max()  # size the tank with the highest flow rate
     T_tank_start_C = TWW_SETPOINT  # assume the tank temperature at timestep 0 is at the dhw set point
 
     if V_tank_m3 > 0:
-        for k in range(HOURS_IN_YEAR):
-            area_tank_surface_m2 = storage_tank.calc_tank_surface_area(V_tank_m3)
-            Q_tank_discharged_W = Qww[k] + Qww_dis_ls_r[k] + Qww_dis_ls_nr[k]
-            Qww_st_ls[k], Qd[k], Qww_sys[k] = storage_tank.calc_dhw_tank_heat_balance(T_int_C[k], T_ext_C[k],
-                                                                                   T_tank_start_C, V_tank_m3,
-                                                                                   Q_tank_discharged_W,
-                                                                                   area_tank_surface_m2)
-            Tww_tank_C[k] = storage_tank.calc_tank_temperature(T_tank_start_C, Qww_st_ls[k], Qd[k], Qww_sys[k], V_tank_m3,
-                                                               'hot_water')
-            T_tank_start_C = Tww_tank_C[k]  # update the tank temperature at the beginning of the next time step
+        Q_tank_discharged_W = Qww + Qww_dis_ls_r + Qww_dis_ls_nr
+        Tww_tank_C, Qww_st_ls, Qww_sys = storage_tank.calc_dhw_tank_temperatures(
+            np.asarray(T_int_C, dtype=np.float64), np.asarray(T_ext_C, dtype=np.float64),
+            np.asarray(Q_tank_discharged_W, dtype=np.float64), float(V_tank_m3), float(T_tank_start_C))
     else:
-        for k in range(HOURS_IN_YEAR):
-            Tww_tank_C[k] = np.nan
+        Qww_sys = np.zeros(HOURS_IN_YEAR)
+        Tww_tank_C = np.full(HOURS_IN_YEAR, np.nan)
     return Tww_tank_C, Qww_sys
 
 
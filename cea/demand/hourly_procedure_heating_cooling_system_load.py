@@ -6,6 +6,7 @@
 
 import warnings
 import numpy as np
+from numba import jit
 from cea.demand import airconditioning_model, rc_model_SIA, control_heating_cooling_systems, \
     space_emission_systems, latent_loads, constants
 
@@ -736,48 +737,57 @@ def detailed_thermal_balance_to_tsd(tsd, bpr, t, rc_model_temperatures):
     :return: None
     """
 
+    tsd['Q_loss_sen_ref'] = -tsd['Qcre_sys'][t]
+
+    # extract detailed rc model intermediate results
+    tsd['Q_gain_sen_light'][t], tsd['Q_gain_sen_app'][t], tsd['Q_gain_sen_pro'][t], tsd['Q_gain_sen_data'][t], \
+    tsd['Q_gain_sen_peop'][t], tsd['Q_gain_sen_wall'][t], tsd['Q_gain_sen_base'][t], tsd['Q_gain_sen_roof'][t], \
+    tsd['Q_gain_sen_wind'][t], tsd['Q_gain_sen_vent'][t] = _calc_detailed_thermal_balance(
+        tsd['El'][t], tsd['Ea'][t], tsd['Epro'][t], tsd['Qcdata_sys'][t], tsd['Qs'][t], bpr.rc_model['Awall_ag'],
+        bpr.rc_model['U_wall'], bpr.rc_model['Aop_bg'], bpr.rc_model['U_base'], bpr.rc_model['Aroof'],
+        bpr.rc_model['U_roof'], rc_model_temperatures['h_em'], rc_model_temperatures['h_op_m'],
+        rc_model_temperatures['theta_m'], rc_model_temperatures['theta_em'], rc_model_temperatures['h_ec'],
+        rc_model_temperatures['theta_c'], rc_model_temperatures['theta_ec'], rc_model_temperatures['h_ea'],
+        rc_model_temperatures['T_int'], rc_model_temperatures['theta_ea'])
+
+    return
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def _calc_detailed_thermal_balance(El, Ea, Epro, Qcdata_sys, Qs, Awall_ag, U_wall, Aop_bg, U_base, Aroof, U_roof, h_em,
+                                   h_op_m, theta_m, theta_em, h_ec, theta_c, theta_ec, h_ea, T_int, theta_ea):
+    # numba compatible calculation, also used by cea.demand.rc_model_kernel
+
     # internal gains from lights
-    tsd['Q_gain_sen_light'][t] = rc_model_SIA.calc_phi_i_l(tsd['El'][t])
+    Q_gain_sen_light = rc_model_SIA.calc_phi_i_l(El)
     # internal gains from appliances, data centres and losses from refrigeration
-    tsd['Q_gain_sen_app'][t] = (rc_model_SIA.calc_phi_i_a(tsd['Ea'][t], tsd['Epro'][t]) - 0.9*tsd['Epro'][t])/0.9
-    tsd['Q_gain_sen_pro'][t] = tsd['Epro'][t]
-    tsd['Q_gain_sen_data'][t] = tsd['Qcdata_sys'][t]
-    tsd['Q_loss_sen_ref'] = -tsd['Qcre_sys'][t]
+    Q_gain_sen_app = (rc_model_SIA.calc_phi_i_a(Ea, Epro) - 0.9*Epro)/0.9
+    Q_gain_sen_pro = Epro
+    Q_gain_sen_data = Qcdata_sys
     # internal gains from people
-    tsd['Q_gain_sen_peop'][t] = rc_model_SIA.calc_phi_i_p(tsd['Qs'][t])
+    Q_gain_sen_peop = rc_model_SIA.calc_phi_i_p(Qs)
 
     # losses / gains from ventilation
     # tsd['']
 
-    # extract detailed rc model intermediate results
-    h_em = rc_model_temperatures['h_em']
-    h_op_m = rc_model_temperatures['h_op_m']
-    theta_m = rc_model_temperatures['theta_m']
-    theta_em = rc_model_temperatures['theta_em']
-    h_ec = rc_model_temperatures['h_ec']
-    theta_c = rc_model_temperatures['theta_c']
-    theta_ec = rc_model_temperatures['theta_ec']
-    h_ea = rc_model_temperatures['h_ea']
-    T_int = rc_model_temperatures['T_int']
-    theta_ea = rc_model_temperatures['theta_ea']
-
     # backwards calculate individual heat transfer coefficient
-    h_wall_em = h_em * bpr.rc_model['Awall_ag'] * bpr.rc_model['U_wall'] / h_op_m
-    h_base_em = h_em * bpr.rc_model['Aop_bg'] * B_F * bpr.rc_model['U_base'] / h_op_m
-    h_roof_em = h_em * bpr.rc_model['Aroof'] * bpr.rc_model['U_roof'] / h_op_m
+    h_wall_em = h_em * Awall_ag * U_wall / h_op_m
+    h_base_em = h_em * Aop_bg * B_F * U_base / h_op_m
+    h_roof_em = h_em * Aroof * U_roof / h_op_m
 
     # calculate heat fluxes between mass and outside through opaque elements
-    tsd['Q_gain_sen_wall'][t] = h_wall_em * (theta_em - theta_m)
-    tsd['Q_gain_sen_base'][t] = h_base_em * (theta_em - theta_m)
-    tsd['Q_gain_sen_roof'][t] = h_roof_em * (theta_em - theta_m)
+    Q_gain_sen_wall = h_wall_em * (theta_em - theta_m)
+    Q_gain_sen_base = h_base_em * (theta_em - theta_m)
+    Q_gain_sen_roof = h_roof_em * (theta_em - theta_m)
 
     # calculate heat fluxes between central and outside through windows
-    tsd['Q_gain_sen_wind'][t] = h_ec * (theta_ec - theta_c)
+    Q_gain_sen_wind = h_ec * (theta_ec - theta_c)
 
     # calculate heat between outside and inside air through ventilation
-    tsd['Q_gain_sen_vent'][t] = h_ea * (theta_ea - T_int)
+    Q_gain_sen_vent = h_ea * (theta_ea - T_int)
 
-    return
+    return Q_gain_sen_light, Q_gain_sen_app, Q_gain_sen_pro, Q_gain_sen_data, Q_gain_sen_peop, Q_gain_sen_wall, \
+           Q_gain_sen_base, Q_gain_sen_roof, Q_gain_sen_wind, Q_gain_sen_vent
 
 
 def calc_rc_no_loads(bpr, tsd, t):
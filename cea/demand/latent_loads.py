@@ -4,7 +4,8 @@
 
 
 import numpy as np
-import math
+from numba import jit
+
 from cea.demand import constants
 
 __author__ = "Gabriel Happle"
@@ -180,12 +181,12 @@ def calc_saturation_pressure(theta):
     Gabriel Happle, Feb. 2018
 
     :param theta: air temperature (C)
-    :type theta: double
+    :type theta: double or ndarray
     :return: saturation pressure (Pa)
-    :rtype: double
+    :rtype: double or ndarray
     """
 
-    p_sat_int = 611.2 * math.exp(17.62 * theta / (243.12 + theta))
+    p_sat_int = 611.2 * np.exp(17.62 * theta / (243.12 + theta))
 
     return p_sat_int
 
@@ -245,8 +246,7 @@ def calc_moisture_in_zone_central(bpr, tsd, t):
     g_int_ztc_t = tsd['w_int'][t]  # gains from occupancy
 
     # zone humidity at previous time step
-    x_int_a_ztc_t_1 = tsd['x_int'][t - 1] if not np.isnan(tsd['x_int'][t - 1]) else\
-        convert_rh_to_moisture_content(tsd['rh_ext'][t-1], tsd['T_ext'][t - 1])
+    x_int_a_ztc_t_1 = tsd['x_int'][t - 1] if not np.isnan(tsd['x_int'][t - 1]) else tsd['x_ext'][t - 1]
 
     # get (de)humidification loads
     g_hu_ld_ztc_t = tsd['g_hu_ld'][t]
@@ -293,24 +293,27 @@ def calc_moisture_content_in_zone_local(bpr, tsd, t):
     :rtype: None
     """
 
-    # zone volume
-    vol_int_a_ztc = bpr.rc_model['Af'] * FLOOR_HEIGHT
+    x_int_a_t = _calc_moisture_content_in_zone_local(bpr.rc_model['Af'], tsd['m_ve_mech'][t],
+                                                     tsd['m_ve_inf'][t] + tsd['m_ve_window'][t], tsd['x_ve_mech'][t],
+                                                     tsd['x_ve_inf'][t], tsd['w_int'][t], tsd['x_int'][t-1],
+                                                     tsd['g_hu_ld'][t], tsd['g_dhu_ld'][t])
 
-    # get air flows
-    m_ve_mech = tsd['m_ve_mech'][t]
-    m_ve_inf = tsd['m_ve_inf'][t] + tsd['m_ve_window'][t]
-    x_ve_mech = tsd['x_ve_mech'][t]
-    x_ve_inf = tsd['x_ve_inf'][t]
+    if x_int_a_t < 0:
+        raise Exception("Bug in moisture balance in zone. Negative moisture content detected.")
 
-    # get internal gains
-    g_int_ztc_t = tsd['w_int'][t]  # gains from occupancy
+    tsd['x_int'][t] = x_int_a_t
+    return
 
-    # zone humidity at previous time step
-    x_int_a_ztc_t_1 = tsd['x_int'][t-1]
 
-    # get (de)humidification loads
-    g_hu_ld_ztc_t = tsd['g_hu_ld'][t]
-    g_dhu_ld_ztc_t = tsd['g_dhu_ld'][t]
+@jit(nopython=True, cache=True, error_model='numpy')
+def _calc_moisture_content_in_zone_local(Af, m_ve_mech, m_ve_inf, x_ve_mech, x_ve_inf, g_int_ztc_t, x_int_a_ztc_t_1,
+                                         g_hu_ld_ztc_t, g_dhu_ld_ztc_t):
+    # numba compatible calculation, also used by cea.demand.rc_model_kernel
+    # m_ve_inf: infiltration and window ventilation, g_int_ztc_t: gains from occupancy, x_int_a_ztc_t_1: zone humidity
+    # at previous time step, g_hu_ld_ztc_t / g_dhu_ld_ztc_t: (de)humidification loads
+
+    # zone volume
+    vol_int_a_ztc = Af * FLOOR_HEIGHT
 
     # sum ventilation moisture + (de)humidification
     x_int_a_t = (m_ve_mech * x_ve_mech + m_ve_inf * x_ve_inf +
@@ -318,11 +321,7 @@ def calc_moisture_content_in_zone_local(bpr, tsd, t):
                      RHO_A * vol_int_a_ztc) / DELTA_T * x_int_a_ztc_t_1) / \
                 ((m_ve_mech + m_ve_inf) + (RHO_A * vol_int_a_ztc) / DELTA_T)
 
-    if x_int_a_t < 0:
-        raise Exception("Bug in moisture balance in zone. Negative moisture content detected.")
-
-    tsd['x_int'][t] = x_int_a_t
-    return
+    return x_int_a_t
 
 
 def total_moisture_in_zone(bpr, x_int):
@@ -353,11 +352,11 @@ def convert_rh_to_moisture_content(rh, theta):
     Gabriel Happle, Feb. 2018
 
     :param rh: relative humidity (%)
-    :type rh: double
+    :type rh: double or ndarray
     :param theta: temperature (C)
-    :type theta: double
+    :type theta: double or ndarray
     :return: moisture content (kg/kg_dry_air)
-    :rtype: double
+    :rtype: double or ndarray
     """
 
     p_sat = calc_saturation_pressure(theta)
@@ -369,7 +368,8 @@ def convert_rh_to_moisture_content(rh, theta):
 
 def calc_moisture_content_airflows(tsd, t):
     """
-    convert relative humidity of ventilation airflows to moisture content
+    set the moisture content of ventilation airflows to the moisture content of the outdoor air (``tsd['x_ext']``,
+    calculated for all hours by ``thermal_loads.initialize_inputs``)
 
     Gabriel Happle, Feb. 2018
 
@@ -381,11 +381,9 @@ def calc_moisture_content_airflows(tsd, t):
     :rtype: None
     """
 
-    rh_ext = tsd['rh_ext'][t]
-    theta_ext = tsd['T_ext'][t]
-
-    tsd['x_ve_inf'][t] = convert_rh_to_moisture_content(rh_ext, theta_ext)
-    tsd['x_ve_mech'][t] = convert_rh_to_moisture_content(rh_ext, theta_ext)
+    # tsd['x_ve_mech'][t] is overwritten by the air handling units, so it is reset every hour
+    tsd['x_ve_inf'][t] = tsd['x_ext'][t]
+    tsd['x_ve_mech'][t] = tsd['x_ext'][t]
 
     return
 
@@ -5,6 +5,8 @@
 
 
 import numpy as np
+from numba import jit
+
 from cea.demand import constants
 
 __author__ = "Gabriel Happle"
@@ -42,6 +44,7 @@ f_r_a = 0.2  # (-) section 2.1.4 in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2
 # 2.1.3
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_h_mc(a_m):
     """
     :param a_m: see ``bpr.rc_model['Am']``
@@ -58,6 +61,7 @@ def calc_h_mc(a_m):
     return h_mc
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_h_ac(a_t):
     """
     :param a_t: equivalent to ``bpr.rc_model['Atot']``
@@ -73,6 +77,7 @@ def calc_h_ac(a_t):
     return h_ac
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_h_op_m(Htr_op):
 
     # work around # TODO: to be addressed in issue #443
@@ -88,6 +93,7 @@ def calc_h_op_m(Htr_op):
     return h_op_m
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_h_em(h_op_m, h_mc):
 
     # (10) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -109,6 +115,7 @@ def calc_h_j_em():
     return None
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_h_ec(Htr_w):
 
     # (12) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -122,6 +129,7 @@ def calc_h_ec(Htr_w):
     return h_ec
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_h_ea(m_ve_mech, m_ve_window, m_ve_inf_simple):
     cp = 1.005 / 3.6  # (Wh/kg/K)
     # TODO: check units of air flow
@@ -143,6 +151,7 @@ def calc_h_ea(m_ve_mech, m_ve_window, m_ve_inf_simple):
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_phi_a(phi_hc_cv, phi_i_l, phi_i_a, phi_i_p, I_sol):
 
     # (14) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -167,6 +176,7 @@ def calc_phi_a(phi_hc_cv, phi_i_l, phi_i_a, phi_i_p, I_sol):
     return phi_a
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_phi_c(phi_hc_r, phi_i_l, phi_i_a, phi_i_p, I_sol, f_ic, f_sc):
 
     # (15) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -195,12 +205,14 @@ def calc_phi_c(phi_hc_r, phi_i_l, phi_i_a, phi_i_p, I_sol, f_ic, f_sc):
     return phi_c
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_phi_i_p(Qs): # _Wp, people):
     # # internal gains from people
     # phi_i_p = people * Qs_Wp
     return Qs # phi_i_p
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_phi_i_a(Eaf, Epro):
     # internal gains from appliances, factor of 0.9 taken from old method calc_Qgain_sen()
     # TODO make function and dynamic, check factor
@@ -208,6 +220,7 @@ def calc_phi_i_a(Eaf, Epro):
     return phi_i_a
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_phi_i_l(Elf):
     # internal gains from lighting, factor of 0.9 taken from old method calc_Qgain_sen()
     # TODO make function and dynamic, check factor
@@ -215,6 +228,7 @@ def calc_phi_i_l(Elf):
     return phi_i_l
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_phi_m(phi_hc_r, phi_i_l, phi_i_a, phi_i_p, I_sol, f_im, f_sm):
 
     # (16) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -242,6 +256,7 @@ def calc_phi_m(phi_hc_r, phi_i_l, phi_i_a, phi_i_p, I_sol, f_im, f_sm):
     return phi_m
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_f_ic(a_t, a_m, h_ec):
     """
 
@@ -261,6 +276,7 @@ def calc_f_ic(a_t, a_m, h_ec):
     return f_ic
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_f_sc(a_t, a_m, a_w, h_ec):
     """
 
@@ -283,6 +299,7 @@ def calc_f_sc(a_t, a_m, a_w, h_ec):
     return f_sc
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_f_im(a_t, a_m):
     """
 
@@ -299,6 +316,7 @@ def calc_f_im(a_t, a_m):
     return f_im
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_f_sm(a_t, a_m, a_w):
     """
     :param a_t: bpr.rc_model['Atot']
@@ -319,6 +337,7 @@ def calc_f_sm(a_t, a_m, a_w):
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_theta_ea(m_ve_mech, m_ve_window, m_ve_inf_simple, theta_ve_mech, T_ext):
 
     # get values
@@ -337,6 +356,7 @@ def calc_theta_ea(m_ve_mech, m_ve_window, m_ve_inf_simple, theta_ve_mech, T_ext)
     return theta_ea
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_theta_ec(T_ext):
 
     # WORKAROUND
@@ -354,6 +374,7 @@ def calc_theta_ec(T_ext):
     return theta_ec
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_theta_em(T_ext):
 
     # WORKAROUND
@@ -410,6 +431,7 @@ def calc_theta_e_star():
 # 2.1.6
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_theta_m_t(phi_m_tot, theta_m_t_1, h_em, h_3, c_m):
     # (25) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     theta_m_t = (theta_m_t_1 * (c_m - 0.5 * (h_3 + h_em)) + phi_m_tot) / (c_m + 0.5 * (h_3 + h_em))
@@ -417,6 +439,7 @@ def calc_theta_m_t(phi_m_tot, theta_m_t_1, h_em, h_3, c_m):
     return theta_m_t
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_h_1(h_ea, h_ac):
 
     # get values
@@ -430,6 +453,7 @@ def calc_h_1(h_ea, h_ac):
     return h_1
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_h_2(h_1, h_ec):
     # (27) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
 
@@ -438,24 +462,28 @@ def calc_h_2(h_1, h_ec):
     return h_2
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_h_3(h_2, h_mc):
     # (28) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     h_3 = 1.0 / (1.0 / h_2 + 1.0 / h_mc)
     return h_3
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_phi_m_tot(phi_m, phi_a, phi_c, theta_ea, theta_em, theta_ec, h_1, h_2, h_3, h_ec, h_ea, h_em):
     # (29) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     phi_m_tot = phi_m + h_em * theta_em + (h_3 * (phi_c + h_ec * theta_ec + h_1 * (phi_a / h_ea + theta_ea))) / h_2
     return phi_m_tot
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_theta_m(theta_m_t, theta_m_t_1):
     # (30) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     theta_m = (theta_m_t + theta_m_t_1) / 2
     return theta_m
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_theta_c(phi_a, phi_c, theta_ea, theta_ec, theta_m, h_1, h_mc, h_ec, h_ea):
 
     # get values
@@ -470,12 +498,14 @@ def calc_theta_c(phi_a, phi_c, theta_ea, theta_ec, theta_m, h_1, h_mc, h_ec, h_e
     return theta_c
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_T_int(phi_a, theta_ea, theta_c, h_ac, h_ea):
     # (32) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     T_int = (h_ac * theta_c + h_ea * theta_ea + phi_a) / (h_ac + h_ea)
     return T_int
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_theta_o(T_int, theta_c):
     # (33) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     theta_o = T_int * 0.31 + theta_c * 0.69
@@ -486,6 +516,7 @@ def calc_theta_o(T_int, theta_c):
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_phi_hc_cv(phi_hc, f_hc_cv):
 
     # (58) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -494,6 +525,7 @@ def calc_phi_hc_cv(phi_hc, f_hc_cv):
     return phi_hc_cv
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_phi_hc_r(phi_hc, f_hc_cv):
 
     # (59) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -629,6 +661,7 @@ def calc_rc_model_temperatures(phi_hc_cv, phi_hc_r, bpr, tsd, t):
     return rc_model_temp
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def _calc_rc_model_temperatures(Eaf, Elf, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t, a_w, c_m,
                                 m_ve_inf_simple, m_ve_mech, m_ve_window, phi_hc_cv, phi_hc_r, theta_m_t_1,
                                 theta_ve_mech):
@@ -871,14 +904,3 @@ def lookup_f_hc_cv_cooling(bpr):
     f_hc_cv = bpr.hvac['convection_cs']
 
     return f_hc_cv
-
-
-# use the optimized (numba_cc) versions of the functions in this module if available
-try:
-    # import Numba AOT versions of the functions above, overwriting them
-    from .rc_model_sia_cc import (calc_phi_m, calc_phi_c, calc_theta_c, calc_phi_m_tot, calc_phi_a, calc_theta_m,
-                                 calc_h_ea, calc_theta_m_t, calc_theta_ea, calc_h_em, calc_h_3)
-except ImportError:
-    # fall back to using the python version
-    # print('failed to import from rc_model_sia_cc.pyd, falling back to pure python functions')
-    pass
@@ -0,0 +1,624 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled version of the hourly demand loop in :py:func:`cea.demand.thermal_loads.calc_Qhs_Qcs`
+
+The time step data (``tsd``) and the building properties (``bpr``) of a building are packed into typed arrays and the
+whole year (incl. the pre-conditioning hours) is simulated in a single numba kernel. The kernel follows the python
+procedure step by step and writes back the same ``tsd`` columns. The physics are not repeated here: the kernel calls the
+compiled functions the python procedure uses for the solar gains (``sensible_loads._calc_I_rad``), the ventilation
+control and air flows (``control_ventilation_systems``, ``ventilation_air_flows_simple``), the moisture balance
+(``latent_loads._calc_moisture_content_in_zone_local``), the R-C-model according to SIA 2044
+(``rc_model_SIA._calc_rc_model_temperatures``), the emission losses (``space_emission_systems.calc_q_em_ls``) and the
+energy balance for the dashboard (``hourly_procedure_heating_cooling_system_load._calc_detailed_thermal_balance``).
+
+Only the radiative (sensible) HVAC branches of
+:py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.calc_heating_cooling_loads` are compiled: radiator
+and floor heating, ceiling and floor cooling and buildings without heating / cooling system. This is the intended
+scope of the kernel: buildings with air based systems (central AC, mini-split, 3for2), whose air handling units are
+simulated with the psychrometric models of :py:mod:`cea.demand.airconditioning_model`, and buildings with dynamic
+infiltration are simulated with the python procedure, use :py:func:`is_supported` to check.
+"""
+
+import warnings
+
+import numpy as np
+from numba import jit
+
+from cea.constants import HOURS_IN_YEAR
+from cea.demand import constants, control_heating_cooling_systems, control_ventilation_systems, latent_loads, \
+    rc_model_SIA, sensible_loads, space_emission_systems, ventilation_air_flows_simple, \
+    hourly_procedure_heating_cooling_system_load
+
+__author__ = "Gabriel Happle"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Gabriel Happle", "Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+T_WARNING_LOW = constants.T_WARNING_LOW
+T_WARNING_HIGH = constants.T_WARNING_HIGH
+TEMP_TOLERANCE = 0.001  # same tolerance as in rc_model_SIA.has_sensible_heating_demand
+
+HEATING_CLASSES_SUPPORTED = ['NONE', 'RADIATOR', 'FLOOR_HEATING']
+COOLING_CLASSES_SUPPORTED = ['NONE', 'CEILING_COOLING', 'FLOOR_COOLING']
+
+# rows of the packed input time series (read only)
+KERNEL_INPUT_KEYS = ['T_ext', 'T_sky', 'rh_ext', 'x_ext', 'RSE_wall', 'RSE_roof', 'RSE_win', 'I_sol_gross',
+                     'm_ve_required', 'm_ve_inf', 'ta_hs_set', 'ta_cs_set', 'El', 'Ea', 'Epro', 'Qs', 'w_int',
+                     'Qcdata_sys', 'Qcre_sys', 'heating_season', 'cooling_season']
+(_T_EXT, _T_SKY, _RH_EXT, _X_EXT, _RSE_WALL, _RSE_ROOF, _RSE_WIN, _I_SOL_GROSS,
+ _M_VE_REQUIRED, _M_VE_INF, _TA_HS_SET, _TA_CS_SET, _EL, _EA, _EPRO, _QS, _W_INT, _QCDATA_SYS,
+ _QCRE_SYS, _HEATING_SEASON, _COOLING_SEASON) = range(len(KERNEL_INPUT_KEYS))
+
+# rows of the packed output time series (the tsd keys written by the hourly loop)
+KERNEL_OUTPUT_KEYS = ['T_int', 'theta_m', 'theta_c', 'theta_o', 'x_int', 'x_ve_inf', 'x_ve_mech', 'g_hu_ld',
+                      'g_dhu_ld', 'm_ve_mech', 'm_ve_window', 'theta_ve_mech', 'I_sol_and_I_rad', 'I_rad', 'I_sol',
+                      'Qhs_sen_rc', 'Qhs_sen_shu', 'Qhs_sen_ahu', 'Qhs_sen_aru', 'Qhs_lat_ahu', 'Qhs_lat_aru',
+                      'Qhs_sen_sys', 'Qhs_lat_sys', 'Qhs_em_ls', 'Ehs_lat_aux',
+                      'ma_sup_hs_ahu', 'ta_sup_hs_ahu', 'ta_re_hs_ahu', 'ma_sup_hs_aru', 'ta_sup_hs_aru',
+                      'ta_re_hs_aru',
+                      'Qcs_sen_rc', 'Qcs_sen_scu', 'Qcs_sen_ahu', 'Qcs_sen_aru', 'Qcs_lat_ahu', 'Qcs_lat_aru',
+                      'Qcs_sen_sys', 'Qcs_lat_sys', 'Qcs_em_ls',
+                      'ma_sup_cs_ahu', 'ta_sup_cs_ahu', 'ta_re_cs_ahu', 'ma_sup_cs_aru', 'ta_sup_cs_aru',
+                      'ta_re_cs_aru',
+                      'Q_gain_sen_light', 'Q_gain_sen_app', 'Q_gain_sen_pro', 'Q_gain_sen_data', 'Q_gain_sen_peop',
+                      'Q_gain_sen_wall', 'Q_gain_sen_base', 'Q_gain_sen_roof', 'Q_gain_sen_wind', 'Q_gain_sen_vent']
+(T_INT, THETA_M, THETA_C, THETA_O, X_INT, X_VE_INF, X_VE_MECH, G_HU_LD,
+ G_DHU_LD, M_VE_MECH, M_VE_WINDOW, THETA_VE_MECH, I_SOL_AND_I_RAD, I_RAD, I_SOL,
+ QHS_SEN_RC, QHS_SEN_SHU, QHS_SEN_AHU, QHS_SEN_ARU, QHS_LAT_AHU, QHS_LAT_ARU,
+ QHS_SEN_SYS, QHS_LAT_SYS, QHS_EM_LS, EHS_LAT_AUX,
+ MA_SUP_HS_AHU, TA_SUP_HS_AHU, TA_RE_HS_AHU, MA_SUP_HS_ARU, TA_SUP_HS_ARU,
+ TA_RE_HS_ARU,
+ QCS_SEN_RC, QCS_SEN_SCU, QCS_SEN_AHU, QCS_SEN_ARU, QCS_LAT_AHU, QCS_LAT_ARU,
+ QCS_SEN_SYS, QCS_LAT_SYS, QCS_EM_LS,
+ MA_SUP_CS_AHU, TA_SUP_CS_AHU, TA_RE_CS_AHU, MA_SUP_CS_ARU, TA_SUP_CS_ARU,
+ TA_RE_CS_ARU,
+ Q_GAIN_SEN_LIGHT, Q_GAIN_SEN_APP, Q_GAIN_SEN_PRO, Q_GAIN_SEN_DATA, Q_GAIN_SEN_PEOP,
+ Q_GAIN_SEN_WALL, Q_GAIN_SEN_BASE, Q_GAIN_SEN_ROOF, Q_GAIN_SEN_WIND, Q_GAIN_SEN_VENT) = range(len(KERNEL_OUTPUT_KEYS))
+
+# building parameters (from bpr.rc_model, bpr.architecture, bpr.hvac and bpr.comfort)
+KERNEL_PARAMETERS = ['Af', 'Aef', 'Atot', 'Am', 'Awin_ag', 'Cm', 'Htr_op', 'Htr_w', 'U_win', 'U_roof', 'U_wall',
+                     'U_base', 'Aroof', 'Awall_ag', 'Aop_bg', 'Hs_ag', 'e_win', 'e_roof', 'e_wall', 'MECH_VENT',
+                     'WIN_VENT', 'HEAT_REC', 'NIGHT_FLSH', 'ECONOMIZER', 'RH_max_pc', 'Tcs_set_C', 'Qhsmax_Wm2',
+                     'Qcsmax_Wm2', 'convection_hs', 'convection_cs', 'Tc_sup_air_max_C', 'delta_theta_int_inc_hs',
+                     'delta_theta_int_inc_cs', 'delta_theta_e_sol', 'has_heating_system', 'has_cooling_system']
+(_AF, _AEF, _ATOT, _AM, _AWIN_AG, _CM, _HTR_OP, _HTR_W, _U_WIN, _U_ROOF, _U_WALL,
+ _U_BASE, _AROOF, _AWALL_AG, _AOP_BG, _HS_AG, _E_WIN, _E_ROOF, _E_WALL, _MECH_VENT,
+ _WIN_VENT, _HEAT_REC, _NIGHT_FLSH, _ECONOMIZER, _RH_MAX_PC, _TCS_SET_C, _QHSMAX_WM2,
+ _QCSMAX_WM2, _CONVECTION_HS, _CONVECTION_CS, _TC_SUP_AIR_MAX_C, _DELTA_THETA_INT_INC_HS,
+ _DELTA_THETA_INT_INC_CS, _DELTA_THETA_E_SOL, _HAS_HEATING_SYSTEM, _HAS_COOLING_SYSTEM) = range(len(KERNEL_PARAMETERS))
+
+# system status logs (tsd['sys_status_*']) are stored as codes into this list
+STATUS_LABELS = ['unknown', 'no system', 'system off', 'On', 'Off']
+STATUS_NO_SYSTEM, STATUS_SYSTEM_OFF, STATUS_ON, STATUS_OFF = 1, 2, 3, 4
+STATUS_KEYS = ['sys_status_ahu', 'sys_status_aru', 'sys_status_sen']
+_AHU, _ARU, _SEN = range(len(STATUS_KEYS))
+
+# error codes returned by the kernel
+ERROR_NONE = 0
+ERROR_TEMPERATURE_OUT_OF_BOUNDS = 1
+ERROR_HEATING_DEMAND = 2
+ERROR_COOLING_DEMAND = 3
+ERROR_NEGATIVE_MOISTURE = 4
+
+# layout of the R-C-model node temperatures (same entries as the dict in rc_model_SIA.calc_rc_model_temperatures)
+(_RC_T_INT, _RC_THETA_C, _RC_THETA_M, _RC_THETA_O, _RC_THETA_EA, _RC_THETA_EC, _RC_THETA_EM, _RC_H_EA, _RC_H_EC,
+ _RC_H_EM, _RC_H_OP_M) = range(11)
+
+
+def is_supported(bpr, use_dynamic_infiltration_calculation):
+    """
+    Check if the hourly loop of a building can be run with the compiled kernel
+
+    :param bpr: a collection of building properties for the building used for thermal loads calculation
+    :type bpr: cea.demand.building_properties.BuildingPropertiesRow
+    :param bool use_dynamic_infiltration_calculation: the dynamic infiltration is not part of the kernel
+    :rtype: bool
+    """
+    return (not use_dynamic_infiltration_calculation
+            and bpr.hvac['class_hs'] in HEATING_CLASSES_SUPPORTED
+            and bpr.hvac['class_cs'] in COOLING_CLASSES_SUPPORTED)
+
+
+def calc_Qhs_Qcs(bpr, tsd, hours):
+    """
+    Compiled equivalent of the hourly loop in :py:func:`cea.demand.thermal_loads.calc_Qhs_Qcs`. The ventilation flows
+    ``m_ve_required`` and ``m_ve_inf`` need to be calculated beforehand.
+
+    :param bpr: a collection of building properties for the building used for thermal loads calculation
+    :type bpr: cea.demand.building_properties.BuildingPropertiesRow
+    :param dict tsd: time series data dict
+    :param hours: the simulated hours in order of simulation (see :py:func:`cea.demand.thermal_loads.get_hours`)
+    :return: updated tsd
+    :rtype: dict
+    """
+    ts_in, params = pack_inputs(bpr, tsd)
+    ts_out = pack_outputs(tsd)
+    status = np.zeros((len(STATUS_KEYS), HOURS_IN_YEAR), dtype=np.int8)
+    diagnostics = np.zeros(4)
+    hours = np.fromiter(hours, dtype=np.int64)
+
+    error, last_balance_hour = calc_hourly_loop(ts_in, params, hours, ts_out, status, diagnostics)
+    check_error(error, diagnostics, bpr)
+    warn_hours_without_season(ts_in, hours)
+
+    return unpack_outputs(tsd, ts_out, status, last_balance_hour)
+
+
+def pack_inputs(bpr, tsd):
+    """
+    Pack the (read only) inputs of the hourly loop into typed arrays
+
+    :return: ``ts_in`` with shape (len(KERNEL_INPUT_KEYS), HOURS_IN_YEAR), ``params`` with shape
+        (len(KERNEL_PARAMETERS),)
+    :rtype: tuple(np.ndarray, np.ndarray)
+    """
+    ts_in = np.empty((len(KERNEL_INPUT_KEYS), HOURS_IN_YEAR))
+    for i, key in enumerate(KERNEL_INPUT_KEYS[:_HEATING_SEASON]):
+        if key == 'I_sol_gross':
+            ts_in[i] = np.asarray(bpr.solar.I_sol, dtype=float)
+        else:
+            ts_in[i] = np.asarray(tsd[key], dtype=float)
+    ts_in[_HEATING_SEASON] = control_heating_cooling_systems.get_heating_season_hours(bpr)
+    ts_in[_COOLING_SEASON] = control_heating_cooling_systems.get_cooling_season_hours(bpr)
+
+    rc_model = bpr.rc_model
+    hvac = bpr.hvac
+    params = np.empty(len(KERNEL_PARAMETERS))
+    for key in ['Af', 'Aef', 'Atot', 'Am', 'Awin_ag', 'Cm', 'Htr_op', 'Htr_w', 'U_win', 'U_roof', 'U_wall', 'U_base',
+                'Aroof', 'Awall_ag', 'Aop_bg']:
+        params[KERNEL_PARAMETERS.index(key)] = rc_model[key]
+    params[_HS_AG] = bpr.architecture.Hs_ag
+    params[_E_WIN] = bpr.architecture.e_win
+    params[_E_ROOF] = bpr.architecture.e_roof
+    params[_E_WALL] = bpr.architecture.e_wall
+    for key in ['MECH_VENT', 'WIN_VENT', 'HEAT_REC', 'NIGHT_FLSH', 'ECONOMIZER', 'Qhsmax_Wm2', 'Qcsmax_Wm2',
+                'convection_hs', 'convection_cs']:
+        params[KERNEL_PARAMETERS.index(key)] = hvac[key]
+    params[_RH_MAX_PC] = bpr.comfort['RH_max_pc']
+    params[_TCS_SET_C] = bpr.comfort['Tcs_set_C']
+    params[_TC_SUP_AIR_MAX_C] = np.max([hvac['Tc_sup_air_ahu_C'], hvac['Tc_sup_air_aru_C']])
+    params[_DELTA_THETA_INT_INC_HS] = space_emission_systems.calc_delta_theta_int_inc_heating(bpr)
+    params[_DELTA_THETA_INT_INC_CS] = space_emission_systems.calc_delta_theta_int_inc_cooling(bpr)
+    params[_DELTA_THETA_E_SOL] = space_emission_systems.get_delta_theta_e_sol(bpr)
+    params[_HAS_HEATING_SYSTEM] = control_heating_cooling_systems.has_heating_system(hvac['class_hs'])
+    params[_HAS_COOLING_SYSTEM] = control_heating_cooling_systems.has_cooling_system(hvac['class_cs'])
+
+    return ts_in, params
+
+
+def pack_outputs(tsd):
+    """Copy the current values of the tsd keys written by the hourly loop (incl. the initial state) to one array"""
+    return np.vstack([np.asarray(tsd[key], dtype=float) for key in KERNEL_OUTPUT_KEYS])
+
+
+def unpack_outputs(tsd, ts_out, status, last_balance_hour):
+    """Write the results of the kernel back to ``tsd``"""
+    for i, key in enumerate(KERNEL_OUTPUT_KEYS):
+        tsd[key] = ts_out[i]
+    for i, key in enumerate(STATUS_KEYS):
+        for code in np.unique(status[i]):
+            if code:
+                tsd[key][status[i] == code] = STATUS_LABELS[code]
+    if last_balance_hour >= 0:
+        # same as detailed_thermal_balance_to_tsd, which overwrites this key with a scalar every hour
+        tsd['Q_loss_sen_ref'] = -tsd['Qcre_sys'][last_balance_hour]
+    return tsd
+
+
+def check_error(error, diagnostics, bpr):
+    """Raise the same exceptions as the python procedure if the kernel stopped with an error"""
+    if error == ERROR_NONE:
+        return
+    t = int(diagnostics[0])
+    if error == ERROR_TEMPERATURE_OUT_OF_BOUNDS:
+        T_int, theta_c, theta_m = diagnostics[1:]
+        raise Exception("Temperature in RC-Model of building {} out of bounds! First occured at timestep = {}."
+                        " The results were Tint = {}, theta_c = {}, theta_m = {},"
+                        " Check building geometry and internal loads! Building might be too small in size or"
+                        " architecture parameter Hs_ag = {} might be too small for this geometry. Current bounds of"
+                        " range for RC-model temperatures are between {} and {}.".format(
+                            bpr.name, t, T_int, theta_c, theta_m, bpr.architecture.Hs_ag,
+                            T_WARNING_LOW, T_WARNING_HIGH))
+    elif error == ERROR_HEATING_DEMAND:
+        raise Exception("Unexpected status in 'calc_rc_heating_demand'")
+    elif error == ERROR_COOLING_DEMAND:
+        raise Exception("Unexpected status in 'calc_rc_cooling_demand'")
+    elif error == ERROR_NEGATIVE_MOISTURE:
+        raise Exception("Bug in moisture balance in zone. Negative moisture content detected.")
+    else:
+        raise ValueError('Unknown error code from the R-C-model kernel: %s' % error)
+
+
+def warn_hours_without_season(ts_in, hours):
+    heating_season = ts_in[_HEATING_SEASON].astype(bool)
+    cooling_season = ts_in[_COOLING_SEASON].astype(bool)
+    for t in hours[heating_season[hours] == cooling_season[hours]]:
+        warnings.warn('Timestep %s not in heating season nor cooling season' % t)
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_hourly_loop(ts_in, params, hours, ts_out, status, diagnostics):
+    """
+    Run the hourly loop for all ``hours`` (in order). Results are written to ``ts_out`` and ``status``.
+
+    :return: error code (see ``ERROR_*``) and the last hour the energy balance for the dashboard was calculated
+    """
+    rc_0 = np.empty(11)
+    rc_10 = np.empty(11)
+    rc_act = np.empty(11)
+    last_balance_hour = -1
+
+    for i in range(len(hours)):
+        t = hours[i]
+        t_prev = t - 1 if t > 0 else HOURS_IN_YEAR - 1
+
+        calc_I_sol(ts_in, params, ts_out, t, t_prev)
+        calc_air_flows(ts_in, params, ts_out, t, t_prev)
+
+        heating_season = ts_in[_HEATING_SEASON, t] > 0.0
+        cooling_season = ts_in[_COOLING_SEASON, t] > 0.0
+
+        if heating_season and not cooling_season:
+            if params[_HAS_HEATING_SYSTEM] == 0.0 or np.isnan(ts_in[_TA_HS_SET, t]):
+                error = calc_rc_no_loads(ts_in, params, ts_out, status, t, t_prev, rc_act, diagnostics)
+            else:
+                error = calc_heat_loads_radiator(ts_in, params, ts_out, status, t, t_prev, rc_0, rc_10, rc_act,
+                                                 diagnostics)
+                ts_out[EHS_LAT_AUX, t] = 0.0
+            update_no_cooling(ts_out, t)
+            detailed_thermal_balance(ts_in, params, ts_out, t, rc_act)
+            last_balance_hour = t
+
+        elif cooling_season and not heating_season:
+            # see control_heating_cooling_systems.cooling_system_is_active
+            cooling_system_is_active = (not np.isnan(ts_in[_TA_CS_SET, t])
+                                        and not ts_out[T_INT, t_prev] <= params[_TC_SUP_AIR_MAX_C])
+            if params[_HAS_COOLING_SYSTEM] == 0.0 or not cooling_system_is_active:
+                error = calc_rc_no_loads(ts_in, params, ts_out, status, t, t_prev, rc_act, diagnostics)
+            else:
+                error = calc_cool_loads_radiator(ts_in, params, ts_out, status, t, t_prev, rc_0, rc_10, rc_act,
+                                                 diagnostics)
+            update_no_heating(ts_out, t)
+            detailed_thermal_balance(ts_in, params, ts_out, t, rc_act)
+            last_balance_hour = t
+
+        else:
+            error = calc_rc_no_loads(ts_in, params, ts_out, status, t, t_prev, rc_act, diagnostics)
+
+        if error != ERROR_NONE:
+            diagnostics[0] = t
+            return error, last_balance_hour
+
+    return ERROR_NONE, last_balance_hour
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_I_sol(ts_in, params, ts_out, t, t_prev):
+    """see sensible_loads.calc_I_sol"""
+    I_rad = sensible_loads._calc_I_rad(ts_out[THETA_C, t_prev], ts_in[_T_EXT, t_prev], ts_in[_T_EXT, t],
+                                       ts_in[_T_SKY, t], ts_in[_RSE_WIN, t], ts_in[_RSE_ROOF, t], ts_in[_RSE_WALL, t],
+                                       params[_U_WIN], params[_U_ROOF], params[_U_WALL], params[_E_WIN],
+                                       params[_E_ROOF], params[_E_WALL], params[_AWIN_AG], params[_AROOF],
+                                       params[_AWALL_AG])
+
+    I_sol_gross = ts_in[_I_SOL_GROSS, t]
+    ts_out[I_SOL_AND_I_RAD, t] = I_sol_gross - I_rad
+    ts_out[I_RAD, t] = I_rad
+    ts_out[I_SOL, t] = I_sol_gross
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_air_flows(ts_in, params, ts_out, t, t_prev):
+    """
+    see ventilation_air_flows_simple.calc_air_mass_flow_mechanical_ventilation,
+    ventilation_air_flows_simple.calc_air_mass_flow_window_ventilation, ventilation_air_flows_simple.calc_theta_ve_mech
+    and latent_loads.calc_moisture_content_airflows
+    """
+    T_ext = ts_in[_T_EXT, t]
+    T_int_prev = ts_out[T_INT, t_prev]
+    m_ve_required = ts_in[_M_VE_REQUIRED]
+    m_ve_inf = ts_in[_M_VE_INF]
+    mechanical_ventilation_system = params[_MECH_VENT] != 0.0
+
+    # control_ventilation_systems
+    night_flushing = control_ventilation_systems._is_night_flushing_active(
+        params[_NIGHT_FLSH] != 0.0, t, T_int_prev, T_ext, ts_in[_RH_EXT, t], params[_RH_MAX_PC])
+    economizer = control_ventilation_systems._is_economizer_active(params[_ECONOMIZER] != 0.0, T_int_prev,
+                                                                   params[_TCS_SET_C], T_ext)
+    mechanical_ventilation = control_ventilation_systems._is_mechanical_ventilation_active(
+        mechanical_ventilation_system, m_ve_required[t], night_flushing)
+    window_ventilation = control_ventilation_systems._is_window_ventilation_active(params[_WIN_VENT] != 0.0,
+                                                                                   mechanical_ventilation)
+    heat_recovery = control_ventilation_systems._is_mechanical_ventilation_heat_recovery_active(
+        mechanical_ventilation, params[_HEAT_REC] != 0.0, ts_in[_HEATING_SEASON, t] > 0.0,
+        ts_in[_COOLING_SEASON, t] > 0.0, night_flushing, economizer, T_int_prev, T_ext)
+
+    ts_out[M_VE_MECH, t] = ventilation_air_flows_simple._calc_air_mass_flow_mechanical_ventilation(
+        m_ve_required, m_ve_inf, t, mechanical_ventilation_system, mechanical_ventilation, night_flushing, economizer)
+    ts_out[M_VE_WINDOW, t] = ventilation_air_flows_simple._calc_air_mass_flow_window_ventilation(
+        m_ve_required, m_ve_inf, t, window_ventilation, night_flushing)
+    ts_out[THETA_VE_MECH, t] = ventilation_air_flows_simple._calc_theta_ve_mech(heat_recovery, T_int_prev, T_ext)
+
+    # moisture content of air flows
+    ts_out[X_VE_INF, t] = ts_in[_X_EXT, t]
+    ts_out[X_VE_MECH, t] = ts_in[_X_EXT, t]
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_rc_model_temperatures(phi_hc_cv, phi_hc_r, ts_in, params, ts_out, t, t_prev, rc, diagnostics):
+    """see rc_model_SIA.calc_rc_model_temperatures, the node temperatures are written to ``rc``"""
+    theta_m_t_1 = ts_out[THETA_M, t_prev]
+    if np.isnan(theta_m_t_1):
+        theta_m_t_1 = ts_in[_T_EXT, t_prev]
+
+    share_af = min(params[_AF] / params[_AEF], 1.0)
+    El = ts_in[_EL, t] * share_af
+    Ea = ts_in[_EA, t] * share_af
+    I_sol = ts_out[I_SOL_AND_I_RAD, t] * np.sqrt(params[_HS_AG])
+    c_m = params[_CM] / 3600
+
+    (rc[_RC_T_INT], rc[_RC_THETA_C], rc[_RC_THETA_M], rc[_RC_THETA_O], rc[_RC_THETA_EA], rc[_RC_THETA_EC],
+     rc[_RC_THETA_EM], rc[_RC_H_EA], rc[_RC_H_EC], rc[_RC_H_EM], rc[_RC_H_OP_M]) = \
+        rc_model_SIA._calc_rc_model_temperatures(Ea, El, ts_in[_EPRO, t], params[_HTR_OP], params[_HTR_W], I_sol,
+                                                 ts_in[_QS, t], ts_in[_T_EXT, t], params[_AM], params[_ATOT],
+                                                 params[_AWIN_AG], c_m, ts_in[_M_VE_INF, t], ts_out[M_VE_MECH, t],
+                                                 ts_out[M_VE_WINDOW, t], phi_hc_cv, phi_hc_r, theta_m_t_1,
+                                                 ts_out[THETA_VE_MECH, t])
+
+    T_int, theta_c, theta_m = rc[_RC_T_INT], rc[_RC_THETA_C], rc[_RC_THETA_M]
+    if T_WARNING_LOW > T_int or T_WARNING_LOW > theta_c or T_WARNING_LOW > theta_m \
+            or T_int > T_WARNING_HIGH or theta_c > T_WARNING_HIGH or theta_m > T_WARNING_HIGH:
+        diagnostics[1] = T_int
+        diagnostics[2] = theta_c
+        diagnostics[3] = theta_m
+        return ERROR_TEMPERATURE_OUT_OF_BOUNDS
+    return ERROR_NONE
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_rc_model_temperatures_hc(phi_hc, f_hc_cv, ts_in, params, ts_out, t, t_prev, rc, diagnostics):
+    """see rc_model_SIA.calc_rc_model_temperatures_heating and rc_model_SIA.calc_rc_model_temperatures_cooling"""
+    phi_hc_cv = rc_model_SIA.calc_phi_hc_cv(phi_hc, f_hc_cv)
+    phi_hc_r = rc_model_SIA.calc_phi_hc_r(phi_hc, f_hc_cv)
+    return calc_rc_model_temperatures(phi_hc_cv, phi_hc_r, ts_in, params, ts_out, t, t_prev, rc, diagnostics)
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_moisture_content_in_zone_local(params, ts_in, ts_out, t, t_prev):
+    """see latent_loads.calc_moisture_content_in_zone_local"""
+    x_int_a_t = latent_loads._calc_moisture_content_in_zone_local(
+        params[_AF], ts_out[M_VE_MECH, t], ts_in[_M_VE_INF, t] + ts_out[M_VE_WINDOW, t], ts_out[X_VE_MECH, t],
+        ts_out[X_VE_INF, t], ts_in[_W_INT, t], ts_out[X_INT, t_prev], ts_out[G_HU_LD, t], ts_out[G_DHU_LD, t])
+
+    if x_int_a_t < 0:
+        return ERROR_NEGATIVE_MOISTURE
+    ts_out[X_INT, t] = x_int_a_t
+    return ERROR_NONE
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def rc_temperatures_to_tsd(rc, ts_out, t):
+    ts_out[T_INT, t] = rc[_RC_T_INT]
+    ts_out[THETA_M, t] = rc[_RC_THETA_M]
+    ts_out[THETA_C, t] = rc[_RC_THETA_C]
+    ts_out[THETA_O, t] = rc[_RC_THETA_O]
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_rc_no_loads(ts_in, params, ts_out, status, t, t_prev, rc_act, diagnostics):
+    """see hourly_procedure_heating_cooling_system_load.calc_rc_no_loads"""
+    error = calc_rc_model_temperatures(0.0, 0.0, ts_in, params, ts_out, t, t_prev, rc_act, diagnostics)
+    if error != ERROR_NONE:
+        return error
+
+    ts_out[G_HU_LD, t] = 0.0
+    ts_out[G_DHU_LD, t] = 0.0
+    error = calc_moisture_content_in_zone_local(params, ts_in, ts_out, t, t_prev)
+    if error != ERROR_NONE:
+        return error
+
+    rc_temperatures_to_tsd(rc_act, ts_out, t)
+    update_no_cooling(ts_out, t)
+    update_no_heating(ts_out, t)
+    status[_AHU, t] = STATUS_SYSTEM_OFF
+    status[_ARU, t] = STATUS_SYSTEM_OFF
+    status[_SEN, t] = STATUS_SYSTEM_OFF
+    return ERROR_NONE
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_rc_heating_demand(ts_in, params, ts_out, t, t_prev, rc_0, rc_10, rc_act, diagnostics):
+    """
+    see hourly_procedure_heating_cooling_system_load.calc_rc_heating_demand, the node temperatures of the actual
+    heating power are written to ``rc_act``
+
+    :return: error code, phi_h_act
+    """
+    error = calc_rc_model_temperatures(0.0, 0.0, ts_in, params, ts_out, t, t_prev, rc_0, diagnostics)
+    if error != ERROR_NONE:
+        return error, 0.0
+    t_int_0 = rc_0[_RC_T_INT]
+    t_int_set = ts_in[_TA_HS_SET, t]
+
+    if np.isnan(t_int_set) or not t_int_0 < t_int_set - TEMP_TOLERANCE:
+        rc_act[:] = rc_0
+        return ERROR_NONE, 0.0
+
+    f_hc_cv = params[_CONVECTION_HS]
+    phi_hc_10 = 10.0 * params[_AF]
+    error = calc_rc_model_temperatures_hc(phi_hc_10, f_hc_cv, ts_in, params, ts_out, t, t_prev, rc_10, diagnostics)
+    if error != ERROR_NONE:
+        return error, 0.0
+    t_int_10 = rc_10[_RC_T_INT]
+
+    phi_hc_ul = phi_hc_10 * (t_int_set - t_int_0) / (t_int_10 - t_int_0)
+    phi_h_max = params[_QHSMAX_WM2] * params[_AF]
+
+    if 0.0 < phi_hc_ul <= phi_h_max:
+        phi_h_act = phi_hc_ul
+    elif 0.0 < phi_hc_ul > phi_h_max:
+        phi_h_act = phi_h_max
+    else:
+        return ERROR_HEATING_DEMAND, 0.0
+
+    error = calc_rc_model_temperatures_hc(phi_h_act, f_hc_cv, ts_in, params, ts_out, t, t_prev, rc_act, diagnostics)
+    return error, phi_h_act
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_rc_cooling_demand(ts_in, params, ts_out, t, t_prev, rc_0, rc_10, rc_act, diagnostics):
+    """
+    see hourly_procedure_heating_cooling_system_load.calc_rc_cooling_demand, the node temperatures of the actual
+    cooling power are written to ``rc_act``
+
+    :return: error code, phi_c_act
+    """
+    error = calc_rc_model_temperatures(0.0, 0.0, ts_in, params, ts_out, t, t_prev, rc_0, diagnostics)
+    if error != ERROR_NONE:
+        return error, 0.0
+    t_int_0 = rc_0[_RC_T_INT]
+    t_int_set = ts_in[_TA_CS_SET, t]
+
+    if np.isnan(t_int_set) or not t_int_0 > t_int_set + TEMP_TOLERANCE:
+        rc_act[:] = rc_0
+        return ERROR_NONE, 0.0
+
+    f_hc_cv = params[_CONVECTION_CS]
+    phi_hc_10 = 10.0 * params[_AF]
+    error = calc_rc_model_temperatures_hc(phi_hc_10, f_hc_cv, ts_in, params, ts_out, t, t_prev, rc_10, diagnostics)
+    if error != ERROR_NONE:
+        return error, 0.0
+    t_int_10 = rc_10[_RC_T_INT]
+
+    phi_hc_ul = phi_hc_10 * (t_int_set - t_int_0) / (t_int_10 - t_int_0)
+    phi_c_max = -params[_QCSMAX_WM2] * params[_AF]
+
+    if 0.0 > phi_hc_ul >= phi_c_max:
+        phi_c_act = phi_hc_ul
+    elif 0.0 > phi_hc_ul < phi_c_max:
+        phi_c_act = phi_c_max
+    else:
+        return ERROR_COOLING_DEMAND, 0.0
+
+    error = calc_rc_model_temperatures_hc(phi_c_act, f_hc_cv, ts_in, params, ts_out, t, t_prev, rc_act, diagnostics)
+    return error, phi_c_act
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_heat_loads_radiator(ts_in, params, ts_out, status, t, t_prev, rc_0, rc_10, rc_act, diagnostics):
+    """see hourly_procedure_heating_cooling_system_load.calc_heat_loads_radiator"""
+    error, qh_sen_rc_demand = calc_rc_heating_demand(ts_in, params, ts_out, t, t_prev, rc_0, rc_10, rc_act,
+                                                     diagnostics)
+    if error != ERROR_NONE:
+        return error
+
+    ts_out[G_HU_LD, t] = 0.0
+    ts_out[G_DHU_LD, t] = 0.0
+    error = calc_moisture_content_in_zone_local(params, ts_in, ts_out, t, t_prev)
+    if error != ERROR_NONE:
+        return error
+
+    ts_out[QHS_SEN_RC, t] = qh_sen_rc_demand
+    ts_out[QHS_SEN_SHU, t] = qh_sen_rc_demand
+    ts_out[QHS_SEN_AHU, t] = 0.0
+    status[_AHU, t] = STATUS_NO_SYSTEM
+    ts_out[QHS_SEN_ARU, t] = 0.0
+    status[_ARU, t] = STATUS_NO_SYSTEM
+    ts_out[QHS_SEN_SYS, t] = qh_sen_rc_demand
+    rc_temperatures_to_tsd(rc_act, ts_out, t)
+    ts_out[QHS_LAT_SYS, t] = 0.0
+    ts_out[MA_SUP_HS_AHU, t] = 0.0
+    ts_out[TA_SUP_HS_AHU, t] = np.nan
+    ts_out[TA_RE_HS_AHU, t] = np.nan
+    ts_out[MA_SUP_HS_ARU, t] = 0.0
+    ts_out[TA_SUP_HS_ARU, t] = np.nan
+    ts_out[TA_RE_HS_ARU, t] = np.nan
+
+    # emission losses (space_emission_systems.calc_q_em_ls_heating)
+    delta_theta_int_inc = params[_DELTA_THETA_INT_INC_HS]
+    ts_out[QHS_EM_LS, t] = space_emission_systems.calc_q_em_ls(qh_sen_rc_demand, delta_theta_int_inc,
+                                                               ts_out[T_INT, t] + delta_theta_int_inc,
+                                                               ts_in[_T_EXT, t], params[_QHSMAX_WM2] * params[_AF])
+
+    status[_SEN, t] = STATUS_ON if qh_sen_rc_demand > 0.0 else STATUS_OFF
+    return ERROR_NONE
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_cool_loads_radiator(ts_in, params, ts_out, status, t, t_prev, rc_0, rc_10, rc_act, diagnostics):
+    """see hourly_procedure_heating_cooling_system_load.calc_cool_loads_radiator"""
+    error, qc_sen_rc_demand = calc_rc_cooling_demand(ts_in, params, ts_out, t, t_prev, rc_0, rc_10, rc_act,
+                                                     diagnostics)
+    if error != ERROR_NONE:
+        return error
+
+    ts_out[G_HU_LD, t] = 0.0
+    ts_out[G_DHU_LD, t] = 0.0
+    error = calc_moisture_content_in_zone_local(params, ts_in, ts_out, t, t_prev)
+    if error != ERROR_NONE:
+        return error
+
+    ts_out[QCS_SEN_RC, t] = qc_sen_rc_demand
+    ts_out[QCS_SEN_SCU, t] = qc_sen_rc_demand
+    ts_out[QCS_SEN_AHU, t] = 0.0
+    status[_AHU, t] = STATUS_NO_SYSTEM
+    ts_out[QCS_SEN_ARU, t] = 0.0
+    status[_ARU, t] = STATUS_NO_SYSTEM
+    ts_out[QCS_SEN_SYS, t] = qc_sen_rc_demand
+    rc_temperatures_to_tsd(rc_act, ts_out, t)
+    ts_out[QCS_LAT_AHU, t] = 0.0
+    ts_out[QCS_LAT_ARU, t] = 0.0
+    ts_out[QCS_LAT_SYS, t] = 0.0
+    ts_out[MA_SUP_CS_AHU, t] = 0.0
+    ts_out[TA_SUP_CS_AHU, t] = np.nan
+    ts_out[TA_RE_CS_AHU, t] = np.nan
+    ts_out[MA_SUP_CS_ARU, t] = 0.0
+    ts_out[TA_SUP_CS_ARU, t] = np.nan
+    ts_out[TA_RE_CS_ARU, t] = np.nan
+
+    # emission losses (space_emission_systems.calc_q_em_ls_cooling)
+    delta_theta_int_inc = params[_DELTA_THETA_INT_INC_CS]
+    ts_out[QCS_EM_LS, t] = space_emission_systems.calc_q_em_ls(qc_sen_rc_demand, delta_theta_int_inc,
+                                                               ts_out[T_INT, t] + delta_theta_int_inc,
+                                                               ts_in[_T_EXT, t] + params[_DELTA_THETA_E_SOL],
+                                                               -params[_QCSMAX_WM2] * params[_AF])
+
+    status[_SEN, t] = STATUS_ON if qc_sen_rc_demand < 0.0 else STATUS_OFF
+    return ERROR_NONE
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def update_no_heating(ts_out, t):
+    """see hourly_procedure_heating_cooling_system_load.update_tsd_no_heating"""
+    for key in (QHS_SEN_RC, QHS_SEN_SHU, QHS_SEN_ARU, QHS_SEN_AHU, QHS_LAT_ARU, QHS_LAT_AHU, QHS_SEN_SYS,
+                QHS_LAT_SYS, QHS_EM_LS, EHS_LAT_AUX, MA_SUP_HS_AHU, MA_SUP_HS_ARU):
+        ts_out[key, t] = 0.0
+    for key in (TA_SUP_HS_AHU, TA_RE_HS_AHU, TA_SUP_HS_ARU, TA_RE_HS_ARU):
+        ts_out[key, t] = np.nan
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def update_no_cooling(ts_out, t):
+    """see hourly_procedure_heating_cooling_system_load.update_tsd_no_cooling"""
+    for key in (QCS_SEN_RC, QCS_SEN_SCU, QCS_SEN_ARU, QCS_SEN_AHU, QCS_LAT_ARU, QCS_LAT_AHU, QCS_SEN_SYS,
+                QCS_LAT_SYS, QCS_EM_LS, MA_SUP_CS_AHU, MA_SUP_CS_ARU):
+        ts_out[key, t] = 0.0
+    for key in (TA_SUP_CS_AHU, TA_RE_CS_AHU, TA_SUP_CS_ARU, TA_RE_CS_ARU):
+        ts_out[key, t] = np.nan
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def detailed_thermal_balance(ts_in, params, ts_out, t, rc):
+    """see hourly_procedure_heating_cooling_system_load.detailed_thermal_balance_to_tsd"""
+    (ts_out[Q_GAIN_SEN_LIGHT, t], ts_out[Q_GAIN_SEN_APP, t], ts_out[Q_GAIN_SEN_PRO, t], ts_out[Q_GAIN_SEN_DATA, t],
+     ts_out[Q_GAIN_SEN_PEOP, t], ts_out[Q_GAIN_SEN_WALL, t], ts_out[Q_GAIN_SEN_BASE, t], ts_out[Q_GAIN_SEN_ROOF, t],
+     ts_out[Q_GAIN_SEN_WIND, t], ts_out[Q_GAIN_SEN_VENT, t]) = \
+        hourly_procedure_heating_cooling_system_load._calc_detailed_thermal_balance(
+            ts_in[_EL, t], ts_in[_EA, t], ts_in[_EPRO, t], ts_in[_QCDATA_SYS, t], ts_in[_QS, t], params[_AWALL_AG],
+            params[_U_WALL], params[_AOP_BG], params[_U_BASE], params[_AROOF], params[_U_ROOF], rc[_RC_H_EM],
+            rc[_RC_H_OP_M], rc[_RC_THETA_M], rc[_RC_THETA_EM], rc[_RC_H_EC], rc[_RC_THETA_C], rc[_RC_THETA_EC],
+            rc[_RC_H_EA], rc[_RC_T_INT], rc[_RC_THETA_EA])
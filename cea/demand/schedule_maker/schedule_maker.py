@@ -1,16 +1,17 @@
+import collections
 import os
-import random
+import zlib
 
 import numpy as np
 import pandas as pd
 from geopandas import GeoDataFrame as Gdf
 
 import warnings
-from itertools import repeat
 
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 from cea.constants import HOURS_IN_YEAR, MONTHS_IN_YEAR
 from cea.datamanagement.schedule_helper import read_cea_schedule
 from cea.datamanagement.data_migrator import is_3_22
@@ -29,11 +30,15 @@ __maintainer__ = "Daren Thomas"
 __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
+# number of occupants simulated together by the stochastic occupancy model
+OCCUPANTS_PER_CHUNK = 256
+
 
 def schedule_maker_main(locator, config, building=None):
     # local variables
     buildings = config.schedule_maker.buildings
     schedule_model = config.schedule_maker.schedule_model
+    random_seed = config.schedule_maker.random_seed
 
     if schedule_model == 'deterministic':
         stochastic_schedule = False
@@ -72,20 +77,29 @@ def schedule_maker_main(locator, config, building=None):
 
     # create date range for the calculation year
     date_range = get_date_range_hours_from_year(year)
+    year_index = get_year_index(date_range)
 
     # SCHEDULE MAKER
-    n = len(buildings)
+    if stochastic_schedule:
+        # the run time of the stochastic occupancy model grows with the number of occupants
+        costs = [prop_geometry.loc[b, 'Aocc'] / internal_loads.loc[b, 'Occ_m2p']
+                 if internal_loads.loc[b, 'Occ_m2p'] > 0.0 else 0.0 for b in buildings]
+    else:
+        costs = None
     calc_schedules_multiprocessing = cea.utilities.parallel.vectorize(calc_schedules,
                                                                       config.get_number_of_processes(),
-                                                                      on_complete=print_progress)
+                                                                      on_complete=print_progress,
+                                                                      costs=costs)
 
-    calc_schedules_multiprocessing(repeat(locator, n),
+    calc_schedules_multiprocessing(broadcast(locator),
                                    buildings,
-                                   repeat(date_range, n),
+                                   broadcast(date_range),
+                                   broadcast(year_index),
                                    [internal_loads.loc[b] for b in buildings],
                                    [indoor_comfort.loc[b] for b in buildings],
                                    [prop_geometry.loc[b] for b in buildings],
-                                   repeat(stochastic_schedule, n))
+                                   broadcast(stochastic_schedule),
+                                   broadcast(random_seed))
     return None
 
 
@@ -96,10 +110,12 @@ def print_progress(i, n, args, result):
 def calc_schedules(locator,
                    building,
                    date_range,
+                   year_index,
                    internal_loads_building,
                    indoor_comfort_building,
                    prop_geometry_building,
-                   stochastic_schedule):
+                   stochastic_schedule,
+                   random_seed=None):
     """
     Calculate the profile of occupancy, electricity demand and domestic hot water consumption from the input schedules.
     For variables that depend on the number of people (humidity gains, heat gains and ventilation demand), additional
@@ -113,6 +129,7 @@ def calc_schedules(locator,
     :param cea.inputlocator.InputLocator locator: InputLocator instance
     :param str building: name of current building
     :param DatetimeIndex date_range: range of dates being considered
+    :param YearIndex year_index: day type, hour and month of each hour in ``date_range`` (see ``get_year_index``)
     :param daily_schedule_building: building schedules for occupancy, electricity demand, water consumption, and system operation
     :type daily_schedule_building: {str: array}
     :param monthly_multiplier: percentage of the total number of occupants present at each month of the year
@@ -121,6 +138,7 @@ def calc_schedules(locator,
     :param indoor_comfort_building: indoor comfort properties for the current building (from case study inputs)
     :param prop_geometry_building: building geometry (from case study inputs)
     :param stochastic_schedule: Boolean that defines whether the stochastic occupancy model should be used
+    :param random_seed: seed of the stochastic occupancy model (None for a different schedule in every run)
 
     .. [Page, J., et al., 2008] Page, J., et al. A generalised stochastic model for the simulation of occupant presence.
         Energy and Buildings, Vol. 40, No. 2, 2008, pp 83-98.
@@ -137,13 +155,12 @@ def calc_schedules(locator,
     # SCHEDULE FOR PEOPLE OCCUPANCY
     array = daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION['Occ_m2p']]
     if internal_loads_building['Occ_m2p'] > 0.0:
-        yearly_array = get_yearly_vectors(date_range, days_in_schedule, array, monthly_multiplier)
+        yearly_array = get_yearly_vectors(year_index, days_in_schedule, array, monthly_multiplier)
         number_of_occupants = int(1 / internal_loads_building['Occ_m2p'] * prop_geometry_building['Aocc'])
         if stochastic_schedule:
-            # if the stochastic schedules are used, the stochastic schedule generator is called once for every occupant
-            final_schedule['Occ_m2p'] = np.zeros(HOURS_IN_YEAR)
-            for occupant in range(number_of_occupants):
-                final_schedule['Occ_m2p'] += calc_individual_occupant_schedule(yearly_array)
+            # if the stochastic schedules are used, the presence of every occupant is simulated
+            final_schedule['Occ_m2p'] = calc_stochastic_occupancy_schedule(yearly_array, number_of_occupants,
+                                                                           get_random_generator(random_seed, building))
         else:
             final_schedule['Occ_m2p'] = np.round(yearly_array * number_of_occupants)
     else:
@@ -161,7 +178,7 @@ def calc_schedules(locator,
     for variable in ['Vww_ldp', 'Vw_ldp']:
         if internal_loads_building[variable] > 0.0:
             array = daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION[variable]]
-            yearly_array = get_yearly_vectors(date_range,
+            yearly_array = get_yearly_vectors(year_index,
                                               days_in_schedule,
                                               array,
                                               monthly_multiplier,
@@ -185,10 +202,10 @@ def calc_schedules(locator,
         # adjust the demand for appliances based on the number of occupants
         if stochastic_schedule:
             # get yearly array for occupant-related loads
-            yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier)
+            yearly_array = get_yearly_vectors(year_index, days_in_schedule, occupant_load, monthly_multiplier)
             # adjust the yearly array based on the number of occupants produced by the stochastic occupancy model
             deterministic_occupancy_array = np.round(
-                get_yearly_vectors(date_range, days_in_schedule,
+                get_yearly_vectors(year_index, days_in_schedule,
                                    daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION['Occ_m2p']],
                                    monthly_multiplier) * 1 / internal_loads_building['Occ_m2p'] *
                 prop_geometry_building['Aocc'])
@@ -205,7 +222,7 @@ def calc_schedules(locator,
             final_schedule[variable] = (adjusted_array + base_load) * internal_loads_building[variable] * \
                                        prop_geometry_building['Aef']
         else:
-            yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load,
+            yearly_array = get_yearly_vectors(year_index, days_in_schedule, occupant_load,
                                               monthly_multiplier) + base_load
             final_schedule[variable] = yearly_array * internal_loads_building[variable] * \
                                        prop_geometry_building['Aef']
@@ -219,7 +236,7 @@ def calc_schedules(locator,
     base_load = np.min(array)
     occupant_load = array - base_load
     # this schedule is assumed to be independent of occupant presence
-    yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier) + base_load
+    yearly_array = get_yearly_vectors(year_index, days_in_schedule, occupant_load, monthly_multiplier) + base_load
     final_schedule[variable] = yearly_array * internal_loads_building[variable] * prop_geometry_building['Aef']
 
     # ELECTROMOVILITYSCHEDULE
@@ -229,14 +246,14 @@ def calc_schedules(locator,
     base_load = np.min(array)
     occupant_load = array - base_load
     # this schedule is assumed to be independent of occupant presence
-    yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier) + base_load
+    yearly_array = get_yearly_vectors(year_index, days_in_schedule, occupant_load, monthly_multiplier) + base_load
     final_schedule[variable] = yearly_array * internal_loads_building[variable] * 1000  # convert to Wh
 
     # DATACENTRE AND PROCESS ENERGY DEMAND SCHEDULES
     for variable in ['Ed_Wm2', 'Epro_Wm2', 'Qcre_Wm2', 'Qhpro_Wm2', 'Qcpro_Wm2']:
         # these schedules are assumed to be independent of occupant presence and have no monthly variations
         array = daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION[variable]]
-        yearly_array = get_yearly_vectors(date_range, days_in_schedule, array,
+        yearly_array = get_yearly_vectors(year_index, days_in_schedule, array,
                                           monthly_multiplier=list(np.ones(MONTHS_IN_YEAR)))
         final_schedule[variable] = yearly_array * internal_loads_building[variable] * prop_geometry_building['Aef']
 
@@ -249,7 +266,7 @@ def calc_schedules(locator,
                                                                      indoor_comfort_building['Ths_setb_C'],
                                                                      indoor_comfort_building['Tcs_set_C'],
                                                                      indoor_comfort_building['Tcs_setb_C'])
-        final_schedule[variable] = get_yearly_vectors(date_range, days_in_schedule, array,
+        final_schedule[variable] = get_yearly_vectors(year_index, days_in_schedule, array,
                                                       monthly_multiplier=list(np.ones(MONTHS_IN_YEAR)))
 
     final_dict = {
@@ -319,48 +336,78 @@ def convert_schedule_string_to_temperature(schedule_string, schedule_type, Ths_s
     return schedule_float
 
 
-def calc_individual_occupant_schedule(deterministic_schedule):
+def get_random_generator(random_seed, building):
     """
-    Calculates the stochastic occupancy pattern for an individual based on Page et al. (2008). The so-called parameter
-    of mobility mu is assumed to be a uniformly-distributed random float between 0 and 0.5 based on the range of values
-    presented in the aforementioned paper.
+    Random number generator of the stochastic occupancy model of a building. The stream of random numbers depends on
+    the ``random_seed`` and the name of the building only, so the schedules of a building are the same whatever the
+    order of the buildings and the number of processes used.
+
+    :param random_seed: seed of the random numbers (None to seed from the operating system)
+    :type random_seed: int
+    :param str building: name of the building
+    :rtype: numpy.random.Generator
+    """
+    if random_seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng([random_seed, zlib.crc32(building.encode('utf-8'))])
+
+
+def calc_stochastic_occupancy_schedule(deterministic_schedule, number_of_occupants, rng):
+    """
+    Calculates the number of occupants present in a building at each time step with the stochastic occupancy model of
+    Page et al. (2008). The occupants are simulated together in chunks of ``OCCUPANTS_PER_CHUNK``.
 
     :param deterministic_schedule: deterministic schedule of occupancy provided in the user inputs
     :type deterministic_schedule: array(float)
+    :param int number_of_occupants: number of occupants of the building
+    :param rng: random number generator (see ``get_random_generator``)
+    :type rng: numpy.random.Generator
 
-    :return pattern: yearly occupancy pattern for a given occupant in a given occupancy type
-    :rtype pattern: list[int]
+    :return: number of occupants present at each time step
+    :rtype: array(float)
     """
+    deterministic_schedule = np.asarray(deterministic_schedule, dtype=float)
+    occupancy = np.zeros(len(deterministic_schedule))
+    for first_occupant in range(0, number_of_occupants, OCCUPANTS_PER_CHUNK):
+        occupants_in_chunk = min(OCCUPANTS_PER_CHUNK, number_of_occupants - first_occupant)
+        occupancy += calc_occupant_presence(deterministic_schedule, occupants_in_chunk, rng).sum(axis=1)
+    return occupancy
 
-    # get a random mobility parameter mu between 0 and 0.5
-    mu = random.uniform(0, 0.5)
 
-    # assign initial state by comparing a random number to the deterministic schedule's probability of occupant presence at t = 0
-    if random.random() <= deterministic_schedule[0]:
-        state = 1
-    else:
-        state = 0
+def calc_occupant_presence(deterministic_schedule, number_of_occupants, rng):
+    """
+    Calculates the stochastic occupancy pattern of each occupant based on Page et al. (2008) as a two-state Markov
+    chain. The so-called parameter of mobility mu is assumed to be a uniformly-distributed random float between 0 and
+    0.5 based on the range of values presented in the aforementioned paper.
 
-    # start list of occupancy states throughout the year
-    pattern = [state]
+    :param deterministic_schedule: deterministic schedule of occupancy provided in the user inputs
+    :type deterministic_schedule: array(float)
+    :param int number_of_occupants: number of occupants to simulate
+    :param rng: random number generator (see ``get_random_generator``)
+    :type rng: numpy.random.Generator
 
-    # calculate probability of presence for each hour of the year
-    for i in range(len(deterministic_schedule[:-1])):
-        # get probability of presence at t and t+1 from archetypal schedule
-        p_0 = deterministic_schedule[i]
-        p_1 = deterministic_schedule[i + 1]
-        # calculate probability of transition from absence to presence (T01) and from presence to presence (T11)
-        T01, T11 = calculate_transition_probabilities(mu, p_0, p_1)
+    :return: presence (True) or absence (False) of each occupant (columns) at each time step (rows)
+    :rtype: array(bool)
+    """
+    # get a random mobility parameter mu between 0 and 0.5 for each occupant
+    mu = rng.uniform(0, 0.5, number_of_occupants)
 
-        if state == 1:
-            next = get_random_presence(T11)
-        else:
-            next = get_random_presence(T01)
+    # calculate the transition probabilities of all occupants for each hour of the year
+    T01, T11 = calculate_transition_probabilities(mu[np.newaxis, :], deterministic_schedule[:-1, np.newaxis],
+                                                  deterministic_schedule[1:, np.newaxis])
+    # the probabilities of presence are used in steps of 1 %
+    T01 = np.trunc(T01 * 100) / 100
+    T11 = np.trunc(T11 * 100) / 100
 
-        pattern.append(next)
-        state = next
+    random_numbers = rng.random((len(deterministic_schedule), number_of_occupants))
+    presence = np.empty((len(deterministic_schedule), number_of_occupants), dtype=bool)
 
-    return np.array(pattern)
+    # assign initial state by comparing a random number to the deterministic schedule's probability of occupant
+    # presence at t = 0
+    presence[0] = random_numbers[0] <= deterministic_schedule[0]
+    for t in range(1, len(deterministic_schedule)):
+        presence[t] = random_numbers[t] < np.where(presence[t - 1], T11[t - 1], T01[t - 1])
+    return presence
 
 
 def calculate_transition_probabilities(mu, P0, P1):
@@ -369,6 +416,9 @@ def calculate_transition_probabilities(mu, P0, P1):
     probability of arriving (T01) and the probability of staying in (T11) given the parameter of mobility mu, the
     probability of the present state (P0), and the probability of the next state t+1 (P1).
 
+    The parameters can be floats or arrays (e.g. mu of each occupant and P0, P1 of each time step), the results are
+    broadcast following the numpy rules.
+
     :param mu: parameter of mobility
     :type mu: float
     :param P0: probability of presence at the current time step t
@@ -387,86 +437,48 @@ def calculate_transition_probabilities(mu, P0, P1):
 
     # Calculate transition probability of arriving and transition probability of staying
     T01 = (m) * P0 + P1
-    if P0 != 0:
-        T11 = ((P0 - 1) / P0) * (m * P0 + P1) + P1 / P0
-    else:
-        T11 = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        T11 = np.where(P0 != 0, ((P0 - 1) / P0) * (m * P0 + P1) + P1 / P0, 0.0)
 
     # For some instances of mu the probabilities are bigger than 1, so the min function is used in the return statement.
-    return min(1, T01), min(1, T11)
+    return np.minimum(1, T01), np.minimum(1, T11)
 
 
-def get_random_presence(p):
-    """
-    Get the current occupant state (presence=1 or absence=0) at the current time step given a probability p.
+YearIndex = collections.namedtuple('YearIndex', ['day_type', 'hour', 'month'])
 
-    :param p: A probability (e.g. T01, T11)
-    :type p: float
 
-    Returns the randomly-chosen state (0 or 1).
+def get_year_index(date_range):
     """
+    Index the hours of the calculation year once, so the yearly vectors of all buildings and variables can be created
+    with array lookups (see ``get_yearly_vectors``).
 
-    # Calculate probability of presence
-    P1 = int(p * 100)
-    # Calculate probability of absence
-    P0 = 100 - P1
-
-    # Create population of possible values and choose one value
-    weighted_choices = [(1, P1), (0, P0)]
-    population = [val for val, cnt in weighted_choices for i in range(cnt)]
-
-    return random.choice(population)
+    :param DatetimeIndex date_range: range of dates being considered
+    :return: the day type (0: weekday, 1: saturday, 2: sunday), the hour of the day and the month (0...11) of each hour
+    :rtype: YearIndex
+    """
+    dayofweek = np.asarray(date_range.dayofweek)
+    day_type = np.where(dayofweek < 5, 0, np.where(dayofweek == 5, 1, 2))
+    return YearIndex(day_type=day_type,
+                     hour=np.asarray(date_range.hour),
+                     month=np.asarray(date_range.month) - 1)
 
 
-def get_yearly_vectors(date_range, days_in_schedule, schedule_array, monthly_multiplier,
+def get_yearly_vectors(year_index, days_in_schedule, schedule_array, monthly_multiplier,
                        normalize_first_daily_profile=False):
     # transform into arrays
     # per weekday, saturday, sunday
+    schedule_array = np.asarray(schedule_array, dtype=float)
     array_per_day = schedule_array.reshape(3, int(len(schedule_array) / days_in_schedule))
-    array_week = array_per_day[0]
-    array_sat = array_per_day[1]
-    array_sun = array_per_day[2]
     if normalize_first_daily_profile:
         # for water consumption we need to normalize to the daily maximum
         # this is to account for typical units of water consumption in liters per person per day (lpd).
-
-        if array_week.sum() != 0.0:
-            norm_weekday_max = array_week.sum() ** -1
-        else:
-            norm_weekday_max = 0.0
-
-        if array_sat.sum() != 0.0:
-            norm_sat_max = array_sat.sum() ** -1
-        else:
-            norm_sat_max = 0.0
-
-        if array_sun.sum() != 0.0:
-            norm_sun_max = array_sun.sum() ** -1
-        else:
-            norm_sun_max = 0.0
+        norm_max = np.array([sum(day) ** -1 if sum(day) != 0.0 else 0.0 for day in array_per_day.tolist()])
     else:
-        norm_weekday_max = 1.0
-        norm_sat_max = 1.0
-        norm_sun_max = 1.0
-
-    yearly_array = [
-        calc_hourly_value(date, array_week, array_sat, array_sun, norm_weekday_max, norm_sat_max, norm_sun_max,
-                          monthly_multiplier) for date in date_range]
-
-    return np.array(yearly_array)
-
-
-def calc_hourly_value(date, array_week, array_sat, array_sun, norm_weekday_max, norm_sat_max, norm_sun_max,
-                      monthly_multiplier):
-    month_year = monthly_multiplier[date.month - 1]
-    hour_day = date.hour
-    dayofweek = date.dayofweek
-    if 0 <= dayofweek < 5:  # weekday
-        return array_week[hour_day] * month_year * norm_weekday_max  # normalized dhw demand flow rates
-    elif dayofweek == 5:  # saturday
-        return array_sat[hour_day] * month_year * norm_sat_max  # normalized dhw demand flow rates
-    else:  # sunday
-        return array_sun[hour_day] * month_year * norm_sun_max  # normalized dhw demand flow rates
+        norm_max = np.ones(3)
+
+    # value of the day type and hour of the day * monthly multiplier * normalization of the day type
+    month_year = np.asarray(monthly_multiplier, dtype=float)[year_index.month]
+    return array_per_day[year_index.day_type, year_index.hour] * month_year * norm_max[year_index.day_type]
 
 
 def main(config):
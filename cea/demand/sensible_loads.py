@@ -7,6 +7,8 @@ EN-13970
 
 
 import numpy as np
+from numba import jit
+
 from cea.demand import control_heating_cooling_systems, constants
 from cea.constants import HOURS_IN_YEAR, BOLTZMANN, KELVIN_OFFSET
 
@@ -85,28 +87,37 @@ def calc_I_rad(t, tsd, bpr):
         I_rad: vector solar radiation re-irradiated to the sky.
     """
 
-    temp_s_prev = tsd['theta_c'][t - 1]
-    if np.isnan(tsd['theta_c'][t - 1]):
-        temp_s_prev = tsd['T_ext'][t - 1]
+    return _calc_I_rad(tsd['theta_c'][t - 1], tsd['T_ext'][t - 1], tsd['T_ext'][t], tsd['T_sky'][t],
+                       tsd['RSE_win'][t], tsd['RSE_roof'][t], tsd['RSE_wall'][t], bpr.rc_model['U_win'],
+                       bpr.rc_model['U_roof'], bpr.rc_model['U_wall'], bpr.architecture.e_win,
+                       bpr.architecture.e_roof, bpr.architecture.e_wall, bpr.rc_model['Awin_ag'],
+                       bpr.rc_model['Aroof'], bpr.rc_model['Awall_ag'])
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def _calc_I_rad(theta_c_prev, T_ext_prev, T_ext, T_sky, RSE_win, RSE_roof, RSE_wall, U_win, U_roof, U_wall, e_win,
+                e_roof, e_wall, Awin_ag, Aroof, Awall_ag):
+    # numba compatible calculation, also used by cea.demand.rc_model_kernel
+    temp_s_prev = theta_c_prev
+    if np.isnan(theta_c_prev):
+        temp_s_prev = T_ext_prev
 
     # theta_ss is the is the arithmetic average of the surface temperature and the sky temperature, in °C.
-    theta_ss = 0.5 * (tsd['T_sky'][t] + temp_s_prev)  # [see 11.4.6 in ISO 13790]
+    theta_ss = 0.5 * (T_sky + temp_s_prev)  # [see 11.4.6 in ISO 13790]
 
     # delta_theta_er is the average difference between outdoor air temperature and sky temperature
-    delta_theta_er = tsd['T_ext'][t] - tsd['T_sky'][t]  # [see 11.3.5 in ISO 13790]
+    delta_theta_er = T_ext - T_sky  # [see 11.3.5 in ISO 13790]
 
     Fform_wall, Fform_win, Fform_roof = 0.5, 0.5, 1  # 50% re-irradiated by vertical surfaces and 100% by horizontal
-    I_rad_win = tsd['RSE_win'][t] * bpr.rc_model['U_win'] * calc_hr(bpr.architecture.e_win, theta_ss) * bpr.rc_model[
-        'Awin_ag'] * delta_theta_er
-    I_rad_roof = tsd['RSE_roof'][t] * bpr.rc_model['U_roof'] * calc_hr(bpr.architecture.e_roof, theta_ss) * bpr.rc_model[
-        'Aroof'] * delta_theta_er
-    I_rad_wall = tsd['RSE_wall'][t] * bpr.rc_model['U_wall'] * calc_hr(bpr.architecture.e_wall, theta_ss) * bpr.rc_model[
-        'Awall_ag'] * delta_theta_er
+    I_rad_win = RSE_win * U_win * calc_hr(e_win, theta_ss) * Awin_ag * delta_theta_er
+    I_rad_roof = RSE_roof * U_roof * calc_hr(e_roof, theta_ss) * Aroof * delta_theta_er
+    I_rad_wall = RSE_wall * U_wall * calc_hr(e_wall, theta_ss) * Awall_ag * delta_theta_er
     I_rad = Fform_wall * I_rad_wall + Fform_win * I_rad_win + Fform_roof * I_rad_roof
 
     return I_rad
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_hr(emissivity, theta_ss):
     """
     This function calculates the external radiative heat transfer coefficient according to ISO 13790
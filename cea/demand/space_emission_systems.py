@@ -12,6 +12,8 @@ prEN 15316-2:2014
 
 
 import numpy as np
+from numba import jit
+
 from cea.demand.control_heating_cooling_systems import has_heating_system, has_cooling_system
 
 __author__ = "Gabriel Happle"
@@ -92,6 +94,7 @@ def calc_q_em_ls_heating(bpr, tsd, hoy):
     return calc_q_em_ls(q_em_out, delta_theta_int_inc, theta_int_inc, theta_e_comb, q_em_max)
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_q_em_ls(q_em_out, delta_theta_int_inc, theta_int_inc, theta_e_comb, q_em_max):
 
     """
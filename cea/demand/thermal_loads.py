@@ -12,7 +12,7 @@ import pandas as pd
 from cea.constants import HOURS_IN_YEAR, HOURS_PRE_CONDITIONING
 from cea.demand import demand_writers
 from cea.demand import hourly_procedure_heating_cooling_system_load, ventilation_air_flows_simple
-from cea.demand import latent_loads
+from cea.demand import latent_loads, rc_model_kernel
 from cea.demand import sensible_loads, electrical_loads, hotwater_loads, refrigeration_loads, datacenter_loads
 from cea.demand import ventilation_air_flows_detailed, control_heating_cooling_systems
 from cea.demand.building_properties import get_thermal_resistance_surface
@@ -105,7 +105,7 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
     # CALCULATE SPACE CONDITIONING DEMANDS
     if np.isclose(bpr.rc_model['Af'], 0.0):  # if building does not have conditioned area
         tsd['T_int'] = tsd['T_ext']
-        tsd['x_int'] = np.vectorize(convert_rh_to_moisture_content)(tsd['rh_ext'], tsd['T_int'])
+        tsd['x_int'] = convert_rh_to_moisture_content(tsd['rh_ext'], tsd['T_int'])
         tsd['E_cs'] = tsd['E_hs'] = np.zeros(HOURS_IN_YEAR)
         tsd['Eaux_cs'] = tsd['Eaux_hs'] = tsd['Ehs_lat_aux'] = np.zeros(HOURS_IN_YEAR)
         print(f"building {bpr.name} does not have an air-conditioned area")
@@ -118,8 +118,8 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
         tsd = latent_loads.calc_Qgain_lat(tsd, schedules)
         tsd = calc_set_points(bpr, date_range, tsd, building_name, config, locator,
                               schedules)  # calculate the setpoints for every hour
-        tsd = calc_Qhs_Qcs(bpr, tsd,
-                           use_dynamic_infiltration_calculation)  # end-use demand latent and sensible + ventilation
+        tsd = calc_Qhs_Qcs(bpr, tsd, use_dynamic_infiltration_calculation,
+                           config.demand.use_compiled_rc_model)  # end-use demand latent and sensible + ventilation
         tsd = sensible_loads.calc_Qhs_Qcs_loss(bpr, tsd)  # losses
         tsd = sensible_loads.calc_Qhs_sys_Qcs_sys(tsd)  # system (incl. losses)
         tsd = sensible_loads.calc_temperatures_emission_systems(bpr, tsd)  # calculate temperatures
@@ -160,7 +160,7 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
 
     # WRITE SOLAR RESULTS
     write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
-                  resolution_outputs, temperatures_output, tsd, debug)
+                  resolution_outputs, temperatures_output, tsd, debug, config.demand.output_format)
 
     return
 
@@ -173,7 +173,7 @@ def calc_QH_sys_QC_sys(tsd):
 
 
 def write_results(bpr, building_name, date, loads_output, locator, massflows_output,
-                  resolution_outputs, temperatures_output, tsd, debug):
+                  resolution_outputs, temperatures_output, tsd, debug, output_format='csv'):
     if resolution_outputs == 'hourly':
         writer = demand_writers.HourlyDemandWriter(loads_output, massflows_output, temperatures_output)
     elif resolution_outputs == 'monthly':
@@ -187,6 +187,8 @@ def write_results(bpr, building_name, date, loads_output, locator, massflows_out
         print('Writing detailed demand results of {} to .xls file.'.format(building_name))
         reporting.quick_visualization_tsd(tsd, locator.get_demand_results_folder(), building_name)
         reporting.full_report_to_xls(tsd, locator.get_demand_results_folder(), building_name)
+    elif output_format == 'parquet':
+        writer.results_to_parquet(tsd, bpr, locator, date, building_name)
     else:
         writer.results_to_csv(tsd, bpr, locator, date, building_name)
 
@@ -305,15 +307,24 @@ def calc_set_points(bpr, date, tsd, building_name, config, locator, schedules):
 
     t_prev = next(get_hours(bpr)) - 1
     tsd['T_int'][t_prev] = tsd['T_ext'][t_prev]
-    tsd['x_int'][t_prev] = latent_loads.convert_rh_to_moisture_content(tsd['rh_ext'][t_prev], tsd['T_ext'][t_prev])
+    tsd['x_int'][t_prev] = tsd['x_ext'][t_prev]
     return tsd
 
 
-def calc_Qhs_Qcs(bpr, tsd, use_dynamic_infiltration_calculation):
+def calc_Qhs_Qcs(bpr, tsd, use_dynamic_infiltration_calculation, use_compiled_rc_model=False):
     # get ventilation flows
     ventilation_air_flows_simple.calc_m_ve_required(tsd)
     ventilation_air_flows_simple.calc_m_ve_leakage_simple(bpr, tsd)
 
+    if use_compiled_rc_model and rc_model_kernel.is_supported(bpr, use_dynamic_infiltration_calculation):
+        # same procedure as the loop below, compiled for the radiative heating / cooling systems. Buildings with air
+        # based systems or dynamic infiltration are always simulated with the loop below.
+        return rc_model_kernel.calc_Qhs_Qcs(bpr, tsd, get_hours(bpr))
+
+    if use_dynamic_infiltration_calculation:
+        # the leakage paths and ventilation openings of the building are the same for every hour
+        dict_props_nat_vent = ventilation_air_flows_detailed.get_properties_natural_ventilation(bpr)
+
     # end-use demand calculation
     for t in get_hours(bpr):
 
@@ -322,7 +333,6 @@ def calc_Qhs_Qcs(bpr, tsd, use_dynamic_infiltration_calculation):
 
         if use_dynamic_infiltration_calculation:
             # OVERWRITE STATIC INFILTRATION WITH DYNAMIC INFILTRATION RATE
-            dict_props_nat_vent = ventilation_air_flows_detailed.get_properties_natural_ventilation(bpr)
             qm_sum_in, qm_sum_out = ventilation_air_flows_detailed.calc_air_flows(
                 tsd['T_int'][t - 1], tsd['u_wind'][t], tsd['T_ext'][t], dict_props_nat_vent)
             # INFILTRATION IS FORCED NOT TO REACH ZERO IN ORDER TO AVOID THE RC MODEL TO FAIL
@@ -429,6 +439,8 @@ def initialize_timestep_data(bpr, weather_data):
     tsd = {'T_ext': weather_data.drybulb_C.values,
            'T_ext_wetbulb': weather_data.wetbulb_C.values,
            'rh_ext': weather_data.relhum_percent.values,
+           'x_ext': convert_rh_to_moisture_content(weather_data.relhum_percent.values,
+                                                   weather_data.drybulb_C.values),
            'T_sky': weather_data.skytemp_C.values,
            'u_wind': weather_data.windspd_ms}
 
@@ -21,7 +21,7 @@ Convention: all temperature inputs in (°C)
 
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
+from numba import jit
 from cea.demand import constants
 from cea.utilities.physics import calc_rho_air
 
@@ -36,6 +36,10 @@ __status__ = "Production"
 
 SHIELDING_CLASS = constants.SHIELDING_CLASS
 
+# tolerance of the zone pressure in the solution of the air flow mass balance (Pa)
+TOLERANCE_P_ZONE = 1e-6
+MAX_ITERATIONS_P_ZONE = 100
+
 
 # ventilation calculation
 
@@ -59,46 +63,129 @@ def get_building_geometry_ventilation(gdf_building_geometry):
 
 def calc_air_flows(temp_zone, u_wind, temp_ext, dict_props_nat_vent):
     """
-    Minimization of variable air flows as a function of zone gauge
+    Solution of the air flow mass balance (Eq. (69) in [1]) for the zone pressure
+
+    The air flow through each path decreases monotonically with the zone pressure, so the mass balance has a single
+    root, which lies between the lowest and the highest pressure of the paths at zero zone pressure. The root is found
+    with a safeguarded Newton method (see ``calc_zone_pressure``), instead of minimizing the absolute mass balance.
 
     :param temp_zone: zone indoor air temperature (°C)
     :param u_wind: wind velocity (m/s)
     :param temp_ext: exterior air temperature (°C)
     :param dict_props_nat_vent: dictionary containing natural ventilation properties of zone
+        (see ``get_properties_natural_ventilation``)
 
     qm_sum_in : total air mass flow rates into zone (kg/h)
     qm_sum_out : total air mass flow rates out of zone (kg/h)
     """
+    return calc_air_flows_paths(float(temp_zone), float(calc_u_wind_site(u_wind)), float(temp_ext),
+                                dict_props_nat_vent['coeff_lea_path'],
+                                dict_props_nat_vent['height_lea_path'],
+                                dict_props_nat_vent['coeff_wind_pressure_path_lea'],
+                                dict_props_nat_vent['coeff_vent_path'],
+                                dict_props_nat_vent['height_vent_path'],
+                                dict_props_nat_vent['coeff_wind_pressure_path_vent'])
 
-    # Different solver options to try:
-    # --------------------------------
-    # solver_options_nelder_mead ={'disp': False, 'maxiter': 100, 'maxfev': None, 'xtol': 0.1, 'ftol': 0.1}
-    # solver_options_cg ={'disp': False, 'gtol': 1e-05, 'eps': 1.4901161193847656e-08, 'return_all': False,
-    #                     'maxiter': None, 'norm': -np.inf}
-    # solver_options_powell = {'disp': True, 'maxiter': None, 'direc': None, 'maxfev': None,
-    #            'xtol': 0.0001, 'ftol': 0.0001}
-    # solver_options_tnc = {'disp': True, 'minfev': 0, 'scale': None, 'rescale': -1, 'offset': None, 'gtol': -1,
-    #                       'eps': 1e-08, 'eta': -1, 'maxiter': None, 'maxCGit': -1, 'mesg_num': None,
-    #                       'ftol': -1, 'xtol': -1, 'stepmx': 0, 'accuracy': 0}
-    solver_options_cobyla = {'iprint': 1, 'disp': False, 'maxiter': 100, 'rhobeg': 1.0, 'tol': 0.001}
-
-    # solve air flow mass balance via iteration
-    p_zone_ref = 1  # (Pa) zone pressure, THE UNKNOWN VALUE
-    res = minimize(calc_air_flow_mass_balance, p_zone_ref,
-                   args=(temp_zone, u_wind, temp_ext, dict_props_nat_vent, 'minimize',),
-                   method='COBYLA',
-                   options=solver_options_cobyla)
-    # print(res)
-    # get zone pressure of air flow mass balance
-    p_zone = res.x
-
-    # calculate air flows at zone pressure
-    qm_sum_in, qm_sum_out = calc_air_flow_mass_balance(p_zone, temp_zone, u_wind,
-                                                       temp_ext, dict_props_nat_vent, 'calculate')
 
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_air_flows_paths(temp_zone, u_wind_site, temp_ext, coeff_lea_path, height_lea_path,
+                         coeff_wind_pressure_path_lea, coeff_vent_path, height_vent_path,
+                         coeff_wind_pressure_path_vent):
+    """
+    Same as ``calc_air_flows`` for the site wind velocity and the arrays of the leakage and ventilation paths.
+
+    :returns: qm_sum_in, qm_sum_out: total air mass flow rates into and out of zone (kg/h)
+    """
+    # pressure difference across each path at a zone pressure of 0 Pa, see ``calc_delta_p_path``
+    delta_p_lea_path_0 = calc_delta_p_path(0.0, height_lea_path, temp_zone, coeff_wind_pressure_path_lea,
+                                           u_wind_site, temp_ext)
+    delta_p_vent_path_0 = calc_delta_p_path(0.0, height_vent_path, temp_zone, coeff_wind_pressure_path_vent,
+                                            u_wind_site, temp_ext)
+    rho_air_ext = calc_rho_air_kernel(temp_ext)
+    rho_air_zone = calc_rho_air_kernel(temp_zone)
+
+    p_zone = calc_zone_pressure(coeff_lea_path, delta_p_lea_path_0, coeff_vent_path, delta_p_vent_path_0,
+                                rho_air_ext, rho_air_zone)
+
+    # air flows through each path at the zone pressure, Eq. (60) and (64) in [1]
+    qv_lea_path = calc_qv_lea_path(coeff_lea_path, delta_p_lea_path_0 - p_zone)
+    qv_vent_path = calc_qv_vent_path(coeff_vent_path, delta_p_vent_path_0 - p_zone)
+
+    # Eq. (62), (63), (65) and (66) in [1], conversion to air mass flows with Eq. (67) and (68) in [1]
+    qm_sum_in = (qv_vent_path[qv_vent_path > 0].sum() * rho_air_ext +
+                 qv_lea_path[qv_lea_path > 0].sum() * rho_air_ext)
+    qm_sum_out = (qv_vent_path[qv_vent_path < 0].sum() * rho_air_zone +
+                  qv_lea_path[qv_lea_path < 0].sum() * rho_air_zone)
     return qm_sum_in, qm_sum_out
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_zone_pressure(coeff_lea_path, delta_p_lea_path_0, coeff_vent_path, delta_p_vent_path_0, rho_air_ext,
+                       rho_air_zone):
+    """
+    Find the zone pressure where the air mass flows into and out of the zone are balanced.
+
+    The pressure difference across a path is ``delta_p_path_0 - p_zone``: for ``p_zone`` below the lowest
+    ``delta_p_path_0`` all air flows enter the zone, above the highest one all air flows leave the zone. Newton steps
+    are taken inside this bracket, with a bisection whenever a Newton step leaves the bracket.
+
+    :returns: p_zone: zone reference pressure (Pa)
+    """
+    p_low = min(delta_p_lea_path_0.min(), delta_p_vent_path_0.min())
+    p_high = max(delta_p_lea_path_0.max(), delta_p_vent_path_0.max())
+    p_zone = 0.5 * (p_low + p_high)
+
+    for _ in range(MAX_ITERATIONS_P_ZONE):
+        if p_high - p_low < TOLERANCE_P_ZONE:
+            break
+        qm_balance, d_qm_balance = calc_mass_balance_paths(p_zone, coeff_lea_path, delta_p_lea_path_0, constants.N_LEA,
+                                                          rho_air_ext, rho_air_zone)
+        qm_balance_vent, d_qm_balance_vent = calc_mass_balance_paths(p_zone, coeff_vent_path, delta_p_vent_path_0,
+                                                                    constants.N_VENT, rho_air_ext, rho_air_zone)
+        qm_balance += qm_balance_vent
+        d_qm_balance += d_qm_balance_vent
+        if qm_balance == 0.0:
+            break
+        # the mass balance decreases with the zone pressure
+        if qm_balance > 0.0:
+            p_low = p_zone
+        else:
+            p_high = p_zone
+        p_newton = p_zone - qm_balance / d_qm_balance if d_qm_balance < 0.0 else np.nan
+        if p_low < p_newton < p_high:
+            converged = abs(p_newton - p_zone) < TOLERANCE_P_ZONE
+            p_zone = p_newton
+            if converged:
+                break
+        else:
+            p_zone = 0.5 * (p_low + p_high)
+    return p_zone
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_mass_balance_paths(p_zone, coeff_path, delta_p_path_0, n_path, rho_air_ext, rho_air_zone):
+    """
+    Sum of the air mass flows through the paths (kg/h, positive into the zone) and its derivative with respect to the
+    zone pressure. The derivative of a path at a pressure difference of 0 Pa is left out (it is infinite).
+    """
+    qm_balance = 0.0
+    d_qm_balance = 0.0
+    for i in range(len(coeff_path)):
+        delta_p = delta_p_path_0[i] - p_zone
+        rho_air = rho_air_ext if delta_p > 0 else rho_air_zone
+        if delta_p != 0.0:
+            qv_path = coeff_path[i] * np.sign(delta_p) * np.abs(delta_p) ** n_path
+            qm_balance += qv_path * rho_air
+            d_qm_balance -= n_path * coeff_path[i] * np.abs(delta_p) ** (n_path - 1.0) * rho_air
+    return qm_balance, d_qm_balance
+
+
+@jit(nopython=True, cache=True)
+def calc_rho_air_kernel(temp_air):
+    """same as :py:func:`cea.utilities.physics.calc_rho_air`, for the compiled functions of this module"""
+    return constants.TEMP_EXT_REF / (temp_air + 273) * constants.RHO_AIR_REF
+
+
 def get_properties_natural_ventilation(bpr):
     """
     gdf_geometry_building : GeoDataFrame containing geometry properties of single building
@@ -260,6 +347,7 @@ def lookup_coeff_wind_pressure(height_path, class_shielding, orientation_path, s
     return coeff_wind_pressure
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_delta_p_path(p_zone_ref, height_path, temp_zone, coeff_wind_pressure_path, u_wind_site, temp_ext):
     """
     Calculation of indoor-outdoor pressure difference at air path according to 6.4.2.4 in [1]
@@ -311,6 +399,7 @@ def calc_qv_delta_p_ref(n_delta_p_ref, vol_building):
     return n_delta_p_ref * vol_building
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_qv_lea_path(coeff_lea_path, delta_p_lea_path):
     """
     Calculate volume air flow of single leakage path according to 6.4.3.6.5 in [1]
@@ -444,6 +533,7 @@ def calc_qm_lea(p_zone_ref, temp_zone, temp_ext, u_wind_site, dict_props_nat_ven
 
 # operation of window openings
 
+@jit(nopython=True, cache=True, error_model='numpy')
 def calc_qv_vent_path(coeff_vent_path, delta_p_vent_path):
     """
     Calculate volume air flow of single ventilation opening path according to 6.4.3.6.4 in [1]
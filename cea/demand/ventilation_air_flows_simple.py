@@ -5,6 +5,8 @@
 
 
 import numpy as np
+from numba import jit
+
 from cea.demand import control_ventilation_systems, constants, control_heating_cooling_systems
 from cea.utilities import physics
 from cea.constants import HOURS_IN_YEAR
@@ -45,29 +47,43 @@ def calc_air_mass_flow_mechanical_ventilation(bpr, tsd, t):
     :return: updates tsd
     """
 
+    tsd['m_ve_mech'][t] = _calc_air_mass_flow_mechanical_ventilation(
+        tsd['m_ve_required'], tsd['m_ve_inf'], t, control_ventilation_systems.has_mechanical_ventilation(bpr),
+        control_ventilation_systems.is_mechanical_ventilation_active(bpr, tsd, t),
+        control_ventilation_systems.is_night_flushing_active(bpr, tsd, t),
+        control_ventilation_systems.is_economizer_active(bpr, tsd, t))
+
+    return
+
+
+@jit(nopython=True, cache=True)
+def _calc_air_mass_flow_mechanical_ventilation(m_ve_required, m_ve_inf, t, mechanical_ventilation_system,
+                                               mechanical_ventilation, night_flushing, economizer):
+    # numba compatible calculation, also used by cea.demand.rc_model_kernel
+
     # if has mechanical ventilation and not night flushing : m_ve_mech = m_ve_schedule
-    if control_ventilation_systems.is_mechanical_ventilation_active(bpr, tsd, t) \
-            and not control_ventilation_systems.is_night_flushing_active(bpr, tsd, t)\
-            and not control_ventilation_systems.is_economizer_active(bpr, tsd, t):
+    if mechanical_ventilation \
+            and not night_flushing\
+            and not economizer:
 
         # mechanical ventilation fulfills requirement - minimum ventilation provided by infiltration (similar to CO2 sensor)
-        m_ve_mech = max(tsd['m_ve_required'][t] - tsd['m_ve_inf'][t], 0.0)
+        m_ve_mech = max(m_ve_required[t] - m_ve_inf[t], 0.0)
 
-    elif control_ventilation_systems.has_mechanical_ventilation(bpr) \
-            and control_ventilation_systems.is_night_flushing_active(bpr, tsd, t):
+    elif mechanical_ventilation_system \
+            and night_flushing:
 
         # night flushing according to strategy
         # ventilation with maximum capacity = maximum required ventilation rate
-        m_ve_mech = tsd['m_ve_required'].max()  # TODO: some night flushing rule
+        m_ve_mech = m_ve_required.max()  # TODO: some night flushing rule
 
-    elif control_ventilation_systems.has_mechanical_ventilation(bpr) \
-            and control_ventilation_systems.is_economizer_active(bpr, tsd, t):
+    elif mechanical_ventilation_system \
+            and economizer:
 
         # economizer according to strategy
         # ventilation with maximum capacity = maximum required ventilation rate
-        m_ve_mech = tsd['m_ve_required'].max()
+        m_ve_mech = m_ve_required.max()
 
-    elif not control_ventilation_systems.is_mechanical_ventilation_active(bpr, tsd, t):
+    elif not mechanical_ventilation:
 
         # mechanical ventilation is turned off
         m_ve_mech = 0.0
@@ -75,9 +91,7 @@ def calc_air_mass_flow_mechanical_ventilation(bpr, tsd, t):
     else:
         raise ValueError
 
-    tsd['m_ve_mech'][t] = m_ve_mech
-
-    return
+    return m_ve_mech
 
 
 def calc_air_mass_flow_window_ventilation(bpr, tsd, t):
@@ -97,30 +111,39 @@ def calc_air_mass_flow_window_ventilation(bpr, tsd, t):
     :return: updates tsd
     """
 
+    tsd['m_ve_window'][t] = _calc_air_mass_flow_window_ventilation(
+        tsd['m_ve_required'], tsd['m_ve_inf'], t, control_ventilation_systems.is_window_ventilation_active(bpr, tsd, t),
+        control_ventilation_systems.is_night_flushing_active(bpr, tsd, t))
+
+    return
+
+
+@jit(nopython=True, cache=True)
+def _calc_air_mass_flow_window_ventilation(m_ve_required, m_ve_inf, t, window_ventilation, night_flushing):
+    # numba compatible calculation, also used by cea.demand.rc_model_kernel
+
     # if has window ventilation and not special control : m_ve_window = m_ve_schedule
-    if control_ventilation_systems.is_window_ventilation_active(bpr, tsd, t) \
-            and not control_ventilation_systems.is_night_flushing_active(bpr, tsd, t):
+    if window_ventilation \
+            and not night_flushing:
 
         # window ventilation fulfills requirement (control by occupants similar to CO2 sensor)
-        m_ve_window = max(tsd['m_ve_required'][t] - tsd['m_ve_inf'][t], 0)
+        m_ve_window = max(m_ve_required[t] - m_ve_inf[t], 0)
         # TODO: check window ventilation calculation, there are some methods in SIA2044
 
-    elif control_ventilation_systems.is_window_ventilation_active(bpr, tsd, t) \
-            and control_ventilation_systems.is_night_flushing_active(bpr, tsd, t):
+    elif window_ventilation \
+            and night_flushing:
 
         # ventilation with maximum capacity = maximum required ventilation rate
-        m_ve_window = tsd['m_ve_required'].max()  # TODO: implement some night flushing rule
+        m_ve_window = m_ve_required.max()  # TODO: implement some night flushing rule
 
-    elif not control_ventilation_systems.is_window_ventilation_active(bpr, tsd, t):
+    elif not window_ventilation:
 
         m_ve_window = 0
 
     else:
         raise ValueError
 
-    tsd['m_ve_window'][t] = m_ve_window
-
-    return
+    return m_ve_window
 
 
 def calc_m_ve_leakage_simple(bpr, tsd):
@@ -172,25 +195,29 @@ def calc_theta_ve_mech(bpr, tsd, t):
     :return: updates tsd
     """
 
-    if control_ventilation_systems.is_mechanical_ventilation_heat_recovery_active(bpr, tsd, t):
+    tsd['theta_ve_mech'][t] = _calc_theta_ve_mech(
+        control_ventilation_systems.is_mechanical_ventilation_heat_recovery_active(bpr, tsd, t), tsd['T_int'][t-1],
+        tsd['T_ext'][t])
 
-        theta_eta_rec = tsd['T_int'][t-1]
+    return
 
-        theta_ve_mech = tsd['T_ext'][t] + ETA_REC * (theta_eta_rec - tsd['T_ext'][t])  # TODO: some HEX formula
 
-    # if no heat recovery: theta_ve_mech = theta_ext
-    elif not control_ventilation_systems.is_mechanical_ventilation_heat_recovery_active(bpr, tsd, t):
+@jit(nopython=True, cache=True)
+def _calc_theta_ve_mech(heat_recovery, T_int_prev, T_ext):
+    # numba compatible calculation, also used by cea.demand.rc_model_kernel
 
-        theta_ve_mech = tsd['T_ext'][t]
+    if heat_recovery:
 
-    else:
+        theta_eta_rec = T_int_prev
 
-        theta_ve_mech = np.nan
-        print('Warning! Unknown HEX  status')
+        theta_ve_mech = T_ext + ETA_REC * (theta_eta_rec - T_ext)  # TODO: some HEX formula
 
-    tsd['theta_ve_mech'][t] = theta_ve_mech
+    # if no heat recovery: theta_ve_mech = theta_ext
+    else:
 
-    return
+        theta_ve_mech = T_ext
+
+    return theta_ve_mech
 
 
 def calc_m_ve_required(tsd):
@@ -878,8 +878,8 @@ class InputLocator(object):
         return os.path.join(self.get_solar_radiation_folder(), '%s_radiation.csv' % building)
 
     def get_radiation_building_sensors(self, building):
-        """scenario/outputs/data/solar-radiation/${building}_insolation_Whm2.json"""
-        return os.path.join(self.get_solar_radiation_folder(), '%s_insolation_Whm2.json' % building)
+        """scenario/outputs/data/solar-radiation/${building}_insolation_Whm2.npy"""
+        return os.path.join(self.get_solar_radiation_folder(), '%s_insolation_Whm2.npy' % building)
 
     def get_radiation_metadata(self, building):
         """scenario/outputs/data/solar-radiation/{building}_geometrgy.csv"""
@@ -955,6 +955,10 @@ class InputLocator(object):
         """scenario/outputs/data/demand/{building}.csv"""
         return os.path.join(self.get_demand_results_folder(), '%(building)s.%(format)s' % locals())
 
+    def get_demand_manifest(self):
+        """scenario/outputs/data/demand/demand_manifest.json"""
+        return os.path.join(self.get_demand_results_folder(), 'demand_manifest.json')
+
     # EMISSIONS
     def get_lca_emissions_results_folder(self):
         """scenario/outputs/data/emissions"""
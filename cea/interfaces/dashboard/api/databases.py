@@ -5,10 +5,10 @@ import os
 from collections import OrderedDict
 
 from flask_restplus import Namespace, Resource, abort
-import pandas as pd
 
 import cea.schemas
 from cea.databases import get_regions, get_database_tree, databases_folder_path
+from cea.utilities import database_cache
 from cea.utilities.schedule_reader import schedule_to_dataframe
 
 api = Namespace("Databases", description="Database data for technologies in CEA")
@@ -28,9 +28,7 @@ DATABASES_SCHEMA_KEYS = {
 # FIXME: Using OrderedDict here due to Python2 unordered dict insertion, change when using Python3
 def database_to_dict(db_path):
     out = OrderedDict()
-    xls = pd.ExcelFile(db_path)
-    for sheet in xls.sheet_names:
-        df = xls.parse(sheet, keep_default_na=False)
+    for sheet, df in database_cache.read_workbook(db_path, keep_default_na=False).items():
         out[sheet] = df.to_dict(orient='records', into=OrderedDict)
     return out
 
@@ -10,6 +10,7 @@ from flask_restplus import Namespace, Resource, abort
 
 import cea.inputlocator
 import cea.utilities.dbf
+from cea.utilities import database_cache
 import cea.scripts
 import cea.schemas
 from cea.datamanagement.databases_verification import InputFileValidator
@@ -405,7 +406,7 @@ class InputDatabaseValidate(Resource):
                 if schema_key != 'get_database_standard_schedules_use':
                     db_path = locator.__getattribute__(schema_key)()
                     try:
-                        df = pandas.read_excel(db_path, sheet_name=None)
+                        df = database_cache.read_excel(db_path, sheet_name=None)
                         errors = validator.validate(df, schema)
                         if errors:
                             out[db_name] = errors
@@ -441,7 +442,7 @@ def schedule_dict_to_file(schedule_dict, schedule_path):
 
 def get_choices(choice_properties, path):
     lookup = choice_properties['lookup']
-    df = pandas.read_excel(path, lookup['sheet'])
+    df = database_cache.read_excel(path, lookup['sheet'])
     choices = df[lookup['column']].tolist()
     out = []
     if 'none_value' in choice_properties:
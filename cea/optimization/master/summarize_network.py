@@ -15,6 +15,7 @@ import pandas as pd
 from cea.optimization.constants import K_DH, ZERO_DEGREES_CELSIUS_IN_KELVIN
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.constants import HOURS_IN_YEAR
+from cea.demand import demand_readers
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -51,7 +52,7 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
     # local variables
     t0 = time.perf_counter()
     num_buildings_network = len(buildings_in_this_network)
-    date = pd.read_csv(locator.get_demand_results_file(buildings_in_this_network[0])).DATE.values
+    date = demand_readers.read_demand_results(locator, buildings_in_this_network[0]).DATE.values
 
     # CALCULATE RELATIVE LENGTH OF THIS NETWORK
     data_network = pd.read_csv(locator.get_thermal_network_edge_list_file(network_type))
@@ -80,7 +81,7 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
     if network_type == "DH":
         iteration = 0
         for building_name in buildings_in_this_network:
-            demand_df.append(pd.read_csv(locator.get_demand_results_file(building_name)))
+            demand_df.append(demand_readers.read_demand_results(locator, building_name))
             substation_df.append(pd.read_csv(locator.get_optimization_substations_results_file(building_name, network_type, key)))
             mdot_heat_netw_all_kgpers += substation_df[iteration].mdot_DH_result_kgpers.values
 
@@ -143,7 +144,7 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
         iteration = 0
         for building_name in buildings_in_this_network:
             #get demand and substation file of buildings in this network
-            demand_df = pd.read_csv(locator.get_demand_results_file(building_name))
+            demand_df = demand_readers.read_demand_results(locator, building_name)
             substation_df = pd.read_csv(locator.get_optimization_substations_results_file(building_name, network_type, key))
 
             #add to demand of servers
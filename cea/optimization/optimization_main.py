@@ -14,6 +14,7 @@ import pandas as pd
 
 import cea.config
 import cea.inputlocator
+from cea.demand import demand_readers
 from cea.optimization.master import master_main
 from cea.optimization.preprocessing.preprocessing_main import get_building_names_with_load
 from cea.optimization.preprocessing.preprocessing_main import preproccessing
@@ -154,7 +155,7 @@ def check_input_files(config, locator):
 
 def demand_files_exist(locator):
     """verify that the necessary demand files exist"""
-    return all(os.path.exists(locator.get_demand_results_file(building_name)) for building_name in
+    return all(os.path.exists(demand_readers.get_demand_results_file(locator, building_name)) for building_name in
                locator.get_zone_building_names())
 
 
@@ -13,6 +13,7 @@ import pandas as pd
 from cea.technologies import boiler
 from cea.technologies.constants import BOILER_ETA_HP
 from cea.constants import HOURS_IN_YEAR, WH_TO_J
+from cea.demand import demand_readers
 
 
 def calc_pareto_Qhp(locator, total_demand, prices, lca):
@@ -37,7 +38,8 @@ def calc_pareto_Qhp(locator, total_demand, prices, lca):
 
         for name in df.Name :
             # Extract process heat needs
-            Qhpro_sys_kWh = pd.read_csv(locator.get_demand_results_file(name), usecols=["Qhpro_sys_kWh"]).Qhpro_sys_kWh.values
+            Qhpro_sys_kWh = demand_readers.read_demand_results(locator, name,
+                                                               columns=["Qhpro_sys_kWh"]).Qhpro_sys_kWh.values
 
             Qnom_Wh = 0
             Qannual_Wh = 0
@@ -16,6 +16,7 @@ import pandas as pd
 
 import cea.technologies.solar.photovoltaic as pv
 from cea.constants import HOURS_IN_YEAR
+from cea.demand import demand_readers
 from cea.optimization.master.emissions_model import calc_emissions_Whyr_to_tonCO2yr
 
 __author__ = "Sreepathi Bhargava Krishna"
@@ -362,7 +363,7 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
 
     # for all buildings with electricity demand
     for name in building_names:  # adding the electricity demand of
-        building_demand = pd.read_csv(locator.get_demand_results_file(name))
+        building_demand = demand_readers.read_demand_results(locator, name)
         # end-use electrical demands
         Eal_req_W += (building_demand['Eal_kWh'] * 1000).values
         Edata_req_W += (building_demand['Edata_kWh'] * 1000).values
@@ -372,7 +373,7 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
     # when the two networks are present
     if master_to_slave_vars.DHN_exists and master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = demand_readers.read_demand_results(locator, name)
             if name in buildings_district_scale_to_district_heating and name in buildings_district_scale_to_district_cooling:
                 # if connected to the heating network
                 E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)
@@ -402,7 +403,7 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
     # if only a district heating network exists.
     elif master_to_slave_vars.DHN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = demand_readers.read_demand_results(locator, name)
             if name in buildings_district_scale_to_district_heating:
                 # if connected to the heating network
                 E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)  # because it is connected to the heating network
@@ -427,7 +428,7 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
     # if only a district cooling network exists.
     elif master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = demand_readers.read_demand_results(locator, name)
             E_hs_ww_req_W += ((building_demand['E_hs_kWh'] +
                                building_demand['E_ww_kWh']) * 1000).values  # to W
             if name in buildings_district_scale_to_district_cooling:
@@ -470,7 +471,7 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
     # when the two networks are present
     if master_to_slave_vars.DHN_exists and master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = demand_readers.read_demand_results(locator, name)
             if name in buildings_district_scale_to_district_heating and name in buildings_district_scale_to_district_cooling:
                 # if connected to the heating network
                 NG_hs_ww_req_W += 0.0
@@ -506,7 +507,7 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
     # if only a district cooling network exists.
     elif master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = demand_readers.read_demand_results(locator, name)
             # if not then get electric boilers etc form baseline.
             NG_hs_ww_req_W += (building_demand['NG_hs_kWh'] + building_demand['NG_ww_kWh']) * 1000  # to W
 
@@ -11,6 +11,7 @@ import cea.config
 import cea.inputlocator
 import cea.plots
 import cea.plots.cache
+from cea.demand import demand_readers
 
 """
 Implements py:class:`cea.plots.DemandPlotBase` as a base class for all plots in the category "demand" and also
@@ -110,7 +111,8 @@ class DemandPlotBase(cea.plots.PlotBase):
         self.input_files = [(self.locator.get_total_demand, [])]  # all these scripts depend on demand
         # Add building to input files if buildings are selected
         if self.buildings:
-            self.input_files += [(self.locator.get_demand_results_file, [building]) for building in self.buildings]
+            self.input_files += [(demand_readers.get_demand_results_file, [self.locator, building])
+                                 for building in self.buildings]
 
     @property
     def hourly_loads(self):
@@ -127,7 +129,7 @@ class DemandPlotBase(cea.plots.PlotBase):
         return df1
 
     def _calculate_hourly_loads(self):
-        data_demand = functools.reduce(self.add_fields, (pd.read_csv(self.locator.get_demand_results_file(building))
+        data_demand = functools.reduce(self.add_fields, (demand_readers.read_demand_results(self.locator, building)
                                                          for building in self.buildings)).set_index('DATE')
         return data_demand
 
@@ -137,8 +139,7 @@ class DemandPlotBase(cea.plots.PlotBase):
         return data_demand
 
     def calculate_external_temperature(self):
-        data_path = self.locator.get_demand_results_file(self.buildings[0])
-        data = pd.read_csv(data_path)
+        data = demand_readers.read_demand_results(self.locator, self.buildings[0])
         data = self.resample_time_data(data)
         return data
 
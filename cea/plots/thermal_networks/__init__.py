@@ -11,6 +11,7 @@ import pandas as pd
 
 import cea.plots.cache
 from cea.constants import HOURS_IN_YEAR
+from cea.demand import demand_readers
 from cea.plots.variable_naming import get_color_array
 from cea.utilities.standardize_coordinates import get_geographic_coordinate_system
 
@@ -88,7 +89,7 @@ class ThermalNetworksPlotBase(cea.plots.PlotBase):
     def date(self):
         """Read in the date information from demand results of the first building in the zone"""
         buildings = self.locator.get_zone_building_names()
-        df_date = pd.read_csv(self.locator.get_demand_results_file(buildings[0]))
+        df_date = demand_readers.read_demand_results(self.locator, buildings[0])
         return df_date["DATE"]
 
     @property
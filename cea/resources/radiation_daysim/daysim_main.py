@@ -1,8 +1,8 @@
-import json
 import os
 
 import numpy as np
 import pandas as pd
+import scipy.sparse
 import py4design.py2radiance as py2radiance
 import py4design.py3dmodel.calculate as calculate
 from py4design import py3dmodel
@@ -16,12 +16,36 @@ __maintainer__ = "Daren Thomas"
 __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
-from cea.constants import HOURS_IN_YEAR
-from cea.resources.radiation_daysim.geometry_generator import BuildingGeometry
+from cea.resources.radiation_daysim.geometry_generator import BuildingGeometry, calc_cache_key, read_cache_key, \
+    remove_cache_key, write_cache_key
 from cea import suppress_3rd_party_debug_loggers
 
 suppress_3rd_party_debug_loggers()
 
+# the columns of the sensor metadata (``locator.get_radiation_metadata``) needed to run Daysim
+SENSOR_COLUMNS = ['SURFACE', 'orientation', 'intersection', 'Xcoor', 'Ycoor', 'Zcoor', 'Xdir', 'Ydir', 'Zdir',
+                  'AREA_m2', 'TYPE']
+
+# the fields of the aggregated results of a building (``locator.get_radiation_building``)
+SOLAR_ANALYSIS_FIELDS = ['windows_east_kW',
+                         'windows_west_kW',
+                         'windows_south_kW',
+                         'windows_north_kW',
+                         'walls_east_kW',
+                         'walls_west_kW',
+                         'walls_south_kW',
+                         'walls_north_kW',
+                         'roofs_top_kW']
+SOLAR_ANALYSIS_FIELDS_AREA = ['windows_east_m2',
+                              'windows_west_m2',
+                              'windows_south_m2',
+                              'windows_north_m2',
+                              'walls_east_m2',
+                              'walls_west_m2',
+                              'walls_south_m2',
+                              'walls_north_m2',
+                              'roofs_top_m2']
+
 
 def create_sensor_input_file(rad, chunk_n):
     sensor_file_path = os.path.join(rad.data_folder_path, "points_" + str(chunk_n) + ".pts")
@@ -102,74 +126,114 @@ def calc_sensors_building(building_geometry, grid_size):
     return sensor_dir_list, sensor_cord_list, sensor_type_list, sensor_area_list, sensor_orientation_list, sensor_intersection_list
 
 
-def calc_sensors_zone(building_names, locator, grid_size, geometry_pickle_dir):
-    sensors_coords_zone = []
-    sensors_dir_zone = []
-    sensors_total_number_list = []
-    names_zone = []
-    sensors_code_zone = []
-    sensor_intersection_zone = []
-    for building_name in building_names:
-        building_geometry = BuildingGeometry.load(os.path.join(geometry_pickle_dir, 'zone', building_name))
-        # get sensors in the building
-        sensors_dir_building, \
-        sensors_coords_building, \
-        sensors_type_building, \
-        sensors_area_building, \
-        sensor_orientation_building, \
-        sensor_intersection_building = calc_sensors_building(building_geometry, grid_size)
-
-        # get the total number of sensors and store in lst
-        sensors_number = len(sensors_coords_building)
-        sensors_total_number_list.append(sensors_number)
-
-        sensors_code = ['srf' + str(x) for x in range(sensors_number)]
-        sensors_code_zone.append(sensors_code)
-
-        # get the total list of coordinates and directions to send to daysim
-        sensors_coords_zone.extend(sensors_coords_building)
-        sensors_dir_zone.extend(sensors_dir_building)
-
-        # get total list of intersections
-        sensor_intersection_zone.append(sensor_intersection_building)
-
-        # get the name of all buildings
-        names_zone.append(building_name)
-
-        # save sensors geometry result to disk
-        pd.DataFrame({'BUILDING': building_name,
-                      'SURFACE': sensors_code,
-                      'orientation': sensor_orientation_building,
-                      'intersection': sensor_intersection_building,
-                      'Xcoor': [x[0] for x in sensors_coords_building],
-                      'Ycoor': [x[1] for x in sensors_coords_building],
-                      'Zcoor': [x[2] for x in sensors_coords_building],
-                      'Xdir': [x[0] for x in sensors_dir_building],
-                      'Ydir': [x[1] for x in sensors_dir_building],
-                      'Zdir': [x[2] for x in sensors_dir_building],
-                      'AREA_m2': sensors_area_building,
-                      'TYPE': sensors_type_building}).to_csv(locator.get_radiation_metadata(building_name), index=None)
-
-    return sensors_coords_zone, sensors_dir_zone, sensors_total_number_list, names_zone, sensors_code_zone, sensor_intersection_zone
-
-
-def isolation_daysim(chunk_n, cea_daysim, building_names, locator, radiance_parameters, write_sensor_data, grid_size,
-                     max_global, weatherfile, geometry_pickle_dir):
+def write_sensors_building(building_name, locator, grid_size, geometry_pickle_dir):
+    """
+    Calculate the sensor points of a building and save them to disk (``locator.get_radiation_metadata``). The sensors
+    of the previous run are reused if the geometry of the building and the grid size did not change.
+
+    :return: the number of sensors of the building
+    :rtype: int
+    """
+    geometry_path = os.path.join(geometry_pickle_dir, 'zone', building_name)
+    metadata_path = locator.get_radiation_metadata(building_name)
+    # the key is saved next to the metadata, in the scenario: the geometry pickles are shared by all the scenarios
+    # with the same name
+    geometry_key = read_cache_key(geometry_path)
+    sensors_key = calc_cache_key(geometry_key, grid_size["walls_grid"], grid_size["roof_grid"])
+    if geometry_key is not None and read_cache_key(metadata_path) == sensors_key:
+        return len(pd.read_csv(metadata_path, usecols=['SURFACE']))
+    # the key file is written last, the sensors are calculated again if this run is interrupted
+    remove_cache_key(metadata_path)
+
+    building_geometry = BuildingGeometry.load(geometry_path)
+    # get sensors in the building
+    sensors_dir_building, \
+    sensors_coords_building, \
+    sensors_type_building, \
+    sensors_area_building, \
+    sensor_orientation_building, \
+    sensor_intersection_building = calc_sensors_building(building_geometry, grid_size)
+
+    # get the total number of sensors
+    sensors_number = len(sensors_coords_building)
+    sensors_code = ['srf' + str(x) for x in range(sensors_number)]
+
+    # save sensors geometry result to disk
+    pd.DataFrame({'BUILDING': building_name,
+                  'SURFACE': sensors_code,
+                  'orientation': sensor_orientation_building,
+                  'intersection': sensor_intersection_building,
+                  'Xcoor': [x[0] for x in sensors_coords_building],
+                  'Ycoor': [x[1] for x in sensors_coords_building],
+                  'Zcoor': [x[2] for x in sensors_coords_building],
+                  'Xdir': [x[0] for x in sensors_dir_building],
+                  'Ydir': [x[1] for x in sensors_dir_building],
+                  'Zdir': [x[2] for x in sensors_dir_building],
+                  'AREA_m2': sensors_area_building,
+                  'TYPE': sensors_type_building}).to_csv(metadata_path, index=None)
+    write_cache_key(metadata_path, sensors_key)
+
+    return sensors_number
+
+
+def read_sensors_zone(building_names, locator):
+    """
+    Read the sensor points of the buildings written by ``write_sensors_building``
+
+    :return: the sensors of each building (``locator.get_radiation_metadata``)
+    :rtype: list[pd.DataFrame]
+    """
+    return [pd.read_csv(locator.get_radiation_metadata(building_name), usecols=SENSOR_COLUMNS)
+            for building_name in building_names]
+
+
+def calc_aggregation_weights(sensors_zone):
+    """
+    The weights of the sensors in the aggregated results of the buildings (``write_aggregated_results``): row
+    ``i * len(SOLAR_ANALYSIS_FIELDS) + j`` of the matrix sums the radiation of the sensors of building ``i`` on the
+    surfaces of field ``j``, weighted by their area.
+
+    :param list[pd.DataFrame] sensors_zone: the sensors of each building (see ``read_sensors_zone``)
+    :return: sparse matrix with shape (buildings * fields, sensors) and the area of each field of each building [m2]
+        with shape (buildings, fields)
+    :rtype: tuple(scipy.sparse.csr_matrix, np.ndarray)
+    """
+    sensors = pd.concat(sensors_zone, ignore_index=True)
+    num_fields = len(SOLAR_ANALYSIS_FIELDS)
+    building_index = np.repeat(np.arange(len(sensors_zone)),
+                               [len(building_sensors) for building_sensors in sensors_zone])
+    field_codes = [field[:-len('_kW')] for field in SOLAR_ANALYSIS_FIELDS]
+    field_index = pd.Categorical(sensors['TYPE'] + '_' + sensors['orientation'], categories=field_codes).codes
+    in_field = field_index >= 0  # sensors of other fields are not aggregated
+    rows = building_index[in_field] * num_fields + field_index[in_field]
+    areas = sensors['AREA_m2'].values[in_field]
+
+    weights = scipy.sparse.csr_matrix((areas, (rows, np.flatnonzero(in_field))),
+                                      shape=(len(sensors_zone) * num_fields, len(sensors)))
+    field_areas = np.bincount(rows, weights=areas, minlength=len(sensors_zone) * num_fields)
+    return weights, field_areas.reshape(len(sensors_zone), num_fields)
+
+
+def isolation_daysim(chunk_n, cea_daysim, building_names, locator, radiance_parameters, write_sensor_data, max_global,
+                     weatherfile):
+    """
+    Run the Daysim simulation of a chunk of buildings and write the results of each building. The sensors of the
+    buildings are calculated beforehand by ``write_sensors_building``.
+    """
     # initialize daysim project
     daysim_project = cea_daysim.initialize_daysim_project('chunk_{n}'.format(n=chunk_n))
     print('Creating daysim project in: {daysim_dir}'.format(daysim_dir=daysim_project.project_path))
 
-    # calculate sensors
-    print("Calculating and sending sensor points")
-    sensors_coords_zone, \
-    sensors_dir_zone, \
-    sensors_number_zone, \
-    names_zone, \
-    sensors_code_zone, \
-    sensor_intersection_zone = calc_sensors_zone(building_names, locator, grid_size, geometry_pickle_dir)
+    # read sensors
+    print("Sending sensor points")
+    sensors_zone = read_sensors_zone(building_names, locator)
+    sensors = pd.concat(sensors_zone, ignore_index=True)
+    names_zone = list(building_names)
 
-    num_sensors = sum(sensors_number_zone)
-    daysim_project.create_sensor_input_file(sensors_coords_zone, sensors_dir_zone, num_sensors, "w/m2")
+    num_sensors = len(sensors)
+    daysim_project.create_sensor_input_file([tuple(xyz) for xyz in sensors[['Xcoor', 'Ycoor', 'Zcoor']].values],
+                                            [tuple(xyz) for xyz in sensors[['Xdir', 'Ydir', 'Zdir']].values],
+                                            num_sensors, "w/m2")
 
     print("Starting Daysim simulation for buildings: {buildings}".format(buildings=names_zone))
     print("Total number of sensors:  {num_sensors}".format(num_sensors=num_sensors))
@@ -188,79 +252,55 @@ def isolation_daysim(chunk_n, cea_daysim, building_names, locator, radiance_para
     daysim_project.execute_ds_illum()
 
     print('Reading results...')
-    solar_res = daysim_project.eval_ill()
-
     # check inconsistencies and replace by max value of weather file
-    print('Fixing inconsistencies, if any')
-    solar_res = np.clip(solar_res, a_min=0.0, a_max=max_global)
+    solar_res = daysim_project.eval_ill(a_max=max_global)
 
-    # Check if leap year and remove extra day
-    if solar_res.shape[1] == HOURS_IN_YEAR + 24:
-        print('Removing leap day')
-        leap_day_hours = range(1416, 1440)
-        solar_res = np.delete(solar_res, leap_day_hours, axis=1)
+    # the sensors on the intersections with other buildings do not receive any radiation
+    solar_res[sensors['intersection'].values == 1] = 0
+
+    print("Aggregating results")
+    weights, field_areas = calc_aggregation_weights(sensors_zone)
+    aggregated_res = weights.dot(solar_res) / 1000  # in kWh
 
     print("Writing results to disk")
     index = 0
-    for building_name, \
-        sensors_number_building, \
-        sensor_code_building, \
-        sensor_intersection_building in zip(names_zone,
-                                            sensors_number_zone,
-                                            sensors_code_zone,
-                                            sensor_intersection_zone):
-        # select sensors data
-        selection_of_results = solar_res[index:index + sensors_number_building]
-        selection_of_results[np.array(sensor_intersection_building) == 1] = 0
-        items_sensor_name_and_result = dict(zip(sensor_code_building, selection_of_results.tolist()))
-        index = index + sensors_number_building
-
+    num_fields = len(SOLAR_ANALYSIS_FIELDS)
+    for i, (building_name, sensors_building) in enumerate(zip(names_zone, sensors_zone)):
         # create summary and save to disk
-        write_aggregated_results(building_name, items_sensor_name_and_result, locator, weatherfile)
+        write_aggregated_results(building_name, aggregated_res[i * num_fields:(i + 1) * num_fields], field_areas[i],
+                                 locator, weatherfile)
 
         if write_sensor_data:
-            write_sensor_results(building_name, items_sensor_name_and_result, locator)
+            # select sensors data (a view of the results of the chunk)
+            selection_of_results = solar_res[index:index + len(sensors_building)]
+            write_sensor_results(building_name, selection_of_results, locator)
+        index = index + len(sensors_building)
 
     # erase daysim folder to avoid conflicts after every iteration
     print('Removing results folder')
     daysim_project.cleanup_project()
 
 
-def write_sensor_results(building_name, items_sensor_name_and_result, locator):
-    with open(locator.get_radiation_building_sensors(building_name), 'w') as outfile:
-        json.dump(items_sensor_name_and_result, outfile)
-
-
-def write_aggregated_results(building_name, items_sensor_name_and_result, locator, weatherfile):
-    geometry = pd.read_csv(locator.get_radiation_metadata(building_name))
-    geometry['code'] = geometry['TYPE'] + '_' + geometry['orientation'] + '_kW'
-    solar_analysis_fields = ['windows_east_kW',
-                             'windows_west_kW',
-                             'windows_south_kW',
-                             'windows_north_kW',
-                             'walls_east_kW',
-                             'walls_west_kW',
-                             'walls_south_kW',
-                             'walls_north_kW',
-                             'roofs_top_kW']
-    solar_analysis_fields_area = ['windows_east_m2',
-                                  'windows_west_m2',
-                                  'windows_south_m2',
-                                  'windows_north_m2',
-                                  'walls_east_m2',
-                                  'walls_west_m2',
-                                  'walls_south_m2',
-                                  'walls_north_m2',
-                                  'roofs_top_m2']
-    dict_not_aggregated = {}
+def write_sensor_results(building_name, sensor_results, locator):
+    """
+    Save the hourly radiation of each sensor of the building as a float32 array with one row per sensor (in the order
+    of the sensor metadata), see :py:func:`cea.utilities.solar_equations.read_sensor_results`
+
+    :param np.ndarray sensor_results: the hourly results of each sensor, with shape (sensors, HOURS_IN_YEAR)
+    """
+    np.save(locator.get_radiation_building_sensors(building_name), sensor_results.astype(np.float32))
 
-    for field, field_area in zip(solar_analysis_fields, solar_analysis_fields_area):
-        select_sensors = geometry.loc[geometry['code'] == field].set_index('SURFACE')
-        area_m2 = select_sensors['AREA_m2'].sum()
-        array_field = np.array([select_sensors.loc[surface, 'AREA_m2'] *
-                                np.array(items_sensor_name_and_result[surface])
-                                for surface in select_sensors.index]).sum(axis=0)
-        dict_not_aggregated[field] = array_field / 1000  # in kWh
+
+def write_aggregated_results(building_name, aggregated_results, field_areas, locator, weatherfile):
+    """
+    :param np.ndarray aggregated_results: the hourly radiation on the surfaces of each of the ``SOLAR_ANALYSIS_FIELDS``
+        of the building [kWh], with shape (fields, HOURS_IN_YEAR)
+    :param np.ndarray field_areas: the area of the surfaces of each field [m2]
+    """
+    dict_not_aggregated = {}
+    for field, field_area, array_field, area_m2 in zip(SOLAR_ANALYSIS_FIELDS, SOLAR_ANALYSIS_FIELDS_AREA,
+                                                       aggregated_results, field_areas):
+        dict_not_aggregated[field] = array_field
         dict_not_aggregated[field_area] = area_m2
 
     data_aggregated_kW = (pd.DataFrame(dict_not_aggregated)).round(2)
@@ -6,6 +6,7 @@ and .tiff (terrain)
 into 3D geometry with windows and roof equivalent to LOD3
 
 """
+import hashlib
 import os
 import pickle
 from itertools import repeat
@@ -21,6 +22,7 @@ import math
 import time
 
 import numpy as np
+import scipy.spatial
 import py4design.py3dmodel.calculate as calculate
 import py4design.py3dmodel.construct as construct
 import py4design.py3dmodel.fetch as fetch
@@ -44,6 +46,15 @@ __maintainer__ = "Daren Thomas"
 __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
+# increase this to regenerate the cached geometry of all buildings after a change to the geometry generation
+GEOMETRY_CACHE_VERSION = 1
+
+# the intersections with the walls of a building are checked for the buildings within this distance [m]
+NEIGHBOURS_DISTANCE_M = 100
+
+# tolerance of the bounding boxes used to select the solids a point could be in [m]
+BOUNDING_BOX_TOLERANCE_M = 1e-3
+
 
 def identify_surfaces_type(occface_list):
     roof_list = []
@@ -116,7 +127,13 @@ def create_hollowed_facade(surface_facade, window):
     return hollowed_facade_clean, hole_facade
 
 
-def calc_building_solids(buildings_df, geometry_simplification, elevation_map, num_processes):
+def calc_building_solids(buildings_df, geometry_simplification, elevation_map, num_processes, solids_dir):
+    """
+    Calculate the solid of each building, intersected with the terrain. The solids are saved in ``solids_dir`` and only
+    calculated again if the footprint, the height, the number of floors or the terrain under the building changed.
+
+    :return: the solids of the buildings and their cache keys
+    """
     height_col_name = 'height_ag'
     nfloor_col_name = "floors_ag"
 
@@ -129,15 +146,32 @@ def calc_building_solids(buildings_df, geometry_simplification, elevation_map, n
     range_floors = nfloors.map(lambda floors: range(floors + 1))
     floor_to_floor_height = height / nfloors
 
-    n = len(geometries)
+    # only the terrain under each building is sent to the worker processes
+    elevation_maps = [elevation_map.get_elevation_map_from_geometry(geometry) for geometry in geometries]
+
+    solid_paths = [os.path.join(solids_dir, str(name)) for name in buildings_df.index]
+    solid_keys = [calc_cache_key(geometry.wkb, int(floors), float(height_floor), elevation_map_for_geometry.calc_hash())
+                  for geometry, floors, height_floor, elevation_map_for_geometry
+                  in zip(geometries, nfloors, floor_to_floor_height, elevation_maps)]
+    missing = [i for i, (path, key) in enumerate(zip(solid_paths, solid_keys)) if read_cache_key(path) != key]
+    print("Reusing the terrain intersection of {n} buildings".format(n=len(solid_paths) - len(missing)))
+
     out = cea.utilities.parallel.vectorize(process_geometries, num_processes,
                                            on_complete=print_terrain_intersection_progress)(
-        geometries, repeat(elevation_map, n), range_floors, floor_to_floor_height)
-    return out
+        geometries.iloc[missing], [elevation_maps[i] for i in missing], range_floors.iloc[missing],
+        floor_to_floor_height.iloc[missing])
+    for i, building_solid in zip(missing, out):
+        save_cache(solid_paths[i], solid_keys[i], building_solid)
+
+    solids = [load_cache(path) for path in solid_paths]
+    return solids, solid_keys
 
 
-def process_geometries(geometry, elevation_map, range_floors, floor_to_floor_height):
-    elevation_map_for_geometry = elevation_map.get_elevation_map_from_geometry(geometry)
+def process_geometries(geometry, elevation_map_for_geometry, range_floors, floor_to_floor_height):
+    """
+    :param elevation_map_for_geometry: the terrain under the building
+        (see ``ElevationMap.get_elevation_map_from_geometry``)
+    """
     # burn buildings footprint into the terrain and return the location of the new face
     face_footprint = burn_buildings(geometry, elevation_map_for_geometry)
     # create floors and form a solid
@@ -164,8 +198,56 @@ def calc_building_geometry_surroundings(name, building_solid, geometry_pickle_di
     return name
 
 
+def calc_cache_key(*values):
+    """
+    A hash of the inputs of the geometry of a building, the geometry is calculated again if it changes
+
+    :param values: the inputs (str, bytes and numbers)
+    """
+    return hashlib.sha1(repr((GEOMETRY_CACHE_VERSION,) + values).encode('utf-8')).hexdigest()
+
+
+def read_cache_key(path):
+    """the cache key of the geometry saved at ``path`` or None if the geometry was not saved (completely)"""
+    key_path = path + '.key'
+    if not os.path.exists(path) or not os.path.exists(key_path):
+        return None
+    with open(key_path, 'r') as f:
+        return f.read()
+
+
+def write_cache_key(path, key):
+    """write the key after the geometry at ``path`` was saved, so an interrupted run does not leave a valid key"""
+    with open(path + '.key', 'w') as f:
+        f.write(key)
+
+
+def remove_cache_key(path):
+    """remove the key before the geometry at ``path`` is saved again"""
+    if os.path.exists(path + '.key'):
+        os.remove(path + '.key')
+
+
+def save_cache(path, key, value):
+    remove_cache_key(path)
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    write_cache_key(path, key)
+
+
+def load_cache(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
 def building_2d_to_3d(locator, zone_df, surroundings_df, elevation_map, config, geometry_pickle_dir):
     """
+    The geometry of the buildings is saved in ``geometry_pickle_dir`` and kept between runs. The geometry of a
+    building is only generated again if its footprint, height, window-to-wall ratios or the terrain under it changed
+    or, if ``consider_intersections`` is set, if one of the buildings close to it changed.
+
     :param locator: InputLocator - provides paths to files in a scenario
     :type locator: cea.inputlocator.InputLocator
     :param config: the configuration object to use
@@ -182,41 +264,85 @@ def building_2d_to_3d(locator, zone_df, surroundings_df, elevation_map, config,
     print('Calculating terrain intersection of building geometries')
     zone_buildings_df = zone_df.set_index('Name')
     zone_building_names = zone_buildings_df.index.values
-    zone_building_solid_list = calc_building_solids(zone_buildings_df, zone_simplification, elevation_map,
-                                                    num_processes)
+    zone_building_solid_list, zone_solid_keys = calc_building_solids(
+        zone_buildings_df, zone_simplification, elevation_map, num_processes,
+        os.path.join(geometry_pickle_dir, 'solids', 'zone'))
 
     surroundings_buildings_df = surroundings_df.set_index('Name')
     surroundings_building_names = surroundings_buildings_df.index.values
-    surroundings_building_solid_list = calc_building_solids(surroundings_buildings_df, surroundings_simplification,
-                                                            elevation_map, num_processes)
+    surroundings_building_solid_list, surroundings_solid_keys = calc_building_solids(
+        surroundings_buildings_df, surroundings_simplification, elevation_map, num_processes,
+        os.path.join(geometry_pickle_dir, 'solids', 'surroundings'))
 
     architecture_wwr_df = gdf.from_file(locator.get_building_architecture()).set_index('Name')
 
     # calculate geometry for the surroundings
     print('Generating geometry for surrounding buildings')
-    geometry_3D_surroundings = [calc_building_geometry_surroundings(x, y, geometry_pickle_dir) for x, y in
-                                zip(surroundings_building_names, surroundings_building_solid_list)]
+    geometry_3D_surroundings = []
+    for name, building_solid, key in zip(surroundings_building_names, surroundings_building_solid_list,
+                                         surroundings_solid_keys):
+        path = os.path.join(geometry_pickle_dir, 'surroundings', str(name))
+        if read_cache_key(path) != key:
+            remove_cache_key(path)
+            calc_building_geometry_surroundings(name, building_solid, geometry_pickle_dir)
+            write_cache_key(path, key)
+        geometry_3D_surroundings.append(name)
 
     # calculate geometry for the zone of analysis
     print('Generating geometry for buildings in the zone of analysis')
-    n = len(zone_building_names)
-    calc_zone_geometry_multiprocessing = cea.utilities.parallel.vectorize(calc_building_geometry_zone,
-                                                                          num_processes,
-                                                                          on_complete=print_progress)
-
     if consider_intersections:
         all_building_solid_list = np.append(zone_building_solid_list, surroundings_building_solid_list)
+        all_solid_keys = zone_solid_keys + surroundings_solid_keys
+        potentially_intersecting = calc_potentially_intersecting_solids(zone_building_solid_list,
+                                                                        all_building_solid_list)
     else:
         all_building_solid_list = []
-    geometry_3D_zone = calc_zone_geometry_multiprocessing(zone_building_names,
-                                                          zone_building_solid_list,
-                                                          repeat(all_building_solid_list, n),
-                                                          repeat(architecture_wwr_df, n),
-                                                          repeat(geometry_pickle_dir, n),
-                                                          repeat(consider_intersections, n))
+        all_solid_keys = []
+        potentially_intersecting = [[] for _ in zone_building_names]
+
+    zone_paths = [os.path.join(geometry_pickle_dir, 'zone', str(name)) for name in zone_building_names]
+    wwr_df = architecture_wwr_df[["wwr_west", "wwr_east", "wwr_north", "wwr_south"]].astype(float)
+    zone_keys = [calc_cache_key(solid_key, bool(consider_intersections), tuple(wwr_df.loc[name].tolist()),
+                                tuple(sorted(all_solid_keys[j] for j in neighbours)))
+                 for name, solid_key, neighbours in zip(zone_building_names, zone_solid_keys, potentially_intersecting)]
+    missing = [i for i, (path, key) in enumerate(zip(zone_paths, zone_keys)) if read_cache_key(path) != key]
+    print("Reusing the geometry of {n} buildings".format(n=len(zone_paths) - len(missing)))
+    for i in missing:
+        remove_cache_key(zone_paths[i])
+
+    n = len(missing)
+    calc_zone_geometry_multiprocessing = cea.utilities.parallel.vectorize(calc_building_geometry_zone,
+                                                                          num_processes,
+                                                                          on_complete=print_progress)
+    calc_zone_geometry_multiprocessing([zone_building_names[i] for i in missing],
+                                       [zone_building_solid_list[i] for i in missing],
+                                       [[all_building_solid_list[j] for j in potentially_intersecting[i]]
+                                        for i in missing],
+                                       repeat(architecture_wwr_df, n),
+                                       repeat(geometry_pickle_dir, n))
+    for i in missing:
+        write_cache_key(zone_paths[i], zone_keys[i])
+
+    geometry_3D_zone = list(zone_building_names)
     return geometry_3D_zone, geometry_3D_surroundings
 
 
+def calc_potentially_intersecting_solids(zone_building_solid_list, all_building_solid_list):
+    """
+    Find the solids close to each building of the zone: it merits to check if they intersect the walls of the building
+    (see ``calc_windows_walls``). Two buildings are close if the distance between the corners (minimum x and y) of
+    their bounding boxes is at most ``NEIGHBOURS_DISTANCE_M``, the corners are stored in a k-d tree so the neighbours
+    of all buildings are found in O(n log n).
+
+    :return: for each building of the zone, the positions of the solids close to it in ``all_building_solid_list``
+    :rtype: list[list[int]]
+    """
+    all_xy = np.array([calculate.get_bounding_box(solid)[:2] for solid in all_building_solid_list])
+    zone_xy = np.array([calculate.get_bounding_box(solid)[:2] for solid in zone_building_solid_list])
+    index = scipy.spatial.cKDTree(all_xy)
+    return [sorted(neighbours) for neighbours in index.query_ball_point(zone_xy, NEIGHBOURS_DISTANCE_M)]
+
+
 def print_progress(i, n, _, __):
     print("Generating geometry for building {i} completed out of {n}".format(i=i + 1, n=n))
 
@@ -225,17 +351,6 @@ def print_terrain_intersection_progress(i, n, _, __):
     print("Calculation of terrain intersection for building {i} completed out of {n}".format(i=i + 1, n=n))
 
 
-def are_buildings_close_to_eachother(x_1, y_1, solid2):
-    box2 = calculate.get_bounding_box(solid2)
-    x_2 = box2[0]
-    y_2 = box2[1]
-    delta = math.sqrt((y_2 - y_1) ** 2 + (x_2 - x_1) ** 2)
-    if delta <= 100:
-        return True
-    else:
-        return False
-
-
 class BuildingGeometry(object):
     __slots__ = ["name", "windows", "walls", "roofs", "footprint", "orientation_walls", "orientation_windows",
                  "normals_windows", "normals_walls", "intersect_walls"]
@@ -270,8 +385,12 @@ class BuildingGeometry(object):
         return pickle_location
 
 
-def calc_building_geometry_zone(name, building_solid, all_building_solid_list, architecture_wwr_df,
-                                geometry_pickle_dir, consider_intersections):
+def calc_building_geometry_zone(name, building_solid, potentially_intersecting_solids, architecture_wwr_df,
+                                geometry_pickle_dir):
+    """
+    :param potentially_intersecting_solids: the solids close to the building (see
+        ``calc_potentially_intersecting_solids``) or an empty list to ignore the intersections with other buildings
+    """
     # now get all surfaces and create windows only if the buildings are in the area of study
     window_list = []
     wall_list = []
@@ -281,15 +400,6 @@ def calc_building_geometry_zone(name, building_solid, all_building_solid_list, a
     normals_win = []
     intersect_wall = []
 
-    # check if buildings are close together and it merits to check the intersection
-    potentially_intersecting_solids = []
-    if consider_intersections:
-        box = calculate.get_bounding_box(building_solid)
-        x, y = box[0], box[1]
-        for solid in all_building_solid_list:
-            if are_buildings_close_to_eachother(x, y, solid):
-                potentially_intersecting_solids.append(solid)
-
     # identify building surfaces according to angle:
     face_list = fetch.faces_frm_solid(building_solid)
     facade_list_north, facade_list_west, \
@@ -446,6 +556,11 @@ def calc_windows_walls(facade_list, wwr, potentially_intersecting_solids):
     normals_wall = []
     wall_intersects = []
     number_intersecting_solids = len(potentially_intersecting_solids)
+    if number_intersecting_solids:
+        # a point can only be in the solids whose bounding box contains it
+        boxes = np.array([calculate.get_bounding_box(solid) for solid in potentially_intersecting_solids])
+        boxes_min = boxes[:, :3] - BOUNDING_BOX_TOLERANCE_M
+        boxes_max = boxes[:, 3:] + BOUNDING_BOX_TOLERANCE_M
     for surface_facade in facade_list:
         # get coordinates of surface
         ref_pypt = calculate.face_midpt(surface_facade)
@@ -457,8 +572,10 @@ def calc_windows_walls(facade_list, wwr, potentially_intersecting_solids):
 
         if number_intersecting_solids:
             # flag weather it intersects a surrounding geometry
-            intersects = np.vectorize(calc_intersection_face_solid)(potentially_intersecting_solids, data_point)
-            intersects = sum(intersects)
+            point = np.array(data_point.point_to_evaluate)
+            in_boxes = np.flatnonzero(np.all((boxes_min <= point) & (point <= boxes_max), axis=1))
+            intersects = sum(calc_intersection_face_solid(potentially_intersecting_solids[i], data_point)
+                             for i in in_boxes)
         else:
             intersects = 0
 
@@ -527,17 +644,24 @@ class ElevationMap(object):
         return cls(a, x_coords, y_coords)
 
     def get_elevation_map_from_geometry(self, geometry, extra_points=5):
+        """
+        The part of the elevation map under ``geometry``, with ``extra_points`` cells around its bounds. The cells are
+        found with a binary search: the x coordinates of the raster are increasing, the y coordinates decreasing.
+        """
         minx, miny, maxx, maxy = geometry.bounds
 
-        x_start = np.where(minx > self.x_coords)[0]
-        x_end = np.where(maxx < self.x_coords)[0]
-        y_start = np.where(maxy < self.y_coords)[0]
-        y_end = np.where(miny > self.y_coords)[0]
+        # the last cell left of minx and the first cell right of maxx
+        x_start = np.searchsorted(self.x_coords, minx, side='left') - 1
+        x_end = np.searchsorted(self.x_coords, maxx, side='right')
+        # the last cell above maxy and the first cell below miny
+        y_increasing = self.y_coords[::-1]
+        y_start = len(self.y_coords) - np.searchsorted(y_increasing, maxy, side='right') - 1
+        y_end = len(self.y_coords) - np.searchsorted(y_increasing, miny, side='left')
 
-        x_start = max(x_start[-1] - extra_points, 0)
-        x_end = min(x_end[0] + extra_points, len(self.x_coords))
-        y_start = max(y_start[-1] - extra_points, 0)
-        y_end = min(y_end[0] + extra_points, len(self.y_coords))
+        x_start = max(x_start - extra_points, 0)
+        x_end = min(x_end + extra_points, len(self.x_coords))
+        y_start = max(y_start - extra_points, 0)
+        y_end = min(y_end + extra_points, len(self.y_coords))
 
         new_elevation_map = self.elevation_map[y_start:y_end + 1, x_start:x_end + 1]
         new_x_coords = self.x_coords[x_start:x_end + 1]
@@ -545,6 +669,13 @@ class ElevationMap(object):
 
         return ElevationMap(new_elevation_map, new_x_coords, new_y_coords)
 
+    def calc_hash(self):
+        """a hash of the elevations and their coordinates, to detect changes of the terrain"""
+        elevation_hash = hashlib.sha1(np.ascontiguousarray(self.elevation_map).tobytes())
+        elevation_hash.update(np.ascontiguousarray(self.x_coords).tobytes())
+        elevation_hash.update(np.ascontiguousarray(self.y_coords).tobytes())
+        return elevation_hash.hexdigest()
+
     def generate_tin(self):
         (y_index, x_index) = np.nonzero(self.elevation_map >= 0)
         _x_coords = self.x_coords[x_index]
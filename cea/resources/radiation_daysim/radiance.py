@@ -4,9 +4,11 @@ import shutil
 import subprocess
 import shlex
 
+import numpy as np
 import pandas as pd
 
 from cea import suppress_3rd_party_debug_loggers
+from cea.constants import HOURS_IN_YEAR
 from cea.resources.radiation_daysim.geometry_generator import BuildingGeometry
 
 suppress_3rd_party_debug_loggers()
@@ -14,6 +16,11 @@ suppress_3rd_party_debug_loggers()
 import py4design.py2radiance as py2radiance
 from py4design.py3dmodel.fetch import points_frm_occface
 
+# number of hours (rows of the .ill file) parsed at once by DaySimProject.eval_ill
+ILL_ROWS_IN_BLOCK = 240
+# the hours of February 29th, removed from the results of leap years
+LEAP_DAY_HOURS = list(range(1416, 1440))
+
 
 class CEADaySim(object):
     """
@@ -326,20 +333,59 @@ class DaySimProject(object):
         command1 = 'ds_illum "{hea_path}"'.format(hea_path=self.hea_path)
         CEADaySim.run_cmd(command1)
 
-    def eval_ill(self):
+    def eval_ill(self, a_max=None):
         """
         This function reads the output file from running `ds_illum`, parses the space separated values
         and returns the values as a numpy array.
 
-        :return: Numpy array of hourly irradiance results of sensor points
+        The file is parsed in blocks of ``ILL_ROWS_IN_BLOCK`` hours into a single preallocated array, so reading the
+        results of a large chunk needs little more memory than the results themselves. The hours of February 29th are
+        skipped (results of leap years) and the values are clipped to [0, ``a_max``] while reading.
+
+        :param float a_max: the maximum value of the results (e.g. the maximum global radiation of the weather file)
+        :return: Numpy array of hourly irradiance results of sensor points, with shape (sensors, HOURS_IN_YEAR)
         """
 
         ill_path = os.path.join(self.project_path, "{file_name}.ill".format(file_name=self.project_name))
-        ill_result = pd.read_csv(ill_path, delimiter=' ', header=None).iloc[:, 4:].T.values
+        num_hours = count_lines(ill_path)
+        if num_hours == HOURS_IN_YEAR + 24:
+            print('Removing leap day')
+            skip_hours = LEAP_DAY_HOURS
+        elif num_hours == HOURS_IN_YEAR:
+            skip_hours = []
+        else:
+            raise ValueError('Unexpected number of hours in {ill_path}: {num_hours}'.format(ill_path=ill_path,
+                                                                                         num_hours=num_hours))
+
+        ill_result = None
+        hour = 0
+        blocks = pd.read_csv(ill_path, delimiter=' ', header=None, chunksize=ILL_ROWS_IN_BLOCK)
+        for block in blocks:
+            values = block.iloc[:, 4:].values
+            if skip_hours:
+                values = values[~block.index.isin(skip_hours)]
+            if ill_result is None:
+                ill_result = np.empty((values.shape[1], HOURS_IN_YEAR))
+            np.clip(values.T, 0.0, a_max, out=ill_result[:, hour:hour + len(values)])
+            hour += len(values)
 
         return ill_result
 
 
+def count_lines(path):
+    """the number of lines of a text file (without parsing it)"""
+    num_lines = 0
+    last_block = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            num_lines += block.count(b'\n')
+            last_block = block
+    if not last_block.endswith(b'\n'):
+        # the last line has no line break
+        num_lines += 1
+    return num_lines
+
+
 class RadSurface(object):
     """
     An object that contains all the surface information running a Radiance/Daysim simulation.
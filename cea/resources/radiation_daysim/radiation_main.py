@@ -5,7 +5,6 @@ Radiation engine and geometry handler for CEA
 import os
 import sys
 import time
-from itertools import repeat
 
 import pandas as pd
 from geopandas import GeoDataFrame as gpdf
@@ -15,8 +14,8 @@ import cea.inputlocator
 from cea.datamanagement.databases_verification import verify_input_geometry_zone, verify_input_geometry_surroundings
 from cea.resources.radiation_daysim import daysim_main, geometry_generator
 from cea.resources.radiation_daysim.radiance import CEADaySim
-from cea.utilities import epwreader
-from cea.utilities.parallel import vectorize
+from cea.utilities import database_cache, epwreader
+from cea.utilities.parallel import vectorize, broadcast
 
 __author__ = "Paul Neitzel, Kian Wee Chen"
 __copyright__ = "Copyright 2016, Architecture and Building Systems - ETH Zurich"
@@ -27,6 +26,11 @@ __maintainer__ = "Daren Thomas"
 __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
+# number of chunks (Daysim projects) per process: more chunks balance the load of the processes better, fewer chunks
+# reduce the overhead of creating the Daysim projects
+CHUNKS_PER_PROCESS = 4
+MIN_SENSORS_IN_CHUNK = 1000
+
 
 def reader_surface_properties(locator):
     """
@@ -39,9 +43,9 @@ def reader_surface_properties(locator):
 
     # local variables
     architectural_properties = gpdf.from_file(locator.get_building_architecture())
-    surface_database_windows = pd.read_excel(locator.get_database_envelope_systems(), "WINDOW")
-    surface_database_roof = pd.read_excel(locator.get_database_envelope_systems(), "ROOF")
-    surface_database_walls = pd.read_excel(locator.get_database_envelope_systems(), "WALL")
+    surface_database_windows = database_cache.read_excel(locator.get_database_envelope_systems(), "WINDOW")
+    surface_database_roof = database_cache.read_excel(locator.get_database_envelope_systems(), "ROOF")
+    surface_database_walls = database_cache.read_excel(locator.get_database_envelope_systems(), "WALL")
 
     # querry data
     df = architectural_properties.merge(surface_database_windows, left_on='type_win', right_on='code')
@@ -63,10 +67,6 @@ def radiation_singleprocessing(cea_daysim, zone_building_names, locator, setting
 
     list_of_building_names = [building_name for building_name in settings.buildings
                               if building_name in zone_building_names]
-    # get chunks of buildings to iterate
-    chunks = [list_of_building_names[i:i + settings.n_buildings_in_chunk] for i in
-              range(0, len(list_of_building_names),
-                    settings.n_buildings_in_chunk)]
 
     write_sensor_data = settings.write_sensor_data
     radiance_parameters = {"rad_ab": settings.rad_ab, "rad_ad": settings.rad_ad, "rad_as": settings.rad_as,
@@ -76,25 +76,68 @@ def radiation_singleprocessing(cea_daysim, zone_building_names, locator, setting
                            "rad_ds": settings.rad_ds, "rad_dr": settings.rad_dr, "rad_dp": settings.rad_dp}
     grid_size = {"walls_grid": settings.walls_grid, "roof_grid": settings.roof_grid}
 
+    # calculate the sensors of all the buildings first: the sensors of a building do not depend on the other
+    # buildings and the number of sensors is used to size the chunks of the Daysim simulation
+    print("Calculating sensor points")
+    # the size of the building geometries is used as an estimate of the run time for each building
+    geometry_sizes = [os.path.getsize(os.path.join(geometry_pickle_dir, 'zone', building_name))
+                      for building_name in list_of_building_names]
+    sensors_number = vectorize(daysim_main.write_sensors_building, num_processes, costs=geometry_sizes)(
+        list_of_building_names,
+        broadcast(locator),
+        broadcast(grid_size),
+        broadcast(geometry_pickle_dir))
+
+    # get chunks of buildings to iterate
+    chunks, chunks_sensors_number = calc_chunks(list_of_building_names, sensors_number, num_processes,
+                                                settings.n_buildings_in_chunk)
     num_chunks = len(chunks)
-    if num_chunks == 1:
-        for chunk_n, building_names in enumerate(chunks):
-            daysim_main.isolation_daysim(
-                chunk_n, cea_daysim, building_names, locator, radiance_parameters, write_sensor_data, grid_size,
-                max_global, weatherfile, geometry_pickle_dir)
+    print("Simulating {n} buildings in {num_chunks} chunks".format(n=len(list_of_building_names),
+                                                                  num_chunks=num_chunks))
+
+    # the run time of Daysim is proportional to the number of sensors. The pool of the sensor calculation is reused,
+    # even if there are less chunks than processes
+    vectorize(daysim_main.isolation_daysim, num_processes, costs=chunks_sensors_number)(
+        range(0, num_chunks),
+        broadcast(cea_daysim),
+        chunks,
+        broadcast(locator),
+        broadcast(radiance_parameters),
+        broadcast(write_sensor_data),
+        broadcast(max_global),
+        broadcast(weatherfile)
+    )
+
+
+def calc_chunks(building_names, sensors_number, num_processes, max_buildings_in_chunk):
+    """
+    Group the buildings into chunks (one Daysim project each) with about the same number of sensors. With
+    multiprocessing, the sensors are split into ``CHUNKS_PER_PROCESS`` chunks per process, so all the processes stay
+    busy until the end of the simulation. A chunk has at least ``MIN_SENSORS_IN_CHUNK`` sensors (unless it is the last
+    one) and at most ``max_buildings_in_chunk`` buildings.
+
+    :param list[str] building_names: the buildings to simulate
+    :param list[int] sensors_number: the number of sensors of each building
+    :param int num_processes: the number of processes used to run Daysim
+    :param int max_buildings_in_chunk: the maximum number of buildings in a chunk
+    :return: the chunks (lists of building names) and the number of sensors in each chunk
+    :rtype: tuple(list[list[str]], list[int])
+    """
+    if num_processes > 1:
+        max_sensors_in_chunk = max(sum(sensors_number) / (num_processes * CHUNKS_PER_PROCESS), MIN_SENSORS_IN_CHUNK)
     else:
-        vectorize(daysim_main.isolation_daysim, num_processes)(
-            range(0, num_chunks),
-            repeat(cea_daysim, num_chunks),
-            chunks,
-            repeat(locator, num_chunks),
-            repeat(radiance_parameters, num_chunks),
-            repeat(write_sensor_data, num_chunks),
-            repeat(grid_size, num_chunks),
-            repeat(max_global, num_chunks),
-            repeat(weatherfile, num_chunks),
-            repeat(geometry_pickle_dir, num_chunks)
-        )
+        max_sensors_in_chunk = float('inf')
+
+    chunks = []
+    chunks_sensors_number = []
+    for building_name, building_sensors_number in zip(building_names, sensors_number):
+        if not chunks or (chunks_sensors_number[-1] + building_sensors_number > max_sensors_in_chunk
+                          or len(chunks[-1]) >= max_buildings_in_chunk):
+            chunks.append([])
+            chunks_sensors_number.append(0)
+        chunks[-1].append(building_name)
+        chunks_sensors_number[-1] += building_sensors_number
+    return chunks, chunks_sensors_number
 
 
 def check_daysim_bin_directory(path_hint, latest_binaries):
@@ -3,8 +3,7 @@
 blinds
 """
 
-
-
+import numpy as np
 
 
 def calc_blinds_activation(radiation, g_gl, Rf_sh):
@@ -12,11 +11,11 @@ def calc_blinds_activation(radiation, g_gl, Rf_sh):
     This function calculates the blind operation according to ISO 13790.
 
     :param radiation: radiation in [W/m2]
+    :type radiation: float or np.ndarray
     :param g_gl: window g value
     :param Rf_sh: shading factor
+    :return: the g value of the windows with the blinds
+    :rtype: float or np.ndarray
     """
     # activate blinds when I =300 W/m2
-    if radiation > 300:  # in w/m2
-        return g_gl * Rf_sh
-    else:
-        return g_gl
+    return np.where(radiation > 300, g_gl * Rf_sh, g_gl)  # in w/m2
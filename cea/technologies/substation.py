@@ -9,6 +9,7 @@ from numba import jit
 import cea.config
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.constants import HOURS_IN_YEAR
+from cea.demand import demand_readers
 from cea.technologies.constants import DT_HEAT, DT_COOL, U_COOL, U_HEAT
 
 __author__ = "Jimeno A. Fonseca"
@@ -30,7 +31,7 @@ def substation_main_heating(locator, total_demand, buildings_name_with_heating,
         heating_system_temperatures_dict = {}
         T_DHN_supply = np.zeros(HOURS_IN_YEAR)
         for name in buildings_name_with_heating:
-            buildings_dict[name] = pd.read_csv(locator.get_demand_results_file(name))
+            buildings_dict[name] = demand_readers.read_demand_results(locator, name)
             print(name)
             ## calculates the building side supply and return temperatures for each unit
             Ths_supply_C, Ths_re_C = calc_temp_hex_building_side_heating(buildings_dict[name],
@@ -61,7 +62,7 @@ def substation_main_heating(locator, total_demand, buildings_name_with_heating,
     else:
         # CALCULATE SUBSTATIONS DURING DECENTRALIZED OPTIMIZATION
         for name in buildings_name_with_heating:
-            substation_demand = pd.read_csv(locator.get_demand_results_file(name))
+            substation_demand = demand_readers.read_demand_results(locator, name)
             Ths_supply_C, Ths_return_C = calc_temp_hex_building_side_heating(substation_demand, heating_configuration)
             T_heating_system_supply = calc_temp_this_building_heating(Ths_supply_C)
             substation_model_heating(name,
@@ -101,7 +102,7 @@ def substation_main_cooling(locator, total_demand, buildings_name_with_cooling,
         T_DCN_supply_to_cs_ref = np.zeros(HOURS_IN_YEAR) + 1E6
         T_DCN_supply_to_cs_ref_data = np.zeros(HOURS_IN_YEAR) + 1E6
         for name in buildings_name_with_cooling:
-            buildings_dict[name] = pd.read_csv(locator.get_demand_results_file(name))
+            buildings_dict[name] = demand_readers.read_demand_results(locator, name)
 
             T_supply_to_cs_ref, T_supply_to_cs_ref_data, \
             Tcs_return_C, Tcs_supply_C = calc_temp_hex_building_side_cooling(buildings_dict[name],
@@ -140,7 +141,7 @@ def substation_main_cooling(locator, total_demand, buildings_name_with_cooling,
     else:
         # CALCULATE SUBSTATIONS DURING DECENTRALIZED OPTIMIZATION
         for name in buildings_name_with_cooling:
-            substation_demand = pd.read_csv(locator.get_demand_results_file(name))
+            substation_demand = demand_readers.read_demand_results(locator, name)
             T_supply_to_cs_ref, T_supply_to_cs_ref_data, \
             Tcs_return_C, Tcs_supply_C = calc_temp_hex_building_side_cooling(substation_demand, cooling_configuration)
 
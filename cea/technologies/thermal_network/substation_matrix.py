@@ -11,6 +11,7 @@ import scipy
 import cea.config
 from math import ceil
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK, P_WATER_KGPERM3
+from cea.demand import demand_readers
 from cea.technologies.constants import DT_COOL, DT_HEAT, U_COOL, U_HEAT, \
     HEAT_EX_EFFECTIVENESS, DT_INTERNAL_HEX, MAX_NODE_FLOW
 
@@ -85,8 +86,8 @@ def determine_building_supply_temperatures(building_names, locator, substation_s
     buildings_demands = {}
     for name in building_names:
         name = str(name)
-        buildings_demands[name] = pd.read_csv(locator.get_demand_results_file(name),
-                                              usecols=(BUILDINGS_DEMANDS_COLUMNS))
+        buildings_demands[name] = demand_readers.read_demand_results(locator, name,
+                                                                      columns=BUILDINGS_DEMANDS_COLUMNS)
         Q_substation_heating = 0
         T_supply_heating_C = np.nan
         for system in substation_systems['heating']:
@@ -0,0 +1,96 @@
+"""
+Test cea.utilities.database_cache.read_excel against pandas.read_excel
+"""
+
+
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from cea.utilities import database_cache
+
+
+class TestDatabaseCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'ENVELOPE.xlsx')
+        write_workbook(self.path, u_value=0.5)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_same_as_pandas(self):
+        for sheet_name in ['WALL', 1, 0, ['ROOF', 'WALL']]:
+            expected = pd.read_excel(self.path, sheet_name)
+            if isinstance(expected, dict):
+                self.assertEqual(list(expected.keys()), list(database_cache.read_excel(self.path, sheet_name).keys()))
+                for name in expected:
+                    pd.testing.assert_frame_equal(database_cache.read_excel(self.path, sheet_name)[name], expected[name])
+            else:
+                pd.testing.assert_frame_equal(database_cache.read_excel(self.path, sheet_name), expected)
+        self.assertEqual(list(database_cache.read_excel(self.path, sheet_name=None).keys()), ['ROOF', 'WALL'])
+        with self.assertRaises(ValueError):
+            database_cache.read_excel(self.path, 'WINDOW')
+
+    def test_copies_are_returned(self):
+        database_cache.read_excel(self.path, 'WALL')['U_wall'] = 0.0
+        self.assertEqual(list(database_cache.read_excel(self.path, 'WALL')['U_wall']), [0.5, 1.0])
+
+    def test_modified_workbook_is_read_again(self):
+        self.assertEqual(list(database_cache.read_excel(self.path, 'WALL')['U_wall']), [0.5, 1.0])
+        write_workbook(self.path, u_value=0.25)
+        os.utime(self.path, (0, 0))
+        self.assertEqual(list(database_cache.read_excel(self.path, 'WALL')['U_wall']), [0.25, 1.0])
+
+    def test_sidecar_file(self):
+        database_cache.read_excel(self.path, 'WALL')
+        database_cache._files.clear()
+        worksheets = database_cache.read_workbook(self.path)
+        self.assertEqual(list(worksheets['WALL']['U_wall']), [0.5, 1.0])
+
+    @unittest.skipIf(not hasattr(os, 'getuid'), "file permissions of POSIX systems")
+    def test_private_sidecar_files(self):
+        database_cache.read_excel(self.path, 'WALL')
+        cache_folder = database_cache.get_cache_folder()
+        self.assertEqual(os.stat(cache_folder).st_mode & 0o777, 0o700)
+        for sidecar_file in os.listdir(cache_folder):
+            self.assertEqual(os.stat(os.path.join(cache_folder, sidecar_file)).st_mode & 0o077, 0)
+
+        # a sidecar file that other users can write to is never loaded
+        parse = '%s.%s' % (pd.read_excel.__module__, pd.read_excel.__name__)
+        sidecar_file = database_cache.get_sidecar_file((self.path, parse, None, (('sheet_name', None),)))
+        self.assertTrue(os.path.exists(sidecar_file))
+        os.chmod(sidecar_file, 0o666)
+        database_cache._files.clear()
+        with mock.patch.object(database_cache.pickle, 'load') as load:
+            database_cache.read_workbook(self.path)
+        load.assert_not_called()
+
+    def test_read_file(self):
+        calls = []
+
+        def parse(path, column):
+            calls.append(path)
+            return pd.read_excel(path, 'WALL')[column].sum()
+
+        self.assertEqual(database_cache.read_file(self.path, parse, column='U_wall'), 1.5)
+        database_cache._files.clear()
+        self.assertEqual(database_cache.read_file(self.path, parse, column='U_wall'), 1.5)
+        self.assertEqual(len(calls), 1)
+
+
+def write_workbook(path, u_value):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'code': ['ROOF_AS1'], 'U_roof': [0.2]}).to_excel(writer, sheet_name='ROOF', index=False)
+        pd.DataFrame({'code': ['WALL_AS1', 'WALL_AS2'], 'U_wall': [u_value, 1.0]}).to_excel(
+            writer, sheet_name='WALL', index=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Test that cea.resources.radiation_daysim.daysim_main.write_sensors_building only reuses the sensors of a previous
+radiation run of the same scenario
+"""
+
+
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import cea.inputlocator
+
+try:
+    from cea.resources.radiation_daysim import daysim_main, geometry_generator
+except ImportError:
+    # the radiation script needs py4design, pythonOCC and GDAL
+    daysim_main = None
+
+GRID_SIZE = {"walls_grid": 200, "roof_grid": 10}
+
+
+def calc_sensors_building(building_geometry, grid_size):
+    """one sensor per wall, instead of the sensor grid of py4design"""
+    n = len(building_geometry.walls)
+    return [(1.0, 0.0, 0.0)] * n, [(float(i), 0.0, 1.0) for i in range(n)], ['walls'] * n, [1.0] * n, \
+           ['east'] * n, [0] * n
+
+
+@unittest.skipIf(daysim_main is None, "py4design is not installed")
+class TestWriteSensorsBuilding(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        # the geometry pickles are saved in a folder named after the scenario (see radiation_main.main)
+        self.geometry_pickle_dir = os.path.join(self.folder, 'baseline_radiation_geometry_pickle')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write_sensors(self, project, number_of_walls):
+        """run the geometry generator and the sensors of building B001 of the scenario ``project/baseline``"""
+        geometry_path = os.path.join(self.geometry_pickle_dir, 'zone', 'B001')
+        geometry_generator.remove_cache_key(geometry_path)
+        geometry_generator.BuildingGeometry(name='B001', walls=list(range(number_of_walls))).save(geometry_path)
+        geometry_generator.write_cache_key(geometry_path, geometry_generator.calc_cache_key(number_of_walls))
+
+        locator = cea.inputlocator.InputLocator(os.path.join(self.folder, project, 'baseline'))
+        sensors_number = daysim_main.write_sensors_building('B001', locator, GRID_SIZE, self.geometry_pickle_dir)
+        self.assertEqual(len(pd.read_csv(locator.get_radiation_metadata('B001'))), sensors_number)
+        return sensors_number
+
+    def test_same_scenario_name(self):
+        with mock.patch.object(daysim_main, 'calc_sensors_building', side_effect=calc_sensors_building) as calc:
+            self.assertEqual(self.write_sensors('project1', 3), 3)
+            self.assertEqual(self.write_sensors('project2', 5), 5)
+            self.assertEqual(calc.call_count, 2)
+
+            # the sensors of the same geometry are reused
+            self.assertEqual(self.write_sensors('project1', 3), 3)
+            self.assertEqual(calc.call_count, 2)
+
+            # the geometry of project2 changed to the geometry of project1, the last one in the geometry pickles
+            self.assertEqual(self.write_sensors('project2', 3), 3)
+            self.assertEqual(calc.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
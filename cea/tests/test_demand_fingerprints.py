@@ -0,0 +1,104 @@
+"""
+Test the incremental demand calculation: cea.demand.demand_fingerprints and YearlyDemandWriter.update_csv
+"""
+
+
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.demand import demand_fingerprints
+from cea.demand.demand_writers import YearlyDemandWriter
+
+
+class TestDemandFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+        self.config = SimpleNamespace(debug=False, demand=SimpleNamespace(
+            use_dynamic_infiltration_calculation=False, resolution_output='hourly', loads_output=[],
+            massflows_output=[], temperatures_output=[], output_format='csv'))
+        self.building_names = ['B1000', 'B1001']
+        self.bprs = {name: {'rc_model': {'Af': 1000.0}, 'I_sol': np.arange(24.0)} for name in self.building_names}
+        for name in self.building_names:
+            write_file(self.locator.get_schedule_model_file(name), 'people_p\n1.0\n')
+            write_file(self.locator.get_radiation_building(name), 'Date,windows_east_kW\n2005-01-01,1.0\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def test_fingerprints_change_with_inputs(self):
+        fingerprints = self.calc_fingerprints()
+        self.assertEqual(fingerprints, self.calc_fingerprints())
+        self.assertNotEqual(fingerprints['B1000'], fingerprints['B1001'])
+
+        self.bprs['B1000']['I_sol'][12] = 100.0
+        changed = self.calc_fingerprints()
+        self.assertNotEqual(changed['B1000'], fingerprints['B1000'])
+        self.assertEqual(changed['B1001'], fingerprints['B1001'])
+
+        write_file(self.locator.get_radiation_building('B1001'), 'Date,windows_east_kW\n2005-01-01,2.0\n')
+        self.assertNotEqual(self.calc_fingerprints()['B1001'], fingerprints['B1001'])
+
+        self.config.demand.output_format = 'parquet'
+        self.assertNotEqual(self.calc_fingerprints(), changed)
+
+    def test_changed_buildings(self):
+        fingerprints = self.calc_fingerprints()
+        self.assertEqual(self.get_changed_buildings(fingerprints), self.building_names)
+
+        self.write_results([1.0, 2.0])
+        demand_fingerprints.write_manifest(self.locator, fingerprints)
+        self.assertEqual(self.get_changed_buildings(fingerprints), [])
+
+        self.bprs['B1001']['rc_model']['Af'] = 500.0
+        self.assertEqual(self.get_changed_buildings(self.calc_fingerprints()), ['B1001'])
+
+        os.remove(self.locator.get_demand_results_file('B1000'))
+        self.assertEqual(self.get_changed_buildings(fingerprints), ['B1000'])
+
+        # a run that is not incremental removes the manifest
+        demand_fingerprints.delete_manifest(self.locator)
+        self.assertFalse(os.path.exists(self.locator.get_demand_manifest()))
+        self.assertEqual(self.get_changed_buildings(fingerprints), self.building_names)
+
+    def test_update_totals(self):
+        self.write_results([1.0, 2.0])
+        pd.DataFrame({'Name': 'B1001', 'QH_sys_MWhyr': 3.0}, index=[0]).to_csv(
+            self.locator.get_temporary_file('B1001T.csv'), index=False)
+        YearlyDemandWriter([], [], []).update_csv(self.building_names, ['B1001'], self.locator)
+
+        total_demand = pd.read_csv(self.locator.get_total_demand())
+        self.assertEqual(list(total_demand.Name), self.building_names)
+        self.assertEqual(list(total_demand.QH_sys_MWhyr), [1.0, 3.0])
+
+    def calc_fingerprints(self):
+        return demand_fingerprints.calc_fingerprints(self.building_names, self.bprs, self.locator, self.config)
+
+    def get_changed_buildings(self, fingerprints):
+        return demand_fingerprints.get_changed_buildings(self.building_names, fingerprints, self.locator)
+
+    def write_results(self, qh_sys):
+        for name in self.building_names:
+            write_file(self.locator.get_demand_results_file(name), 'DATE,Name\n2005-01-01,%s\n' % name)
+        pd.DataFrame({'Name': self.building_names, 'QH_sys_MWhyr': qh_sys}).to_csv(
+            self.locator.get_total_demand(), index=False)
+
+
+def write_file(path, contents):
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+        f.write(contents)
+
+
+if __name__ == "__main__":
+    unittest.main()
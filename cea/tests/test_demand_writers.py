@@ -0,0 +1,86 @@
+"""
+Test the output formats of cea.demand.demand_writers and reading them back with cea.demand.demand_readers
+"""
+
+
+
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.demand import demand_readers
+from cea.demand.demand_writers import HourlyDemandWriter, YearlyDemandWriter
+
+
+class TestDemandWriters(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+        self.writer = HourlyDemandWriter(['QH_sys', 'E_sys'], [], [])
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def test_csv_and_parquet_are_read_the_same(self):
+        columns, hourly_data = create_hourly_data()
+        self.writer.write_to_csv('B1000', columns, hourly_data, self.locator)
+        from_csv = demand_readers.read_demand_results(self.locator, 'B1000')
+
+        self.writer.write_to_parquet('B1000', columns, hourly_data, self.locator)
+        self.assertTrue(demand_readers.get_demand_results_file(self.locator, 'B1000').endswith('.parquet'))
+        from_parquet = demand_readers.read_demand_results(self.locator, 'B1000')
+
+        self.assertEqual(list(from_csv.columns), list(from_parquet.columns))
+        self.assertEqual(list(from_csv.DATE), list(from_parquet.DATE))
+        # the csv file is rounded to FLOAT_FORMAT, the parquet file keeps the full precision
+        for column in columns[1:]:
+            np.testing.assert_allclose(from_parquet[column], from_csv[column], atol=1e-3, err_msg=column)
+
+        qh_sys = demand_readers.read_demand_results(self.locator, 'B1000', columns=['QH_sys_kWh'])
+        self.assertEqual(list(qh_sys.columns), ['QH_sys_kWh'])
+
+    def test_yearly_totals(self):
+        names = ['B1000', 'B1001', 'B1002']
+        for i, name in enumerate(names):
+            pd.DataFrame({'Name': name, 'QH_sys_MWhyr': float(i)}, index=[0]).to_csv(
+                self.locator.get_temporary_file('%(name)sT.csv' % locals()), index=False)
+        YearlyDemandWriter([], [], []).write_to_csv(names, self.locator)
+
+        total_demand = pd.read_csv(self.locator.get_total_demand())
+        self.assertEqual(list(total_demand.Name), names)
+        self.assertEqual(list(total_demand.QH_sys_MWhyr), [0.0, 1.0, 2.0])
+
+    def test_yearly_totals_columns(self):
+        """the rows of all the buildings are written in the columns of the first building"""
+        rows = {'B1000': {'Name': 'B1000', 'QH_sys_MWhyr': 1.0, 'E_sys_MWhyr': 2.0},
+                'B1001': {'E_sys_MWhyr': 4.0, 'Name': 'B1001', 'QH_sys_MWhyr': 3.0},
+                'B1002': {'Name': 'B1002', 'E_sys_MWhyr': 5.0}}
+        for name, row in rows.items():
+            pd.DataFrame(row, index=[0]).to_csv(self.locator.get_temporary_file('%(name)sT.csv' % locals()),
+                                                index=False)
+        YearlyDemandWriter([], [], []).write_to_csv(list(rows), self.locator)
+
+        total_demand = pd.read_csv(self.locator.get_total_demand())
+        self.assertEqual(list(total_demand.columns), ['Name', 'QH_sys_MWhyr', 'E_sys_MWhyr'])
+        self.assertEqual(list(total_demand.E_sys_MWhyr), [2.0, 4.0, 5.0])
+        self.assertEqual(list(total_demand.QH_sys_MWhyr[:2]), [1.0, 3.0])
+        self.assertTrue(np.isnan(total_demand.QH_sys_MWhyr[2]))
+
+
+def create_hourly_data():
+    """hourly results as returned by `DemandWriter.calc_hourly_dataframe` for a synthetic day"""
+    date = pd.date_range('2005-01-01', periods=24, freq='H')
+    hourly_data = pd.DataFrame({'DATE': date, 'Name': 'B1000', 'people': np.arange(24.0),
+                                'x_int': np.full(24, 7.5), 'QH_sys_kWh': np.linspace(0.0, 10.0, 24),
+                                'E_sys_kWh': np.linspace(1.0, 2.0, 24)}).set_index('DATE')
+    columns = ['Name', 'people', 'x_int', 'QH_sys_kWh', 'E_sys_kWh']
+    return columns, hourly_data
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+"""
+Test the cache of the weather data read by cea.utilities.epwreader.epw_reader
+"""
+
+
+
+
+import os
+import unittest
+
+import pandas as pd
+
+import cea.config
+from cea.utilities import database_cache, epwreader
+
+
+class TestEpwReader(unittest.TestCase):
+    def setUp(self):
+        self.weather_path = os.path.join(os.path.dirname(cea.config.__file__), 'databases', 'weather',
+                                         'Zuerich-Kloten_2030_AB1_TMY.epw')
+
+    def test_same_as_parsed(self):
+        expected = epwreader.parse_epw_file(self.weather_path)
+        pd.testing.assert_frame_equal(epwreader.epw_reader(self.weather_path), expected)
+        # read from the sidecar file
+        database_cache._files.clear()
+        pd.testing.assert_frame_equal(epwreader.epw_reader(self.weather_path), expected)
+
+    def test_copies_are_returned(self):
+        epwreader.epw_reader(self.weather_path)['drybulb_C'] = 100.0
+        self.assertLess(epwreader.epw_reader(self.weather_path)['drybulb_C'].max(), 100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
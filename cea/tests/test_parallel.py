@@ -0,0 +1,75 @@
+"""
+Test cea.utilities.parallel.vectorize with sequences and broadcast arguments
+"""
+
+
+
+
+import unittest
+
+import pandas as pd
+
+from cea.utilities.parallel import vectorize, broadcast, get_worker_pool
+
+
+class TestVectorize(unittest.TestCase):
+    def test_single_process(self):
+        self.assertEqual(vectorize(add, 1)(range(5), broadcast(10)), [10, 11, 12, 13, 14])
+
+    def test_multiprocessing(self):
+        weather_data = pd.DataFrame({'drybulb_C': [1.0, 2.0, 3.0]})
+        self.assertEqual(vectorize(sum_column, 2)(broadcast(weather_data), ['drybulb_C'] * 4, range(4)),
+                         [6.0, 7.0, 8.0, 9.0])
+
+    def test_same_results(self):
+        """broadcast arguments are inserted at their position, between the sequences"""
+        args = (range(6), broadcast(100), range(10, 16))
+        self.assertEqual(vectorize(add3, 1)(*args), vectorize(add3, 2)(*args))
+
+    def test_longest_job_first(self):
+        """the results are returned in the order of the arguments, whatever the order of the calls"""
+        costs = [1.0, 5.0, 3.0, 0.0, 4.0, 2.0]
+        self.assertEqual(vectorize(add, 2, costs=costs)(range(6), broadcast(10)),
+                         [10, 11, 12, 13, 14, 15])
+
+    def test_on_result(self):
+        """the results are passed to on_result with the index of the call, in the main process"""
+        for processes in [1, 2]:
+            results = {}
+            self.assertEqual(vectorize(add, processes, costs=[1.0, 5.0, 3.0, 0.0], on_result=results.__setitem__)(
+                range(4), broadcast(10)), [None] * 4)
+            self.assertEqual(results, {0: 10, 1: 11, 2: 12, 3: 13})
+
+    def test_worker_pool_is_reused(self):
+        vectorize(add, 2)(range(2), range(2))
+        worker_pool = get_worker_pool(2)
+        vectorize(add, 2)(range(2), range(2))
+        self.assertIs(get_worker_pool(2), worker_pool)
+
+    def test_worker_pool_after_exception(self):
+        with self.assertRaises(ZeroDivisionError):
+            vectorize(divide, 2)(range(4), broadcast(0))
+        self.assertEqual(vectorize(divide, 2)(range(4), broadcast(2)), [0.0, 0.5, 1.0, 1.5])
+        with self.assertRaises(ZeroDivisionError):
+            vectorize(divide, 2, on_result=print)(range(4), broadcast(0))
+        self.assertEqual(vectorize(divide, 2)(range(4), broadcast(2)), [0.0, 0.5, 1.0, 1.5])
+
+
+def add(a, b):
+    return a + b
+
+
+def add3(a, b, c):
+    return a * b + c
+
+
+def divide(a, b):
+    return a / b
+
+
+def sum_column(df, column, offset):
+    return df[column].sum() + offset
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Test the electricity generated by the PV panels (cea.technologies.solar.photovoltaic.calc_pv_generation) against the
+results of the previous implementation, which calculated the groups of sensors one by one
+"""
+
+
+
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HOURS_IN_YEAR
+from cea.utilities.date import get_date_range_hours_from_year
+
+try:
+    from cea.technologies.solar import photovoltaic
+except ImportError:
+    # the solar technologies need GDAL
+    photovoltaic = None
+
+LATITUDE = 47.4
+PANEL_PROPERTIES_PV = {'PV_n': 0.16, 'PV_Bref': 0.0035, 'misc_losses': 0.1, 'PV_noct': 45.0, 'PV_a0': 0.935823,
+                       'PV_a1': 0.054289, 'PV_a2': -0.008677, 'PV_a3': 0.000527, 'PV_a4': -0.000011, 'PV_th': 0.002}
+# hours of the results compared to the reference values
+REFERENCE_HOURS = [108, 2004, 4000, 4381, 8000]
+
+
+def create_inputs():
+    """a simplified position of the sun and four groups of sensors on the roofs and the east and west walls"""
+    hour = np.arange(HOURS_IN_YEAR)
+    day = hour // 24 + 1
+    g = 23.45 * np.sin(np.radians(360.0 * (284 + day) / 365))
+    ha = 15.0 * (hour % 24 + 0.5 - 12)
+    lat = np.radians(LATITUDE)
+    cos_Sz = np.sin(lat) * np.sin(np.radians(g)) + np.cos(lat) * np.cos(np.radians(g)) * np.cos(np.radians(ha))
+    solar_properties = pd.DataFrame({'g': g, 'ha': ha, 'Sz': np.degrees(np.arccos(cos_Sz)), 'Az': ha + 180.0})
+    weather_data = pd.DataFrame({'drybulb_C': 10.0 + 10.0 * np.sin(2 * np.pi * (hour - 2000) / HOURS_IN_YEAR)
+                                              + 5.0 * np.sin(2 * np.pi * (hour % 24 - 9) / 24),
+                                 'ratio_diffhout': 0.3 + 0.4 * (day % 7) / 7})
+
+    sun = np.maximum(0.0, cos_Sz)
+    hourlydata_groups = pd.DataFrame({0: 800.0 * sun, 1: 500.0 * sun, 2: 650.0 * sun ** 0.5, 3: 300.0 * sun})
+    hourlydata_groups.iloc[100, 1] = np.nan
+    prop_observers = pd.DataFrame({'surface_azimuth_deg': [180.0, 90.0, 180.0, 270.0],
+                                   'B_deg': [30.0, 90.0, 15.0, 90.0],
+                                   'area_installed_module_m2': [120.0, 35.0, 60.0, 20.0],
+                                   'type_orientation': ['roofs_top', 'walls_east', 'roofs_top', 'walls_west']})
+    sensor_groups = {'number_groups': 4, 'prop_observers': prop_observers, 'hourlydata_groups': hourlydata_groups}
+    return sensor_groups, weather_data, solar_properties
+
+
+@unittest.skipIf(photovoltaic is None, "GDAL is not installed")
+class TestCalcPvGeneration(unittest.TestCase):
+    def test_reference_values(self):
+        sensor_groups, weather_data, solar_properties = create_inputs()
+        potential = photovoltaic.calc_pv_generation(sensor_groups, weather_data,
+                                                    get_date_range_hours_from_year(2030), solar_properties, LATITUDE,
+                                                    PANEL_PROPERTIES_PV)
+
+        self.assertEqual(list(potential.columns),
+                         ['PV_walls_south_E_kWh', 'PV_walls_south_m2', 'PV_walls_north_E_kWh', 'PV_walls_north_m2',
+                          'PV_roofs_top_E_kWh', 'PV_roofs_top_m2', 'PV_walls_east_E_kWh', 'PV_walls_east_m2',
+                          'PV_walls_west_E_kWh', 'PV_walls_west_m2', 'E_PV_gen_kWh', 'radiation_kWh', 'Area_PV_m2'])
+        annual_results = potential.sum()
+        for column, expected in [('PV_walls_south_E_kWh', 0.0), ('PV_walls_north_E_kWh', 0.0),
+                                 ('PV_roofs_top_E_kWh', 42710.4233857657), ('PV_walls_east_E_kWh', 2986.1364862218843),
+                                 ('PV_walls_west_E_kWh', 1021.9945811061455), ('E_PV_gen_kWh', 46718.55445309373),
+                                 ('radiation_kWh', 334188.99168861913)]:
+            self.assertAlmostEqual(annual_results[column], expected, delta=1e-9 * max(expected, 1.0), msg=column)
+        self.assertEqual(potential['PV_roofs_top_m2'].iloc[0], 180.0)
+        self.assertEqual(potential['Area_PV_m2'].iloc[0], 235.0)
+
+        np.testing.assert_allclose(potential['E_PV_gen_kWh'].values[REFERENCE_HOURS],
+                                   [11.44717140065174, 16.514287757609832, 10.379991053441117, 16.344229748089376,
+                                    6.836427002424934], rtol=1e-10)
+        np.testing.assert_allclose(potential['radiation_kWh'].values[REFERENCE_HOURS],
+                                   [62.74498643571469, 114.34827263931027, 91.67004247266225, 139.44720145407587,
+                                    25.49803746991565], rtol=1e-10)
+
+
+if __name__ == "__main__":
+    unittest.main()
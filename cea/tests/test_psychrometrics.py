@@ -0,0 +1,50 @@
+"""
+Test that the psychrometric functions of cea.utilities.epwreader and cea.demand.latent_loads calculate the same values
+for a whole year (arrays) as for single hours (floats)
+"""
+
+
+
+
+import os
+import unittest
+
+import numpy as np
+
+import cea.config
+from cea.demand import latent_loads
+from cea.utilities import epwreader
+
+
+class TestPsychrometrics(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        weather_path = os.path.join(os.path.dirname(cea.config.__file__), 'databases', 'weather',
+                                    'Zuerich-Kloten_2030_AB1_TMY.epw')
+        cls.weather_data = epwreader.epw_reader(weather_path)
+
+    def test_weather_file(self):
+        weather_data = self.weather_data
+        for i in range(0, len(weather_data), 97):
+            hour = weather_data.iloc[i]
+            self.assertAlmostEqual(weather_data['wetbulb_C'][i],
+                                   epwreader.calc_wetbulb(hour['drybulb_C'], hour['relhum_percent']), places=10)
+            self.assertAlmostEqual(weather_data['skytemp_C'][i],
+                                   epwreader.calc_skytemp(hour['drybulb_C'], hour['dewpoint_C'],
+                                                          hour['opaqskycvr_tenths']), places=10)
+
+    def test_moisture_content(self):
+        rh = self.weather_data['relhum_percent'].values
+        theta = self.weather_data['drybulb_C'].values
+        x = latent_loads.convert_rh_to_moisture_content(rh, theta)
+        self.assertEqual(x.shape, rh.shape)
+        for i in range(0, len(x), 97):
+            self.assertAlmostEqual(x[i], latent_loads.convert_rh_to_moisture_content(float(rh[i]), float(theta[i])),
+                                   places=15)
+        # saturated air at 20 C: about 14.3 g water / kg dry air
+        self.assertAlmostEqual(latent_loads.convert_rh_to_moisture_content(100.0, 20.0), 0.0144, places=3)
+        self.assertTrue(np.all(x > 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
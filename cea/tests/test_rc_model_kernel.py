@@ -0,0 +1,128 @@
+"""
+Test cea.demand.rc_model_kernel against the python procedure in cea.demand.thermal_loads.calc_Qhs_Qcs
+"""
+
+
+
+
+import copy
+import unittest
+import warnings
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HOURS_IN_YEAR
+from cea.demand import rc_model_kernel, control_heating_cooling_systems, thermal_loads
+from cea.demand.thermal_loads import calc_Qhs_Qcs, initialize_timestep_data
+
+
+class TestRcModelKernel(unittest.TestCase):
+    def test_radiator_heating_ceiling_cooling(self):
+        self.assert_same_results(create_bpr(), create_tsd())
+
+    def test_floor_heating_floor_cooling_window_ventilation(self):
+        bpr = create_bpr(class_hs='FLOOR_HEATING', class_cs='FLOOR_COOLING', MECH_VENT=False, WIN_VENT=True)
+        self.assert_same_results(bpr, create_tsd())
+
+    def test_no_systems(self):
+        bpr = create_bpr(class_hs='NONE', class_cs='NONE', HEAT_REC=False, ECONOMIZER=False)
+        self.assert_same_results(bpr, create_tsd())
+
+    def test_is_supported(self):
+        self.assertTrue(rc_model_kernel.is_supported(create_bpr(), False))
+        self.assertFalse(rc_model_kernel.is_supported(create_bpr(), True))
+        self.assertFalse(rc_model_kernel.is_supported(create_bpr(class_cs='CENTRAL_AC'), False))
+
+    def test_python_procedure_fallback(self):
+        """Buildings with air based systems or dynamic infiltration are simulated with the python procedure"""
+        buildings = [(create_bpr(), False, True),
+                     (create_bpr(class_hs='CENTRAL_AC'), False, False),
+                     (create_bpr(class_cs='DECENTRALIZED_AC'), False, False),
+                     (create_bpr(class_cs='HYBRID_AC'), False, False),
+                     (create_bpr(), True, False)]
+        for bpr, use_dynamic_infiltration, compiled in buildings:
+            # no hours to simulate, only the choice of the procedure is tested
+            with mock.patch.object(rc_model_kernel, 'calc_Qhs_Qcs') as kernel, \
+                    mock.patch.object(thermal_loads, 'get_hours', return_value=[]), \
+                    mock.patch.object(thermal_loads.ventilation_air_flows_detailed,
+                                      'get_properties_natural_ventilation'):
+                calc_Qhs_Qcs(bpr, create_tsd(), use_dynamic_infiltration, use_compiled_rc_model=True)
+            self.assertEqual(kernel.called, compiled)
+
+    def test_season_hours(self):
+        """The vector form of the seasons is the same as the hourly check"""
+        bpr = create_bpr()
+        heating_season = control_heating_cooling_systems.get_heating_season_hours(bpr)
+        cooling_season = control_heating_cooling_systems.get_cooling_season_hours(bpr)
+        for t in range(HOURS_IN_YEAR):
+            self.assertEqual(heating_season[t], control_heating_cooling_systems.is_heating_season(t, bpr))
+            self.assertEqual(cooling_season[t], control_heating_cooling_systems.is_cooling_season(t, bpr))
+
+    def assert_same_results(self, bpr, tsd):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            expected = calc_Qhs_Qcs(bpr, copy.deepcopy(tsd), False, use_compiled_rc_model=False)
+            actual = calc_Qhs_Qcs(bpr, copy.deepcopy(tsd), False, use_compiled_rc_model=True)
+
+        for key in rc_model_kernel.KERNEL_OUTPUT_KEYS:
+            np.testing.assert_allclose(actual[key], expected[key], rtol=1e-9, atol=1e-9, equal_nan=True,
+                                       err_msg=key)
+        for key in rc_model_kernel.STATUS_KEYS:
+            np.testing.assert_array_equal(actual[key], expected[key], err_msg=key)
+        np.testing.assert_allclose(actual['Q_loss_sen_ref'], expected['Q_loss_sen_ref'])
+
+
+def create_bpr(**hvac):
+    """a building with 1000 m2 of conditioned floor area and radiative heating / cooling"""
+    af = 1000.0
+    hvac_properties = {'class_hs': 'RADIATOR', 'class_cs': 'CEILING_COOLING',
+                       'has-heating-season': True, 'heat_starts': '16|09', 'heat_ends': '14|05',
+                       'has-cooling-season': True, 'cool_starts': '15|05', 'cool_ends': '15|09',
+                       'MECH_VENT': True, 'WIN_VENT': False, 'HEAT_REC': True, 'NIGHT_FLSH': True,
+                       'ECONOMIZER': True, 'Qhsmax_Wm2': 50.0, 'Qcsmax_Wm2': 30.0, 'convection_hs': 0.5,
+                       'convection_cs': 0.4, 'Tc_sup_air_ahu_C': np.nan, 'Tc_sup_air_aru_C': np.nan,
+                       'dT_Qhs': 1.2, 'dThs_C': -1.0, 'dT_Qcs': -1.2, 'dTcs_C': 0.5, 'type_ctrl': 'T1'}
+    hvac_properties.update(hvac)
+    rc_model = {'Af': af, 'Aef': af, 'Atot': 4.5 * af, 'Am': 2.5 * af, 'Awin_ag': 200.0, 'Cm': 165000.0 * af,
+                'Htr_op': 400.0, 'Htr_w': 300.0, 'U_win': 1.5, 'U_roof': 0.3, 'U_wall': 0.4, 'U_base': 0.4,
+                'Aroof': 250.0, 'Awall_ag': 600.0, 'Aop_bg': 250.0}
+    architecture = SimpleNamespace(Hs_ag=0.9, e_win=0.89, e_roof=0.9, e_wall=0.9, win_wall=0.3, n50=4.0)
+    hours = np.arange(HOURS_IN_YEAR)
+    solar = SimpleNamespace(I_sol=np.maximum(0.0, np.sin((hours % 24 - 6) / 12.0 * np.pi)) * 40000.0)
+    comfort = {'RH_max_pc': 70.0, 'Tcs_set_C': 26.0}
+    return SimpleNamespace(name='B1000', hvac=hvac_properties, rc_model=rc_model, architecture=architecture,
+                           solar=solar, comfort=comfort)
+
+
+def create_tsd():
+    """time series of a synthetic year with an office like occupancy"""
+    hours = np.arange(HOURS_IN_YEAR)
+    hour_of_day = hours % 24
+    day_time = (hour_of_day >= 8) & (hour_of_day < 18)
+    t_ext = 10.0 - 12.0 * np.cos(2 * np.pi * hours / HOURS_IN_YEAR) + 6.0 * np.sin((hour_of_day - 9) / 12.0 * np.pi)
+    weather_data = pd.DataFrame({'drybulb_C': t_ext, 'wetbulb_C': t_ext - 2.0,
+                                 'relhum_percent': 60.0 + 20.0 * np.cos(hours / 24.0),
+                                 'skytemp_C': t_ext - 10.0, 'windspd_ms': np.full(HOURS_IN_YEAR, 3.0)})
+    bpr = create_bpr()
+    tsd = initialize_timestep_data(bpr, weather_data)
+    tsd['ve_lps'] = np.where(day_time, 1000.0, 0.0)
+    tsd['Qs'] = np.where(day_time, 7000.0, 0.0)
+    tsd['El'] = np.where(day_time, 8000.0, 500.0)
+    tsd['Ea'] = np.where(day_time, 10000.0, 1000.0)
+    tsd['Epro'] = np.zeros(HOURS_IN_YEAR)
+    tsd['w_int'] = np.where(day_time, 0.002, 0.0)
+    tsd['Qcdata_sys'] = np.zeros(HOURS_IN_YEAR)
+    tsd['Qcre_sys'] = np.zeros(HOURS_IN_YEAR)
+    tsd['RSE_wall'] = tsd['RSE_roof'] = tsd['RSE_win'] = np.full(HOURS_IN_YEAR, 0.04)
+    tsd['ta_hs_set'] = np.where(control_heating_cooling_systems.get_heating_season_hours(bpr),
+                                np.where(day_time, 21.0, 18.0), np.nan)
+    tsd['ta_cs_set'] = np.where(control_heating_cooling_systems.get_cooling_season_hours(bpr) & day_time, 26.0,
+                                np.nan)
+    return tsd
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,14 +9,17 @@ import json
 import os
 import unittest
 
+import numpy as np
 import pandas as pd
 
 import cea.config
 from cea.datamanagement.archetypes_mapper import calculate_average_multiuse
 from cea.demand.building_properties import BuildingProperties
-from cea.demand.schedule_maker.schedule_maker import schedule_maker_main
+from cea.demand.schedule_maker.schedule_maker import schedule_maker_main, get_year_index, get_yearly_vectors, \
+    calc_stochastic_occupancy_schedule, calculate_transition_probabilities, get_random_generator
 from cea.inputlocator import ReferenceCaseOpenLocator
 from cea.utilities import epwreader
+from cea.utilities.date import get_date_range_hours_from_year
 
 REFERENCE_TIME = 3456
 
@@ -76,6 +79,56 @@ class TestScheduleCreation(unittest.TestCase):
                                                                                        reference_results[schedule]))
 
 
+class TestYearlyVectors(unittest.TestCase):
+    def test_yearly_vectors(self):
+        """the yearly vector picks the value of the day type and hour, scaled by the monthly multiplier"""
+        date_range = get_date_range_hours_from_year(2005)
+        daily_schedules = np.concatenate([np.linspace(0.0, 1.0, 24), np.full(24, 0.5), np.zeros(24)])
+        monthly_multiplier = [0.1 * (month + 1) for month in range(12)]
+
+        yearly_vector = get_yearly_vectors(get_year_index(date_range), 3, daily_schedules, monthly_multiplier)
+        for t in [0, 8, 123, 4000, 8759]:
+            date = date_range[t]
+            day_type = {5: 1, 6: 2}.get(date.dayofweek, 0)  # weekday, saturday, sunday
+            expected = daily_schedules[day_type * 24 + date.hour] * monthly_multiplier[date.month - 1]
+            self.assertEqual(yearly_vector[t], expected)
+
+        normalized = get_yearly_vectors(get_year_index(date_range), 3, daily_schedules, monthly_multiplier,
+                                        normalize_first_daily_profile=True)
+        self.assertAlmostEqual(normalized[date_range.dayofweek < 5][:24].sum(), monthly_multiplier[0])
+        self.assertTrue((normalized[date_range.dayofweek == 6] == 0.0).all())
+
+
+class TestStochasticOccupancy(unittest.TestCase):
+    def test_transition_probabilities(self):
+        """the vector form gives the same probabilities as the time steps one by one"""
+        mu = np.array([0.0, 0.25, 0.5])
+        schedule = np.array([0.0, 0.2, 0.9, 1.0, 0.5, 0.0])
+        T01, T11 = calculate_transition_probabilities(mu[np.newaxis, :], schedule[:-1, np.newaxis],
+                                                      schedule[1:, np.newaxis])
+        for t in range(len(schedule) - 1):
+            for i in range(len(mu)):
+                m = (mu[i] - 1) / (mu[i] + 1)
+                P0, P1 = schedule[t], schedule[t + 1]
+                self.assertAlmostEqual(T01[t, i], min(1, m * P0 + P1))
+                expected_T11 = ((P0 - 1) / P0) * (m * P0 + P1) + P1 / P0 if P0 != 0 else 0
+                self.assertAlmostEqual(T11[t, i], min(1, expected_T11))
+
+    def test_seeded_schedules(self):
+        deterministic_schedule = np.tile(np.concatenate([np.zeros(8), np.full(10, 0.8), np.zeros(6)]), 365)
+        occupancy = calc_stochastic_occupancy_schedule(deterministic_schedule, 300, get_random_generator(42, 'B1011'))
+        same_seed = calc_stochastic_occupancy_schedule(deterministic_schedule, 300, get_random_generator(42, 'B1011'))
+        other_building = calc_stochastic_occupancy_schedule(deterministic_schedule, 300,
+                                                            get_random_generator(42, 'B1012'))
+        np.testing.assert_array_equal(occupancy, same_seed)
+        self.assertFalse((occupancy == other_building).all())
+
+        # nobody arrives or stays while the deterministic schedule is empty, the mean presence follows the schedule
+        empty = (deterministic_schedule[1:] == 0.0) & (deterministic_schedule[:-1] == 0.0)
+        self.assertEqual(occupancy[1:][empty].max(), 0.0)
+        self.assertAlmostEqual(occupancy.sum() / (300 * deterministic_schedule.sum()), 1.0, delta=0.05)
+
+
 def get_test_config_path():
     """return the path to the test data configuration file (``cea/tests/test_schedules.config``)"""
     return os.path.join(os.path.dirname(__file__), 'test_schedules.config')
@@ -0,0 +1,76 @@
+"""
+Test the compiled collector model of the solar collectors and the photovoltaic-thermal panels
+(cea.technologies.solar.solar_collector.calc_collector_model) against the results of the previous, python
+implementation of the hourly loop
+"""
+
+
+
+
+import unittest
+
+import numpy as np
+
+try:
+    from cea.technologies.solar import solar_collector, photovoltaic_thermal
+except ImportError:
+    # the solar technologies need GDAL
+    solar_collector = None
+
+HOURS = 72
+# hours of the results compared to the reference values
+REFERENCE_HOURS = [9, 12, 17, 18, 33, 41, 43, 62]
+
+
+def create_inputs():
+    """three days with the flow switched on during the day and a lower flow in the afternoon of the second day"""
+    hour = np.arange(HOURS)
+    Tamb_vector_C = 8.0 + 6.0 * np.sin(2 * np.pi * (hour - 9) / 24)
+    q_rad_vector_Wperm2 = np.maximum(0.0, 850.0 * np.sin(np.pi * (hour % 24 - 6) / 12))
+    specific_flows_kgpers = np.where((hour % 24 >= 8) & (hour % 24 <= 17), 0.045, 0.0)
+    specific_flows_kgpers[40:44] = 0.02
+    return Tamb_vector_C, q_rad_vector_Wperm2, specific_flows_kgpers
+
+
+@unittest.skipIf(solar_collector is None, "GDAL is not installed")
+class TestCollectorModel(unittest.TestCase):
+    def test_solar_collector(self):
+        Tamb_vector_C, q_rad_vector_Wperm2, specific_flows_kgpers = create_inputs()
+        temperature_out_C, supply_out_kW = solar_collector.calc_collector_model(
+            60.0, Tamb_vector_C, q_rad_vector_Wperm2, np.full(HOURS, 3.91), 0.0113, specific_flows_kgpers, 10, 10,
+            8000.0, 3680.0, 1.8)
+
+        self.assertAlmostEqual(temperature_out_C.sum(), 2398.6960114693165, places=8)
+        self.assertAlmostEqual(supply_out_kW.sum(), 20.59853173435829, places=10)
+        np.testing.assert_allclose(temperature_out_C[REFERENCE_HOURS],
+                                   [63.85381068238229, 66.73480500151197, 60.155374843247955, 12.242640687119309,
+                                    63.85381068238229, 60.401895997445536, 54.9632643095278, 65.62898280496506],
+                                   rtol=1e-10)
+        np.testing.assert_allclose(supply_out_kW[REFERENCE_HOURS],
+                                   [0.6381910490025069, 1.1152837082503826, 0.02573007404186137, 0.0,
+                                    0.6381910490025069, 0.029579545411991426, -0.37070374681875384,
+                                    0.9321595525022143], rtol=1e-9, atol=1e-12)
+
+    def test_photovoltaic_thermal(self):
+        Tamb_vector_C, q_rad_vector_Wperm2, specific_flows_kgpers = create_inputs()
+        # the heat loss coefficient of the PVT panels depends on the radiation absorbed by the PV cells
+        c1_vector = photovoltaic_thermal.calc_cl_pvt(0.0035, 0.9 * q_rad_vector_Wperm2, 3.91, 0.16)
+        # the PVT panels keep the temperatures of all segments but the last one between the hours
+        temperature_out_C, supply_out_kW = solar_collector.calc_collector_model(
+            60.0, Tamb_vector_C, q_rad_vector_Wperm2, c1_vector, 0.0113, specific_flows_kgpers, 10, 9, 8000.0,
+            3680.0, 1.8)
+
+        self.assertAlmostEqual(temperature_out_C.sum(), 2407.6597125681033, places=8)
+        self.assertAlmostEqual(supply_out_kW.sum(), 21.41257855021068, places=10)
+        np.testing.assert_allclose(temperature_out_C[REFERENCE_HOURS],
+                                   [64.0224970017066, 66.95262735172878, 60.20555233999784, 12.242640687119309,
+                                    64.0224970017066, 60.499635713902876, 54.98647439321553, 65.80721988113947],
+                                   rtol=1e-10)
+        np.testing.assert_allclose(supply_out_kW[REFERENCE_HOURS],
+                                   [0.6661255034826125, 1.1513550894462858, 0.03403946750364179, 0.0,
+                                    0.6661255034826125, 0.03677318854325168, -0.36899548465933696,
+                                    0.9616756123166968], rtol=1e-9, atol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+Test the sensor results read by cea.utilities.solar_equations.filter_low_potential, the position of the sun
+calculated by cea.utilities.solar_equations.calc_sun_position, the categories and groups of the sensors
+(cea.utilities.solar_equations.calc_categoriesroof and calc_groups) and the totals of the building results summed by
+cea.utilities.solar_equations.BuildingResultsTotals
+"""
+
+
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from cea import MissingInputDataException
+from cea.constants import HOURS_IN_YEAR
+from cea.utilities import solar_equations
+from cea.utilities.date import get_date_range_hours_from_year
+
+
+class TestFilterLowPotential(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.radiation_path = os.path.join(self.folder, 'B001_insolation_Whm2.npy')
+        self.metadata_path = os.path.join(self.folder, 'B001_geometry.csv')
+        rng = np.random.default_rng(3)
+        num_sensors = 60
+        self.sensors_rad = np.clip(rng.normal(100.0, 250.0, (num_sensors, HOURS_IN_YEAR)), 0.0, 900.0)
+        np.save(self.radiation_path, self.sensors_rad.astype(np.float32))
+        pd.DataFrame({'BUILDING': 'B001',
+                      'SURFACE': ['srf%i' % i for i in range(num_sensors)],
+                      'TYPE': rng.choice(['walls', 'roofs', 'windows'], num_sensors),
+                      'AREA_m2': rng.random(num_sensors)}).to_csv(self.metadata_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_read_sensor_results(self):
+        self.assertEqual(solar_equations.read_sensor_results(self.radiation_path).shape, self.sensors_rad.shape)
+        np.testing.assert_allclose(solar_equations.read_sensor_results(self.radiation_path, [5, 2]),
+                                   self.sensors_rad[[5, 2]], rtol=1e-6)
+
+    def test_legacy_sensor_results(self):
+        """the json sensor results of older versions of the radiation script are not read"""
+        os.remove(self.radiation_path)
+        with open(os.path.splitext(self.radiation_path)[0] + '.json', 'w') as f:
+            f.write('{"srf0": [0.0]}')
+        with self.assertRaises(MissingInputDataException):
+            solar_equations.read_sensor_results(self.radiation_path)
+
+    def test_filter_low_potential(self):
+        config = SimpleNamespace(solar=SimpleNamespace(panel_on_roof=True, panel_on_wall=False,
+                                                       annual_radiation_threshold=300))
+        max_annual_radiation, threshold, sensors_rad_clean, sensors_metadata_clean = \
+            solar_equations.filter_low_potential(self.radiation_path, self.metadata_path, config)
+
+        total_rad = self.sensors_rad.sum(axis=1)
+        self.assertAlmostEqual(max_annual_radiation, total_rad.max(), delta=1e-6 * total_rad.max())
+        self.assertEqual(threshold, 300000.0)
+        self.assertTrue((sensors_metadata_clean.TYPE == 'roofs').all())
+        self.assertTrue((sensors_metadata_clean.total_rad_Whm2 >= threshold).all())
+        self.assertEqual(list(sensors_rad_clean.columns), list(sensors_metadata_clean.index))
+        sensors = [int(surface[len('srf'):]) for surface in sensors_metadata_clean.index]
+        expected = np.where(self.sensors_rad[sensors] <= 50.0, 0.0, self.sensors_rad[sensors]).T
+        np.testing.assert_allclose(sensors_rad_clean.values, expected, rtol=1e-6)
+
+
+class TestSunPosition(unittest.TestCase):
+    def test_same_as_pyephem(self):
+        # Zurich, Singapore, Sydney, New York
+        for latitude, longitude, time_zone in [(47.45, 8.55, 'Etc/GMT-1'), (1.35, 103.8, 'Etc/GMT-8'),
+                                               (-33.9, 151.2, 'Etc/GMT-10'), (40.7, -74.0, 'Etc/GMT+5')]:
+            datetime_local = get_date_range_hours_from_year(2030).tz_localize(time_zone)
+            expected = solar_equations.pyephem(datetime_local, latitude, longitude)
+            sun_position = solar_equations.calc_sun_position(datetime_local, latitude, longitude)
+
+            np.testing.assert_allclose(sun_position['elevation'], expected['elevation'], rtol=0.0, atol=0.02)
+            np.testing.assert_allclose(sun_position['zenith'], expected['zenith'], rtol=0.0, atol=0.02)
+            # the azimuth is not well defined when the sun is close to the zenith (or the nadir)
+            azimuth_difference = (sun_position['azimuth'] - expected['azimuth'] + 180.0) % 360.0 - 180.0
+            self.assertLess(np.abs(azimuth_difference[expected['elevation'].abs() < 80.0]).max(), 0.1)
+
+
+class TestCalcGroups(unittest.TestCase):
+    def test_categories(self):
+        teta_z = np.array([-100.0, -40.0, 0.0, 40.0, 100.0, 150.0])
+        B = np.radians([3.0, 10.0, 20.0, 30.0, 50.0, 70.0])
+        GB = np.array([50.0, 150.0, 450.0, 700.0, 950.0, 1000.0])
+        CATteta_z, CATB, CATGB = solar_equations.calc_categoriesroof(teta_z, B, GB, 1000.0)
+        self.assertEqual(list(CATteta_z), [1, 3, 5, 4, 2, 6])
+        self.assertEqual(list(CATB), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(list(CATGB), [1, 2, 5, 7, 10, 10])
+
+        # out of the expected range
+        CATteta_z, CATB, CATGB = solar_equations.calc_categoriesroof(teta_z[:2], np.array([0.0, B[1]]),
+                                                                     np.array([-1.0, 500.0]), 1000.0)
+        self.assertTrue(np.isnan(CATB[0]))
+        self.assertEqual(CATB[1], 2)
+        self.assertTrue(np.isnan(CATGB[0]))
+        self.assertEqual(CATGB[1], 5)
+
+    def test_same_as_pandas(self):
+        rng = np.random.default_rng(5)
+        num_sensors = 500
+        surfaces = ['srf%i' % i for i in range(num_sensors)]
+        sensors_metadata_cat = pd.DataFrame({'TYPE': rng.choice(['walls', 'roofs'], num_sensors),
+                                             'orientation': rng.choice(['north', 'south'], num_sensors),
+                                             'CATB': rng.integers(1, 4, num_sensors),
+                                             'CATGB': rng.integers(1, 4, num_sensors),
+                                             'CATteta_z': rng.integers(1, 3, num_sensors),
+                                             'B_deg': 90.0 * rng.random(num_sensors),
+                                             'AREA_m2': rng.random(num_sensors),
+                                             'area_installed_module_m2': rng.random(num_sensors)}, index=surfaces)
+        radiation_of_sensors_clean = pd.DataFrame(500.0 * rng.random((HOURS_IN_YEAR, num_sensors)), columns=surfaces)
+
+        panel_groups = solar_equations.calc_groups(radiation_of_sensors_clean, sensors_metadata_cat)
+
+        # reference: pandas groupby of the sensors
+        grouped = sensors_metadata_cat.groupby(['CATB', 'CATGB', 'CATteta_z', 'type_orientation'])
+        self.assertEqual(panel_groups['number_groups'], grouped.ngroups)
+        prop_observers = panel_groups['prop_observers']
+        for group, (key, sensors) in enumerate(grouped):
+            self.assertEqual(panel_groups['number_points'][group], len(sensors))
+            self.assertEqual(tuple(prop_observers.loc[group, ['CATB', 'CATGB', 'CATteta_z', 'type_orientation']]),
+                             key)
+            self.assertAlmostEqual(prop_observers.loc[group, 'B_deg'], sensors['B_deg'].mean(), places=10)
+            self.assertAlmostEqual(prop_observers.loc[group, 'AREA_m2'], sensors['AREA_m2'].sum(), places=10)
+            self.assertEqual(prop_observers.loc[group, 'srfs'], ''.join(sensors.index))
+            np.testing.assert_allclose(panel_groups['hourlydata_groups'][group],
+                                       radiation_of_sensors_clean[sensors.index].mean(axis=1), rtol=1e-10)
+
+    def test_sensors_without_category(self):
+        surfaces = ['srf0', 'srf1', 'srf2']
+        sensors_metadata_cat = pd.DataFrame({'TYPE': 'roofs', 'orientation': 'top', 'CATB': [1, np.nan, 1],
+                                             'CATGB': 5, 'CATteta_z': 5, 'B_deg': [10.0, 20.0, 30.0],
+                                             'AREA_m2': 1.0, 'area_installed_module_m2': 0.5}, index=surfaces)
+        radiation_of_sensors_clean = pd.DataFrame(np.array([[100.0, 200.0, 300.0]] * HOURS_IN_YEAR),
+                                                  columns=surfaces)
+
+        panel_groups = solar_equations.calc_groups(radiation_of_sensors_clean, sensors_metadata_cat)
+
+        # the sensor without a category is not in a group
+        self.assertEqual(panel_groups['number_groups'], 1)
+        self.assertEqual(panel_groups['number_points'], {0: 2})
+        self.assertEqual(panel_groups['prop_observers'].loc[0, 'B_deg'], 20.0)
+        self.assertEqual(panel_groups['prop_observers'].loc[0, 'srfs'], 'srf0srf2')
+        np.testing.assert_allclose(panel_groups['hourlydata_groups'][0], 200.0)
+
+
+class TestBuildingResultsTotals(unittest.TestCase):
+    def test_same_as_pandas(self):
+        rng = np.random.default_rng(1)
+        index = pd.Index(get_date_range_hours_from_year(2030).astype(str), name='Date')
+        building_names = ['B001', 'B002', 'B003']
+        hourly_results = {}
+        for name in building_names:
+            hourly_results[name] = pd.DataFrame({'PVT_roofs_top_Q_kWh': 10.0 * rng.random(HOURS_IN_YEAR),
+                                                 'PVT_roofs_top_m2': 50.0 * rng.random(),
+                                                 'T_PVT_re_C': np.where(rng.random(HOURS_IN_YEAR) > 0.5,
+                                                                        30.0 + 10.0 * rng.random(HOURS_IN_YEAR),
+                                                                        np.nan)}, index=index)
+
+        totals = solar_equations.BuildingResultsTotals(building_names, mean_columns=['T_PVT_re_C'])
+        for i in [2, 0, 1]:  # in the order the buildings are completed
+            totals.add(i, hourly_results[building_names[i]])
+
+        # reference: the sum of the DataFrames of the buildings
+        expected = sum(hourly_results[name] for name in building_names)
+        expected['T_PVT_re_C'] = pd.DataFrame([hourly_results[name]['T_PVT_re_C'] for name in building_names]).mean()
+        pd.testing.assert_frame_equal(totals.get_hourly_totals(), expected, rtol=1e-12)
+
+        annual_results = totals.get_annual_results()
+        self.assertEqual(list(annual_results.index), building_names)
+        self.assertEqual(list(annual_results.columns), ['PVT_roofs_top_Q_kWh', 'PVT_roofs_top_m2'])
+        for name in building_names:
+            self.assertAlmostEqual(annual_results.loc[name, 'PVT_roofs_top_Q_kWh'],
+                                   hourly_results[name]['PVT_roofs_top_Q_kWh'].sum(), places=6)
+            self.assertEqual(annual_results.loc[name, 'PVT_roofs_top_m2'],
+                             hourly_results[name]['PVT_roofs_top_m2'].iloc[0])
+
+    def test_column_order(self):
+        """the columns of the totals are in the order of the first building, not of the first building completed"""
+        index = pd.Index(['2030-01-01 00:00:00', '2030-01-01 01:00:00'], name='Date')
+        totals = solar_equations.BuildingResultsTotals(['B001', 'B002'])
+        totals.add(1, pd.DataFrame({'Area_PV_m2': [0.0, 0.0], 'E_PV_gen_kWh': [0.0, 0.0]}, index=index))
+        totals.add(0, pd.DataFrame({'E_PV_gen_kWh': [1.0, 2.0], 'Area_PV_m2': [5.0, 5.0]}, index=index))
+        self.assertEqual(list(totals.get_hourly_totals().columns), ['E_PV_gen_kWh', 'Area_PV_m2'])
+
+
+if __name__ == "__main__":
+    unittest.main()
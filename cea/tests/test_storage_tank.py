@@ -0,0 +1,59 @@
+"""
+Test the closed-form solution of the fully mixed tank in cea.technologies.storage_tank against scipy.integrate.odeint
+"""
+
+
+
+
+import unittest
+
+import numpy as np
+from scipy.integrate import odeint
+
+from cea.demand.constants import TWW_SETPOINT
+from cea.technologies import storage_tank
+
+# maximum difference to the tank temperatures integrated with odeint [K]
+TOLERANCE_K = 1e-6
+
+
+class TestStorageTank(unittest.TestCase):
+    def test_tank_temperature(self):
+        for tank_type, ode in [('hot_water', storage_tank.ode_hot_water_tank),
+                               ('cold_water', storage_tank.ode_cold_water_tank)]:
+            for V_tank_m3 in [0.0, 0.2, 150.0]:
+                args = (350.0, 1200.0, 3000.0, V_tank_m3)
+                expected = odeint(ode, 55.0, np.linspace(0, 1, 2), args=args)[1][0]
+                self.assertAlmostEqual(storage_tank.calc_tank_temperature(55.0, *(args + (tank_type,))), expected,
+                                       delta=TOLERANCE_K)
+        with self.assertRaises(ValueError):
+            storage_tank.calc_tank_temperature(55.0, 0.0, 0.0, 0.0, 1.0, 'ice')
+
+    def test_dhw_tank_temperatures(self):
+        rng = np.random.default_rng(42)
+        hours = 24 * 14
+        T_int_C = 20.0 + 4.0 * rng.random(hours)
+        T_ext_C = -5.0 + 30.0 * rng.random(hours)
+        q_discharged_W = np.where(rng.random(hours) > 0.6, 0.0, 5000.0 * rng.random(hours))
+        V_tank_m3 = 0.3
+
+        # reference: the hourly loop of cea.demand.hotwater_loads with odeint
+        expected_T_tank_C = np.zeros(hours)
+        expected_q_charged_W = np.zeros(hours)
+        area_tank_surface_m2 = storage_tank.calc_tank_surface_area(V_tank_m3)
+        T_start_C = TWW_SETPOINT
+        for k in range(hours):
+            q_loss_W, q_discharged, expected_q_charged_W[k] = storage_tank.calc_dhw_tank_heat_balance(
+                T_int_C[k], T_ext_C[k], T_start_C, V_tank_m3, q_discharged_W[k], area_tank_surface_m2)
+            T_start_C = expected_T_tank_C[k] = odeint(storage_tank.ode_hot_water_tank, T_start_C, np.linspace(0, 1, 2),
+                                                      args=(q_loss_W, q_discharged, expected_q_charged_W[k],
+                                                            V_tank_m3))[1][0]
+
+        T_tank_C, q_loss_W, q_charged_W = storage_tank.calc_dhw_tank_temperatures(T_int_C, T_ext_C, q_discharged_W,
+                                                                                  V_tank_m3, TWW_SETPOINT)
+        np.testing.assert_allclose(T_tank_C, expected_T_tank_C, rtol=0.0, atol=TOLERANCE_K)
+        np.testing.assert_allclose(q_charged_W, expected_q_charged_W, rtol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Test the solution of the air flow mass balance of the dynamic infiltration calculation
+(cea.demand.ventilation_air_flows_detailed.calc_air_flows)
+"""
+
+
+
+
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+from scipy.optimize import brentq
+
+from cea.demand import ventilation_air_flows_detailed
+
+
+class TestCalcAirFlows(unittest.TestCase):
+    def test_mass_balance(self):
+        rng = np.random.default_rng(7)
+        for _ in range(10):
+            bpr = SimpleNamespace(architecture=SimpleNamespace(n50=0.5 + 5.0 * rng.random()),
+                                  geometry={'footprint': 50.0 + 1000.0 * rng.random(),
+                                            'height_ag': 3.0 + 60.0 * rng.random(),
+                                            'perimeter': 20.0 + 200.0 * rng.random()})
+            dict_props_nat_vent = ventilation_air_flows_detailed.get_properties_natural_ventilation(bpr)
+            temp_zone, u_wind, temp_ext = 18.0 + 8.0 * rng.random(), 10.0 * rng.random(), -10.0 + 40.0 * rng.random()
+
+            qm_sum_in, qm_sum_out = ventilation_air_flows_detailed.calc_air_flows(temp_zone, u_wind, temp_ext,
+                                                                                  dict_props_nat_vent)
+
+            # reference: root of the mass balance of the python implementation
+            def qm_balance(p_zone):
+                return sum(ventilation_air_flows_detailed.calc_air_flow_mass_balance(
+                    p_zone, temp_zone, u_wind, temp_ext, dict_props_nat_vent, 'calculate'))
+
+            p_zone = brentq(qm_balance, -1000.0, 1000.0, xtol=1e-12)
+            expected_in, expected_out = ventilation_air_flows_detailed.calc_air_flow_mass_balance(
+                p_zone, temp_zone, u_wind, temp_ext, dict_props_nat_vent, 'calculate')
+
+            self.assertGreater(qm_sum_in, 0.0)
+            self.assertAlmostEqual(qm_sum_in, -qm_sum_out, delta=1e-6 * qm_sum_in)
+            self.assertAlmostEqual(qm_sum_in, expected_in, delta=1e-6 * expected_in)
+            self.assertAlmostEqual(qm_sum_out, expected_out, delta=1e-6 * expected_in)
+
+
+if __name__ == "__main__":
+    unittest.main()
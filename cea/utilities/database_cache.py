@@ -0,0 +1,184 @@
+"""
+Cached reading of the Excel databases (``locator.get_database_*``). Parsing an Excel workbook with ``pandas.read_excel``
+is slow and the same workbooks are read by many scripts (archetypes-mapper, radiation, demand, the dashboard...) and
+often several times by the same script (one call per worksheet).
+
+``read_excel`` replaces ``pandas.read_excel`` for these files:
+
+- all the worksheets of a workbook are parsed at once and kept in memory for the lifetime of the process
+- the parsed worksheets are stored in a pickled sidecar file in a folder of the temporary folder that only the current
+  user can access, so the next process (e.g. the next step of a workflow) does not need to parse the workbook again.
+  Sidecar files are only read from this folder if it is owned by the current user and not accessible to other users,
+  since loading a pickle can run arbitrary code.
+
+The in-memory copy is valid as long as the modification time and size of the workbook do not change. The sidecar file
+also stores the hash of the contents of the workbook, so copying a database (e.g. by the data-initializer) with a new
+modification time does not invalidate it.
+
+``read_file`` applies the same cache to other input files that are parsed by many scripts, e.g. the weather files
+(``cea.utilities.epwreader.epw_reader``).
+"""
+
+import getpass
+import hashlib
+import os
+import pickle
+import tempfile
+
+import pandas as pd
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# increase this to invalidate all sidecar files written before a change to this module
+CACHE_VERSION = 2
+
+FILE_CHUNK_SIZE = 1024 * 1024
+
+# (path, parse function, parse options) -> (modification time, size, parsed data)
+_files = {}
+
+
+def read_excel(path, sheet_name=0, **kwargs):
+    """
+    Same as ``pandas.read_excel(path, sheet_name, **kwargs)``, but the workbook is only parsed once. The DataFrames
+    returned are copies, they can be modified by the caller.
+
+    :param path: path to the workbook
+    :param sheet_name: the name (str) or position (int) of a worksheet, a list of those or None for all worksheets
+    :param kwargs: the options of ``pandas.read_excel`` used to parse the worksheets (e.g. ``keep_default_na``)
+    :return: a DataFrame or, if ``sheet_name`` is a list or None, a dict of DataFrames keyed by ``sheet_name``
+    """
+    worksheets = read_workbook(path, **kwargs)
+    if sheet_name is None:
+        return {name: worksheet.copy() for name, worksheet in worksheets.items()}
+    if isinstance(sheet_name, list):
+        return {name: get_worksheet(worksheets, name) for name in sheet_name}
+    return get_worksheet(worksheets, sheet_name)
+
+
+def get_worksheet(worksheets, sheet_name):
+    if isinstance(sheet_name, int):
+        sheet_name = list(worksheets.keys())[sheet_name]
+    if sheet_name not in worksheets:
+        raise ValueError("Worksheet named '%s' not found" % sheet_name)
+    return worksheets[sheet_name].copy()
+
+
+def read_workbook(path, **kwargs):
+    """
+    Return all the worksheets of the workbook at ``path`` (a dict of DataFrames keyed by the name of the worksheet).
+    The DataFrames are shared by all callers - don't modify them.
+    """
+    return read_file(path, pd.read_excel, sheet_name=None, **kwargs)
+
+
+def read_file(path, parse, version=None, **kwargs):
+    """
+    Return ``parse(path, **kwargs)``, parsing the file only once (see the module docstring). The value returned is
+    shared by all callers - don't modify it.
+
+    :param path: path to the file to parse
+    :param parse: function that parses the file, the pickled value it returns is stored in the sidecar file
+    :param version: version of ``parse``, change it to invalidate the sidecar files written by a previous version
+    :param kwargs: the arguments of ``parse``, they are part of the key of the cache
+    """
+    path = os.path.abspath(path)
+    key = (path, '%s.%s' % (parse.__module__, parse.__name__), version, tuple(sorted(kwargs.items())))
+    stat = os.stat(path)
+    if key in _files:
+        mtime, size, data = _files[key]
+        if mtime == stat.st_mtime and size == stat.st_size:
+            return data
+
+    sidecar_file = get_sidecar_file(key)
+    data = read_sidecar(sidecar_file, path, stat)
+    if data is None:
+        data = parse(path, **kwargs)
+        write_sidecar(sidecar_file, stat, hash_file(path), data)
+    _files[key] = (stat.st_mtime, stat.st_size, data)
+    return data
+
+
+def get_sidecar_file(key):
+    """the path of the sidecar file of ``key`` or None if there is no private folder for the sidecar files"""
+    cache_folder = get_cache_folder()
+    if cache_folder is None:
+        return None
+    key_hash = hashlib.sha1(repr((CACHE_VERSION, pd.__version__) + key).encode('utf-8')).hexdigest()
+    return os.path.join(cache_folder, key_hash + '.pickle')
+
+
+def get_cache_folder():
+    """
+    The folder of the sidecar files of the current user in the temporary folder, created with access for the current
+    user only. Returns None if the folder can't be created or if it is not private to the current user (e.g. it was
+    created by another user of a shared temporary folder).
+    """
+    try:
+        cache_folder = os.path.join(tempfile.gettempdir(), 'cea-database-cache-%s' % getpass.getuser())
+        os.makedirs(cache_folder, mode=0o700, exist_ok=True)
+        if os.path.islink(cache_folder) or not is_private(cache_folder):
+            return None
+    except (KeyError, IOError, OSError):
+        # e.g. no user name or a read-only temporary folder
+        return None
+    return cache_folder
+
+
+def is_private(path):
+    """True if ``path`` is owned by the current user and not accessible to other users (always True on Windows)"""
+    if not hasattr(os, 'getuid'):
+        # the temporary folder on Windows is in the profile of the user
+        return True
+    path_stat = os.stat(path)
+    return path_stat.st_uid == os.getuid() and not path_stat.st_mode & 0o077
+
+
+def read_sidecar(sidecar_file, path, stat):
+    """the data stored in the sidecar file or None if the sidecar file is missing, out of date or not private"""
+    if sidecar_file is None or not os.path.exists(sidecar_file) or not is_private(sidecar_file):
+        return None
+    try:
+        with open(sidecar_file, 'rb') as f:
+            sidecar = pickle.load(f)
+    except Exception:
+        # e.g. an incomplete file or a file written by a different version of pandas
+        return None
+    if sidecar['mtime'] == stat.st_mtime and sidecar['size'] == stat.st_size:
+        return sidecar['data']
+    if sidecar['size'] == stat.st_size and sidecar['hash'] == hash_file(path):
+        # same contents, e.g. the database was copied to the scenario again
+        write_sidecar(sidecar_file, stat, sidecar['hash'], sidecar['data'])
+        return sidecar['data']
+    return None
+
+
+def write_sidecar(sidecar_file, stat, file_hash, data):
+    """write the sidecar file to a temporary file first, so other processes never read an incomplete file"""
+    if sidecar_file is None:
+        return
+    sidecar = {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': file_hash, 'data': data}
+    try:
+        temporary_file = '%s.%i.tmp' % (sidecar_file, os.getpid())
+        with open(os.open(temporary_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+            pickle.dump(sidecar, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, sidecar_file)
+    except (IOError, OSError):
+        # the cache is an optimization only - e.g. a read-only temporary folder
+        pass
+
+
+def hash_file(path):
+    """hex digest of the contents of a file"""
+    file_hash = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(FILE_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
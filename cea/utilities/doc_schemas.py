@@ -12,6 +12,7 @@ NOTE: This is meant to help _write_ the schemas.yml file, not to CREATE it - you
 import os
 import yaml
 import json
+import numpy as np
 import pandas as pd
 from pandas.errors import EmptyDataError
 import dateutil.parser
@@ -62,6 +63,7 @@ def read_schema_details(abs_path, file_type, buildings):
         "tiff": get_tif_schema,
         "csv": get_csv_schema,
         "json": get_json_schema,
+        "npy": get_npy_schema,
         "epw": get_epw_schema,
         "dbf": get_dbf_schema,
         "shp": get_shp_schema,
@@ -145,6 +147,13 @@ def get_json_schema(filename, buildings):
     return schema
 
 
+def get_npy_schema(filename, buildings):
+    """the rows of the array (e.g. the sensors of a building) are documented as columns"""
+    array = np.load(filename, mmap_mode='r')
+    df = pd.DataFrame(np.asarray(array[:1]).T, columns=['srf0'])
+    return {"columns": {"srf0": get_column_schema(df["srf0"])}}
+
+
 def get_epw_schema(filename, _):
     epw_labels = ['year (index = 0)', 'month (index = 1)', 'day (index = 2)', 'hour (index = 3)',
                   'minute (index = 4)', 'datasource (index = 5)', 'drybulb_C (index = 6)',
@@ -5,10 +5,10 @@ Energyplus file reader
 
 
 import pandas as pd
-import math
 import cea.inputlocator
 import numpy as np
 from cea.constants import BOLTZMANN, KELVIN_OFFSET, HOURS_IN_YEAR
+from cea.utilities import database_cache
 from calendar import isleap
 
 __author__ = "Clayton Miller"
@@ -22,6 +22,9 @@ __status__ = "Production"
 
 from cea.utilities.date import get_date_range_hours_from_year
 
+# increase this to invalidate the cached weather data after a change to parse_epw_file
+EPW_READER_VERSION = 1
+
 
 def epw_to_dataframe(weather_path):
     epw_labels = ['year', 'month', 'day', 'hour', 'minute', 'datasource', 'drybulb_C', 'dewpoint_C', 'relhum_percent',
@@ -36,6 +39,20 @@ def epw_to_dataframe(weather_path):
 
 
 def epw_reader(weather_path):
+    """
+    Read the hourly weather data of a year from an EnergyPlus weather file, including the derived variables (wet bulb
+    and sky temperature...). The weather file is parsed once and cached (see
+    :py:func:`cea.utilities.database_cache.read_file`), so reading the same file again (also in another process, e.g.
+    the workers of a multiprocessing pool) is fast. The DataFrame returned is a copy, it can be modified by the caller.
+
+    :param weather_path: path to the .epw file
+    :rtype: pandas.DataFrame
+    """
+    return database_cache.read_file(weather_path, parse_epw_file, version=EPW_READER_VERSION).copy()
+
+
+def parse_epw_file(weather_path):
+    """parse the weather file and calculate the derived variables (see :py:func:`epw_reader`)"""
     epw_data = epw_to_dataframe(weather_path)
 
     year = epw_data["year"][0]
@@ -59,9 +76,9 @@ def epw_reader(weather_path):
 
     epw_data['ratio_diffhout'] = epw_data['difhorrad_Whm2'] / epw_data['glohorrad_Whm2']
     epw_data['ratio_diffhout'] = epw_data['ratio_diffhout'].replace(np.inf, np.nan)
-    epw_data['wetbulb_C'] = np.vectorize(calc_wetbulb)(epw_data['drybulb_C'], epw_data['relhum_percent'])
-    epw_data['skytemp_C'] = np.vectorize(calc_skytemp)(epw_data['drybulb_C'], epw_data['dewpoint_C'],
-                                                       epw_data['opaqskycvr_tenths'])
+    epw_data['wetbulb_C'] = calc_wetbulb(epw_data['drybulb_C'].values, epw_data['relhum_percent'].values)
+    epw_data['skytemp_C'] = calc_skytemp(epw_data['drybulb_C'].values, epw_data['dewpoint_C'].values,
+                                         epw_data['opaqskycvr_tenths'].values)
 
     return epw_data
 
@@ -73,13 +90,15 @@ def calc_skytemp(Tdrybulb, Tdewpoint, N):
     or:
     https://bigladdersoftware.com/epx/docs/8-6/engineering-reference/climate-calculations.html
 
+    All the arguments can be floats or arrays (e.g. the columns of the weather file).
+
     :param Tdrybulb: Dry bulb temperature [C]
     :param Tdewpoint: Wet bulb temperature [C]
     :param N: opaque skycover in [tenths], minimum is 0, maximum is 10 see: http://glossary.ametsoc.org/wiki/Sky_cover
     :return: sky temperature [C]
     """
 
-    sky_e = (0.787 + 0.764 * math.log((Tdewpoint + KELVIN_OFFSET) / KELVIN_OFFSET)) * (
+    sky_e = (0.787 + 0.764 * np.log((Tdewpoint + KELVIN_OFFSET) / KELVIN_OFFSET)) * (
             1 + 0.0224 * N - 0.0035 * N ** 2 + 0.00028 * N ** 3)
     hor_IR = sky_e * BOLTZMANN * (Tdrybulb + KELVIN_OFFSET) ** 4
     sky_T = ((hor_IR / BOLTZMANN) ** 0.25) - KELVIN_OFFSET
@@ -88,8 +107,11 @@ def calc_skytemp(Tdrybulb, Tdewpoint, N):
 
 
 def calc_wetbulb(Tdrybulb, RH):
-    Tw = Tdrybulb * math.atan(0.151977 * ((RH + 8.313659) ** (0.5))) + math.atan(Tdrybulb + RH) - math.atan(
-        RH - 1.676331) + (0.00391838 * (RH ** (3 / 2))) * math.atan(0.023101 * RH) - 4.686035
+    """
+    wet bulb temperature from the dry bulb temperature [C] and the relative humidity [%] (floats or arrays)
+    """
+    Tw = Tdrybulb * np.arctan(0.151977 * ((RH + 8.313659) ** (0.5))) + np.arctan(Tdrybulb + RH) - np.arctan(
+        RH - 1.676331) + (0.00391838 * (RH ** (3 / 2))) * np.arctan(0.023101 * RH) - 4.686035
 
     return Tw  # wetbulb temperature in C
 
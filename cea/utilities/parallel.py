@@ -11,12 +11,21 @@ not applying this technique to the demand script.
 
 This module exports the function `map` which is intended to replace both ``map_async`` and the builtin ``map`` function
 (which was used when ``config.multiprocessing == False``). This simplifies multiprocessing.
+
+Arguments that are the same for every call (e.g. the weather data, the locator or the config) should be wrapped with
+``broadcast`` instead of ``itertools.repeat``: they are stored once per vectorized call in a dict shared through a
+``multiprocessing.Manager`` and each worker process fetches them from the manager (once per vectorized call) instead of
+receiving them pickled with every call.
+
+The worker processes are kept alive between calls (see ``get_worker_pool``), so consecutive scripts - e.g. the steps of
+``cea workflow`` - reuse the same processes. The calls are dispatched to the workers one by one, longest jobs first if
+the ``costs`` of the calls are known.
 """
 
+import atexit
 import multiprocessing
 import sys
 import logging
-from itertools import repeat
 from cea.utilities.workerstream import stream_from_queue, QueueWorkerStream
 
 __author__ = "Daren Thomas"
@@ -29,7 +38,30 @@ __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
 
-def vectorize(func, processes=1, on_complete=None):
+class BroadcastArgument(object):
+    """An argument of a vectorized function that has the same (read-only) value for every call, see ``broadcast``"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+def broadcast(value):
+    """
+    Pass ``value`` to every call of a vectorized function. Use this instead of ``itertools.repeat(value, n)`` for
+    arguments that are expensive to pickle: with multiprocessing, ``value`` is sent to each worker process once when
+    the pool is created and not with every call. The value must not be modified by the vectorized function.
+
+    Example::
+
+        vectorize(calc_thermal_loads, processes)(building_names, broadcast(weather_data), broadcast(locator))
+
+    :param value: the argument passed to every call
+    :rtype: BroadcastArgument
+    """
+    return BroadcastArgument(value)
+
+
+def vectorize(func, processes=1, on_complete=None, costs=None, on_result=None):
     """
     Similar to ``numpy.vectorize``, this function wraps ``func`` so that it operates on sequences (of same length)
     of inputs and outputs a sequence of results, similar to ``map(func, *args)``.
@@ -46,72 +78,196 @@ def vectorize(func, processes=1, on_complete=None):
     - args: the arguments passed to this call to ``func``
     - result: the return value of this call to ``func``
 
+    The parameter ``on_result`` is an optional callable that is called in the main process with the index of each
+    call (the position of its arguments) and the value it returned, as soon as the call is completed. Use it to reduce
+    large results (e.g. to sum the hourly results of all the buildings) without keeping all of them in memory - the
+    return values passed to ``on_result`` are not kept, the vectorized function returns ``None`` for them.
+
     .. note: due to the way multiprocessing works, ``func`` and ``on_complete`` need to be module-level functions
 
     .. note: the if processes > 1, then the first argument to the vectorized ``func`` will be converted to a list before
         running. This should not have any side effects, but is necessary if the args are constructed with
         ``itertools.repeat``.
 
+    .. note: arguments wrapped with ``broadcast`` are passed to every call of ``func``. At least one of the arguments
+        must be a sequence.
+
     :param func: The function to vectorize
     :param int processes: The number of processes to use (use ``config.get_number_of_processes()``)
     :param on_complete: An optional function to call for each completed call to ``func``.
+    :param costs: An optional estimate of the run time of each call (e.g. the floor area of each building). The calls
+        are sent to the worker processes in the order of decreasing costs (longest job first), so no process is left
+        with a long job at the end. The results are returned in the order of the arguments regardless.
+    :type costs: list[float]
+    :param on_result: An optional function called in the main process with the index and the result of each call.
     """
     if processes > 1:
-        return __multiprocess_wrapper(func, processes, on_complete)
+        return __multiprocess_wrapper(func, processes, on_complete, costs, on_result)
     else:
-        return single_process_wrapper(func, on_complete)
+        return single_process_wrapper(func, on_complete, on_result)
 
 
-def __multiprocess_wrapper(func, processes, on_complete):
-    """Create a worker pool to map the function, taking care to set up STDOUT and STDERR"""
+def __multiprocess_wrapper(func, processes, on_complete, costs, on_result):
+    """Map the function on the worker pool, taking care to set up STDOUT and STDERR"""
 
     def wrapper(*args):
         print("Using {processes} CPU's".format(processes=processes))
-        pool = multiprocessing.Pool(processes)
-        manager = multiprocessing.Manager()
+
+        # make sure the args are lists (not generators) since we need the length of the sequence, the broadcast
+        # arguments are sent to the workers once
+        broadcast_args = dict((j, a.value) for j, a in enumerate(args) if isinstance(a, BroadcastArgument))
+        args = [list(a) for a in args if not isinstance(a, BroadcastArgument)]
+        n = len(args[0])  # the number of iterations to map
+
+        if costs is None:
+            order = list(range(n))
+        else:
+            # longest job first
+            order = sorted(range(n), key=lambda i: costs[i], reverse=True)
+
+        worker_pool = get_worker_pool(processes)
+        return worker_pool.map(func, on_complete, list(zip(*args)), broadcast_args, order, on_result)
+
+    return wrapper
+
+
+class WorkerPool(object):
+    """
+    A pool of worker processes that is kept alive between the calls to vectorized functions. STDOUT and STDERR of
+    the workers are sent through a queue (see ``cea.utilities.workerstream.QueueWorkerStream``).
+
+    The arguments that are the same for every call of a vectorized function (the function itself, ``on_complete`` and
+    the broadcast arguments) are stored in a dict shared with the workers. Each worker reads them once per vectorized
+    function, the tasks only contain the id of the vectorized call and the arguments of the call.
+    """
+
+    def __init__(self, processes):
+        self.processes = processes
+        self.manager = multiprocessing.Manager()
 
         # a queue for STDOUT and STDERR output of sub-processes (see cea.utilities.workerstream.QueueWorkerStream)
-        queue = manager.Queue()
+        self.queue = self.manager.Queue()
 
-        # make sure the first arg is a list (not a generator) since we need the length of the sequence
-        args = [list(a) for a in args]
-        n = len(args[0])  # the number of iterations to map
+        # the arguments that are the same for every call, by id of the vectorized call
+        self.contexts = self.manager.dict()
+        self.last_call_id = 0
+
+        self.pool = multiprocessing.Pool(processes, initializer=_initialize_worker,
+                                         initargs=(self.queue, self.contexts))
+
+    def map(self, func, on_complete, args, broadcast_args, order, on_result=None):
+        """
+        Call ``func`` with each tuple in ``args`` (in the sequence given by ``order``) and return the results in the
+        order of ``args``. If ``on_result`` is given, it is called with the index and the result of each call as soon
+        as the call is completed instead. The calls are sent to the workers one by one, so that ``order`` is kept.
+        """
+        n = len(args)
+        self.last_call_id += 1
+        call_id = self.last_call_id
 
         # set up the list of i-values for on_complete
-        i_queue = manager.Queue()
+        i_queue = self.manager.Queue()
         for i in range(n):
             i_queue.put(i)
 
-        args = [repeat(func, n),
-                repeat(queue, n),
-                repeat(on_complete, n),
-                repeat(i_queue, n),
-                repeat(n, n)] + args
-        args = zip(*args)
+        self.contexts[call_id] = (func, on_complete, i_queue, n, broadcast_args)
+        if on_result:
+            try:
+                self.map_unordered(call_id, args, order, on_result)
+            finally:
+                del self.contexts[call_id]
+                while not self.queue.empty():
+                    stream_from_queue(self.queue)
+            return [None] * n
+
+        try:
+            map_result = self.pool.map_async(_apply_func_with_worker_stream,
+                                             [(call_id,) + tuple(args[i]) for i in order], chunksize=1)
+
+            while not map_result.ready():
+                stream_from_queue(self.queue)
+            ordered_result = map_result.get()
+        finally:
+            del self.contexts[call_id]
+
+            # process the rest of the queue
+            while not self.queue.empty():
+                stream_from_queue(self.queue)
+
+        result = [None] * n
+        for i, r in zip(order, ordered_result):
+            result[i] = r
+        return result
+
+    def map_unordered(self, call_id, args, order, on_result):
+        """Pass the index and the result of each call to ``on_result`` in the order the calls are completed"""
+        results = self.pool.imap_unordered(_apply_func_with_index, [(i, (call_id,) + tuple(args[i])) for i in order],
+                                           chunksize=1)
+        completed = 0
+        try:
+            while completed < len(args):
+                try:
+                    i, result = results.next(timeout=0.1)
+                except multiprocessing.TimeoutError:
+                    stream_from_queue(self.queue)
+                    continue
+                completed += 1
+                on_result(i, result)
+        except Exception:
+            # wait for the other calls, so they don't run after the context of the vectorized call is removed
+            while True:
+                try:
+                    results.next()
+                except StopIteration:
+                    break
+                except Exception:
+                    pass
+            raise
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.manager.shutdown()
+
+
+# the worker pool of this process, see ``get_worker_pool``
+_worker_pool = None
+
+
+def get_worker_pool(processes):
+    """
+    Return the worker pool with ``processes`` processes. The pool is created the first time it is needed and reused
+    until a different number of processes is requested or the python process ends.
 
-        map_result = pool.map_async(__apply_func_with_worker_stream, args)
+    :rtype: WorkerPool
+    """
+    global _worker_pool
+    if _worker_pool is not None and _worker_pool.processes != processes:
+        shutdown_worker_pool()
+    if _worker_pool is None:
+        _worker_pool = WorkerPool(processes)
+    return _worker_pool
 
-        while not map_result.ready():
-            stream_from_queue(queue)
-        result = map_result.get()
 
-        pool.close()
-        pool.join()
+@atexit.register
+def shutdown_worker_pool():
+    """Stop the processes of the worker pool (if any)"""
+    global _worker_pool
+    if _worker_pool is not None:
+        _worker_pool.close()
+        _worker_pool = None
 
-        # process the rest of the queue
-        while not queue.empty():
-            stream_from_queue(queue)
-        return result
 
-    return wrapper
+# the state of a worker process (set by _initialize_worker)
+_worker_context = {}
 
 
-def __apply_func_with_worker_stream(args):
+def _initialize_worker(queue, contexts):
     """
-    Call func, using ``queue`` to redirect stdout and stderr, with a tuple of args because multiprocessing.Pool.map
-    only accepts one argument for the function.
+    Set up printing to stderr and stdout to go through the queue and keep a reference to the arguments that are the
+    same for every call.
 
-    This function is called _inside_ a separate process.
+    This function is called _inside_ a separate process, once when the process is started.
     """
 
     # set up logging
@@ -120,13 +276,29 @@ def __apply_func_with_worker_stream(args):
     from cea import suppress_3rd_party_debug_loggers
     suppress_3rd_party_debug_loggers()
 
-    # unpack the arguments
-    func, queue, on_complete, i_queue, n, args = args[0], args[1], args[2], args[3], args[4], args[5:]
+    _worker_context.update(contexts=contexts, call_id=None)
 
     # set up printing to stderr and stdout to go through the queue
     sys.stdout = QueueWorkerStream('stdout', queue)
     sys.stderr = QueueWorkerStream('stderr', queue)
 
+
+def _apply_func_with_worker_stream(args):
+    """
+    Call func with a tuple of args because multiprocessing.Pool.map only accepts one argument for the function. The
+    first element of ``args`` is the id of the vectorized call, the broadcast arguments are inserted at their
+    positions.
+
+    This function is called _inside_ a separate process.
+    """
+    call_id, args = args[0], args[1:]
+    if _worker_context['call_id'] != call_id:
+        # first call of this vectorized function in this worker
+        _worker_context['call_id'] = call_id
+        _worker_context['context'] = _worker_context['contexts'][call_id]
+    func, on_complete, i_queue, n, broadcast_args = _worker_context['context']
+    args = insert_broadcast_args(args, broadcast_args)
+
     # CALL
     result = func(*args)
 
@@ -136,19 +308,41 @@ def __apply_func_with_worker_stream(args):
     return result
 
 
-def single_process_wrapper(func, on_complete):
+def _apply_func_with_index(args):
+    """Same as ``_apply_func_with_worker_stream``, ``args`` is the index of the call and its arguments"""
+    i, args = args
+    return i, _apply_func_with_worker_stream(args)
+
+
+def insert_broadcast_args(args, broadcast_args):
+    """
+    Return the full tuple of arguments of a call: ``broadcast_args`` maps the position of each broadcast argument to
+    its value, ``args`` are the other arguments in order.
+    """
+    args = list(args)
+    for j in sorted(broadcast_args.keys()):
+        args.insert(j, broadcast_args[j])
+    return tuple(args)
+
+
+def single_process_wrapper(func, on_complete, on_result=None):
     """The simplest form of vectorization: Just loop"""
 
     def wrapper(*args):
         print("Using single process")
 
-        args = [list(a) for a in args]
+        broadcast_args = dict((j, a.value) for j, a in enumerate(args) if isinstance(a, BroadcastArgument))
+        args = [list(a) for a in args if not isinstance(a, BroadcastArgument)]
         n = len(args[0])
+        args = [insert_broadcast_args(instance_args, broadcast_args) for instance_args in zip(*args)]
         map_result = []
-        for i, instance_args in enumerate(zip(*args)):
+        for i, instance_args in enumerate(args):
             result = func(*instance_args)
             if on_complete:
                 on_complete(i, n, instance_args, result)
+            if on_result:
+                on_result(i, result)
+                result = None
             map_result.append(result)
         return map_result
 
@@ -162,3 +356,4 @@ def test(a, b):
 
 if __name__ == '__main__':
     print(vectorize(test, 4)(range(10, 20), range(20, 30)))
+    print(vectorize(test, 4)(range(10, 20), broadcast(100)))
@@ -42,19 +42,12 @@ def read_cea_schedule(path_to_cea_schedule):
     :return: schedule data, schedule complementary data
     """
 
+    # the file is parsed in one pass: the two header rows first, then the schedules table
     with open(path_to_cea_schedule) as f:
-        reader = csv.reader(f)
-        for i, row in enumerate(reader):
-            if i == 0:
-                metadata = row[1]
-            elif i == 1:
-                monthly_multiplier = [round(float(x), 2) for x in row[1:]]
-            else:
-                # skip all the other rows
-                break
-
-    schedule_data = pd.read_csv(path_to_cea_schedule, skiprows=2).T
-    schedule_data = dict(zip(schedule_data.index, schedule_data.values))
+        metadata = next(csv.reader([f.readline()]))[1]
+        monthly_multiplier = [round(float(x), 2) for x in next(csv.reader([f.readline()]))[1:]]
+        schedule_data = pd.read_csv(f)
+    schedule_data = dict((column, schedule_data[column].values) for column in schedule_data.columns)
     schedule_complementary_data = {'METADATA': metadata, 'MONTHLY_MULTIPLIER': monthly_multiplier}
 
     return schedule_data, schedule_complementary_data
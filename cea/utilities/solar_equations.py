@@ -5,15 +5,19 @@ solar equations
 
 
 
+import os
 import numpy as np
 import pandas as pd
 import ephem
 import datetime
 import collections
+import scipy.sparse
 from math import *
 from timezonefinder import TimezoneFinder
 import pytz
+from cea import MissingInputDataException
 from cea.constants import HOURS_IN_YEAR
+from cea.utilities import database_cache, epwreader
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -26,6 +30,9 @@ __status__ = "Production"
 
 from cea.utilities.date import get_date_range_hours_from_year
 
+# increase this to invalidate the cached sun properties (``get_sun_properties``) after a change to their calculation
+SUN_PROPERTIES_VERSION = 1
+
 
 def _ephem_setup(latitude, longitude, altitude, pressure, temperature):
     # observer
@@ -89,6 +96,64 @@ def pyephem(datetime_local, latitude, longitude, altitude=0, pressure=101325,
     return sun_coords
 
 
+def calc_sun_position(datetime_local, latitude, longitude):
+    """
+    Calculate the position of the sun (without atmospheric refraction) for all the hours of the year at once, with the
+    algorithm of the NOAA solar calculator (based on Meeus, Astronomical Algorithms). The difference to ``pyephem`` is
+    about 0.01 degrees for the elevation and the azimuth (except for a sun close to the zenith or the nadir, where the
+    azimuth is not well defined).
+
+    :param datetime_local: the localized dates of the hours of the year
+    :type datetime_local: pd.DatetimeIndex
+    :param latitude: latitude of the case study location [degree]
+    :param longitude: longitude of the case study location [degree]
+    :return: elevation, azimuth (0 degree north, east positive) and zenith of the sun [degree]
+    :rtype: pd.DataFrame
+    """
+    datetime_utc = datetime_local.tz_convert('UTC')
+    julian_century = (datetime_utc.tz_localize(None).to_julian_date().values - 2451545.0) / 36525.0
+
+    # geometric mean longitude, mean anomaly and eccentricity of the orbit of the earth
+    mean_longitude_deg = (280.46646 + julian_century * (36000.76983 + julian_century * 0.0003032)) % 360
+    mean_anomaly = np.radians(357.52911 + julian_century * (35999.05029 - 0.0001537 * julian_century))
+    eccentricity = 0.016708634 - julian_century * (0.000042037 + 0.0000001267 * julian_century)
+
+    # apparent longitude of the sun and obliquity of the ecliptic
+    equation_of_center_deg = (
+            np.sin(mean_anomaly) * (1.914602 - julian_century * (0.004817 + 0.000014 * julian_century))
+            + np.sin(2 * mean_anomaly) * (0.019993 - 0.000101 * julian_century)
+            + np.sin(3 * mean_anomaly) * 0.000289)
+    omega = np.radians(125.04 - 1934.136 * julian_century)
+    apparent_longitude = np.radians(mean_longitude_deg + equation_of_center_deg - 0.00569 - 0.00478 * np.sin(omega))
+    mean_obliquity_deg = 23 + (26 + (21.448 - julian_century * (
+            46.815 + julian_century * (0.00059 - julian_century * 0.001813))) / 60) / 60
+    obliquity = np.radians(mean_obliquity_deg + 0.00256 * np.cos(omega))
+    declination = np.arcsin(np.sin(obliquity) * np.sin(apparent_longitude))
+
+    # true solar time and hour angle
+    mean_longitude = np.radians(mean_longitude_deg)
+    y = np.tan(obliquity / 2) ** 2
+    equation_of_time_min = 4 * np.degrees(y * np.sin(2 * mean_longitude)
+                                          - 2 * eccentricity * np.sin(mean_anomaly)
+                                          + 4 * eccentricity * y * np.sin(mean_anomaly) * np.cos(2 * mean_longitude)
+                                          - 0.5 * y ** 2 * np.sin(4 * mean_longitude)
+                                          - 1.25 * eccentricity ** 2 * np.sin(2 * mean_anomaly))
+    minutes_utc = datetime_utc.hour.values * 60 + datetime_utc.minute.values + datetime_utc.second.values / 60
+    true_solar_time_min = (minutes_utc + equation_of_time_min + 4 * longitude) % 1440
+    hour_angle = np.radians(true_solar_time_min / 4 - 180)
+
+    # zenith and azimuth
+    latitude_rad = np.radians(latitude)
+    cos_zenith = (np.sin(latitude_rad) * np.sin(declination)
+                  + np.cos(latitude_rad) * np.cos(declination) * np.cos(hour_angle))
+    zenith = np.degrees(np.arccos(np.clip(cos_zenith, -1.0, 1.0)))
+    azimuth = np.degrees(np.arctan2(np.sin(hour_angle), np.cos(hour_angle) * np.sin(latitude_rad)
+                                    - np.tan(declination) * np.cos(latitude_rad)))
+
+    return pd.DataFrame({'elevation': 90 - zenith, 'azimuth': (azimuth + 180) % 360, 'zenith': zenith},
+                        index=datetime_local)
+
+
 # solar properties
 SunProperties = collections.namedtuple('SunProperties', ['g', 'Sz', 'Az', 'ha', 'trr_mean', 'worst_sh', 'worst_Az'])
 def calc_datetime_local_from_weather_file(weather_data, latitude, longitude):
@@ -129,26 +194,47 @@ def get_local_etc_timezone(latitude, longitude):
 
     return time_zone
 
-def calc_sun_properties(latitude, longitude, weather_data, datetime_local, config):
-    solar_window_solstice = config.solar.solar_window_solstice
-    hour_date = datetime_local.hour
-    min_date = datetime_local.minute
-    day_date = datetime_local.dayofyear
+
+def get_sun_properties(weather_path, latitude, longitude, config):
+    """
+    The sun properties of the case study location (see ``calc_sun_properties``). They only depend on the weather file,
+    the location and ``config.solar.solar_window_solstice``, so they are calculated once and then read from the cache
+    (see ``cea.utilities.database_cache.read_file``) by every script and worker process.
+
+    :param weather_path: path to the weather file of the case study location
+    :rtype: SunProperties
+    """
+    return database_cache.read_file(weather_path, calc_sun_properties_from_weather_file,
+                                    version=SUN_PROPERTIES_VERSION, latitude=float(latitude),
+                                    longitude=float(longitude),
+                                    solar_window_solstice=config.solar.solar_window_solstice)
+
+
+def calc_sun_properties_from_weather_file(weather_path, latitude, longitude, solar_window_solstice):
+    weather_data = epwreader.epw_reader(weather_path)
+    datetime_local = calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
+    return calc_sun_properties(latitude, longitude, weather_data, datetime_local, solar_window_solstice)
+
+
+def calc_sun_properties(latitude, longitude, weather_data, datetime_local, solar_window_solstice):
+    hour_date = datetime_local.hour.values
+    min_date = datetime_local.minute.values
+    day_date = datetime_local.dayofyear.values
     worst_hour = calc_worst_hour(latitude, weather_data, solar_window_solstice)
 
     # solar elevation, azimuth and values for the 9-3pm period of no shading on the solar solstice
-    sun_coords = pyephem(datetime_local, latitude, longitude)
-    sun_coords['declination'] = np.vectorize(declination_degree)(day_date, 365)
-    sun_coords['hour_angle'] = np.vectorize(get_hour_angle)(longitude, min_date, hour_date, day_date)
+    sun_coords = calc_sun_position(datetime_local, latitude, longitude)
+    sun_coords['declination'] = declination_degree(day_date, 365)
+    sun_coords['hour_angle'] = get_hour_angle(longitude, min_date, hour_date, day_date)
     worst_sh = sun_coords['elevation'].loc[datetime_local[worst_hour]]
     worst_Az = sun_coords['azimuth'].loc[datetime_local[worst_hour]]
 
     # mean transmissivity
-    weather_data['diff'] = weather_data.difhorrad_Whm2 / weather_data.glohorrad_Whm2
-    T_G_hour = weather_data[np.isfinite(weather_data['diff'])]
-    T_G_day = np.round(T_G_hour.groupby(['dayofyear']).mean(), 2)
-    T_G_day['diff'] = T_G_day['diff'].replace(1, 0.90)
-    transmittivity = (1 - T_G_day['diff']).mean()
+    diffuse_fraction = weather_data.difhorrad_Whm2 / weather_data.glohorrad_Whm2
+    valid = np.isfinite(diffuse_fraction)
+    T_G_day = np.round(diffuse_fraction[valid].groupby(weather_data['dayofyear'][valid]).mean(), 2)
+    T_G_day = T_G_day.replace(1, 0.90)
+    transmittivity = (1 - T_G_day).mean()
 
     return SunProperties(g=sun_coords['declination'], Sz=sun_coords['zenith'], Az=sun_coords['azimuth'],
                          ha=sun_coords['hour_angle'], trr_mean=transmittivity, worst_sh=worst_sh, worst_Az=worst_Az)
@@ -175,7 +261,7 @@ def declination_degree(day_date, TY):
     .. [1] http://pysolar.org/
     """
 
-    return 23.45 * np.vectorize(sin)((2 * pi / (TY)) * (day_date - 81))
+    return 23.45 * np.sin((2 * pi / (TY)) * (day_date - 81))
 
 
 def get_hour_angle(longitude_deg, min_date, hour_date, day_date):
@@ -199,13 +285,41 @@ def get_solar_time(longitude_deg, min_date, hour_date, day_date):
 
 def get_equation_of_time(day_date):
     B = (day_date - 1) * 360 / 365
-    E = 229.2 * (0.000075 + 0.001868 * cos(B) - 0.032077 * sin(B) - 0.014615 * cos(2 * B) - 0.04089 * sin(2 * B))
+    E = 229.2 * (0.000075 + 0.001868 * np.cos(B) - 0.032077 * np.sin(B) - 0.014615 * np.cos(2 * B) -
+                 0.04089 * np.sin(2 * B))
     return E
 
 
 # filter sensor points with low solar potential
 
-def filter_low_potential(radiation_json_path, metadata_csv_path, config):
+def read_sensor_results(radiation_path, sensors=None):
+    """
+    Read the hourly radiation of the sensors of a building written by the radiation script
+    (``locator.get_radiation_building_sensors``, one row per sensor in the order of ``locator.get_radiation_metadata``).
+
+    :param str radiation_path: path to the sensor results of the building
+    :param sensors: the positions of the sensors to read (rows of the sensor metadata) or None to read all sensors
+    :type sensors: list[int] or np.ndarray
+    :return: hourly radiation of the sensors [Wh/m2] with shape (sensors, HOURS_IN_YEAR). If ``sensors`` is None, the
+        float32 results are memory-mapped (read from disk when they are used), otherwise the results of the selected
+        sensors only are read and converted to float64
+    :rtype: np.ndarray
+    :raises MissingInputDataException: if the scenario only has the sensor results of an older version of the
+        radiation script (``${building}_insolation_Whm2.json``)
+    """
+    legacy_radiation_path = os.path.splitext(radiation_path)[0] + '.json'
+    if not os.path.exists(radiation_path) and os.path.exists(legacy_radiation_path):
+        raise MissingInputDataException(
+            "The sensor results {legacy_radiation_path} were written by an older version of the radiation script, "
+            "please run the radiation script again to write {radiation_path}".format(
+                legacy_radiation_path=legacy_radiation_path, radiation_path=radiation_path))
+    sensors_rad = np.load(radiation_path, mmap_mode='r')
+    if sensors is None:
+        return sensors_rad
+    return np.asarray(sensors_rad[sensors], dtype=np.float64)
+
+
+def filter_low_potential(radiation_path, metadata_csv_path, config):
     """
     To filter the sensor points/hours with low radiation potential.
 
@@ -213,8 +327,8 @@ def filter_low_potential(radiation_json_path, metadata_csv_path, config):
     #. eliminate points when hourly production < 50 W/m2
     #. augment the solar radiation due to differences between panel reflectance and original reflectances used in daysim
 
-    :param radiation_csv: solar insulation data on all surfaces of each building
-    :type radiation_csv: .csv
+    :param radiation_path: hourly solar insolation of each sensor point of the building (see ``read_sensor_results``)
+    :type radiation_path: .npy
     :param metadata_csv: solar insulation sensor data of each building
     :type metadata_csv: .csv
     :return max_annual_radiation: yearly horizontal radiation [Wh/m2/year]
@@ -234,20 +348,15 @@ def filter_low_potential(radiation_json_path, metadata_csv_path, config):
     #. No solar panels on windows.
     """
 
-    def f(x):
-        if x <= 50:
-            return 0
-        else:
-            return x
-
     # read radiation file
-    sensors_rad = pd.read_json(radiation_json_path)
+    sensors_rad = read_sensor_results(radiation_path)
     sensors_metadata = pd.read_csv(metadata_csv_path)
 
     # join total radiation to sensor_metadata
-    sensors_rad_sum = sensors_rad.sum(0).to_frame('total_rad_Whm2')  # add new row with yearly radiation
+    sensors_rad_sum = sensors_rad.sum(axis=1, dtype=np.float64)  # yearly radiation [Wh/m2]
+    sensors_metadata['total_rad_Whm2'] = sensors_rad_sum
     sensors_metadata.set_index('SURFACE', inplace=True)
-    sensors_metadata = sensors_metadata.merge(sensors_rad_sum, left_index=True, right_index=True)  # [Wh/m2]
+    sensors_surfaces = sensors_metadata.index
 
     # remove window surfaces
     sensors_metadata = sensors_metadata[sensors_metadata.TYPE != 'windows']
@@ -261,12 +370,13 @@ def filter_low_potential(radiation_json_path, metadata_csv_path, config):
 
     # set min yearly radiation threshold for sensor selection
     # keep sensors above min production in sensors_rad
-    max_annual_radiation = sensors_rad_sum.max().values[0]
+    max_annual_radiation = sensors_rad_sum.max()
     annual_radiation_threshold_Whperm2 = float(config.solar.annual_radiation_threshold)*1000
     sensors_metadata_clean = sensors_metadata[sensors_metadata.total_rad_Whm2 >= annual_radiation_threshold_Whperm2]
-    sensors_rad_clean = sensors_rad[sensors_metadata_clean.index.tolist()]  # keep sensors above min radiation
-
-    sensors_rad_clean = sensors_rad_clean.applymap(lambda x: f(x))
+    # keep sensors above min radiation, read only these from the radiation file
+    sensors_rad_clean = read_sensor_results(radiation_path, sensors_surfaces.get_indexer(sensors_metadata_clean.index))
+    sensors_rad_clean[sensors_rad_clean <= 50] = 0
+    sensors_rad_clean = pd.DataFrame(sensors_rad_clean.T, columns=sensors_metadata_clean.index)
 
     return max_annual_radiation, annual_radiation_threshold_Whperm2, sensors_rad_clean, sensors_metadata_clean
 
@@ -313,8 +423,8 @@ def calc_spacing_custom_angle(sensors_metadata_clean, solar_properties, max_rad_
 
     # calculate panel tilt angle (B) for flat roofs (tilt < 5 degrees), slope roofs and walls.
     input_angle_rad = radians(panel_tilt_angle)
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(acos)(sensors_metadata_clean['Zdir'])  # surface tilt angle in rad
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(degrees)(sensors_metadata_clean['tilt_deg'])  # surface tilt angle in degrees
+    # surface tilt angle in degrees
+    sensors_metadata_clean['tilt_deg'] = np.degrees(np.arccos(sensors_metadata_clean['Zdir'].values))
     sensors_metadata_clean['B_deg'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5,
                                                sensors_metadata_clean['tilt_deg'],
                                                degrees(input_angle_rad))  # panel tilt angle in degrees
@@ -324,10 +434,9 @@ def calc_spacing_custom_angle(sensors_metadata_clean, solar_properties, max_rad_
     optimal_spacing_flat_m = calc_optimal_spacing(solar_properties, input_angle_rad, module_length_m)
     sensors_metadata_clean['array_spacing_m'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5, 0,
                                                          optimal_spacing_flat_m)
-    sensors_metadata_clean['surface_azimuth_deg'] = np.vectorize(calc_surface_azimuth)(sensors_metadata_clean['Xdir'],
-                                                                                       sensors_metadata_clean['Ydir'],
-                                                                                       sensors_metadata_clean[
-                                                                                           'B_deg'])  # degrees
+    sensors_metadata_clean['surface_azimuth_deg'] = calc_surface_azimuth(sensors_metadata_clean['Xdir'].values,
+                                                                         sensors_metadata_clean['Ydir'].values,
+                                                                         sensors_metadata_clean['B_deg'].values)
 
     # calculate the surface area required to install one pv panel on flat roofs with defined tilt angle and array spacing
     if panel_properties['type'] == 'PV':
@@ -344,8 +453,8 @@ def calc_spacing_custom_angle(sensors_metadata_clean, solar_properties, max_rad_
         area_per_module_m2 * (roof_coverage * sensors_metadata_clean.AREA_m2 / module_flat_surface_area_m2))
 
     # categorize the sensors by surface_azimuth, B, GB
-    result = np.vectorize(calc_categoriesroof)(sensors_metadata_clean.surface_azimuth_deg, sensors_metadata_clean.B_deg,
-                                               sensors_metadata_clean.total_rad_Whm2, max_rad_Whperm2yr)
+    result = calc_categoriesroof(sensors_metadata_clean.surface_azimuth_deg.values, sensors_metadata_clean.B_deg.values,
+                                 sensors_metadata_clean.total_rad_Whm2.values, max_rad_Whperm2yr)
     sensors_metadata_clean['CATteta_z'] = result[0]
     sensors_metadata_clean['CATB'] = result[1]
     sensors_metadata_clean['CATGB'] = result[2]
@@ -395,9 +504,8 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, solar_properties, m
     # calculate panel tilt angle (B) for flat roofs (tilt < 5 degrees), slope roofs and walls.
     optimal_angle_flat_rad = calc_optimal_angle(180, latitude,
                                                 solar_properties.trr_mean)  # assume surface azimuth = 180 (N,E), south facing
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(acos)(sensors_metadata_clean['Zdir'])  # surface tilt angle in rad
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(degrees)(
-        sensors_metadata_clean['tilt_deg'])  # surface tilt angle in degrees
+    # surface tilt angle in degrees
+    sensors_metadata_clean['tilt_deg'] = np.degrees(np.arccos(sensors_metadata_clean['Zdir'].values))
     sensors_metadata_clean['B_deg'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5,
                                                sensors_metadata_clean['tilt_deg'],
                                                degrees(optimal_angle_flat_rad))  # panel tilt angle in degrees
@@ -407,10 +515,9 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, solar_properties, m
     optimal_spacing_flat_m = calc_optimal_spacing(solar_properties, optimal_angle_flat_rad, module_length_m)
     sensors_metadata_clean['array_spacing_m'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5, 0,
                                                          optimal_spacing_flat_m)
-    sensors_metadata_clean['surface_azimuth_deg'] = np.vectorize(calc_surface_azimuth)(sensors_metadata_clean['Xdir'],
-                                                                                       sensors_metadata_clean['Ydir'],
-                                                                                       sensors_metadata_clean[
-                                                                                           'B_deg'])  # degrees
+    sensors_metadata_clean['surface_azimuth_deg'] = calc_surface_azimuth(sensors_metadata_clean['Xdir'].values,
+                                                                         sensors_metadata_clean['Ydir'].values,
+                                                                         sensors_metadata_clean['B_deg'].values)
 
     # calculate the surface area required to install one pv panel on flat roofs with defined tilt angle and array spacing
     if panel_properties['type'] == 'PV':
@@ -429,8 +536,8 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, solar_properties, m
                                                                    module_flat_surface_area_m2))
 
     # categorize the sensors by surface_azimuth, B, GB
-    result = np.vectorize(calc_categoriesroof)(sensors_metadata_clean.surface_azimuth_deg, sensors_metadata_clean.B_deg,
-                                               sensors_metadata_clean.total_rad_Whm2, max_rad_Whperm2yr)
+    result = calc_categoriesroof(sensors_metadata_clean.surface_azimuth_deg.values, sensors_metadata_clean.B_deg.values,
+                                 sensors_metadata_clean.total_rad_Whm2.values, max_rad_Whperm2yr)
     sensors_metadata_clean['CATteta_z'] = result[0]
     sensors_metadata_clean['CATB'] = result[1]
     sensors_metadata_clean['CATGB'] = result[2]
@@ -494,122 +601,52 @@ def calc_categoriesroof(teta_z, B, GB, Max_Isol):
     To categorize solar panels by the surface azimuth, tilt angle and yearly radiation.
 
     :param teta_z: surface azimuth [degree], 0 degree north (east positive, west negative)
-    :type teta_z: float
+    :type teta_z: np.ndarray
     :param B: solar panel tile angle [degree]
-    :type B: float
+    :type B: np.ndarray
     :param GB: yearly radiation of sensors [Wh/m2/year]
-    :type GB: float
+    :type GB: np.ndarray
     :param Max_Isol: maximum radiation received on surfaces [Wh/m2/year]
     :type Max_Isol: float
     :return CATteta_z: category of surface azimuth
-    :rtype CATteta_z: float
-    :return CATB: category of tilt angle
-    :rtype CATB: float
-    :return CATBG: category of yearly radiation
-    :rtype CATBG: float
-    """
-    if -122.5 < teta_z <= -67:
-        CATteta_z = 1
-    elif -67 < teta_z <= -22.5:
-        CATteta_z = 3
-    elif -22.5 < teta_z <= 22.5:
-        CATteta_z = 5
-    elif 22.5 < teta_z <= 67:
-        CATteta_z = 4
-    elif 67 <= teta_z <= 122.5:
-        CATteta_z = 2
-    else:
-        CATteta_z = 6
-    B = degrees(B)
-    if 0 < B <= 5:
-        CATB = 1  # flat roof
-    elif 5 < B <= 15:
-        CATB = 2  # tilted 5-15 degrees
-    elif 15 < B <= 25:
-        CATB = 3  # tilted 15-25 degrees
-    elif 25 < B <= 40:
-        CATB = 4  # tilted 25-40 degrees
-    elif 40 < B <= 60:
-        CATB = 5  # tilted 40-60 degrees
-    elif B > 60:
-        CATB = 6  # tilted >60 degrees
-    else:
-        CATB = None
-        print('B not in expected range')
-
-    GB_percent = GB / Max_Isol
-    # if 0 < GB_percent <= 0.05:
-    #     CATGB = 1
-    # elif 0.05 < GB_percent <= 0.1:
-    #     CATGB = 2
-    # elif 0.1 < GB_percent <= 0.15:
-    #     CATGB = 3
-    # elif 0.15 < GB_percent <= 0.2:
-    #     CATGB = 4
-    # elif 0.2 < GB_percent <= 0.25:
-    #     CATGB = 5
-    # elif 0.25 < GB_percent <= 0.3:
-    #     CATGB = 6
-    # elif 0.3 < GB_percent <= 0.35:
-    #     CATGB = 7
-    # elif 0.35 < GB_percent <= 0.4:
-    #     CATGB = 8
-    # elif 0.4 < GB_percent<= 0.45:
-    #     CATGB = 9
-    # elif 0.45 < GB_percent <= 0.5:
-    #     CATGB = 10
-    # elif 0.5 < GB_percent <= 0.55:
-    #     CATGB = 11
-    # elif 0.55 < GB_percent <= 0.6:
-    #     CATGB = 12
-    # elif 0.6 < GB_percent <= 0.65:
-    #     CATGB = 13
-    # elif 0.65 < GB_percent <= 0.7:
-    #     CATGB = 14
-    # elif 0.7 < GB_percent <= 0.75:
-    #     CATGB = 15
-    # elif 0.75 < GB_percent <= 0.8:
-    #     CATGB = 16
-    # elif 0.8 < GB_percent <= 0.85:
-    #     CATGB = 17
-    # elif 0.85 < GB_percent <= 0.9:
-    #     CATGB = 18
-    # elif 0.9 < GB_percent <= 0.95:
-    #     CATGB = 19
-    # elif 0.95 < GB_percent <= 1:
-    #     CATGB = 20
-    # else:
-    #     CATGB = None
-    #     print('GB not in expected range')
-
-
-    if 0 < GB_percent <= 0.1:
-        CATGB = 1
-    elif 0.1 < GB_percent <= 0.2:
-        CATGB = 2
-    elif 0.2 < GB_percent <= 0.3:
-        CATGB = 3
-    elif 0.3 < GB_percent <= 0.4:
-        CATGB = 4
-    elif 0.4 < GB_percent<= 0.5:
-        CATGB = 5
-    elif 0.5 < GB_percent <= 0.6:
-        CATGB = 6
-    elif 0.6 < GB_percent <= 0.7:
-        CATGB = 7
-    elif 0.7 < GB_percent <= 0.8:
-        CATGB = 8
-    elif 0.8 < GB_percent <= 0.9:
-        CATGB = 9
-    elif 0.90 < GB_percent <= 1:
-        CATGB = 10
-    else:
-        CATGB = None
-        print('GB not in expected range')
+    :rtype CATteta_z: np.ndarray
+    :return CATB: category of tilt angle (nan if out of the expected range)
+    :rtype CATB: np.ndarray
+    :return CATBG: category of yearly radiation (nan if out of the expected range)
+    :rtype CATBG: np.ndarray
+    """
+    teta_z = np.asarray(teta_z, dtype=np.float64)
+    CATteta_z = np.select([(-122.5 < teta_z) & (teta_z <= -67),
+                           (-67 < teta_z) & (teta_z <= -22.5),
+                           (-22.5 < teta_z) & (teta_z <= 22.5),
+                           (22.5 < teta_z) & (teta_z <= 67),
+                           (67 <= teta_z) & (teta_z <= 122.5)],
+                          [1, 3, 5, 4, 2], default=6)
+
+    B = np.degrees(np.asarray(B, dtype=np.float64))
+    # flat roof, tilted 5-15, 15-25, 25-40, 40-60 and >60 degrees
+    CATB = categorize(B, [0, 5, 15, 25, 40, 60, np.inf], 'B not in expected range')
+
+    GB_percent = np.asarray(GB, dtype=np.float64) / Max_Isol
+    # 10 categories of 10% of the maximum radiation
+    CATGB = categorize(GB_percent, [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1], 'GB not in expected range')
 
     return CATteta_z, CATB, CATGB
 
 
+def categorize(values, bins, message):
+    """
+    The category of each value: i if bins[i - 1] < value <= bins[i]. The categories are integers, unless a value is out
+    of the range of the bins (the category is nan then and ``message`` is printed).
+    """
+    categories = np.searchsorted(bins, values, side='left')
+    out_of_range = (categories == 0) | (categories == len(bins)) | np.isnan(values)
+    if out_of_range.any():
+        print(message)
+        return np.where(out_of_range, np.nan, categories)
+    return categories
+
+
 def calc_surface_azimuth(xdir, ydir, B):
     """
     Calculate surface azimuth from the surface normal vector (x,y,z) and tilt angle (B).
@@ -618,25 +655,19 @@ def calc_surface_azimuth(xdir, ydir, B):
     :param xdir: surface normal vector x in (x,y,z) representing east-west direction
     :param ydir: surface normal vector y in (x,y,z) representing north-south direction
     :param B: surface tilt angle in degree
-    :type xdir: float
-    :type ydir: float
-    :type B: float
+    :type xdir: float or np.ndarray
+    :type ydir: float or np.ndarray
+    :type B: float or np.ndarray
     :returns surface azimuth: the azimuth of the surface of a solar panel in degree
-    :rtype surface_azimuth: float
+    :rtype surface_azimuth: float or np.ndarray
 
     """
-    B = radians(B)
-    teta_z = degrees(asin(xdir / sin(B)))
+    B = np.radians(B)
+    teta_z = np.degrees(np.arcsin(xdir / np.sin(B)))
     # set the surface azimuth with on the sing convention (E,N)=(+,+)
-    if xdir < 0:
-        if ydir < 0:
-            surface_azimuth = 180 + teta_z  # (xdir,ydir) = (-,-)
-        else:
-            surface_azimuth = 360 + teta_z  # (xdir,ydir) = (-,+)
-    elif ydir < 0:
-        surface_azimuth = 180 + teta_z  # (xdir,ydir) = (+,-)
-    else:
-        surface_azimuth = teta_z  # (xdir,ydir) = (+,+)
+    surface_azimuth = np.where(ydir < 0, 180 + teta_z,  # (xdir,ydir) = (-,-) and (+,-)
+                               np.where(xdir < 0, 360 + teta_z,  # (xdir,ydir) = (-,+)
+                                        teta_z))  # (xdir,ydir) = (+,+)
     return surface_azimuth  # degree
 
 
@@ -662,27 +693,27 @@ def calc_angle_of_incidence(g, lat, ha, tilt, teta_z):
     :param tilt: panel surface tilt angle [radians]
     :param teta_z: panel surface azimuth angle [radians]
     :type lat: float
-    :type g: float
-    :type ha: float
-    :type tilt: float
-    :type teta_z: float
+    :type g: float or np.array
+    :type ha: float or np.array
+    :type tilt: float or np.array
+    :type teta_z: float or np.array
     :return teta_B: angle of incidence [radians]
-    :rtype teta_B: float
+    :rtype teta_B: float or np.array
 
     .. [Sproul, A. B., 2017] Sproul, A.B. (2007). Derivation of the solar geometric relationships using vector analysis.
        Renewable Energy, 32(7), 1187-1205.
     """
     # surface normal vector
-    n_E = sin(tilt) * sin(teta_z)
-    n_N = sin(tilt) * cos(teta_z)
-    n_Z = cos(tilt)
+    n_E = np.sin(tilt) * np.sin(teta_z)
+    n_N = np.sin(tilt) * np.cos(teta_z)
+    n_Z = np.cos(tilt)
     # solar vector
-    s_E = -cos(g) * sin(ha)
-    s_N = sin(g) * cos(lat) - cos(g) * sin(lat) * cos(ha)
-    s_Z = cos(g) * cos(lat) * cos(ha) + sin(g) * sin(lat)
+    s_E = -np.cos(g) * np.sin(ha)
+    s_N = np.sin(g) * np.cos(lat) - np.cos(g) * np.sin(lat) * np.cos(ha)
+    s_Z = np.cos(g) * np.cos(lat) * np.cos(ha) + np.sin(g) * np.sin(lat)
 
     # angle of incidence
-    teta_B = acos(n_E * s_E + n_N * s_N + n_Z * s_Z)
+    teta_B = np.arccos(n_E * s_E + n_N * s_N + n_Z * s_Z)
     return teta_B
 
 
@@ -710,33 +741,38 @@ def calc_groups(radiation_of_sensors_clean, sensors_metadata_cat):
     # calculate number of groups as number of optimal combinations.
     sensors_metadata_cat['type_orientation'] = sensors_metadata_cat['TYPE'] + '_' + sensors_metadata_cat['orientation']
     sensors_metadata_cat['surface'] = sensors_metadata_cat.index
-    sensor_groups_ob = sensors_metadata_cat.groupby(
-        ['CATB', 'CATGB', 'CATteta_z', 'type_orientation'])  # group the sensors by categories
-    number_groups = sensor_groups_ob.size().count() # TODO: check if redundant, it is actually equal to group_count
-    group_keys = sensor_groups_ob.groups.keys()
-
-    # empty dicts to store results
-    group_properties = {}
-    group_mean_radiations = {}
-    number_points = {}
-    group_count = 0
-    for key in group_keys:
-        # get surface names in group
-        surfaces_in_group = sensor_groups_ob['surface'].groups[key].values
-        number_points[group_count] = len(surfaces_in_group)
-        # write group properties
-        group_key = pd.Series({'CATB': key[0], 'CATGB': key[1], 'CATteta_z': key[2], 'type_orientation': key[3]})
-        group_info = pd.Series({'number_srfs': number_points, 'srfs': (''.join(surfaces_in_group))})
-        group_prop_sum = sensor_groups_ob.sum().loc[key,:][['AREA_m2','area_installed_module_m2']]
-        group_prop_mean =  sensor_groups_ob.mean().loc[key,:].drop(['area_installed_module_m2', 'AREA_m2'])
-        group_properties[group_count] = group_key.append(group_prop_mean).append(group_prop_sum).append(group_info)
-        # calculate mean radiation among surfaces in group
-        group_mean_radiations[group_count] = radiation_of_sensors_clean[surfaces_in_group].mean(axis=1).values
-
-        group_count += 1
-
-    prop_observers = pd.DataFrame(group_properties).T
-    hourlydata_groups = pd.DataFrame(group_mean_radiations)
+    group_keys = ['CATB', 'CATGB', 'CATteta_z', 'type_orientation']
+    # number the groups in the order of the categories, sensors without a category are not in a group (-1)
+    sensor_groups = sensors_metadata_cat.groupby(group_keys).ngroup().fillna(-1).values.astype(int)
+    in_group = sensor_groups >= 0
+    number_groups = int(sensor_groups.max()) + 1 if in_group.any() else 0
+
+    # sparse matrix (groups x sensors) to sum the values of the sensors in each group
+    sensors = np.flatnonzero(in_group)
+    group_matrix = scipy.sparse.csr_matrix((np.ones(len(sensors)), (sensor_groups[sensors], sensors)),
+                                           shape=(number_groups, len(sensor_groups)))
+    points_in_group = np.bincount(sensor_groups[in_group], minlength=number_groups)
+    number_points = dict(enumerate(points_in_group))
+
+    # write group properties: the categories, the mean of the properties of the sensors, the total areas
+    first_sensors = np.unique(sensor_groups[in_group], return_index=True)[1]
+    prop_observers = sensors_metadata_cat[in_group][group_keys].iloc[first_sensors].reset_index(drop=True)
+    area_columns = ['AREA_m2', 'area_installed_module_m2']
+    mean_columns = [column for column in sensors_metadata_cat.select_dtypes(include=[np.number, bool]).columns
+                    if column not in group_keys + area_columns]
+    mean_values = group_matrix.dot(sensors_metadata_cat[mean_columns].values.astype(np.float64))
+    for k, column in enumerate(mean_columns):
+        prop_observers[column] = mean_values[:, k] / points_in_group
+    sum_values = group_matrix.dot(sensors_metadata_cat[area_columns].values.astype(np.float64))
+    for k, column in enumerate(area_columns):
+        prop_observers[column] = sum_values[:, k]
+    prop_observers['number_srfs'] = points_in_group
+    prop_observers['srfs'] = sensors_metadata_cat['surface'][in_group].groupby(sensor_groups[in_group]).agg(''.join)
+
+    # calculate mean radiation among surfaces in group
+    if not radiation_of_sensors_clean.columns.equals(sensors_metadata_cat.index):
+        radiation_of_sensors_clean = radiation_of_sensors_clean[sensors_metadata_cat.index]
+    hourlydata_groups = pd.DataFrame(group_matrix.dot(radiation_of_sensors_clean.values.T).T / points_in_group)
 
     panel_groups = {'number_groups': number_groups, 'number_points': number_points,
                     'hourlydata_groups': hourlydata_groups, 'prop_observers': prop_observers}
@@ -771,6 +807,22 @@ def calc_worst_hour(latitude, weather_data, solar_window_solstice):
     return worst_hour
 
 
+def calc_radiation_types(hourly_radiation, weather_data):
+    """
+    Same as ``cal_radiation_type`` for the radiation of all the groups of sensors at once
+
+    :param hourly_radiation: mean hourly radiation of the sensors in each group [Wh/m2], with shape
+        (HOURS_IN_YEAR, number of groups)
+    :type hourly_radiation: np.ndarray
+    :return: total, direct and diffuse radiation [Wh/m2], with the shape of ``hourly_radiation``
+    """
+    I_sol = hourly_radiation
+    I_diffuse = weather_data.ratio_diffhout.values[:, np.newaxis] * I_sol  # calculate diffuse radiation
+    I_direct = I_sol - I_diffuse  # calculate direct radiation
+    # set nan to zero
+    return tuple(np.where(np.isnan(radiation), 0.0, radiation) for radiation in (I_sol, I_direct, I_diffuse))
+
+
 def cal_radiation_type(group, hourly_radiation, weather_data):
     radiation_Wperm2 = pd.DataFrame({'I_sol': hourly_radiation[group]})
     radiation_Wperm2['I_diffuse'] = weather_data.ratio_diffhout * radiation_Wperm2.I_sol  # calculate diffuse radiation
@@ -778,3 +830,72 @@ def cal_radiation_type(group, hourly_radiation, weather_data):
         'I_diffuse']  # calculate direct radiation
     radiation_Wperm2.fillna(0, inplace=True)  # set nan to zero
     return radiation_Wperm2
+
+
+class BuildingResultsTotals(object):
+    """
+    Sums the hourly results of the buildings (e.g. ``locator.PV_results``) while they are calculated, to write the
+    totals of the district (e.g. ``locator.PV_totals``) and the annual results of each building (e.g.
+    ``locator.PV_total_buildings``) without reading the results of each building again. Use ``add`` as the
+    ``on_result`` of ``cea.utilities.parallel.vectorize``.
+    """
+
+    def __init__(self, building_names, mean_columns=()):
+        """
+        :param building_names: the names of the buildings, in the order of the vectorized calls
+        :param mean_columns: columns averaged over the buildings (ignoring nan) instead of summed, e.g. temperatures
+        """
+        self.building_names = list(building_names)
+        self.mean_columns = set(mean_columns)
+        self.index = None
+        self.sums = {}  # column -> hourly sum over the buildings
+        self.columns = {}  # i -> columns of the hourly results of the i-th building
+        self.counts = {}  # mean column -> hourly number of buildings with a value
+        self.annual_results = {}  # building name -> annual energy and panel areas
+
+    def add(self, i, hourly_results):
+        """
+        Add the hourly results of the ``i``-th building
+
+        :param hourly_results: hourly results of a building, indexed by date
+        :type hourly_results: pd.DataFrame
+        """
+        if self.index is None:
+            self.index = hourly_results.index
+        self.columns[i] = list(hourly_results.columns)
+        for column in hourly_results.columns:
+            values = hourly_results[column].values.astype(np.float64)
+            if column not in self.sums:
+                self.sums[column] = np.zeros(len(values))
+                if column in self.mean_columns:
+                    self.counts[column] = np.zeros(len(values))
+            if column in self.mean_columns:
+                has_value = ~np.isnan(values)
+                self.sums[column] += np.where(has_value, values, 0.0)
+                self.counts[column] += has_value
+            else:
+                self.sums[column] += values
+
+        annual_energy_production = hourly_results.filter(like='_kWh').sum()
+        panel_area_per_building = hourly_results.filter(like='_m2').iloc[0]
+        self.annual_results[self.building_names[i]] = pd.concat([annual_energy_production, panel_area_per_building])
+
+    def get_hourly_totals(self):
+        """
+        the hourly totals of all the buildings added. The columns are in the order of the first building (in the order
+        of ``building_names``), whatever the order in which the buildings are completed.
+        """
+        columns = []
+        for i in sorted(self.columns):
+            columns.extend(column for column in self.columns[i] if column not in columns)
+        hourly_totals = pd.DataFrame(self.sums, index=self.index, columns=columns)
+        for column in self.counts:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                hourly_totals[column] = np.where(self.counts[column] > 0, self.sums[column] / self.counts[column],
+                                                 np.nan)
+        return hourly_totals
+
+    def get_annual_results(self):
+        """the annual results of each building added, one row per building"""
+        building_names = [name for name in self.building_names if name in self.annual_results]
+        return pd.DataFrame([self.annual_results[name] for name in building_names], index=building_names)
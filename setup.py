@@ -30,6 +30,7 @@ INSTALL_REQUIRES = ["cufflinks",
                     'osmnx',
                     'plotly',
                     'psutil',
+                    'pyarrow',
                     'py4design_cea',
                     'pysal',
                     'pyyaml',